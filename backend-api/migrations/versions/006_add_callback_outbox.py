@@ -0,0 +1,82 @@
+"""add callback outbox
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-18
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "006"
+down_revision: str | None = "005"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Create callback_outbox table for asynchronous callback delivery."""
+    op.create_table(
+        "callback_outbox",
+        sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("callback_url", sa.String(length=2048), nullable=False),
+        sa.Column("payload", postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column("request_id", sa.String(length=255), nullable=True),
+        sa.Column(
+            "status",
+            sa.Enum("pending", "delivered", "failed", name="callback_outbox_status"),
+            nullable=False,
+        ),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column(
+            "next_attempt_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column("last_status_code", sa.Integer(), nullable=True),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("delivered_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.CheckConstraint("attempts >= 0", name="ck_callback_outbox_attempts_positive"),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk_callback_outbox")),
+    )
+    op.create_index(
+        "ix_callback_outbox_status_next_attempt_at",
+        "callback_outbox",
+        ["status", "next_attempt_at"],
+        unique=False,
+    )
+
+    op.execute(
+        """
+        CREATE TRIGGER update_callback_outbox_updated_at
+        BEFORE UPDATE ON callback_outbox
+        FOR EACH ROW
+        EXECUTE FUNCTION update_updated_at_column();
+    """
+    )
+
+
+def downgrade() -> None:
+    """Drop callback_outbox table."""
+    op.execute("DROP TRIGGER IF EXISTS update_callback_outbox_updated_at ON callback_outbox")
+    op.drop_index("ix_callback_outbox_status_next_attempt_at", table_name="callback_outbox")
+    op.drop_table("callback_outbox")
+    op.execute("DROP TYPE IF EXISTS callback_outbox_status")
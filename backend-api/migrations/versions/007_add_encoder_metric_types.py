@@ -0,0 +1,43 @@
+"""add encoder resource metric types
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-18
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "007"
+down_revision: str | None = "006"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+ENCODER_METRIC_TYPES = (
+    "encoder_cpu",
+    "encoder_memory",
+    "encoder_read_bytes",
+    "encoder_write_bytes",
+    "encode_fps",
+    "encode_speed",
+)
+
+
+def upgrade() -> None:
+    """Add metric types for the FFmpeg resource time series."""
+    # ALTER TYPE ... ADD VALUE cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        for value in ENCODER_METRIC_TYPES:
+            op.execute(f"ALTER TYPE metric_type ADD VALUE IF NOT EXISTS '{value}'")
+
+
+def downgrade() -> None:
+    """Remove encoder resource metrics.
+
+    PostgreSQL cannot drop enum values, so the types stay but go unused.
+    """
+    values = ", ".join(f"'{value}'" for value in ENCODER_METRIC_TYPES)
+    op.execute(f"DELETE FROM job_metrics WHERE metric_type::text IN ({values})")  # noqa: S608
@@ -0,0 +1,104 @@
+"""add recompositions
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-18
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "008"
+down_revision: str | None = "007"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Create recompositions table for edit-triggered re-renders."""
+    op.create_table(
+        "recompositions",
+        sa.Column("id", sa.String(length=64), nullable=False),
+        sa.Column("composition_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("generation_id", sa.String(length=255), nullable=False),
+        sa.Column("config_hash", sa.String(length=64), nullable=False),
+        sa.Column("plan_hash", sa.String(length=64), nullable=False),
+        sa.Column(
+            "status",
+            sa.Enum(
+                "pending",
+                "triggered",
+                "processing",
+                "completed",
+                "failed",
+                "cancelled",
+                name="recomposition_status",
+            ),
+            nullable=False,
+        ),
+        sa.Column("ffmpeg_job_id", sa.String(length=255), nullable=True),
+        sa.Column("estimated_duration_seconds", sa.Float(), nullable=True),
+        sa.Column("edit_plan", postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column("updated_config", postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column("triggered_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("completed_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("error_message", sa.Text(), nullable=True),
+        sa.Column("error_details", postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(
+            ["composition_id"],
+            ["compositions.id"],
+            name=op.f("fk_recompositions_composition_id_compositions"),
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk_recompositions")),
+    )
+    op.create_index(
+        op.f("ix_recompositions_composition_id"),
+        "recompositions",
+        ["composition_id"],
+        unique=False,
+    )
+    op.create_index(op.f("ix_recompositions_status"), "recompositions", ["status"], unique=False)
+    op.create_index(
+        "uq_recompositions_active_edit",
+        "recompositions",
+        ["composition_id", "config_hash", "plan_hash"],
+        unique=True,
+        postgresql_where=sa.text("status NOT IN ('failed', 'cancelled')"),
+    )
+
+    op.execute(
+        """
+        CREATE TRIGGER update_recompositions_updated_at
+        BEFORE UPDATE ON recompositions
+        FOR EACH ROW
+        EXECUTE FUNCTION update_updated_at_column();
+    """
+    )
+
+
+def downgrade() -> None:
+    """Drop recompositions table."""
+    op.execute("DROP TRIGGER IF EXISTS update_recompositions_updated_at ON recompositions")
+    op.drop_index("uq_recompositions_active_edit", table_name="recompositions")
+    op.drop_index(op.f("ix_recompositions_status"), table_name="recompositions")
+    op.drop_index(op.f("ix_recompositions_composition_id"), table_name="recompositions")
+    op.drop_table("recompositions")
+    op.execute("DROP TYPE IF EXISTS recomposition_status")
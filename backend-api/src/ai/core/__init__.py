@@ -1,4 +1,7 @@
 """Core utilities for AI processing"""
 
 from .openai_client import *
-from .replicate_client import *
\ No newline at end of file
+from .replicate_client import *
+from .replicate_fanout import *
+from .palette_engine import *
+from .timeline_engine import *
@@ -0,0 +1,110 @@
+"""
+Palette Engine - PR #502 follow-up: vectorized color harmony math
+Computes pairwise contrast, temperature and harmony matrices for a palette in one pass.
+"""
+
+from dataclasses import dataclass
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+# WCAG relative luminance coefficients (sRGB)
+LUMINANCE_WEIGHTS = (0.2126, 0.7152, 0.0722)
+
+
+@dataclass
+class PaletteMatrices:
+    """
+    Per-color vectors and pairwise matrices for a palette
+
+    Matrices are n x n and symmetric; entry [i, j] describes colors[i] vs colors[j].
+    """
+    colors: List[str]
+    luminance: np.ndarray
+    temperature: np.ndarray
+    contrast: np.ndarray
+    temperature_difference: np.ndarray
+    harmony: np.ndarray
+
+    def upper_pairs(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Index arrays (i, j) for every unordered pair with i < j, in row-major order"""
+        return np.triu_indices(len(self.colors), k=1)
+
+
+def pair_harmony_score(contrast_ratio: float, temp_diff: float) -> float:
+    """
+    Harmony score (0-1) for one color pair
+
+    Contrast is weighted 70% (stepped at the WCAG thresholds), temperature
+    similarity 30% (full penalty at a 0.5 temperature difference).
+    """
+    if contrast_ratio >= 7.0:  # WCAG AAA
+        contrast_score = 1.0
+    elif contrast_ratio >= 4.5:  # WCAG AA
+        contrast_score = 0.8
+    elif contrast_ratio >= 3.0:  # Large text minimum
+        contrast_score = 0.6
+    else:
+        contrast_score = contrast_ratio / 3.0  # Linear scale below minimum
+
+    temp_harmony = 1.0 - min(temp_diff, 0.5) * 2
+    return (contrast_score * 0.7) + (temp_harmony * 0.3)
+
+
+def _hex_to_rgb_array(colors: Sequence[str]) -> np.ndarray:
+    """Parse hex colors into an (n, 3) float array of 0-255 channel values"""
+    digits = [color.lstrip('#') for color in colors]
+    invalid = [color for color, hex_digits in zip(colors, digits) if len(hex_digits) != 6]
+    if invalid:
+        raise ValueError(f"Expected 6-digit hex colors, got: {invalid}")
+    packed = "".join(digits)
+    return np.frombuffer(bytes.fromhex(packed), dtype=np.uint8).reshape(-1, 3).astype(np.float64)
+
+
+def compute_palette_matrices(colors: Sequence[str]) -> PaletteMatrices:
+    """
+    Compute luminance, temperature and all pairwise matrices for a palette
+
+    Each color is parsed and linearized exactly once; contrast, temperature
+    difference and harmony for every pair are then computed with broadcasting
+    instead of per-pair Python calls.
+
+    Args:
+        colors: Hex color codes (e.g. "#1a1a1a")
+
+    Returns:
+        PaletteMatrices for the palette
+    """
+    colors = list(colors)
+    rgb = _hex_to_rgb_array(colors)
+
+    # Linear RGB and WCAG relative luminance
+    srgb = rgb / 255.0
+    linear = np.where(srgb <= 0.03928, srgb / 12.92, ((srgb + 0.055) / 1.055) ** 2.4)
+    luminance = linear @ np.asarray(LUMINANCE_WEIGHTS)
+
+    # Temperature: red/yellow weighted warmth, clamped to [0, 1]
+    warmth = (rgb[:, 0] + rgb[:, 1] * 0.5) / (rgb.sum(axis=1) + 1)
+    temperature = np.clip(warmth, 0.0, 1.0)
+
+    # Pairwise matrices
+    contrast = (np.maximum.outer(luminance, luminance) + 0.05) / (np.minimum.outer(luminance, luminance) + 0.05)
+    temperature_difference = np.abs(np.subtract.outer(temperature, temperature))
+
+    contrast_score = np.select(
+        [contrast >= 7.0, contrast >= 4.5, contrast >= 3.0],
+        [1.0, 0.8, 0.6],
+        default=contrast / 3.0,
+    )
+    temp_harmony = 1.0 - np.minimum(temperature_difference, 0.5) * 2
+    harmony = contrast_score * 0.7 + temp_harmony * 0.3
+
+    return PaletteMatrices(
+        colors=colors,
+        luminance=luminance,
+        temperature=temperature,
+        contrast=contrast,
+        temperature_difference=temperature_difference,
+        harmony=harmony,
+    )
+
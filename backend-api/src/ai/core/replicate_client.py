@@ -8,7 +8,6 @@ import time
 from typing import Dict, List, Optional, Any, Union
 from datetime import datetime, timedelta
 import replicate
-from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
 
 from ..models.replicate_client import (
     ClientConfig,
@@ -20,6 +19,7 @@ from ..models.replicate_client import (
     VideoResolution,
     VideoFormat
 )
+from .replicate_fanout import ReplicateFanout, TERMINAL_STATUSES, poll_intervals
 
 logger = logging.getLogger(__name__)
 
@@ -44,13 +44,11 @@ class ReplicateModelClient:
         # Initialize Replicate client
         self.client = replicate.Client(api_token=config.api_token)
 
+        # Per-model concurrency, create-rate pacing and 429 backoff
+        self.fanout = ReplicateFanout(config.fanout, client=self.client)
+
         logger.info(f"ReplicateModelClient initialized with model: {config.default_model}")
 
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=4, max=10),
-        retry=retry_if_exception_type((replicate.exceptions.ReplicateError, Exception))
-    )
     async def generate_clip(self, request: GenerateClipRequest) -> GenerateClipResponse:
         """
         Generate a video clip using Replicate
@@ -62,7 +60,7 @@ class ReplicateModelClient:
             Response with generation tracking information
 
         Raises:
-            Exception: If generation fails after retries
+            Exception: If generation fails (the fan-out retries 429 and 5xx creates)
         """
         try:
             logger.info(f"Starting video generation for clip {request.clip_id}")
@@ -70,14 +68,12 @@ class ReplicateModelClient:
             # Prepare model inputs
             model_inputs = self._prepare_model_inputs(request)
 
-            # Start prediction asynchronously
-            prediction = await asyncio.get_event_loop().run_in_executor(
-                None,
-                lambda: self.client.predictions.create(
-                    version=request.model,
-                    input=model_inputs,
-                    webhook=request.webhook_url
-                )
+            # Start prediction asynchronously, paced by the per-model limiter
+            prediction = await self.fanout.submit(
+                request.model,
+                version=request.model,
+                input=model_inputs,
+                webhook=request.webhook_url
             )
 
             # Calculate estimated duration based on typical generation times
@@ -154,6 +150,7 @@ class ReplicateModelClient:
         """
         timeout = timeout_seconds or self.config.generation_timeout
         start_time = time.time()
+        intervals = poll_intervals(self.config.fanout)
 
         while time.time() - start_time < timeout:
             try:
@@ -168,11 +165,12 @@ class ReplicateModelClient:
                     error_msg = status_info.get("error", "Unknown error")
                     raise Exception(f"Generation failed: {error_msg}")
 
-                elif status_info["status"] == "cancelled":
+                elif status_info["status"] in TERMINAL_STATUSES:
                     raise Exception("Generation was cancelled")
 
-                # Still processing, wait and check again
-                await asyncio.sleep(2.0)
+                # Still processing, back off before checking again
+                remaining = timeout - (time.time() - start_time)
+                await asyncio.sleep(max(0.0, min(next(intervals), remaining)))
 
             except Exception as e:
                 logger.error(f"Error during generation wait for {prediction_id}: {e}")
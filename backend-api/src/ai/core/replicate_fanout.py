@@ -0,0 +1,401 @@
+"""
+Replicate Fan-out Engine - bounded, rate-limited prediction fan-out
+"""
+
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterator, Optional
+
+from ..models.replicate_client import FanoutConfig
+
+logger = logging.getLogger(__name__)
+
+# Replicate spells it "canceled"; older code paths used "cancelled"
+TERMINAL_STATUSES = frozenset({"succeeded", "failed", "canceled", "cancelled"})
+
+
+class TokenBucket:
+    """
+    Async token bucket used to pace prediction create calls
+
+    Waiters are served in FIFO order. A 429 response can pause the bucket
+    for the server-provided retry delay so that every caller backs off
+    together instead of stampeding the API again.
+    """
+
+    def __init__(self, rate: float, capacity: int, clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize the bucket
+
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum number of tokens (burst size)
+            clock: Monotonic clock, injectable for tests
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._tokens = float(capacity)
+        self._updated = clock()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float) -> None:
+        elapsed = max(0.0, now - self._updated)
+        self._tokens = min(float(self.capacity), self._tokens + elapsed * self.rate)
+        self._updated = now
+
+    async def acquire(self) -> float:
+        """
+        Take one token, waiting until one is available
+
+        Returns:
+            Seconds spent waiting
+        """
+        started = self._clock()
+        async with self._lock:
+            while True:
+                now = self._clock()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+
+                self._refill(now)
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return self._clock() - started
+
+                await asyncio.sleep((1.0 - self._tokens) / self.rate)
+
+    def pause(self, seconds: float) -> None:
+        """
+        Stop handing out tokens for the given number of seconds
+
+        Args:
+            seconds: Pause duration (typically the Retry-After value)
+        """
+        now = self._clock()
+        self._paused_until = max(self._paused_until, now + seconds)
+        self._tokens = 0.0
+        self._updated = now
+
+
+class LatencyTracker:
+    """Rolling window of observed prediction latencies for one model"""
+
+    def __init__(self, window: int = 100):
+        self._samples: Deque[float] = deque(maxlen=window)
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """
+        Nearest-rank percentile of the recorded samples
+
+        Args:
+            fraction: Percentile as a fraction in (0, 1)
+
+        Returns:
+            Latency in seconds, or None when no samples exist
+        """
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))
+        return ordered[index]
+
+
+def poll_intervals(
+    config: FanoutConfig,
+    expected_latency: Optional[float] = None,
+) -> Iterator[float]:
+    """
+    Generate polling intervals with exponential backoff and jitter
+
+    When a typical latency for the model is known, the first poll is deferred
+    to half of it, since polling earlier almost never finds a finished clip.
+
+    Args:
+        config: Fan-out configuration
+        expected_latency: Typical completion latency for the model (seconds)
+
+    Yields:
+        Seconds to sleep before the next status check
+    """
+    interval = config.poll_initial_interval
+    if expected_latency:
+        first = min(config.poll_max_interval, max(interval, expected_latency * 0.5))
+    else:
+        first = interval
+
+    yield first
+    while True:
+        jitter = 1.0 + random.uniform(-config.poll_jitter, config.poll_jitter)  # noqa: S311
+        yield min(config.poll_max_interval, interval) * jitter
+        interval = min(config.poll_max_interval, interval * config.poll_backoff_factor)
+
+
+def _status_code(error: Exception) -> Optional[int]:
+    status = getattr(error, "status", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status
+
+
+def _is_retryable(error: Exception) -> bool:
+    """Only 429 and 5xx are worth retrying; a timed-out create may already have started a prediction"""
+    status = _status_code(error)
+    return status is not None and (status == 429 or 500 <= status < 600)
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    """Return the server-provided Retry-After delay, if any"""
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after", 0)) or None
+    except (TypeError, ValueError):
+        return None
+
+
+class _ModelLimits:
+    """Per-model concurrency, pacing and latency state"""
+
+    def __init__(self, config: FanoutConfig):
+        self.semaphore = asyncio.Semaphore(config.max_concurrency_per_model)
+        self.hedges = asyncio.Semaphore(config.max_hedges_in_flight)
+        self.bucket = TokenBucket(config.requests_per_second, config.burst)
+        self.latency = LatencyTracker()
+
+
+class ReplicateFanout:
+    """
+    Fan-out engine for Replicate predictions
+
+    Wraps a Replicate client (the ``replicate`` module or a ``replicate.Client``)
+    with a per-model concurrency semaphore, a per-model token bucket for
+    create calls, 429-aware retries, adaptive polling and optional hedged
+    submissions for predictions that run past a latency percentile.
+    """
+
+    def __init__(self, config: Optional[FanoutConfig] = None, client: Any = None):
+        """
+        Initialize the engine
+
+        Args:
+            config: Fan-out configuration (defaults used when omitted)
+            client: Object exposing ``predictions.create/get/cancel``
+        """
+        self.config = config or FanoutConfig()
+        if client is None:
+            import replicate
+
+            client = replicate
+        self.client = client
+        self._limits: Dict[str, _ModelLimits] = {}
+
+    def _limits_for(self, model: str) -> _ModelLimits:
+        limits = self._limits.get(model)
+        if limits is None:
+            limits = _ModelLimits(self.config)
+            self._limits[model] = limits
+        return limits
+
+    async def _create(self, model: str, create_kwargs: Dict[str, Any]) -> Any:
+        """Create a prediction, paced by the token bucket and retried on 429 and 5xx"""
+        limits = self._limits_for(model)
+        attempt = 0
+        while True:
+            await limits.bucket.acquire()
+            try:
+                return await asyncio.to_thread(self.client.predictions.create, **create_kwargs)
+            except Exception as e:
+                if attempt >= self.config.max_submit_retries or not _is_retryable(e):
+                    raise
+
+                delay = self.config.retry_base_delay * (2 ** attempt)
+                if _status_code(e) == 429:
+                    delay = _retry_after(e) or delay
+                    limits.bucket.pause(delay)
+                    logger.warning(
+                        f"Replicate rate limited create for {model}, backing off {delay:.1f}s",
+                        extra={"model": model, "attempt": attempt + 1},
+                    )
+                else:
+                    logger.warning(
+                        f"Replicate create failed for {model}: {e}; retrying in {delay:.1f}s",
+                        extra={"model": model, "attempt": attempt + 1},
+                    )
+                    await asyncio.sleep(delay)
+                attempt += 1
+
+    async def submit(self, model: str, **create_kwargs: Any) -> Any:
+        """
+        Create a prediction without waiting for it to finish
+
+        Used when completion is delivered by webhook. The model slot is held
+        only for the duration of the create call.
+
+        Args:
+            model: Model identifier used for per-model limits
+            **create_kwargs: Arguments for ``predictions.create``
+
+        Returns:
+            The created prediction
+        """
+        if "version" not in create_kwargs:
+            create_kwargs.setdefault("model", model)
+        async with self._limits_for(model).semaphore:
+            return await self._create(model, create_kwargs)
+
+    async def wait(
+        self,
+        prediction_id: str,
+        model: Optional[str] = None,
+        timeout: Optional[float] = None,
+    ) -> Any:
+        """
+        Poll a prediction until it reaches a terminal status
+
+        Args:
+            prediction_id: Replicate prediction ID
+            model: Model identifier, used to seed the polling schedule
+            timeout: Maximum seconds to wait (None waits indefinitely)
+
+        Returns:
+            The prediction in its terminal state
+
+        Raises:
+            RuntimeError: If the engine is configured for webhook-only completion
+            TimeoutError: If the prediction does not finish in time
+        """
+        if self.config.webhook_only:
+            raise RuntimeError("Fan-out is configured for webhook-only completion")
+
+        expected = None
+        if model is not None:
+            expected = self._limits_for(model).latency.percentile(0.5)
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for interval in poll_intervals(self.config, expected):
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                interval = min(interval, remaining)
+            await asyncio.sleep(interval)
+
+            prediction = await asyncio.to_thread(self.client.predictions.get, prediction_id)
+            if prediction.status in TERMINAL_STATUSES:
+                return prediction
+
+        raise TimeoutError(f"Prediction {prediction_id} timed out after {timeout} seconds")
+
+    async def run(self, model: str, timeout: Optional[float] = None, **create_kwargs: Any) -> Any:
+        """
+        Create a prediction and wait for it to finish, hedging stragglers
+
+        The model slot is held until the prediction is terminal, so the number
+        of predictions running on Replicate per model stays bounded. When
+        hedging is enabled and enough latencies have been observed, a
+        prediction still running past the configured percentile gets a
+        duplicate submission; the first to succeed wins and the other is
+        cancelled.
+
+        Args:
+            model: Model identifier used for per-model limits
+            timeout: Maximum seconds to wait for completion
+            **create_kwargs: Arguments for ``predictions.create``
+
+        Returns:
+            The winning prediction in its terminal state
+        """
+        if "version" not in create_kwargs:
+            create_kwargs.setdefault("model", model)
+        limits = self._limits_for(model)
+
+        async with limits.semaphore:
+            started = time.monotonic()
+            primary = await self._create(model, create_kwargs)
+            primary_task = asyncio.create_task(self.wait(primary.id, model, timeout))
+
+            threshold = self._hedge_threshold(model)
+            if threshold is not None:
+                done, _ = await asyncio.wait({primary_task}, timeout=threshold)
+                if not done and not limits.hedges.locked():
+                    async with limits.hedges:
+                        result = await self._race_hedge(model, create_kwargs, primary, primary_task, timeout)
+                    self._record(model, result, started)
+                    return result
+
+            result = await primary_task
+            self._record(model, result, started)
+            return result
+
+    def _hedge_threshold(self, model: str) -> Optional[float]:
+        if not self.config.hedge_enabled:
+            return None
+        latency = self._limits_for(model).latency
+        if len(latency) < self.config.hedge_min_samples:
+            return None
+        return latency.percentile(self.config.hedge_percentile)
+
+    async def _race_hedge(
+        self,
+        model: str,
+        create_kwargs: Dict[str, Any],
+        primary: Any,
+        primary_task: "asyncio.Task[Any]",
+        timeout: Optional[float],
+    ) -> Any:
+        """Submit a hedge prediction and return whichever succeeds first"""
+        logger.info(
+            f"Hedging straggler prediction {primary.id} for {model}",
+            extra={"model": model, "prediction_id": primary.id},
+        )
+        try:
+            hedge = await self._create(model, dict(create_kwargs))
+        except Exception as e:
+            logger.warning(f"Hedge submission failed for {model}: {e}")
+            return await primary_task
+
+        hedge_task = asyncio.create_task(self.wait(hedge.id, model, timeout))
+        owners = {primary_task: primary, hedge_task: hedge}
+        pending = set(owners)
+        winner_task = None
+
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None and task.result().status == "succeeded":
+                    winner_task = task
+                    break
+            if winner_task is not None:
+                break
+
+        for task, prediction in owners.items():
+            if task is winner_task or task.done():
+                continue
+            task.cancel()
+            await self._cancel_quietly(prediction.id)
+
+        if winner_task is not None:
+            return winner_task.result()
+        # Neither succeeded: surface the primary's outcome
+        return await primary_task
+
+    async def _cancel_quietly(self, prediction_id: str) -> None:
+        try:
+            await asyncio.to_thread(self.client.predictions.cancel, prediction_id)
+        except Exception as e:
+            logger.debug(f"Failed to cancel hedged prediction {prediction_id}: {e}")
+
+    def _record(self, model: str, prediction: Any, started: float) -> None:
+        if getattr(prediction, "status", None) == "succeeded":
+            self._limits_for(model).latency.record(time.monotonic() - started)
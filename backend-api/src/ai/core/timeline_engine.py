@@ -0,0 +1,456 @@
+"""
+Timeline Engine - PR #402 follow-up: array-backed edit simulation
+Simulates edit plans on parallel start/end/duration/sequence arrays instead of clip models.
+"""
+
+from itertools import chain
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from ..models.clip_assembly import DatabaseClipMetadata
+from ..models.edit_intent import EditOperation, FFmpegOperation
+
+# Duration drift tolerated before a recalculated clip's duration is overwritten
+DURATION_TOLERANCE = 0.01
+
+_ARRAY_FIELDS = ("start", "end", "duration", "sequence", "index")
+
+
+def validate_trim_operation(operation: FFmpegOperation, durations: Sequence[float]) -> Dict[str, List[str]]:
+    """Validate a trim operation against the clip durations"""
+    errors = []
+    warnings = []
+
+    if not operation.target_clips:
+        errors.append("Trim operation must specify target clips")
+        return {'errors': errors, 'warnings': warnings}
+
+    clip_idx = operation.target_clips[0]  # Trim typically affects one clip
+    clip_duration = durations[clip_idx]
+
+    # Check for duration parameters
+    start_time = operation.parameters.get('start_time')
+    end_time = operation.parameters.get('end_time')
+    duration = operation.parameters.get('duration')
+
+    if duration is not None:
+        if duration <= 0:
+            errors.append(f"Trim duration must be positive, got {duration}")
+        elif duration > clip_duration:
+            errors.append(f"Cannot trim clip {clip_idx} to {duration}s (original: {clip_duration}s)")
+    elif start_time is not None and end_time is not None:
+        if start_time >= end_time:
+            errors.append(f"Trim start_time ({start_time}) must be before end_time ({end_time})")
+        elif end_time > clip_duration:
+            warnings.append(f"Trim end_time ({end_time}) exceeds clip duration ({clip_duration})")
+
+    return {'errors': errors, 'warnings': warnings}
+
+
+def validate_reorder_operation(operation: FFmpegOperation) -> Dict[str, List[str]]:
+    """Validate a reorder operation"""
+    errors = []
+    warnings = []
+
+    if len(operation.target_clips) < 2:
+        errors.append("Reorder operation requires at least 2 clips")
+        return {'errors': errors, 'warnings': warnings}
+
+    # Check that all indices are unique
+    seen_indices = set()
+    for clip_idx in operation.target_clips:
+        if clip_idx in seen_indices:
+            errors.append(f"Reorder operation contains duplicate clip index {clip_idx}")
+        seen_indices.add(clip_idx)
+
+    return {'errors': errors, 'warnings': warnings}
+
+
+def validate_split_operation(operation: FFmpegOperation, durations: Sequence[float]) -> Dict[str, List[str]]:
+    """Validate a split operation against the clip durations"""
+    errors = []
+    warnings = []
+
+    if not operation.target_clips:
+        errors.append("Split operation must specify target clips")
+        return {'errors': errors, 'warnings': warnings}
+
+    clip_duration = durations[operation.target_clips[0]]
+
+    split_time = operation.parameters.get('split_time')
+    if split_time is None:
+        errors.append("Split operation must specify split_time parameter")
+    elif split_time <= 0 or split_time >= clip_duration:
+        errors.append(f"Split time {split_time} is outside valid range (0, {clip_duration})")
+
+    return {'errors': errors, 'warnings': warnings}
+
+
+def detect_operation_conflicts(operations: Sequence[FFmpegOperation]) -> List[str]:
+    """Detect operations that cannot be combined on the same clip"""
+    conflicts = []
+
+    # Group operation types by affected clip
+    clip_operations: Dict[int, List[EditOperation]] = {}
+    for op in operations:
+        for clip_idx in op.target_clips:
+            clip_operations.setdefault(clip_idx, []).append(op.operation_type)
+
+    for clip_idx, op_types in clip_operations.items():
+        if len(op_types) < 2:
+            continue
+
+        # Cannot trim and split the same clip
+        if EditOperation.TRIM in op_types and EditOperation.SPLIT in op_types:
+            conflicts.append(
+                f"Clip {clip_idx}: Cannot both trim and split the same clip in one edit plan"
+            )
+
+        # Multiple reorder operations on same clip set
+        if op_types.count(EditOperation.REORDER) > 1:
+            conflicts.append(f"Clip {clip_idx}: Multiple reorder operations conflict")
+
+    return conflicts
+
+
+class ClipTimeline:
+    """
+    Clip timing held as parallel arrays, one entry per clip
+
+    Arrays are in timeline order; `index` maps each entry back to its position
+    in the clip list the timeline was built from. Snapshots share arrays with
+    their parent and copy an array only on first write, so simulating a plan
+    that trims one clip copies two arrays and no clip models.
+    """
+
+    def __init__(
+        self,
+        start: np.ndarray,
+        end: np.ndarray,
+        duration: np.ndarray,
+        sequence: np.ndarray,
+        index: np.ndarray
+    ):
+        self.start = start
+        self.end = end
+        self.duration = duration
+        self.sequence = sequence
+        self.index = index
+        self._owned = set(_ARRAY_FIELDS)
+        self._sequence_lookup: Optional[Dict[int, int]] = None
+
+    @classmethod
+    def from_clips(cls, clips: Sequence[DatabaseClipMetadata], sort: bool = True) -> 'ClipTimeline':
+        """
+        Build a timeline from clip metadata
+
+        Args:
+            clips: Clip metadata, left unmodified
+            sort: Order entries by sequence_order (stable), as the planner indexes clips;
+                otherwise keep list order
+
+        Returns:
+            ClipTimeline over the clips
+        """
+        count = len(clips)
+        index = np.arange(count, dtype=np.int64)
+        sequence = np.fromiter((c.sequence_order for c in clips), dtype=np.int64, count=count)
+        if sort:
+            index = np.argsort(sequence, kind='stable')
+            sequence = sequence[index]
+
+        ordered = [clips[i] for i in index.tolist()]
+        return cls(
+            start=np.fromiter((c.start_time_seconds for c in ordered), dtype=np.float64, count=count),
+            end=np.fromiter((c.end_time_seconds for c in ordered), dtype=np.float64, count=count),
+            duration=np.fromiter((c.duration_seconds for c in ordered), dtype=np.float64, count=count),
+            sequence=sequence,
+            index=index,
+        )
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def snapshot(self) -> 'ClipTimeline':
+        """Copy-on-write copy: arrays are shared until either side writes to them"""
+        clone = ClipTimeline.__new__(ClipTimeline)
+        for name in _ARRAY_FIELDS:
+            setattr(clone, name, getattr(self, name))
+        clone._owned = set()
+        clone._sequence_lookup = self._sequence_lookup
+        self._owned = set()
+        return clone
+
+    def _writable(self, name: str) -> np.ndarray:
+        """Get an array for writing, copying it first if it is shared"""
+        if name not in self._owned:
+            setattr(self, name, getattr(self, name).copy())
+            self._owned.add(name)
+        return getattr(self, name)
+
+    def validate(self, operations: Sequence[FFmpegOperation]) -> Dict[str, Any]:
+        """
+        Check that operations are feasible on this timeline
+
+        All clip indices of the plan are range-checked in one array comparison;
+        per-operation checks read durations from the array.
+
+        Args:
+            operations: Operations to validate
+
+        Returns:
+            Dict with is_feasible, errors, warnings, clip_count (and error_message on failure)
+        """
+        count = len(self)
+        result = {
+            'is_feasible': True,
+            'errors': [],
+            'warnings': [],
+            'clip_count': count
+        }
+
+        targets = np.fromiter(chain.from_iterable(op.target_clips for op in operations), dtype=np.int64)
+        all_in_range = bool(((targets >= 0) & (targets < count)).all())
+        durations = self.duration.tolist()
+        max_clip_index = count - 1
+
+        for i, operation in enumerate(operations):
+            first_in_range = True
+            if not all_in_range:
+                for position, clip_idx in enumerate(operation.target_clips):
+                    if clip_idx < 0 or clip_idx > max_clip_index:
+                        result['errors'].append(
+                            f"Operation {i} ({operation.operation_type.value}) references invalid clip index {clip_idx} "
+                            f"(valid range: 0-{max_clip_index})"
+                        )
+                        result['is_feasible'] = False
+                        if position == 0:
+                            first_in_range = False
+
+            # Validate operation-specific constraints
+            validation = None
+            if operation.operation_type == EditOperation.REORDER:
+                validation = validate_reorder_operation(operation)
+            elif not first_in_range:
+                continue  # Already reported; there is no clip to check against
+            elif operation.operation_type == EditOperation.TRIM:
+                validation = validate_trim_operation(operation, durations)
+            elif operation.operation_type == EditOperation.SPLIT:
+                validation = validate_split_operation(operation, durations)
+
+            if validation:
+                result['errors'].extend(validation['errors'])
+                result['warnings'].extend(validation['warnings'])
+
+        # Check for conflicting operations
+        conflicts = detect_operation_conflicts(operations)
+        if conflicts:
+            result['errors'].extend(conflicts)
+            result['is_feasible'] = False
+
+        if result['errors']:
+            result['error_message'] = f"Validation failed: {len(result['errors'])} errors found"
+
+        return result
+
+    def apply(self, operation: FFmpegOperation) -> bool:
+        """
+        Apply one operation to the timeline
+
+        Clip indices refer to timeline positions, except for reorders, whose
+        targets are sequence_order values.
+
+        Returns:
+            bool: True if the operation was applied
+        """
+        try:
+            if operation.operation_type == EditOperation.TRIM:
+                return self._apply_trim(operation)
+            elif operation.operation_type == EditOperation.REORDER:
+                return self._apply_reorder(operation)
+            elif operation.operation_type == EditOperation.TIMING:
+                return self._apply_timing(operation)
+            elif operation.operation_type == EditOperation.OVERLAY:
+                return self._check_overlay(operation)
+            else:
+                # Unsupported operations don't change timing
+                return True
+        except Exception:
+            return False
+
+    def apply_all(self, operations: Sequence[FFmpegOperation]) -> List[bool]:
+        """Apply operations in order, returning whether each one was applied"""
+        return [self.apply(operation) for operation in operations]
+
+    def _apply_trim(self, operation: FFmpegOperation) -> bool:
+        if not operation.target_clips:
+            return False
+
+        clip_idx = operation.target_clips[0]
+        clip_start = float(self.start[clip_idx])
+        clip_duration = float(self.duration[clip_idx])
+
+        start_time = operation.parameters.get('start_time', 0.0)
+        duration = operation.parameters.get('duration')
+        end_time = operation.parameters.get('end_time')
+
+        if duration is not None:
+            # Trim to specific duration
+            if duration <= 0 or duration > clip_duration:
+                return False
+            new_end = clip_start + duration
+        elif end_time is not None:
+            # Trim to specific end time
+            if end_time <= start_time or end_time > clip_start + clip_duration:
+                return False
+            new_end = end_time
+        else:
+            return False
+
+        self._writable('end')[clip_idx] = new_end
+        self._writable('duration')[clip_idx] = new_end - clip_start
+        return True
+
+    def _apply_reorder(self, operation: FFmpegOperation) -> bool:
+        if len(operation.target_clips) < 2:
+            return False
+
+        new_order = operation.parameters.get('new_order')
+        if not new_order or len(new_order) != len(operation.target_clips):
+            return False
+
+        # sequence_order -> position; on duplicates the later clip wins
+        if self._sequence_lookup is None:
+            self._sequence_lookup = dict(zip(self.sequence.tolist(), range(len(self))))
+        lookup = self._sequence_lookup
+
+        positions = [lookup.get(clip_idx) for clip_idx in operation.target_clips]
+        if None in positions:
+            return False
+
+        self._writable('sequence')[positions] = new_order
+        self._sequence_lookup = None
+        return True
+
+    def _apply_timing(self, operation: FFmpegOperation) -> bool:
+        if not operation.target_clips:
+            return False
+
+        clip_idx = operation.target_clips[0]
+        time_offset = operation.parameters.get('time_offset', 0.0)
+        self._writable('start')[clip_idx] += time_offset
+        self._writable('end')[clip_idx] += time_offset
+        return True
+
+    def _check_overlay(self, operation: FFmpegOperation) -> bool:
+        if not operation.target_clips:
+            return False
+
+        # Overlays don't move clips; only their timing parameters are checked
+        start_time = operation.parameters.get('start_time')
+        duration = operation.parameters.get('duration')
+        end_time = operation.parameters.get('end_time')
+
+        if start_time is None:
+            return False
+        if duration is not None and duration <= 0:
+            return False
+        return end_time is None or end_time > start_time
+
+    def recalculate(self) -> None:
+        """
+        Lay clips out back to back in sequence_order
+
+        Each clip keeps its length (end - start); gaps and overlaps are closed.
+        The stable sort is skipped when the sequence is already in order.
+        """
+        if not len(self):
+            return
+
+        sequence = self.sequence
+        if (sequence[1:] < sequence[:-1]).any():
+            order = np.argsort(sequence, kind='stable')
+            for name in _ARRAY_FIELDS:
+                setattr(self, name, getattr(self, name)[order])
+                self._owned.add(name)
+            self._sequence_lookup = None
+
+        lengths = self.end - self.start
+        end = np.cumsum(lengths)
+        start = np.empty_like(end)
+        start[0] = 0.0
+        start[1:] = end[:-1]
+
+        actual = end - start
+        self.duration = np.where(np.abs(actual - self.duration) > DURATION_TOLERANCE, actual, self.duration)
+        self.start = start
+        self.end = end
+        self._owned.update(('start', 'end', 'duration'))
+
+    def total_duration(self) -> float:
+        """End of the last-ending clip (0.0 for an empty timeline)"""
+        return float(self.end.max()) if len(self) else 0.0
+
+    def to_clips(self, clips: Sequence[DatabaseClipMetadata]) -> List[DatabaseClipMetadata]:
+        """
+        Materialize the timeline as new clip models, in timeline order
+
+        Args:
+            clips: The clip list the timeline was built from (not modified)
+        """
+        return [
+            clips[i].model_copy(update={
+                'sequence_order': sequence,
+                'start_time_seconds': start,
+                'end_time_seconds': end,
+                'duration_seconds': duration,
+            })
+            for i, sequence, start, end, duration in zip(
+                self.index.tolist(), self.sequence.tolist(), self.start.tolist(),
+                self.end.tolist(), self.duration.tolist()
+            )
+        ]
+
+    def write_back(self, clips: List[DatabaseClipMetadata]) -> None:
+        """
+        Write the timeline into the clip list it was built from, in place
+
+        The list is rearranged into timeline order and each clip's timing fields updated.
+        """
+        clips[:] = [clips[i] for i in self.index.tolist()]
+        for clip, sequence, start, end, duration in zip(
+            clips, self.sequence.tolist(), self.start.tolist(), self.end.tolist(), self.duration.tolist()
+        ):
+            clip.sequence_order = sequence
+            clip.start_time_seconds = start
+            clip.end_time_seconds = end
+            clip.duration_seconds = duration
+        self.index = np.arange(len(clips), dtype=np.int64)
+        self._owned.add('index')
+
+    def preview(self, clips: Sequence[DatabaseClipMetadata]) -> Dict[str, Any]:
+        """
+        Timeline preview in the planner's format
+
+        Args:
+            clips: The clip list the timeline was built from
+        """
+        return {
+            'total_duration': self.total_duration(),
+            'clip_count': len(self),
+            'clips': [
+                {
+                    'clip_id': clips[i].clip_id,
+                    'sequence_order': sequence,
+                    'start_time': start,
+                    'end_time': end,
+                    'duration': duration,
+                    'scene_id': clips[i].scene_id
+                }
+                for i, sequence, start, end, duration in zip(
+                    self.index.tolist(), self.sequence.tolist(), self.start.tolist(),
+                    self.end.tolist(), self.duration.tolist()
+                )
+            ]
+        }
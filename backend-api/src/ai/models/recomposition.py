@@ -132,12 +132,14 @@ class RecompositionRecord(BaseModel):
     # Configuration
     updated_config: UpdatedCompositionConfig = Field(..., description="Updated composition config")
     ffmpeg_job_id: Optional[str] = Field(None, description="FFmpeg backend job ID")
+    estimated_duration_seconds: Optional[float] = Field(None, description="FFmpeg backend's estimate of the render time")
 
     # Status and timing
     status: RecompositionStatus = Field(default=RecompositionStatus.PENDING, description="Current status")
     created_at: datetime = Field(default_factory=datetime.utcnow, description="When recomposition was initiated")
     triggered_at: Optional[datetime] = Field(None, description="When FFmpeg job was triggered")
     completed_at: Optional[datetime] = Field(None, description="When recomposition completed")
+    updated_at: Optional[datetime] = Field(None, description="When the stored record last changed")
 
     # Error handling
     error_message: Optional[str] = Field(None, description="Error message if failed")
@@ -147,10 +149,11 @@ class RecompositionRecord(BaseModel):
     can_rollback: bool = Field(default=True, description="Whether this recomposition can be rolled back")
     rollback_config: Optional[Dict[str, Any]] = Field(None, description="Config to restore original state")
 
-    def mark_triggered(self, ffmpeg_job_id: str):
+    def mark_triggered(self, ffmpeg_job_id: str, estimated_duration_seconds: Optional[float] = None):
         """Mark recomposition as triggered with FFmpeg job ID"""
         self.status = RecompositionStatus.TRIGGERED
         self.ffmpeg_job_id = ffmpeg_job_id
+        self.estimated_duration_seconds = estimated_duration_seconds
         self.triggered_at = datetime.utcnow()
 
     def mark_completed(self):
@@ -206,6 +209,9 @@ class RecompositionTriggerResponse(BaseModel):
     status_url: str = Field(..., description="URL to check recomposition status")
     result_url: Optional[str] = Field(None, description="URL to get final result")
 
+    # True when an identical edit of the same composition version was already triggered
+    deduplicated: bool = Field(default=False, description="Whether an existing recomposition was returned")
+
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for API responses"""
         return {
@@ -214,7 +220,8 @@ class RecompositionTriggerResponse(BaseModel):
             "status": self.status.value,
             "estimated_duration_seconds": self.estimated_duration_seconds,
             "status_url": self.status_url,
-            "result_url": self.result_url
+            "result_url": self.result_url,
+            "deduplicated": self.deduplicated
         }
 
 
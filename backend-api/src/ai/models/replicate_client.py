@@ -141,6 +141,37 @@ class GenerationResult(BaseModel):
     prediction_details: Dict[str, Any] = Field(default_factory=dict, description="Raw prediction details from Replicate")
 
 
+class FanoutConfig(BaseModel):
+    """
+    Configuration for fanning out many predictions to Replicate
+
+    Bounds in-flight work per model, paces prediction creation to stay under
+    Replicate's rate limits, and controls polling and hedging behaviour.
+    """
+
+    # Concurrency and rate limiting (per model)
+    max_concurrency_per_model: int = Field(default=4, ge=1, description="Maximum in-flight predictions per model")
+    requests_per_second: float = Field(default=5.0, gt=0.0, description="Sustained prediction create rate per model")
+    burst: int = Field(default=5, ge=1, description="Token bucket capacity (burst size) per model")
+
+    # Submission retries on 429 / 5xx responses
+    max_submit_retries: int = Field(default=3, ge=0, description="Retries for a create call rejected with 429 or 5xx")
+    retry_base_delay: float = Field(default=1.0, ge=0.0, description="Base delay for submit retry backoff (seconds)")
+
+    # Adaptive polling
+    poll_initial_interval: float = Field(default=1.0, gt=0.0, description="First polling interval (seconds)")
+    poll_max_interval: float = Field(default=15.0, gt=0.0, description="Maximum polling interval (seconds)")
+    poll_backoff_factor: float = Field(default=1.5, ge=1.0, description="Multiplier applied to the interval after each poll")
+    poll_jitter: float = Field(default=0.1, ge=0.0, le=1.0, description="Relative jitter applied to each interval")
+    webhook_only: bool = Field(default=False, description="Never poll; rely on webhooks for completion")
+
+    # Hedged submissions for stragglers
+    hedge_enabled: bool = Field(default=False, description="Submit a duplicate prediction for stragglers")
+    hedge_percentile: float = Field(default=0.95, gt=0.0, lt=1.0, description="Latency percentile after which to hedge")
+    hedge_min_samples: int = Field(default=5, ge=1, description="Completed samples required before hedging")
+    max_hedges_in_flight: int = Field(default=2, ge=1, description="Maximum concurrent hedge predictions per model")
+
+
 class ClientConfig(BaseModel):
     """Configuration for the Replicate client"""
 
@@ -162,3 +193,6 @@ class ClientConfig(BaseModel):
 
     # Webhook configuration
     webhook_base_url: Optional[str] = Field(None, description="Base URL for webhooks")
+
+    # Fan-out, rate limiting and polling
+    fanout: FanoutConfig = Field(default_factory=FanoutConfig, description="Fan-out and polling configuration")
@@ -4,6 +4,7 @@ from .brand_analysis_service import *
 from .prompt_analysis_service import *
 from .scene_decomposition_service import *
 from .recomposition_trigger_service import *
+from .recomposition_store import *
 from .style_vector_builder_service import *
 from .brand_harmony_service import *
-from .timeline_edit_planner_service import *
\ No newline at end of file
+from .timeline_edit_planner_service import *
@@ -5,9 +5,15 @@ Analyzes compatibility between brand color palettes and style vector requirement
 
 import uuid
 import hashlib
+import json
+import time
+from collections import OrderedDict
 from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime
 
+import numpy as np
+
+from ..core.palette_engine import PaletteMatrices, compute_palette_matrices, pair_harmony_score
 from ..models.brand_style_vector import BrandStyleVector
 from ..models.brand_config import ColorPalette
 from ..models.brand_harmony import (
@@ -19,12 +25,19 @@ from ..models.brand_harmony import (
     ConflictType,
     ConflictSeverity,
     calculate_contrast_ratio,
-    get_color_temperature,
     is_wcag_aa_compliant,
     is_wcag_aaa_compliant,
     hex_to_rgb
 )
 
+# Usage recommendations per contrast band, highest band first
+_PAIR_USAGE_BANDS = (
+    (7.0, ("text on background", "icons", "borders")),
+    (4.5, ("large text", "buttons", "interactive elements")),
+    (3.0, ("large text only", "decorative elements")),
+    (0.0, ("decorative use only - not for text",)),
+)
+
 
 class BrandHarmonyService:
     """
@@ -35,17 +48,20 @@ class BrandHarmonyService:
     problems, and temperature conflicts while providing actionable recommendations.
     """
 
-    def __init__(self, redis_client=None, use_mock: bool = False):
+    def __init__(self, redis_client=None, use_mock: bool = False, local_cache_size: int = 256):
         """
         Initialize the brand harmony service.
 
         Args:
             redis_client: Optional Redis client for caching
             use_mock: Whether to use mock responses for testing
+            local_cache_size: Entries kept in the in-process LRU in front of Redis
         """
         self.redis_client = redis_client
         self.use_mock = use_mock
         self.cache_ttl = 7200  # 2 hours cache TTL (harmony analysis is more stable than style vectors)
+        self.local_cache_size = local_cache_size
+        self._local_cache: "OrderedDict[str, Tuple[float, BrandHarmonyAnalysis]]" = OrderedDict()
 
     async def analyze_harmony(
         self,
@@ -62,20 +78,31 @@ class BrandHarmonyService:
             cache_key: Optional cache key for storing/retrieving analysis
 
         Returns:
-            BrandHarmonyAnalysis: Comprehensive harmony analysis
+            BrandHarmonyAnalysis: Comprehensive harmony analysis. Cached analyses
+            are shared between callers and should be treated as read-only.
         """
         try:
-            # Check cache first if available
-            if cache_key and self.redis_client and not self.use_mock:
+            use_cache = bool(cache_key) and not self.use_mock
+
+            # Check the in-process LRU, then Redis
+            if use_cache:
+                local_analysis = self._get_local_analysis(cache_key)
+                if local_analysis:
+                    return local_analysis
+
+            if use_cache and self.redis_client:
                 cached_analysis = await self._get_cached_analysis(cache_key)
                 if cached_analysis:
+                    self._store_local_analysis(cache_key, cached_analysis)
                     return cached_analysis
 
             # Perform comprehensive analysis
             analysis = await self._perform_harmony_analysis(style_vector, color_palette)
 
             # Cache the result
-            if cache_key and self.redis_client and not self.use_mock:
+            if use_cache:
+                self._store_local_analysis(cache_key, analysis)
+            if use_cache and self.redis_client:
                 await self._cache_analysis(cache_key, analysis)
 
             return analysis
@@ -156,58 +183,39 @@ class BrandHarmonyService:
         if color_palette.background:
             all_colors.append(color_palette.background)
 
+        # Per-color and pairwise metrics in one vectorized pass
+        matrices = compute_palette_matrices(all_colors)
+        temperatures = matrices.temperature
+        total_colors = len(all_colors)
+
         # Analyze temperature properties
-        temperatures = [get_color_temperature(color) for color in all_colors]
-        avg_temperature = sum(temperatures) / len(temperatures) if temperatures else 0.5
+        avg_temperature = float(temperatures.mean()) if total_colors else 0.5
 
         # Calculate temperature variance (how spread out temperatures are)
-        if len(temperatures) > 1:
-            variance = sum((t - avg_temperature) ** 2 for t in temperatures) / len(temperatures)
+        if total_colors > 1:
+            variance = float(((temperatures - avg_temperature) ** 2).mean())
             temperature_variance = min(1.0, variance * 4)  # Scale and cap
         else:
             temperature_variance = 0.0
 
         # Calculate warm/cool balance (0.5 = perfect balance)
-        warm_colors = sum(1 for t in temperatures if t > 0.5)
-        cool_colors = sum(1 for t in temperatures if t <= 0.5)
-        total_colors = len(temperatures)
+        warm_colors = int((temperatures > 0.5).sum())
+        cool_colors = total_colors - warm_colors
         warm_cool_balance = 0.5 if total_colors == 0 else min(warm_colors, cool_colors * 2) / max(warm_colors, cool_colors * 2, 1)
 
-        # Analyze accessibility and compatibility
-        compatibility_matrix = []
-        accessibility_issues = 0
-        total_comparisons = 0
-
-        # Check all pairwise combinations
-        for i, color_a in enumerate(all_colors):
-            for j, color_b in enumerate(all_colors):
-                if i >= j:  # Avoid duplicate comparisons
-                    continue
-
-                total_comparisons += 1
-                contrast_ratio = calculate_contrast_ratio(color_a, color_b)
-                temp_diff = abs(get_color_temperature(color_a) - get_color_temperature(color_b))
-                harmony_score = self._calculate_color_pair_harmony(color_a, color_b, contrast_ratio, temp_diff)
-
-                compatibility_matrix.append(ColorCompatibility(
-                    color_a=color_a,
-                    color_b=color_b,
-                    contrast_ratio=round(contrast_ratio, 2),
-                    temperature_difference=round(temp_diff, 2),
-                    harmony_score=round(harmony_score, 2),
-                    recommended_usage=self._get_pair_usage_recommendations(color_a, color_b, contrast_ratio)
-                ))
-
-                # Count accessibility issues
-                if not is_wcag_aa_compliant(contrast_ratio):
-                    accessibility_issues += 1
+        # Pairwise compatibility; pydantic objects are only built for the output
+        rows, cols = matrices.upper_pairs()
+        pair_contrast = matrices.contrast[rows, cols]
+        compatibility_matrix = self._build_compatibility_matrix(matrices, rows, cols)
 
         # Calculate accessibility score (percentage of compliant combinations)
+        total_comparisons = len(pair_contrast)
+        accessibility_issues = int((pair_contrast < 4.5).sum())
         accessibility_score = 1.0 if total_comparisons == 0 else (total_comparisons - accessibility_issues) / total_comparisons
 
         # Determine WCAG compliance (need to check text/background specifically)
-        wcag_aa_compliant = self._check_wcag_compliance(color_palette, compatibility_matrix, level="AA")
-        wcag_aaa_compliant = self._check_wcag_compliance(color_palette, compatibility_matrix, level="AAA")
+        wcag_aa_compliant = self._check_wcag_compliance(color_palette, compatibility_matrix, level="AA", matrices=matrices)
+        wcag_aaa_compliant = self._check_wcag_compliance(color_palette, compatibility_matrix, level="AAA", matrices=matrices)
 
         return ColorPaletteAnalysis(
             palette_name=f"{color_palette.primary[0] if color_palette.primary else 'Unknown'}_palette",
@@ -223,6 +231,33 @@ class BrandHarmonyService:
             color_compatibility_matrix=compatibility_matrix
         )
 
+    def _build_compatibility_matrix(
+        self,
+        matrices: PaletteMatrices,
+        rows: np.ndarray,
+        cols: np.ndarray
+    ) -> List[ColorCompatibility]:
+        """Materialize ColorCompatibility entries for the given pairs"""
+        colors = matrices.colors
+        raw_contrast = matrices.contrast[rows, cols].tolist()
+        contrast = [round(value, 2) for value in raw_contrast]
+        temp_diff = [round(value, 2) for value in matrices.temperature_difference[rows, cols].tolist()]
+        harmony = [round(value, 2) for value in matrices.harmony[rows, cols].tolist()]
+
+        return [
+            ColorCompatibility.model_construct(
+                color_a=colors[i],
+                color_b=colors[j],
+                contrast_ratio=ratio,
+                temperature_difference=diff,
+                harmony_score=score,
+                recommended_usage=self._get_pair_usage_recommendations(colors[i], colors[j], raw)
+            )
+            for i, j, raw, ratio, diff, score in zip(
+                rows.tolist(), cols.tolist(), raw_contrast, contrast, temp_diff, harmony
+            )
+        ]
+
     def _detect_conflicts(
         self,
         style_vector: BrandStyleVector,
@@ -478,21 +513,7 @@ class BrandHarmonyService:
         temp_diff: float
     ) -> float:
         """Calculate harmony score for a specific color pair"""
-        # Start with contrast score (accessibility-focused)
-        if contrast_ratio >= 7.0:  # WCAG AAA
-            contrast_score = 1.0
-        elif contrast_ratio >= 4.5:  # WCAG AA
-            contrast_score = 0.8
-        elif contrast_ratio >= 3.0:  # Large text minimum
-            contrast_score = 0.6
-        else:
-            contrast_score = contrast_ratio / 3.0  # Linear scale below minimum
-
-        # Temperature harmony (prefer complementary or similar temperatures)
-        temp_harmony = 1.0 - min(temp_diff, 0.5) * 2  # Max penalty for 0.5 difference
-
-        # Weighted combination
-        return (contrast_score * 0.7) + (temp_harmony * 0.3)
+        return pair_harmony_score(contrast_ratio, temp_diff)
 
     def _get_pair_usage_recommendations(
         self,
@@ -501,24 +522,17 @@ class BrandHarmonyService:
         contrast_ratio: float
     ) -> List[str]:
         """Get recommended usage patterns for a color pair"""
-        recommendations = []
-
-        if contrast_ratio >= 7.0:
-            recommendations.extend(["text on background", "icons", "borders"])
-        elif contrast_ratio >= 4.5:
-            recommendations.extend(["large text", "buttons", "interactive elements"])
-        elif contrast_ratio >= 3.0:
-            recommendations.extend(["large text only", "decorative elements"])
-        else:
-            recommendations.append("decorative use only - not for text")
-
-        return recommendations
+        for threshold, usage in _PAIR_USAGE_BANDS:
+            if contrast_ratio >= threshold:
+                return list(usage)
+        return list(_PAIR_USAGE_BANDS[-1][1])
 
     def _check_wcag_compliance(
         self,
         color_palette: ColorPalette,
         compatibility_matrix: List[ColorCompatibility],
-        level: str = "AA"
+        level: str = "AA",
+        matrices: Optional[PaletteMatrices] = None
     ) -> bool:
         """Check if palette meets WCAG compliance standards"""
         # For WCAG compliance, we need to check text/background combinations
@@ -530,8 +544,13 @@ class BrandHarmonyService:
         background = color_palette.background
         text_colors = color_palette.primary + (color_palette.secondary or [])
 
-        for text_color in text_colors:
-            contrast = calculate_contrast_ratio(text_color, background)
+        if matrices is not None:
+            # Background is the last color in the analyzed palette
+            contrasts = matrices.contrast[:len(text_colors), len(matrices.colors) - 1]
+        else:
+            contrasts = [calculate_contrast_ratio(text_color, background) for text_color in text_colors]
+
+        for contrast in contrasts:
             if level == "AAA":
                 if not is_wcag_aaa_compliant(contrast):
                     return False
@@ -634,6 +653,30 @@ class BrandHarmonyService:
             confidence_score=0.3  # Low confidence for fallback
         )
 
+    def _get_local_analysis(self, cache_key: str) -> Optional[BrandHarmonyAnalysis]:
+        """Retrieve harmony analysis from the in-process LRU"""
+        entry = self._local_cache.get(cache_key)
+        if entry is None:
+            return None
+
+        stored_at, analysis = entry
+        if time.monotonic() - stored_at > self.cache_ttl:
+            del self._local_cache[cache_key]
+            return None
+
+        self._local_cache.move_to_end(cache_key)
+        return analysis
+
+    def _store_local_analysis(self, cache_key: str, analysis: BrandHarmonyAnalysis) -> None:
+        """Store harmony analysis in the in-process LRU, evicting the oldest entry"""
+        if self.local_cache_size <= 0:
+            return
+
+        self._local_cache[cache_key] = (time.monotonic(), analysis)
+        self._local_cache.move_to_end(cache_key)
+        while len(self._local_cache) > self.local_cache_size:
+            self._local_cache.popitem(last=False)
+
     async def _get_cached_analysis(self, cache_key: str) -> Optional[BrandHarmonyAnalysis]:
         """Retrieve harmony analysis from Redis cache"""
         try:
@@ -643,7 +686,6 @@ class BrandHarmonyService:
             cached_data = await self.redis_client.get(f"harmony_analysis:{cache_key}")
             if cached_data:
                 data = cached_data.decode('utf-8') if isinstance(cached_data, bytes) else cached_data
-                import json
                 analysis_data = json.loads(data)
                 return BrandHarmonyAnalysis(**analysis_data)
         except Exception as e:
@@ -657,7 +699,6 @@ class BrandHarmonyService:
             if not self.redis_client:
                 return
 
-            import json
             cache_data = json.dumps(analysis.dict())
             await self.redis_client.setex(
                 f"harmony_analysis:{cache_key}",
@@ -680,8 +721,17 @@ def create_harmony_cache_key(brand_name: str, color_palette: ColorPalette, style
     Returns:
         Cache key string
     """
-    # Create hash of color palette
-    colors_str = "_".join(sorted(color_palette.primary + (color_palette.secondary or [])))
-    colors_hash = hashlib.md5(colors_str.encode()).hexdigest()[:8]
-
-    return f"{brand_name}_{colors_hash}_{style_vector_hash[:8]}"
+    # Hash the full palette including color roles and background; a truncated
+    # digest of the sorted colors let distinct palettes share an entry.
+    palette_str = json.dumps(
+        {
+            "primary": color_palette.primary,
+            "secondary": color_palette.secondary or [],
+            "background": color_palette.background,
+            "style_vector": style_vector_hash,
+        },
+        sort_keys=True
+    )
+    palette_hash = hashlib.sha256(palette_str.encode()).hexdigest()
+
+    return f"{brand_name}_{palette_hash}"
@@ -4,9 +4,12 @@ Micro-Prompt Builder Service - PR 301: Micro-Prompt Builder
 
 import uuid
 import time
-from typing import Dict, List, Optional, Any
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime
 
+from pydantic import TypeAdapter
+
 from ..models.micro_prompt import (
     MicroPrompt,
     MicroPromptRequest,
@@ -19,6 +22,32 @@ from ..models.scene_decomposition import Scene
 from ..models.brand_style_vector import BrandStyleVector
 from ..models.brand_harmony import BrandHarmonyAnalysis
 
+_SCENE_LIST_ADAPTER = TypeAdapter(List[Scene])
+
+
+@dataclass
+class PromptFragments:
+    """
+    Scene-independent pieces of a micro-prompt batch
+
+    Everything here depends only on the request (prompt analysis, brand config,
+    style vector, harmony analysis and target model), so it is computed once
+    and shared by every scene in the batch.
+    """
+    narrative_suffix: str
+    brand_prefix: Optional[List[str]]  # None when the request has no brand config
+    brand_suffix: List[str]
+    technical_specs: str
+    visual_anchors: str
+    anchors_priority: PromptPriority
+    quality_hints: str
+    brand_keywords: List[str]
+    model_hints: Dict[str, Any]
+    style_vector_score: float
+    style_boost: Optional[float]
+    harmony_boost: Optional[float]
+    has_critical_issues: bool
+
 
 class MicroPromptBuilderService:
     """
@@ -30,6 +59,7 @@ class MicroPromptBuilderService:
 
     def __init__(self, config: Optional[PromptBuilderConfig] = None):
         self.config = config or PromptBuilderConfig()
+        self._negative_prompt_cache: Dict[str, str] = {}
 
         # Initialize default templates for Replicate models
         self._setup_default_templates()
@@ -67,6 +97,11 @@ class MicroPromptBuilderService:
         """
         Build micro-prompts from scene decomposition results
 
+        Request-level fragments (brand keywords, consistency anchors, quality
+        hints, technical specs) are prepared once and shared by every scene,
+        so a 60-scene music video costs little more than its scene-specific
+        text.
+
         Args:
             request: Request containing scenes and analysis data
 
@@ -75,8 +110,8 @@ class MicroPromptBuilderService:
         """
         start_time = time.time()
 
-        # Convert scene dicts to Scene objects
-        scenes = [Scene(**scene_data) for scene_data in request.scenes]
+        # Convert scene dicts to Scene objects in a single validation pass
+        scenes = _SCENE_LIST_ADAPTER.validate_python(request.scenes)
 
         # Parse brand style vector if provided
         brand_style_vector = None
@@ -88,19 +123,11 @@ class MicroPromptBuilderService:
         if request.brand_harmony_analysis:
             brand_harmony_analysis = BrandHarmonyAnalysis(**request.brand_harmony_analysis)
 
-        # Generate micro-prompts for each scene
-        micro_prompts = []
-        total_confidence = 0.0
+        fragments = self._prepare_fragments(request, brand_style_vector, brand_harmony_analysis)
 
-        for scene in scenes:
-            prompt = await self._build_single_prompt(
-                scene=scene,
-                request=request,
-                brand_style_vector=brand_style_vector,
-                brand_harmony_analysis=brand_harmony_analysis
-            )
-            micro_prompts.append(prompt)
-            total_confidence += prompt.confidence_score
+        # Scene rendering is pure string work, so render the batch in one sweep
+        micro_prompts = [self._render_prompt(scene, request, fragments) for scene in scenes]
+        total_confidence = sum(prompt.confidence_score for prompt in micro_prompts)
 
         # Calculate response metrics
         average_confidence = total_confidence / len(micro_prompts) if micro_prompts else 0.0
@@ -126,22 +153,70 @@ class MicroPromptBuilderService:
         brand_harmony_analysis: Optional[BrandHarmonyAnalysis]
     ) -> MicroPrompt:
         """Build a single micro-prompt for one scene"""
+        fragments = self._prepare_fragments(request, brand_style_vector, brand_harmony_analysis)
+        return self._render_prompt(scene, request, fragments)
 
-        # Generate unique prompt ID
-        prompt_id = f"mp_{uuid.uuid4().hex[:12]}"
+    def _prepare_fragments(
+        self,
+        request: MicroPromptRequest,
+        brand_style_vector: Optional[BrandStyleVector],
+        brand_harmony_analysis: Optional[BrandHarmonyAnalysis]
+    ) -> PromptFragments:
+        """Compute the scene-independent prompt fragments for a request"""
+        has_critical_issues = bool(
+            brand_harmony_analysis and self._has_critical_accessibility_issues(brand_harmony_analysis)
+        )
+
+        brand_prefix: Optional[List[str]] = None
+        brand_suffix: List[str] = []
+        if request.brand_config and isinstance(request.brand_config, dict):
+            brand_prefix, brand_suffix = self._build_brand_fragments(
+                request.brand_config, brand_style_vector, brand_harmony_analysis, request
+            )
 
-        # Perform consistency enforcement checks
-        consistency_warnings = self._check_consistency_requirements(
-            request, brand_style_vector, brand_harmony_analysis
+        visual_anchors = ""
+        if brand_harmony_analysis and request.enforce_brand_consistency:
+            visual_anchors = self._build_visual_consistency_anchors(brand_harmony_analysis, request)
+
+        brand_keywords = []
+        if request.brand_config:
+            brand_keywords = self._extract_brand_keywords(request.brand_config)
+
+        style_vector_score = brand_style_vector.overall_score if brand_style_vector else 0.7
+
+        return PromptFragments(
+            narrative_suffix=self._build_narrative_suffix(request.prompt_analysis),
+            brand_prefix=brand_prefix,
+            brand_suffix=brand_suffix,
+            technical_specs=self._build_technical_specs(None, brand_style_vector),
+            visual_anchors=visual_anchors,
+            anchors_priority=PromptPriority.CRITICAL if has_critical_issues else PromptPriority.HIGH,
+            quality_hints=self._build_quality_hints(brand_style_vector),
+            brand_keywords=brand_keywords,
+            model_hints=self._get_model_hints(),
+            style_vector_score=style_vector_score,
+            style_boost=style_vector_score * 0.1 if brand_style_vector else None,
+            harmony_boost=brand_harmony_analysis.overall_harmony_score * 0.05 if brand_harmony_analysis else None,
+            has_critical_issues=has_critical_issues
         )
 
+    def _render_prompt(
+        self,
+        scene: Scene,
+        request: MicroPromptRequest,
+        fragments: PromptFragments
+    ) -> MicroPrompt:
+        """Render one scene's micro-prompt from the shared request fragments"""
+
+        # Generate unique prompt ID
+        prompt_id = f"mp_{uuid.uuid4().hex[:12]}"
+
         # Collect all prompt elements
         prompt_elements = []
 
         # 1. Core scene description
-        core_description = self._build_core_description(scene, request.prompt_analysis)
         prompt_elements.append(PromptElement(
-            content=core_description,
+            content=f"{scene.content_description}{fragments.narrative_suffix}",
             priority=PromptPriority.CRITICAL,
             category="narrative",
             source="scene"
@@ -158,9 +233,11 @@ class MicroPromptBuilderService:
             ))
 
         # 3. Brand integration with consistency enforcement
-        brand_elements = self._build_brand_elements(
-            scene, request.brand_config, brand_style_vector, brand_harmony_analysis, request
-        )
+        brand_elements = ""
+        if fragments.brand_prefix is not None:
+            brand_elements = "; ".join(
+                fragments.brand_prefix + self._logo_elements(scene) + fragments.brand_suffix
+            )
         if brand_elements:
             prompt_elements.append(PromptElement(
                 content=brand_elements,
@@ -170,33 +247,27 @@ class MicroPromptBuilderService:
             ))
 
         # 4. Technical specifications
-        technical_specs = self._build_technical_specs(scene, brand_style_vector)
-        if technical_specs:
+        if fragments.technical_specs:
             prompt_elements.append(PromptElement(
-                content=technical_specs,
+                content=fragments.technical_specs,
                 priority=PromptPriority.MEDIUM,
                 category="technical",
                 source="requirements"
             ))
 
         # 5. Visual consistency anchors (from harmony analysis)
-        if brand_harmony_analysis and request.enforce_brand_consistency:
-            visual_anchors = self._build_visual_consistency_anchors(
-                brand_harmony_analysis, request
-            )
-            if visual_anchors:
-                prompt_elements.append(PromptElement(
-                    content=visual_anchors,
-                    priority=PromptPriority.CRITICAL if self._has_critical_accessibility_issues(brand_harmony_analysis) else PromptPriority.HIGH,
-                    category="consistency",
-                    source="harmony_analysis"
-                ))
+        if fragments.visual_anchors:
+            prompt_elements.append(PromptElement(
+                content=fragments.visual_anchors,
+                priority=fragments.anchors_priority,
+                category="consistency",
+                source="harmony_analysis"
+            ))
 
         # 6. Quality and style hints
-        quality_hints = self._build_quality_hints(brand_style_vector)
-        if quality_hints:
+        if fragments.quality_hints:
             prompt_elements.append(PromptElement(
-                content=quality_hints,
+                content=fragments.quality_hints,
                 priority=PromptPriority.MEDIUM,
                 category="quality",
                 source="style_vector"
@@ -209,16 +280,11 @@ class MicroPromptBuilderService:
         # Generate negative prompt if enabled
         negative_prompt = None
         if self.config.include_negative_prompts:
-            negative_prompt = self._build_negative_prompt(scene, request.prompt_analysis)
+            negative_prompt = self._compiled_negative_prompt(scene_type_value)
 
-        # Calculate confidence and style scores
-        confidence_score = self._calculate_confidence_score(prompt_elements, brand_style_vector, brand_harmony_analysis)
-        style_vector_score = brand_style_vector.overall_score if brand_style_vector else 0.7
-
-        # Extract brand elements list
-        brand_elements_list = []
-        if request.brand_config:
-            brand_elements_list = self._extract_brand_keywords(request.brand_config)
+        # Calculate confidence score
+        critical_count = 1 + (1 if fragments.visual_anchors and fragments.anchors_priority == PromptPriority.CRITICAL else 0)
+        confidence_score = self._score_confidence(critical_count, 1 if brand_elements else 0, fragments)
 
         return MicroPrompt(
             scene_id=scene.scene_id,
@@ -228,18 +294,36 @@ class MicroPromptBuilderService:
             estimated_duration=scene.duration,
             aspect_ratio=getattr(request, 'aspect_ratio', '16:9'),
             resolution=getattr(request, 'resolution', '1024x576'),
-            style_vector_score=style_vector_score,
-            brand_elements=brand_elements_list,
+            style_vector_score=fragments.style_vector_score,
+            brand_elements=fragments.brand_keywords,
             confidence_score=confidence_score,
-            generation_hints=self._get_model_hints(),
+            generation_hints=fragments.model_hints,
             source_elements=prompt_elements,
-            original_scene_data=scene.dict()
+            original_scene_data=scene.model_dump()
         )
 
+    def _score_confidence(self, critical_count: int, brand_count: int, fragments: PromptFragments) -> float:
+        """Confidence score from element counts and precomputed request-level boosts"""
+        base_score = 0.7  # Base confidence
+        base_score += min(critical_count * 0.1, 0.2)
+        base_score += min(brand_count * 0.05, 0.1)
+
+        # Same accumulation order as _calculate_confidence_score
+        if fragments.style_boost is not None:
+            base_score += fragments.style_boost
+        if fragments.harmony_boost is not None:
+            base_score += fragments.harmony_boost
+            if fragments.has_critical_issues:
+                base_score -= 0.1
+
+        return min(max(base_score, 0.0), 1.0)
+
     def _build_core_description(self, scene: Scene, prompt_analysis: Dict[str, Any]) -> str:
         """Build the core narrative description for the scene"""
-        base_desc = scene.content_description
+        return f"{scene.content_description}{self._build_narrative_suffix(prompt_analysis)}"
 
+    def _build_narrative_suffix(self, prompt_analysis: Dict[str, Any]) -> str:
+        """Build the request-level text appended to every scene description"""
         # Enhance with prompt analysis insights
         tone = prompt_analysis.get('tone', 'professional')
         style = prompt_analysis.get('style', 'modern')
@@ -256,12 +340,12 @@ class MicroPromptBuilderService:
         # Add narrative context
         narrative_context = f" in {tone} {style} style"
 
-        # Combine base description with key elements
+        # Combine key elements with narrative context
         if element_descriptions:
             elements_text = ", ".join(element_descriptions)
-            return f"{base_desc} featuring {elements_text}{narrative_context}"
+            return f" featuring {elements_text}{narrative_context}"
         else:
-            return f"{base_desc}{narrative_context}"
+            return narrative_context
 
     def _build_visual_elements(self, scene: Scene) -> str:
         """Build visual style and camera elements"""
@@ -338,10 +422,10 @@ class MicroPromptBuilderService:
 
     def _build_technical_specs(
         self,
-        scene: Scene,
+        scene: Optional[Scene],
         brand_style_vector: Optional[BrandStyleVector]
     ) -> str:
-        """Build technical specifications for the model"""
+        """Build technical specifications for the model (scene-independent)"""
         specs = []
 
         # Resolution and quality hints
@@ -376,6 +460,20 @@ class MicroPromptBuilderService:
 
     def _build_negative_prompt(self, scene: Scene, prompt_analysis: Dict[str, Any]) -> str:
         """Build negative prompt to avoid unwanted elements"""
+        # Safely handle both enum and string values
+        scene_type = scene.scene_type.value if hasattr(scene.scene_type, 'value') else str(scene.scene_type)
+        return self._compiled_negative_prompt(scene_type)
+
+    def _compiled_negative_prompt(self, scene_type: str) -> str:
+        """Negative prompt for a scene type, compiled once per service"""
+        negative_prompt = self._negative_prompt_cache.get(scene_type)
+        if negative_prompt is None:
+            negative_prompt = self._compile_negative_prompt(scene_type)
+            self._negative_prompt_cache[scene_type] = negative_prompt
+        return negative_prompt
+
+    def _compile_negative_prompt(self, scene_type: str) -> str:
+        """Assemble the negative prompt text for a scene type"""
         negative_elements = []
 
         # Generic quality negatives
@@ -384,8 +482,7 @@ class MicroPromptBuilderService:
             "poor lighting", "amateur", "unprofessional"
         ])
 
-        # Scene-specific negatives - safely handle both enum and string values
-        scene_type = scene.scene_type.value if hasattr(scene.scene_type, 'value') else str(scene.scene_type)
+        # Scene-specific negatives
         if scene_type == "introduction":
             negative_elements.extend(["dark", "confusing", "boring"])
         elif scene_type == "development":
@@ -574,7 +671,32 @@ class MicroPromptBuilderService:
         if not brand_config or not isinstance(brand_config, dict):
             return ""
 
-        elements = []
+        prefix, suffix = self._build_brand_fragments(
+            brand_config, brand_style_vector, brand_harmony_analysis, request
+        )
+        return "; ".join(prefix + self._logo_elements(scene) + suffix)
+
+    def _logo_elements(self, scene: Scene) -> List[str]:
+        """Logo placement is the only scene-specific brand element"""
+        logo_placement = scene.brand_references.logo_placement
+        if logo_placement:
+            return [f"logo positioned {logo_placement}"]
+        return []
+
+    def _build_brand_fragments(
+        self,
+        brand_config: Dict[str, Any],
+        brand_style_vector: Optional[BrandStyleVector],
+        brand_harmony_analysis: Optional[BrandHarmonyAnalysis],
+        request: MicroPromptRequest
+    ) -> Tuple[List[str], List[str]]:
+        """
+        Build the scene-independent brand elements
+
+        Returns:
+            Elements that go before and after the scene's logo placement
+        """
+        prefix = []
 
         # Basic color integration (respecting harmony recommendations)
         colors_value = brand_config.get('colors')
@@ -600,23 +722,21 @@ class MicroPromptBuilderService:
             safe_combinations = brand_harmony_analysis.safe_color_combinations
             if safe_combinations.get('text_on_background'):
                 # Suggest harmony-approved color usage
-                elements.append("using brand-approved color combinations for visual consistency")
+                prefix.append("using brand-approved color combinations for visual consistency")
             else:
                 # Fallback to basic colors but note potential issues
-                elements.append(f"using {', '.join(flat_colors[:2])} brand colors")
+                prefix.append(f"using {', '.join(flat_colors[:2])} brand colors")
         elif flat_colors:
-            elements.append(f"using {', '.join(flat_colors[:2])} brand colors")
+            prefix.append(f"using {', '.join(flat_colors[:2])} brand colors")
 
         # Typography (no harmony conflicts typically)
         typography_config = brand_config.get('typography', {}) or {}
         typography = typography_config.get('primary_font') if isinstance(typography_config, dict) else None
         if typography:
-            elements.append(f"with {typography} typography style")
+            prefix.append(f"with {typography} typography style")
 
-        # Logo placement (scene-specific)
-        logo_placement = scene.brand_references.logo_placement
-        if logo_placement:
-            elements.append(f"logo positioned {logo_placement}")
+        # Logo placement (scene-specific) is inserted between prefix and suffix
+        suffix = []
 
         # Brand tone from style vector (enhanced with harmony context)
         if brand_style_vector:
@@ -628,16 +748,16 @@ class MicroPromptBuilderService:
                 tone_hints.append("visually cohesive brand presentation")
 
             if tone_hints:
-                elements.append(f"maintaining {', '.join(tone_hints[:2])}")
+                suffix.append(f"maintaining {', '.join(tone_hints[:2])}")
 
         # Accessibility enforcement
         if request.enforce_accessibility and brand_harmony_analysis:
             if brand_harmony_analysis.wcag_aa_compliant:
-                elements.append("ensuring WCAG AA accessibility compliance")
+                suffix.append("ensuring WCAG AA accessibility compliance")
             elif brand_harmony_analysis.wcag_aaa_compliant:
-                elements.append("ensuring WCAG AAA accessibility compliance")
+                suffix.append("ensuring WCAG AAA accessibility compliance")
 
-        return "; ".join(elements)
+        return prefix, suffix
 
     def _build_visual_consistency_anchors(
         self,
@@ -0,0 +1,387 @@
+"""
+Recomposition Store - PR 403 follow-up: database-backed recomposition records
+Persists recomposition records in the recompositions table and loads original
+composition configs from Composition.composition_config through a local cache.
+
+Database modules are imported when first used, so the AI package still imports
+without the API's database configuration.
+"""
+
+import hashlib
+import json
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ..models.edit_intent import EditPlan
+from ..models.recomposition import (
+    RecompositionRecord,
+    RecompositionStatus,
+    UpdatedCompositionConfig,
+)
+
+logger = logging.getLogger(__name__)
+
+# Statuses that no longer hold the deduplication slot for their edit
+RETRYABLE_STATUSES = (RecompositionStatus.FAILED, RecompositionStatus.CANCELLED)
+
+
+def _default_session_factory() -> Callable[[], Any]:
+    from db.session import AsyncSessionLocal
+
+    return AsyncSessionLocal
+
+
+def _hash_json(value: Any) -> str:
+    """SHA-256 of a value's canonical JSON"""
+    canonical = json.dumps(value, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def hash_composition_config(config: Dict[str, Any]) -> str:
+    """
+    Version hash of a composition config
+
+    Two configs hash the same exactly when their content is the same, so the
+    hash identifies the version of the composition an edit was applied to.
+    """
+    return _hash_json(config)
+
+
+def hash_edit_plan(edit_plan: EditPlan) -> str:
+    """
+    Hash of an edit plan's operations
+
+    Request IDs, timestamps and the natural language request are left out, so
+    the same edit requested twice hashes the same.
+    """
+    return _hash_json([operation.model_dump(mode='json') for operation in edit_plan.operations])
+
+
+def _utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Make naive (UTC) model timestamps timezone-aware for the database"""
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def _parse_composition_id(composition_id: str) -> uuid.UUID:
+    try:
+        return uuid.UUID(str(composition_id))
+    except ValueError:
+        raise ValueError(f"Composition {composition_id} not found") from None
+
+
+class CompositionConfigLoader:
+    """
+    Loads original composition configs from the compositions table
+
+    Configs are kept in a bounded in-process LRU for `ttl_seconds`, so repeated
+    edits of the same composition read it from the database once.
+    """
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable[[], Any]] = None,
+        cache_size: int = 256,
+        ttl_seconds: float = 60.0
+    ):
+        """
+        Initialize the config loader
+
+        Args:
+            session_factory: Creates async database sessions (default: AsyncSessionLocal)
+            cache_size: Configs kept in the LRU (0 disables caching)
+            ttl_seconds: How long a cached config is used before it is read again
+        """
+        self._session_factory = session_factory
+        self.cache_size = cache_size
+        self.ttl_seconds = ttl_seconds
+        self._cache: "OrderedDict[str, Tuple[float, Dict[str, Any], str]]" = OrderedDict()
+
+    @property
+    def session_factory(self) -> Callable[[], Any]:
+        if self._session_factory is None:
+            self._session_factory = _default_session_factory()
+        return self._session_factory
+
+    async def load(self, composition_id: str) -> Tuple[Dict[str, Any], str]:
+        """
+        Get a composition's config and its version hash
+
+        Args:
+            composition_id: Composition ID
+
+        Returns:
+            Tuple of (composition config, config hash)
+
+        Raises:
+            ValueError: If the composition does not exist
+        """
+        key = str(composition_id)
+        entry = self._cache.get(key)
+        if entry is not None:
+            stored_at, config, config_hash = entry
+            if time.monotonic() - stored_at <= self.ttl_seconds:
+                self._cache.move_to_end(key)
+                return config, config_hash
+            del self._cache[key]
+
+        from db.models.composition import Composition
+        from sqlalchemy import select
+
+        async with self.session_factory() as session:
+            result = await session.execute(
+                select(Composition.composition_config).where(
+                    Composition.id == _parse_composition_id(key)
+                )
+            )
+            config = result.scalar_one_or_none()
+
+        if config is None:
+            raise ValueError(f"Composition {composition_id} not found")
+
+        config_hash = hash_composition_config(config)
+        if self.cache_size > 0:
+            self._cache[key] = (time.monotonic(), config, config_hash)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+        return config, config_hash
+
+    def invalidate(self, composition_id: str) -> None:
+        """Drop a composition's cached config, e.g. after its config changed"""
+        self._cache.pop(str(composition_id), None)
+
+
+class RecompositionStore:
+    """
+    Recomposition records in the recompositions table
+
+    Shared by every API replica. A partial unique index on (composition_id,
+    config_hash, plan_hash) over live records makes deduplication safe when
+    two replicas receive the same edit at once.
+    """
+
+    def __init__(self, session_factory: Optional[Callable[[], Any]] = None):
+        """
+        Initialize the record store
+
+        Args:
+            session_factory: Creates async database sessions (default: AsyncSessionLocal)
+        """
+        self._session_factory = session_factory
+
+    @property
+    def session_factory(self) -> Callable[[], Any]:
+        if self._session_factory is None:
+            self._session_factory = _default_session_factory()
+        return self._session_factory
+
+    async def get(self, recomposition_id: str) -> Optional[RecompositionRecord]:
+        """Get a record by ID"""
+        from db.models.recomposition import Recomposition
+
+        async with self.session_factory() as session:
+            row = await session.get(Recomposition, recomposition_id)
+            return self._to_record(row) if row is not None else None
+
+    async def find_active(
+        self,
+        composition_id: str,
+        config_hash: str,
+        plan_hash: str
+    ) -> Optional[RecompositionRecord]:
+        """
+        Find the live (not failed or cancelled) record for an edit of a config version
+
+        Args:
+            composition_id: Composition ID
+            config_hash: Hash of the composition config the edit applies to
+            plan_hash: Hash of the edit plan's operations
+
+        Returns:
+            The existing record, if any
+        """
+        from db.models.recomposition import Recomposition
+        from db.models.recomposition import RecompositionStatus as RowStatus
+        from sqlalchemy import select
+
+        retryable = [RowStatus(status.value) for status in RETRYABLE_STATUSES]
+        statement = (
+            select(Recomposition)
+            .where(
+                Recomposition.composition_id == _parse_composition_id(composition_id),
+                Recomposition.config_hash == config_hash,
+                Recomposition.plan_hash == plan_hash,
+                Recomposition.status.notin_(retryable),
+            )
+            .order_by(Recomposition.created_at.desc())
+            .limit(1)
+        )
+        async with self.session_factory() as session:
+            row = (await session.execute(statement)).scalar_one_or_none()
+            return self._to_record(row) if row is not None else None
+
+    async def add(
+        self,
+        record: RecompositionRecord,
+        config_hash: str,
+        plan_hash: str
+    ) -> Tuple[RecompositionRecord, bool]:
+        """
+        Insert a record unless a live record for the same edit exists
+
+        Args:
+            record: New record
+            config_hash: Hash of the composition config the edit applies to
+            plan_hash: Hash of the edit plan's operations
+
+        Returns:
+            Tuple of (stored record, created); created is False when another
+            request inserted the same edit first and its record is returned
+        """
+        from sqlalchemy.exc import IntegrityError
+
+        row = self._to_row(record, config_hash, plan_hash)
+        async with self.session_factory() as session:
+            session.add(row)
+            try:
+                await session.commit()
+                return record, True
+            except IntegrityError:
+                await session.rollback()
+
+        existing = await self.find_active(record.composition_id, config_hash, plan_hash)
+        if existing is None:
+            raise RuntimeError(f"Could not store recomposition {record.recomposition_id}")
+
+        logger.info(
+            f"Recomposition for composition {record.composition_id} already stored as "
+            f"{existing.recomposition_id}"
+        )
+        return existing, False
+
+    async def save(self, record: RecompositionRecord) -> bool:
+        """
+        Write a record's status, job and error fields
+
+        Returns:
+            True if the record exists
+        """
+        from db.models.recomposition import Recomposition
+        from db.models.recomposition import RecompositionStatus as RowStatus
+        from sqlalchemy import update
+
+        statement = (
+            update(Recomposition)
+            .where(Recomposition.id == record.recomposition_id)
+            .values(
+                status=RowStatus(record.status.value),
+                ffmpeg_job_id=record.ffmpeg_job_id,
+                estimated_duration_seconds=record.estimated_duration_seconds,
+                triggered_at=_utc(record.triggered_at),
+                completed_at=_utc(record.completed_at),
+                error_message=record.error_message,
+                error_details=record.error_details,
+            )
+        )
+        async with self.session_factory() as session:
+            result = await session.execute(statement)
+            await session.commit()
+            return result.rowcount > 0
+
+    async def claim_pending(self, record: RecompositionRecord) -> bool:
+        """
+        Claim a pending record so exactly one replica resumes its trigger
+
+        The claim is a conditional update on the record's status and
+        updated_at as read, so of two replicas resuming the same record only
+        the first gets the row back; the update moves updated_at on.
+
+        Returns:
+            True if this caller claimed the record
+        """
+        from db.models.recomposition import Recomposition
+        from db.models.recomposition import RecompositionStatus as RowStatus
+        from sqlalchemy import func, update
+
+        statement = (
+            update(Recomposition)
+            .where(
+                Recomposition.id == record.recomposition_id,
+                Recomposition.status == RowStatus.PENDING,
+                Recomposition.updated_at == _utc(record.updated_at),
+            )
+            .values(updated_at=func.now())
+            .returning(Recomposition.id)
+        )
+        async with self.session_factory() as session:
+            claimed = (await session.execute(statement)).scalar_one_or_none()
+            await session.commit()
+            return claimed is not None
+
+    async def list_recent(
+        self,
+        composition_id: Optional[str] = None,
+        limit: int = 100
+    ) -> List[RecompositionRecord]:
+        """Most recent records, newest first, optionally for one composition"""
+        from db.models.recomposition import Recomposition
+        from sqlalchemy import select
+
+        statement = select(Recomposition).order_by(Recomposition.created_at.desc()).limit(limit)
+        if composition_id is not None:
+            statement = statement.where(
+                Recomposition.composition_id == _parse_composition_id(composition_id)
+            )
+
+        async with self.session_factory() as session:
+            rows = (await session.execute(statement)).scalars().all()
+            return [self._to_record(row) for row in rows]
+
+    @staticmethod
+    def _to_row(record: RecompositionRecord, config_hash: str, plan_hash: str) -> Any:
+        from db.models.recomposition import Recomposition
+        from db.models.recomposition import RecompositionStatus as RowStatus
+
+        return Recomposition(
+            id=record.recomposition_id,
+            composition_id=_parse_composition_id(record.composition_id),
+            generation_id=record.generation_id,
+            config_hash=config_hash,
+            plan_hash=plan_hash,
+            status=RowStatus(record.status.value),
+            ffmpeg_job_id=record.ffmpeg_job_id,
+            estimated_duration_seconds=record.estimated_duration_seconds,
+            edit_plan=record.edit_plan.model_dump(mode='json'),
+            updated_config=record.updated_config.model_dump(mode='json'),
+            created_at=_utc(record.created_at),
+            triggered_at=_utc(record.triggered_at),
+            completed_at=_utc(record.completed_at),
+            error_message=record.error_message,
+            error_details=record.error_details,
+        )
+
+    @staticmethod
+    def _to_record(row: Any) -> RecompositionRecord:
+        return RecompositionRecord(
+            recomposition_id=row.id,
+            composition_id=str(row.composition_id),
+            generation_id=row.generation_id,
+            edit_plan=EditPlan.model_validate(row.edit_plan),
+            updated_config=UpdatedCompositionConfig.model_validate(row.updated_config),
+            ffmpeg_job_id=row.ffmpeg_job_id,
+            estimated_duration_seconds=row.estimated_duration_seconds,
+            status=RecompositionStatus(row.status.value),
+            created_at=row.created_at,
+            triggered_at=row.triggered_at,
+            completed_at=row.completed_at,
+            updated_at=row.updated_at,
+            error_message=row.error_message,
+            error_details=row.error_details,
+        )
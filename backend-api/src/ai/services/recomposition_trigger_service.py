@@ -5,8 +5,8 @@ Recomposition Trigger Service - PR 403: Recomposition Trigger
 import asyncio
 import logging
 import uuid
-from typing import Dict, List, Optional, Any, Tuple
-from datetime import datetime
+from typing import Callable, Dict, List, Optional, Any, Tuple
+from datetime import datetime, timedelta
 import httpx
 
 from ..models.recomposition import (
@@ -22,6 +22,7 @@ from ..models.recomposition import (
     FFmpegJobTriggerResponse
 )
 from ..models.edit_intent import EditPlan, FFmpegOperation, EditOperation, EditTarget
+from .recomposition_store import CompositionConfigLoader, RecompositionStore, hash_edit_plan
 
 logger = logging.getLogger(__name__)
 
@@ -34,19 +35,31 @@ class RecompositionTriggerService:
     FFmpeg jobs via HTTP API calls to the FFmpeg backend service.
     """
 
-    def __init__(self, ffmpeg_backend_url: str, request_timeout: float = 30.0):
+    def __init__(
+        self,
+        ffmpeg_backend_url: str,
+        request_timeout: float = 30.0,
+        session_factory: Optional[Callable[[], Any]] = None,
+        record_store: Optional[RecompositionStore] = None,
+        config_loader: Optional[CompositionConfigLoader] = None
+    ):
         """
         Initialize the recomposition trigger service
 
         Args:
             ffmpeg_backend_url: Base URL for the FFmpeg backend service
             request_timeout: Timeout for HTTP requests to FFmpeg backend
+            session_factory: Creates async database sessions for the default
+                record store and config loader (default: AsyncSessionLocal)
+            record_store: Where recomposition records are kept
+            config_loader: Loads original composition configs
         """
         self.ffmpeg_backend_url = ffmpeg_backend_url.rstrip('/')
         self.request_timeout = request_timeout
 
-        # In-memory storage for recomposition records (would be database in production)
-        self._recomposition_records: Dict[str, RecompositionRecord] = {}
+        # Records live in the database so they are shared across API replicas
+        self.record_store = record_store or RecompositionStore(session_factory)
+        self.config_loader = config_loader or CompositionConfigLoader(session_factory)
 
         logger.info(f"RecompositionTriggerService initialized with FFmpeg backend: {ffmpeg_backend_url}")
 
@@ -57,6 +70,12 @@ class RecompositionTriggerService:
         """
         Trigger a recomposition based on an edit plan
 
+        If the same edit plan was already triggered for the same version of the
+        composition config and has not failed or been cancelled, that
+        recomposition is returned (with deduplicated=True) instead of rendering
+        again. A record left pending by a trigger that never completed is
+        resumed once the trigger would have timed out.
+
         Args:
             request: Recomposition trigger request with edit plan
 
@@ -69,6 +88,13 @@ class RecompositionTriggerService:
         try:
             logger.info(f"Triggering recomposition for composition {request.composition_id}")
 
+            original_config, config_hash = await self.config_loader.load(request.composition_id)
+            plan_hash = hash_edit_plan(request.edit_plan)
+
+            existing = await self.record_store.find_active(request.composition_id, config_hash, plan_hash)
+            if existing is not None:
+                return await self._reuse_recomposition(existing, request)
+
             # Generate unique ID for this recomposition
             recomposition_id = f"recomp_{uuid.uuid4().hex[:16]}"
 
@@ -76,54 +102,115 @@ class RecompositionTriggerService:
             updated_config = await self._build_updated_config(
                 request.generation_id,
                 request.composition_id,
-                request.edit_plan
+                request.edit_plan,
+                original_config=original_config
             )
 
-            # Create recomposition record
-            record = RecompositionRecord(
-                recomposition_id=recomposition_id,
-                composition_id=request.composition_id,
-                generation_id=request.generation_id,
-                edit_plan=request.edit_plan,
-                updated_config=updated_config
+            # Create and store the record; a concurrent identical request may win the insert
+            record, created = await self.record_store.add(
+                RecompositionRecord(
+                    recomposition_id=recomposition_id,
+                    composition_id=request.composition_id,
+                    generation_id=request.generation_id,
+                    edit_plan=request.edit_plan,
+                    updated_config=updated_config
+                ),
+                config_hash,
+                plan_hash
             )
+            if not created:
+                return await self._reuse_recomposition(record, request)
+
+            response = await self._start_ffmpeg_job(record, request)
 
-            # Store record
-            self._recomposition_records[recomposition_id] = record
+            logger.info(f"Recomposition {recomposition_id} triggered successfully with FFmpeg job {response.ffmpeg_job_id}")
+            return response
 
-            # Trigger FFmpeg job
+        except Exception as e:
+            logger.error(f"Failed to trigger recomposition for {request.composition_id}: {e}")
+            raise Exception(f"Recomposition trigger failed: {str(e)}")
+
+    async def _start_ffmpeg_job(
+        self,
+        record: RecompositionRecord,
+        request: RecompositionTriggerRequest
+    ) -> RecompositionTriggerResponse:
+        """
+        Trigger the FFmpeg job for a stored record and record the outcome
+
+        A failed trigger marks the record failed, which frees the edit for a retry.
+        """
+        try:
             ffmpeg_response = await self._trigger_ffmpeg_job(
-                recomposition_id,
-                updated_config,
+                record.recomposition_id,
+                record.updated_config,
                 request.priority,
                 request.webhook_url
             )
+        except Exception as e:
+            record.mark_failed(str(e))
+            await self.record_store.save(record)
+            raise
 
-            # Update record with FFmpeg job info
-            record.mark_triggered(ffmpeg_response.job_id)
-
-            # Create response
-            response = RecompositionTriggerResponse(
-                recomposition_id=recomposition_id,
-                ffmpeg_job_id=ffmpeg_response.job_id,
-                status=record.status,
-                estimated_duration_seconds=ffmpeg_response.estimated_duration,
-                status_url=f"/api/v1/recompositions/{recomposition_id}/status",
-                result_url=f"/api/v1/recompositions/{recomposition_id}/result"
-            )
+        record.mark_triggered(ffmpeg_response.job_id, ffmpeg_response.estimated_duration)
+        await self.record_store.save(record)
 
-            logger.info(f"Recomposition {recomposition_id} triggered successfully with FFmpeg job {ffmpeg_response.job_id}")
-            return response
+        return self._build_response(record)
 
-        except Exception as e:
-            logger.error(f"Failed to trigger recomposition for {request.composition_id}: {e}")
-            raise Exception(f"Recomposition trigger failed: {str(e)}")
+    async def _reuse_recomposition(
+        self,
+        record: RecompositionRecord,
+        request: RecompositionTriggerRequest
+    ) -> RecompositionTriggerResponse:
+        """
+        Answer a request with an existing recomposition of the same edit
+
+        Records without an FFmpeg job are resumed if their trigger has had
+        time to time out; otherwise another request is still triggering them.
+        Resuming claims the record first, so only one replica triggers it.
+        """
+        if record.ffmpeg_job_id is None:
+            pending_since = record.updated_at or record.created_at
+            pending_for = datetime.utcnow() - pending_since.replace(tzinfo=None)
+            if pending_for < timedelta(seconds=self.request_timeout) or not (
+                await self.record_store.claim_pending(record)
+            ):
+                raise Exception(
+                    f"Recomposition {record.recomposition_id} is already being triggered"
+                )
+
+            logger.info(f"Resuming recomposition {record.recomposition_id} left pending")
+            return await self._start_ffmpeg_job(record, request)
+
+        logger.info(
+            f"Edit of composition {record.composition_id} already recomposed as "
+            f"{record.recomposition_id} (FFmpeg job {record.ffmpeg_job_id})"
+        )
+        return self._build_response(record, deduplicated=True)
+
+    def _build_response(
+        self,
+        record: RecompositionRecord,
+        deduplicated: bool = False
+    ) -> RecompositionTriggerResponse:
+        """Create the trigger response for a triggered record"""
+        recomposition_id = record.recomposition_id
+        return RecompositionTriggerResponse(
+            recomposition_id=recomposition_id,
+            ffmpeg_job_id=record.ffmpeg_job_id,
+            status=record.status,
+            estimated_duration_seconds=record.estimated_duration_seconds or 0.0,
+            status_url=f"/api/v1/recompositions/{recomposition_id}/status",
+            result_url=f"/api/v1/recompositions/{recomposition_id}/result",
+            deduplicated=deduplicated
+        )
 
     async def _build_updated_config(
         self,
         generation_id: str,
         composition_id: str,
-        edit_plan: EditPlan
+        edit_plan: EditPlan,
+        original_config: Optional[Dict[str, Any]] = None
     ) -> UpdatedCompositionConfig:
         """
         Build updated composition config from edit plan
@@ -132,12 +219,13 @@ class RecompositionTriggerService:
             generation_id: Generation job ID
             composition_id: Composition ID
             edit_plan: Timeline edit plan
+            original_config: Original composition config, if already loaded
 
         Returns:
             Updated composition configuration
         """
-        # Get original composition config (mock for now - would come from database/storage)
-        original_config = await self._get_original_composition_config(composition_id)
+        if original_config is None:
+            original_config = await self._get_original_composition_config(composition_id)
 
         # Convert FFmpeg operations to edit instructions
         clip_edits = []
@@ -155,7 +243,7 @@ class RecompositionTriggerService:
                 if transition_edit:
                     transition_edits.append(transition_edit)
 
-            elif operation.target_type == EditTarget.OVERLAY:
+            elif operation.target_type == EditTarget.VISUAL:
                 overlay_edit = self._convert_overlay_operation(operation)
                 if overlay_edit:
                     overlay_edits.append(overlay_edit)
@@ -271,28 +359,19 @@ class RecompositionTriggerService:
 
     async def _get_original_composition_config(self, composition_id: str) -> Dict[str, Any]:
         """
-        Get original composition config (would come from database in production)
+        Get original composition config from Composition.composition_config
 
         Args:
             composition_id: Composition ID
 
         Returns:
             Original composition configuration
+
+        Raises:
+            ValueError: If the composition does not exist
         """
-        # Mock implementation - in production this would query the database
-        # for the original composition config associated with the composition_id
-        return {
-            "target_duration": 30.0,
-            "resolution": "1920x1080",
-            "frame_rate": 30,
-            "clips": [
-                {"index": 0, "duration": 10.0, "source": "clip1.mp4"},
-                {"index": 1, "duration": 10.0, "source": "clip2.mp4"},
-                {"index": 2, "duration": 10.0, "source": "clip3.mp4"}
-            ],
-            "transitions": [],
-            "overlays": []
-        }
+        config, _ = await self.config_loader.load(composition_id)
+        return config
 
     async def _trigger_ffmpeg_job(
         self,
@@ -367,7 +446,7 @@ class RecompositionTriggerService:
 
         return ", ".join(summary_parts)
 
-    def get_recomposition_record(self, recomposition_id: str) -> Optional[RecompositionRecord]:
+    async def get_recomposition_record(self, recomposition_id: str) -> Optional[RecompositionRecord]:
         """
         Get recomposition record by ID
 
@@ -377,9 +456,9 @@ class RecompositionTriggerService:
         Returns:
             Recomposition record if found
         """
-        return self._recomposition_records.get(recomposition_id)
+        return await self.record_store.get(recomposition_id)
 
-    def update_recomposition_status(
+    async def update_recomposition_status(
         self,
         recomposition_id: str,
         status: RecompositionStatus,
@@ -398,7 +477,7 @@ class RecompositionTriggerService:
         Returns:
             True if update was successful
         """
-        record = self._recomposition_records.get(recomposition_id)
+        record = await self.record_store.get(recomposition_id)
         if not record:
             return False
 
@@ -411,9 +490,16 @@ class RecompositionTriggerService:
         else:
             record.status = status
 
+        if not await self.record_store.save(record):
+            return False
+
         logger.info(f"Updated recomposition {recomposition_id} status to {status.value}")
         return True
 
-    def get_all_recomposition_records(self) -> List[RecompositionRecord]:
-        """Get all recomposition records (for debugging/admin)"""
-        return list(self._recomposition_records.values())
+    async def get_all_recomposition_records(
+        self,
+        composition_id: Optional[str] = None,
+        limit: int = 100
+    ) -> List[RecompositionRecord]:
+        """Get the most recent recomposition records (for debugging/admin)"""
+        return await self.record_store.list_recent(composition_id, limit)
@@ -0,0 +1,98 @@
+"""
+In-memory stand-ins for the recomposition database, shared by the recomposition tests
+"""
+
+from datetime import datetime
+from unittest.mock import MagicMock
+
+from ..models.recomposition import RecompositionStatus
+
+
+class FakeSession:
+    """Async session returning a fixed query result"""
+
+    def __init__(self, value=None, commit_error=None):
+        self.value = value
+        self.commit_error = commit_error
+        self.executed = 0
+        self.added = []
+
+    def __call__(self):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, statement):
+        self.executed += 1
+        result = MagicMock()
+        result.scalar_one_or_none.return_value = self.value
+        return result
+
+    def add(self, instance):
+        self.added.append(instance)
+
+    async def commit(self):
+        if self.commit_error:
+            raise self.commit_error
+
+    async def rollback(self):
+        pass
+
+
+class InMemoryRecordStore:
+    """Record store keeping rows in a dict, with the live-edit uniqueness rule"""
+
+    def __init__(self):
+        self.rows = {}
+
+    async def get(self, recomposition_id):
+        row = self.rows.get(recomposition_id)
+        return row[0].model_copy(deep=True) if row else None
+
+    async def find_active(self, composition_id, config_hash, plan_hash):
+        for record, row_config_hash, row_plan_hash in self.rows.values():
+            if (
+                record.composition_id == composition_id
+                and (row_config_hash, row_plan_hash) == (config_hash, plan_hash)
+                and record.status not in (RecompositionStatus.FAILED, RecompositionStatus.CANCELLED)
+            ):
+                return record.model_copy(deep=True)
+        return None
+
+    async def add(self, record, config_hash, plan_hash):
+        existing = await self.find_active(record.composition_id, config_hash, plan_hash)
+        if existing is not None:
+            return existing, False
+        stored = record.model_copy(update={"updated_at": record.created_at}, deep=True)
+        self.rows[record.recomposition_id] = (stored, config_hash, plan_hash)
+        return record, True
+
+    async def save(self, record):
+        if record.recomposition_id not in self.rows:
+            return False
+        _, config_hash, plan_hash = self.rows[record.recomposition_id]
+        stored = record.model_copy(update={"updated_at": datetime.utcnow()}, deep=True)
+        self.rows[record.recomposition_id] = (stored, config_hash, plan_hash)
+        return True
+
+    async def claim_pending(self, record):
+        row = self.rows.get(record.recomposition_id)
+        if row is None or row[0].status != RecompositionStatus.PENDING:
+            return False
+        if row[0].updated_at != record.updated_at:
+            return False
+        row[0].updated_at = datetime.utcnow()
+        return True
+
+    async def list_recent(self, composition_id=None, limit=100):
+        records = [
+            record.model_copy(deep=True)
+            for record, _, _ in self.rows.values()
+            if composition_id is None or record.composition_id == composition_id
+        ]
+        records.sort(key=lambda record: record.created_at, reverse=True)
+        return records[:limit]
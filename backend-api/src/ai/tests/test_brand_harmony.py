@@ -384,6 +384,52 @@ class TestBrandHarmonyService:
         assert "TestBrand" in cache_key
         assert "_" in cache_key
 
+    def test_cache_key_distinguishes_background_and_roles(self, sample_color_palette):
+        """Palettes differing only in background or color roles get distinct keys"""
+        other_background = ColorPalette(
+            primary=sample_color_palette.primary,
+            secondary=sample_color_palette.secondary,
+            background="#000000"
+        )
+        swapped_roles = ColorPalette(
+            primary=["#1a1a1a", "#666666"],
+            secondary=["#d4af37"],
+            background=sample_color_palette.background
+        )
+
+        base_key = create_harmony_cache_key("TestBrand", sample_color_palette, "abc123")
+        assert base_key != create_harmony_cache_key("TestBrand", other_background, "abc123")
+        assert base_key != create_harmony_cache_key("TestBrand", swapped_roles, "abc123")
+        assert base_key == create_harmony_cache_key("TestBrand", sample_color_palette, "abc123")
+
+    @pytest.mark.asyncio
+    async def test_local_cache_serves_repeat_requests(self, sample_style_vector, sample_color_palette):
+        """Repeat analyses are served from the in-process LRU without touching Redis"""
+        mock_redis = AsyncMock()
+        mock_redis.get.return_value = None
+        service = BrandHarmonyService(redis_client=mock_redis)
+
+        first = await service.analyze_harmony(sample_style_vector, sample_color_palette, "lru_key")
+        second = await service.analyze_harmony(sample_style_vector, sample_color_palette, "lru_key")
+
+        assert second is first
+        mock_redis.get.assert_called_once()
+        mock_redis.setex.assert_called_once()
+
+    def test_local_cache_evicts_least_recently_used(self, sample_style_vector, sample_color_palette):
+        """The LRU keeps at most local_cache_size entries"""
+        service = BrandHarmonyService(local_cache_size=2)
+        analysis = service._create_fallback_analysis(sample_style_vector, sample_color_palette, "n/a")
+
+        service._store_local_analysis("a", analysis)
+        service._store_local_analysis("b", analysis)
+        assert service._get_local_analysis("a") is analysis  # "a" becomes most recent
+        service._store_local_analysis("c", analysis)
+
+        assert service._get_local_analysis("b") is None
+        assert service._get_local_analysis("a") is analysis
+        assert service._get_local_analysis("c") is analysis
+
     @pytest.mark.asyncio
     async def test_redis_error_handling(self, service_with_redis, sample_style_vector, sample_color_palette):
         """Test graceful handling of Redis errors"""
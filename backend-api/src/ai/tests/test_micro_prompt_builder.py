@@ -515,3 +515,119 @@ class TestMicroPromptIntegration:
             # Check that prompt durations match scene durations
             for prompt, scene in zip(prompt_response.micro_prompts, scene_response.scenes):
                 assert prompt.estimated_duration == scene.duration
+
+
+def music_video_request(scene_count: int, brand_style_vector: BrandStyleVector) -> MicroPromptRequest:
+    """Create a music video request with short beat-synced scenes"""
+    scene_types = [SceneType.INTRODUCTION, SceneType.DEVELOPMENT, SceneType.CLIMAX, SceneType.CONCLUSION]
+    scenes = []
+    for i in range(scene_count):
+        start = i * 3.0
+        scenes.append(Scene(
+            scene_id=f"scene_{i + 1}",
+            scene_type=scene_types[min(3, i * 4 // scene_count)],
+            start_time=start,
+            duration=3.0,
+            end_time=start + 3.0,
+            title=f"Beat {i + 1}",
+            content_description=f"Dancers move under neon lights on beat {i + 1}",
+            narrative_purpose="Keep energy with the music",
+            visual_style=VisualStyle.LIFESTYLE,
+            camera_movement="handheld",
+            pacing="fast",
+            brand_references={"logo_placement": "corner" if i % 4 == 0 else None}
+        ).model_dump())
+
+    return MicroPromptRequest(
+        generation_id=f"music_video_{scene_count}",
+        scenes=scenes,
+        prompt_analysis={
+            "tone": "energetic",
+            "style": "music video",
+            "key_elements": [{"description": "neon lighting", "importance": 4}]
+        },
+        brand_config={
+            "name": "Test Brand",
+            "colors": ["#FF0000", "#0000FF", "#00FF00"],
+            "typography": {"primary_font": "Arial"}
+        },
+        brand_style_vector=brand_style_vector.model_dump()
+    )
+
+
+class TestBatchPromptBuilding:
+    """Test cases for request-level precomputation in batch builds"""
+
+    @pytest.fixture
+    def service(self):
+        return MicroPromptBuilderService()
+
+    @pytest.fixture
+    def brand_style_vector(self):
+        from ..models.brand_style_vector import create_default_style_vector
+        return create_default_style_vector("good_brand_adaptation")
+
+    @pytest.mark.asyncio
+    async def test_request_fragments_computed_once(self, service, brand_style_vector):
+        request = music_video_request(30, brand_style_vector)
+
+        with patch.object(service, "_extract_brand_keywords", wraps=service._extract_brand_keywords) as keywords, \
+                patch.object(service, "_build_quality_hints", wraps=service._build_quality_hints) as hints:
+            response = await service.build_micro_prompts(request)
+
+        assert len(response.micro_prompts) == 30
+        assert keywords.call_count == 1
+        assert hints.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_batch_matches_per_scene_builders(self, service, brand_style_vector):
+        request = music_video_request(8, brand_style_vector)
+
+        response = await service.build_micro_prompts(request)
+
+        for scene_data, prompt in zip(request.scenes, response.micro_prompts):
+            scene = Scene(**scene_data)
+            core = service._build_core_description(scene, request.prompt_analysis)
+            brand = service._build_brand_elements(scene, request.brand_config, brand_style_vector, None, request)
+            assert prompt.scene_id == scene.scene_id
+            assert prompt.prompt_text.startswith(core)
+            assert brand in prompt.prompt_text
+            assert prompt.negative_prompt == service._build_negative_prompt(scene, request.prompt_analysis)
+            assert prompt.brand_elements == service._extract_brand_keywords(request.brand_config)
+
+        # Logo placement stays scene-specific
+        assert "logo positioned corner" in response.micro_prompts[0].prompt_text
+        assert "logo positioned" not in response.micro_prompts[1].prompt_text
+
+    @pytest.mark.asyncio
+    async def test_single_prompt_matches_batch(self, service, brand_style_vector):
+        request = music_video_request(4, brand_style_vector)
+        scene = Scene(**request.scenes[2])
+
+        batch = await service.build_micro_prompts(request)
+        single = await service._build_single_prompt(scene, request, brand_style_vector, None)
+
+        assert single.prompt_text == batch.micro_prompts[2].prompt_text
+        assert single.confidence_score == batch.micro_prompts[2].confidence_score
+
+    def test_negative_prompt_compiled_once_per_scene_type(self, service):
+        with patch.object(service, "_compile_negative_prompt", wraps=service._compile_negative_prompt) as compile_:
+            first = service._compiled_negative_prompt("introduction")
+            second = service._compiled_negative_prompt("introduction")
+            service._compiled_negative_prompt("climax")
+
+        assert first == second
+        assert compile_.call_count == 2
+
+
+@pytest.mark.benchmark(group="micro-prompt-batch")
+@pytest.mark.parametrize("scene_count", [30, 60])
+def test_benchmark_music_video_batch(benchmark, scene_count):
+    import asyncio
+    from ..models.brand_style_vector import create_default_style_vector
+
+    service = MicroPromptBuilderService()
+    request = music_video_request(scene_count, create_default_style_vector("good_brand_adaptation"))
+
+    response = benchmark(lambda: asyncio.run(service.build_micro_prompts(request)))
+    assert len(response.micro_prompts) == scene_count
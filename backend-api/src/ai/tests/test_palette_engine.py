@@ -0,0 +1,116 @@
+"""
+Unit tests and micro-benchmarks for the vectorized palette engine
+"""
+
+import random
+
+import pytest
+
+from ..core.palette_engine import compute_palette_matrices, pair_harmony_score
+from ..models.brand_config import ColorPalette
+from ..models.brand_harmony import calculate_contrast_ratio, get_color_temperature
+from ..services.brand_harmony_service import BrandHarmonyService
+
+
+def random_palette(size: int, seed: int = 0) -> list:
+    """Generate a reproducible list of random hex colors"""
+    rng = random.Random(seed)
+    return ["#%06x" % rng.randrange(1 << 24) for _ in range(size)]
+
+
+class TestComputePaletteMatrices:
+    """Test cases for compute_palette_matrices"""
+
+    def test_matches_scalar_functions(self):
+        colors = random_palette(12, seed=42)
+        matrices = compute_palette_matrices(colors)
+
+        for i, color_a in enumerate(colors):
+            assert matrices.temperature[i] == pytest.approx(get_color_temperature(color_a))
+            for j, color_b in enumerate(colors):
+                ratio = calculate_contrast_ratio(color_a, color_b)
+                diff = abs(get_color_temperature(color_a) - get_color_temperature(color_b))
+                assert matrices.contrast[i, j] == pytest.approx(ratio)
+                assert matrices.temperature_difference[i, j] == pytest.approx(diff)
+                assert matrices.harmony[i, j] == pytest.approx(pair_harmony_score(ratio, diff))
+
+    def test_black_white_contrast(self):
+        matrices = compute_palette_matrices(["#000000", "#FFFFFF"])
+        assert matrices.contrast[0, 1] == pytest.approx(21.0)
+        assert matrices.contrast[1, 0] == pytest.approx(21.0)
+
+    def test_upper_pairs_row_major(self):
+        matrices = compute_palette_matrices(random_palette(4))
+        rows, cols = matrices.upper_pairs()
+        assert list(zip(rows.tolist(), cols.tolist())) == [(0, 1), (0, 2), (0, 3), (1, 2), (1, 3), (2, 3)]
+
+    def test_empty_palette(self):
+        matrices = compute_palette_matrices([])
+        assert matrices.contrast.shape == (0, 0)
+
+    def test_rejects_short_hex(self):
+        with pytest.raises(ValueError):
+            compute_palette_matrices(["#fff", "#000000"])
+
+
+class TestPaletteAnalysisEquivalence:
+    """The vectorized analysis must match the per-pair definitions"""
+
+    def test_compatibility_matrix_matches_pairwise(self):
+        colors = random_palette(8, seed=7)
+        palette = ColorPalette(primary=colors[:4], secondary=colors[4:], background="#ffffff")
+        service = BrandHarmonyService(use_mock=True)
+
+        analysis = service._analyze_color_palette(palette)
+
+        all_colors = colors + ["#ffffff"]
+        expected_pairs = [(a, b) for i, a in enumerate(all_colors) for b in all_colors[i + 1:]]
+        assert [(c.color_a, c.color_b) for c in analysis.color_compatibility_matrix] == expected_pairs
+
+        for compat in analysis.color_compatibility_matrix:
+            ratio = calculate_contrast_ratio(compat.color_a, compat.color_b)
+            diff = abs(get_color_temperature(compat.color_a) - get_color_temperature(compat.color_b))
+            assert compat.contrast_ratio == round(ratio, 2)
+            assert compat.temperature_difference == round(diff, 2)
+            assert compat.harmony_score == round(pair_harmony_score(ratio, diff), 2)
+            assert compat.recommended_usage == service._get_pair_usage_recommendations(
+                compat.color_a, compat.color_b, ratio
+            )
+
+
+def _scalar_pairwise(colors):
+    """Reference implementation: per-pair Python calls, as before vectorization"""
+    results = []
+    for i, color_a in enumerate(colors):
+        for color_b in colors[i + 1:]:
+            ratio = calculate_contrast_ratio(color_a, color_b)
+            diff = abs(get_color_temperature(color_a) - get_color_temperature(color_b))
+            results.append((ratio, diff, pair_harmony_score(ratio, diff)))
+    return results
+
+
+@pytest.mark.benchmark(group="palette-pairwise")
+@pytest.mark.parametrize("size", [5, 10, 25, 50])
+def test_benchmark_pairwise_scalar(benchmark, size):
+    colors = random_palette(size)
+    results = benchmark(_scalar_pairwise, colors)
+    assert len(results) == size * (size - 1) // 2
+
+
+@pytest.mark.benchmark(group="palette-pairwise")
+@pytest.mark.parametrize("size", [5, 10, 25, 50])
+def test_benchmark_pairwise_vectorized(benchmark, size):
+    colors = random_palette(size)
+    matrices = benchmark(compute_palette_matrices, colors)
+    assert matrices.contrast.shape == (size, size)
+
+
+@pytest.mark.benchmark(group="palette-analysis")
+@pytest.mark.parametrize("size", [5, 10, 25, 50])
+def test_benchmark_analyze_color_palette(benchmark, size):
+    colors = random_palette(size)
+    palette = ColorPalette(primary=colors[: size // 2], secondary=colors[size // 2:], background="#ffffff")
+    service = BrandHarmonyService(use_mock=True)
+
+    analysis = benchmark(service._analyze_color_palette, palette)
+    assert len(analysis.color_compatibility_matrix) == (size + 1) * size // 2
@@ -2,15 +2,41 @@
 Integration tests for Recomposition Trigger - PR 403
 """
 
-import pytest
-import asyncio
+import uuid
+from typing import List
 from unittest.mock import AsyncMock, MagicMock, patch
-from freezegun import freeze_time
 
-from services.recomposition_trigger_service import RecompositionTriggerService
-from services.edit_intent_classifier_service import EditIntentClassifierService
-from models.recomposition import RecompositionTriggerRequest, RecompositionStatus
-from models.edit_intent import EditRequest, EditOperation, EditTarget
+import pytest
+
+import app  # noqa: F401 - the API package must be loaded before db
+
+from ..models.edit_intent import EditOperation, EditPlan, EditTarget, FFmpegOperation
+from ..models.recomposition import RecompositionStatus, RecompositionTriggerRequest
+from ..services.recomposition_store import CompositionConfigLoader
+from ..services.recomposition_trigger_service import RecompositionTriggerService
+from .recomposition_fakes import FakeSession, InMemoryRecordStore
+
+ORIGINAL_CONFIG = {
+    "target_duration": 30.0,
+    "resolution": "1920x1080",
+    "frame_rate": 30,
+    "clips": [{"index": i, "duration": 10.0} for i in range(3)],
+    "transitions": [],
+    "overlays": []
+}
+
+
+def make_plan(generation_id: str, operations: List[FFmpegOperation]) -> EditPlan:
+    return EditPlan(
+        generation_id=generation_id,
+        request_id=f"edit_{uuid.uuid4().hex[:8]}",
+        natural_language_request="Apply the requested edits",
+        interpreted_intent="Apply the requested edits",
+        operations=operations,
+        confidence_score=0.85,
+        safety_check_passed=True,
+        estimated_duration_seconds=5.0
+    )
 
 
 class TestRecompositionIntegration:
@@ -23,28 +49,30 @@ class TestRecompositionIntegration:
 
     @pytest.fixture
     def recomposition_service(self, ffmpeg_backend_url):
-        """Create RecompositionTriggerService with mock backend"""
+        """Create RecompositionTriggerService with mock backend and in-memory records"""
         return RecompositionTriggerService(
             ffmpeg_backend_url=ffmpeg_backend_url,
-            request_timeout=30.0
+            request_timeout=30.0,
+            record_store=InMemoryRecordStore(),
+            config_loader=CompositionConfigLoader(session_factory=FakeSession(ORIGINAL_CONFIG))
         )
 
-    @pytest.fixture
-    def mock_edit_classifier(self):
-        """Create mock edit intent classifier"""
-        classifier = MagicMock(spec=EditIntentClassifierService)
-
-        # Mock successful classification
-        mock_response = MagicMock()
-        mock_response.operations = [
-            MagicMock(
+    @pytest.mark.asyncio
+    async def test_full_recomposition_workflow(self, recomposition_service, ffmpeg_backend_url):
+        """Test complete workflow from edit plan to FFmpeg trigger"""
+        composition_id = str(uuid.uuid4())
+
+        # Step 1: Edit plan, as produced by the edit intent classifier
+        edit_plan = make_plan("gen_integration_001", [
+            FFmpegOperation(
                 operation_type=EditOperation.TRIM,
                 target_type=EditTarget.CLIP,
                 target_clips=[0],
                 target_time_range={"start": 2.0, "end": 8.0},
+                description="Trim clip 0",
                 priority=1
             ),
-            MagicMock(
+            FFmpegOperation(
                 operation_type=EditOperation.MERGE,
                 target_type=EditTarget.TRANSITION,
                 target_clips=[0, 1],
@@ -53,32 +81,16 @@ class TestRecompositionIntegration:
                     "duration": 1.5,
                     "easing": "linear"
                 },
+                description="Crossfade clips 0 and 1",
                 priority=2
             )
-        ]
-        mock_response.confidence_score = 0.87
-        mock_response.safety_check_passed = True
-
-        classifier.classify_edit_intent.return_value = mock_response
-        return classifier
-
-    @pytest.mark.asyncio
-    async def test_full_recomposition_workflow(self, recomposition_service, mock_edit_classifier, ffmpeg_backend_url):
-        """Test complete workflow from edit request to FFmpeg trigger"""
-        # Step 1: Classify edit intent
-        edit_request = EditRequest(
-            generation_id="gen_integration_001",
-            composition_id="comp_integration_001",
-            natural_language_edit="Make the first clip 6 seconds shorter and add a smooth crossfade between clips"
-        )
-
-        edit_response = mock_edit_classifier.classify_edit_intent(edit_request)
+        ])
 
         # Step 2: Create recomposition trigger request
         trigger_request = RecompositionTriggerRequest(
-            generation_id=edit_request.generation_id,
-            composition_id=edit_request.composition_id,
-            edit_plan=edit_response,
+            generation_id="gen_integration_001",
+            composition_id=composition_id,
+            edit_plan=edit_plan,
             priority="high",
             webhook_url="http://api.example.com/webhooks/recomposition"
         )
@@ -100,8 +112,7 @@ class TestRecompositionIntegration:
             mock_client.post.return_value = mock_response
 
             # Step 4: Trigger recomposition
-            with freeze_time("2024-01-01 12:00:00"):
-                trigger_response = await recomposition_service.trigger_recomposition(trigger_request)
+            trigger_response = await recomposition_service.trigger_recomposition(trigger_request)
 
             # Verify the complete workflow
             assert trigger_response.recomposition_id.startswith("recomp_")
@@ -115,81 +126,79 @@ class TestRecompositionIntegration:
             assert call_args[0][0] == f"{ffmpeg_backend_url}/api/v1/compositions"
 
             request_payload = call_args[1]["json"]
-            assert request_payload["composition_id"] == "comp_integration_001"
+            assert request_payload["composition_id"] == composition_id
             assert request_payload["generation_id"] == "gen_integration_001"
             assert request_payload["priority"] == "high"
             assert request_payload["webhook_url"] == "http://api.example.com/webhooks/recomposition"
 
             # Verify config contains the edits
             config = request_payload["config"]
-            assert config["composition_id"] == "comp_integration_001"
+            assert config["composition_id"] == composition_id
             assert config["generation_id"] == "gen_integration_001"
             assert len(config["clip_edits"]) == 1  # One trim operation
             assert len(config["transition_edits"]) == 1  # One transition operation
 
             # Verify record persistence
-            record = recomposition_service.get_recomposition_record(trigger_response.recomposition_id)
+            record = await recomposition_service.get_recomposition_record(trigger_response.recomposition_id)
             assert record is not None
             assert record.status == RecompositionStatus.TRIGGERED
             assert record.ffmpeg_job_id == "ffmpeg_integration_job_123"
-            assert record.edit_plan == edit_response
+            assert record.edit_plan == edit_plan
 
     @pytest.mark.asyncio
     async def test_recomposition_with_complex_edits(self, recomposition_service):
         """Test recomposition with multiple complex edit operations"""
         # Create complex edit plan with multiple operations
-        from models.edit_intent import EditPlan, FFmpegOperation
-
-        complex_edit_plan = EditPlan(
-            operations=[
-                # Trim first clip
-                FFmpegOperation(
-                    operation_type=EditOperation.TRIM,
-                    target_type=EditTarget.CLIP,
-                    target_clips=[0],
-                    target_time_range={"start": 1.0, "end": 7.0},
-                    priority=1
-                ),
-                # Speed up second clip
-                FFmpegOperation(
-                    operation_type=EditOperation.MERGE,  # Using merge for speed adjustment
-                    target_type=EditTarget.CLIP,
-                    target_clips=[1],
-                    parameters={"speed_multiplier": 1.2},
-                    priority=2
-                ),
-                # Add transition between clips 1 and 2
-                FFmpegOperation(
-                    operation_type=EditOperation.MERGE,
-                    target_type=EditTarget.TRANSITION,
-                    target_clips=[1, 2],
-                    parameters={
-                        "transition_type": "fade",
-                        "duration": 2.0,
-                        "easing": "ease_in"
-                    },
-                    priority=3
-                ),
-                # Update overlay text
-                FFmpegOperation(
-                    operation_type=EditOperation.MERGE,
-                    target_type=EditTarget.OVERLAY,
-                    target_clips=[0],
-                    parameters={
-                        "overlay_id": "title_text",
-                        "text_content": "Updated Product Name",
-                        "position": {"x": "center", "y": 100}
-                    },
-                    priority=4
-                )
-            ],
-            confidence_score=0.92,
-            safety_check_passed=True
-        )
+        complex_edit_plan = make_plan("gen_complex_001", [
+            # Trim first clip
+            FFmpegOperation(
+                operation_type=EditOperation.TRIM,
+                target_type=EditTarget.CLIP,
+                target_clips=[0],
+                target_time_range={"start": 1.0, "end": 7.0},
+                description="Test operation",
+                priority=1
+            ),
+            # Trim second clip
+            FFmpegOperation(
+                operation_type=EditOperation.TRIM,
+                target_type=EditTarget.CLIP,
+                target_clips=[1],
+                target_time_range={"start": 0.5, "end": 6.0},
+                description="Test operation",
+                priority=2
+            ),
+            # Add transition between clips 1 and 2
+            FFmpegOperation(
+                operation_type=EditOperation.MERGE,
+                target_type=EditTarget.TRANSITION,
+                target_clips=[1, 2],
+                parameters={
+                    "transition_type": "fade",
+                    "duration": 2.0,
+                    "easing": "ease_in"
+                },
+                description="Test operation",
+                priority=3
+            ),
+            # Update overlay text
+            FFmpegOperation(
+                operation_type=EditOperation.MERGE,
+                target_type=EditTarget.VISUAL,
+                target_clips=[0],
+                parameters={
+                    "overlay_id": "title_text",
+                    "text_content": "Updated Product Name",
+                    "position": {"x": "center", "y": 100}
+                },
+                description="Test operation",
+                priority=4
+            )
+        ])
 
         trigger_request = RecompositionTriggerRequest(
             generation_id="gen_complex_001",
-            composition_id="comp_complex_001",
+            composition_id=str(uuid.uuid4()),
             edit_plan=complex_edit_plan
         )
 
@@ -214,7 +223,7 @@ class TestRecompositionIntegration:
             request_payload = mock_client.post.call_args[1]["json"]
             config = request_payload["config"]
 
-            assert len(config["clip_edits"]) == 2  # Trim + speed adjustment
+            assert len(config["clip_edits"]) == 2  # Two trims
             assert len(config["transition_edits"]) == 1  # One transition
             assert len(config["overlay_edits"]) == 1  # One overlay update
 
@@ -225,31 +234,28 @@ class TestRecompositionIntegration:
             assert trim_edit["trim_start"] == 1.0
             assert trim_edit["trim_end"] == 7.0
 
-            speed_edit = next((edit for edit in clip_edits if edit["clip_index"] == 1), None)
-            assert speed_edit is not None
-            assert speed_edit["speed_multiplier"] == 1.2
+            second_edit = next((edit for edit in clip_edits if edit["clip_index"] == 1), None)
+            assert second_edit is not None
+            assert second_edit["trim_start"] == 0.5
 
     @pytest.mark.asyncio
     async def test_recomposition_error_recovery(self, recomposition_service):
         """Test error recovery and rollback scenarios"""
         # Create a valid edit plan
-        edit_plan = EditPlan(
-            operations=[
-                FFmpegOperation(
-                    operation_type=EditOperation.TRIM,
-                    target_type=EditTarget.CLIP,
-                    target_clips=[0],
-                    target_time_range={"start": 1.0, "end": 5.0},
-                    priority=1
-                )
-            ],
-            confidence_score=0.8,
-            safety_check_passed=True
-        )
+        edit_plan = make_plan("gen_error_test", [
+            FFmpegOperation(
+                operation_type=EditOperation.TRIM,
+                target_type=EditTarget.CLIP,
+                target_clips=[0],
+                target_time_range={"start": 1.0, "end": 5.0},
+                description="Test operation",
+                priority=1
+            )
+        ])
 
         trigger_request = RecompositionTriggerRequest(
             generation_id="gen_error_test",
-            composition_id="comp_error_test",
+            composition_id=str(uuid.uuid4()),
             edit_plan=edit_plan
         )
 
@@ -268,18 +274,21 @@ class TestRecompositionIntegration:
             with pytest.raises(Exception, match="Recomposition trigger failed"):
                 await recomposition_service.trigger_recomposition(trigger_request)
 
-            # Verify no record was persisted (since it failed)
-            all_records = recomposition_service.get_all_recomposition_records()
-            assert len(all_records) == 0
+            # The record is kept as failed, which frees the edit for a retry
+            all_records = await recomposition_service.get_all_recomposition_records(
+                trigger_request.composition_id
+            )
+            assert [record.status for record in all_records] == [RecompositionStatus.FAILED]
+            assert "503" in all_records[0].error_message
 
     @pytest.mark.asyncio
     async def test_recomposition_status_updates(self, recomposition_service):
         """Test status update functionality"""
         # First create a successful recomposition
-        edit_plan = EditPlan(operations=[], confidence_score=0.8, safety_check_passed=True)
+        edit_plan = make_plan("gen_status_test", [])
         trigger_request = RecompositionTriggerRequest(
             generation_id="gen_status_test",
-            composition_id="comp_status_test",
+            composition_id=str(uuid.uuid4()),
             edit_plan=edit_plan
         )
 
@@ -302,25 +311,26 @@ class TestRecompositionIntegration:
 
             # Test status updates
             # Update to processing
-            success = recomposition_service.update_recomposition_status(
+            success = await recomposition_service.update_recomposition_status(
                 recomposition_id, RecompositionStatus.PROCESSING
             )
             assert success is True
 
-            record = recomposition_service.get_recomposition_record(recomposition_id)
+            record = await recomposition_service.get_recomposition_record(recomposition_id)
             assert record.status == RecompositionStatus.PROCESSING
 
             # Update to completed
-            success = recomposition_service.update_recomposition_status(
+            success = await recomposition_service.update_recomposition_status(
                 recomposition_id, RecompositionStatus.COMPLETED
             )
             assert success is True
+            record = await recomposition_service.get_recomposition_record(recomposition_id)
             assert record.status == RecompositionStatus.COMPLETED
             assert record.completed_at is not None
             assert record.get_duration() is not None  # Should have duration now
 
             # Test update of non-existent record
-            success = recomposition_service.update_recomposition_status(
+            success = await recomposition_service.update_recomposition_status(
                 "nonexistent_id", RecompositionStatus.FAILED
             )
             assert success is False
@@ -331,10 +341,10 @@ class TestRecompositionIntegration:
         priorities = ["low", "normal", "high", "urgent"]
 
         for priority in priorities:
-            edit_plan = EditPlan(operations=[], confidence_score=0.8, safety_check_passed=True)
+            edit_plan = make_plan(f"gen_priority_{priority}", [])
             trigger_request = RecompositionTriggerRequest(
                 generation_id=f"gen_priority_{priority}",
-                composition_id=f"comp_priority_{priority}",
+                composition_id=str(uuid.uuid4()),
                 edit_plan=edit_plan,
                 priority=priority
             )
@@ -361,23 +371,20 @@ class TestRecompositionIntegration:
     @pytest.mark.asyncio
     async def test_recomposition_config_preservation(self, recomposition_service):
         """Test that original config is preserved for rollback"""
-        edit_plan = EditPlan(
-            operations=[
-                FFmpegOperation(
-                    operation_type=EditOperation.TRIM,
-                    target_type=EditTarget.CLIP,
-                    target_clips=[0],
-                    target_time_range={"start": 0.5, "end": 4.5},
-                    priority=1
-                )
-            ],
-            confidence_score=0.85,
-            safety_check_passed=True
-        )
+        edit_plan = make_plan("gen_config_test", [
+            FFmpegOperation(
+                operation_type=EditOperation.TRIM,
+                target_type=EditTarget.CLIP,
+                target_clips=[0],
+                target_time_range={"start": 0.5, "end": 4.5},
+                description="Test operation",
+                priority=1
+            )
+        ])
 
         trigger_request = RecompositionTriggerRequest(
             generation_id="gen_config_test",
-            composition_id="comp_config_test",
+            composition_id=str(uuid.uuid4()),
             edit_plan=edit_plan
         )
 
@@ -399,6 +406,4 @@ class TestRecompositionIntegration:
             # Verify original config is preserved
             request_payload = mock_client.post.call_args[1]["json"]
             config = request_payload["config"]
-            assert "original_config" in config
-            assert config["original_config"]["target_duration"] == 30.0  # From mock
-            assert config["original_config"]["resolution"] == "1920x1080"
+            assert config["original_config"] == ORIGINAL_CONFIG
@@ -0,0 +1,256 @@
+"""
+Unit tests for database-backed recomposition records and deduplication
+"""
+
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+import app  # noqa: F401 - the API package must be loaded before db
+from sqlalchemy.exc import IntegrityError
+
+from ..models.edit_intent import EditOperation, EditPlan, EditTarget, FFmpegOperation
+from ..models.recomposition import (
+    FFmpegJobTriggerResponse,
+    RecompositionRecord,
+    RecompositionStatus,
+    RecompositionTriggerRequest,
+)
+from ..services.recomposition_store import (
+    CompositionConfigLoader,
+    RecompositionStore,
+    hash_composition_config,
+    hash_edit_plan,
+)
+from ..services.recomposition_trigger_service import RecompositionTriggerService
+from .recomposition_fakes import FakeSession, InMemoryRecordStore
+
+COMPOSITION_ID = str(uuid.uuid4())
+ORIGINAL_CONFIG = {"target_duration": 30.0, "resolution": "1920x1080", "frame_rate": 30, "clips": []}
+
+
+def make_plan(request_id: str = "edit_1", trim_end: float = 8.0) -> EditPlan:
+    return EditPlan(
+        generation_id="gen_123",
+        request_id=request_id,
+        natural_language_request="Trim the first clip",
+        interpreted_intent="Trim clip 0",
+        operations=[
+            FFmpegOperation(
+                operation_type=EditOperation.TRIM,
+                target_type=EditTarget.CLIP,
+                target_clips=[0],
+                target_time_range={"start": 2.0, "end": trim_end},
+                description="Trim clip 0"
+            )
+        ],
+        confidence_score=0.9,
+        estimated_duration_seconds=5.0
+    )
+
+
+def make_request(edit_plan: EditPlan) -> RecompositionTriggerRequest:
+    return RecompositionTriggerRequest(
+        generation_id="gen_123",
+        composition_id=COMPOSITION_ID,
+        edit_plan=edit_plan
+    )
+
+
+def make_service(record_store: InMemoryRecordStore) -> RecompositionTriggerService:
+    """Trigger service over a record store and a fixed composition config"""
+    loader = CompositionConfigLoader(session_factory=FakeSession(ORIGINAL_CONFIG))
+    service = RecompositionTriggerService(
+        ffmpeg_backend_url="http://ffmpeg-backend:8000",
+        record_store=record_store,
+        config_loader=loader
+    )
+    service._trigger_ffmpeg_job = AsyncMock(side_effect=lambda *args: FFmpegJobTriggerResponse(
+        job_id=f"ffmpeg_job_{service._trigger_ffmpeg_job.await_count}",
+        status="queued",
+        estimated_duration=45.0
+    ))
+    return service
+
+
+@pytest.fixture
+def service():
+    """Trigger service over an in-memory store"""
+    return make_service(InMemoryRecordStore())
+
+
+class TestPlanHashing:
+    """Test cases for the deduplication hashes"""
+
+    def test_identical_operations_hash_the_same(self):
+        assert hash_edit_plan(make_plan("edit_1")) == hash_edit_plan(make_plan("edit_2"))
+        assert hash_edit_plan(make_plan(trim_end=8.0)) != hash_edit_plan(make_plan(trim_end=9.0))
+
+    def test_config_hash_ignores_key_order(self):
+        assert hash_composition_config({"a": 1, "b": [1, 2]}) == hash_composition_config({"b": [1, 2], "a": 1})
+        assert hash_composition_config({"a": 1}) != hash_composition_config({"a": 2})
+
+
+class TestCompositionConfigLoader:
+    """Test cases for CompositionConfigLoader"""
+
+    @pytest.mark.asyncio
+    async def test_load_is_cached(self):
+        session = FakeSession(ORIGINAL_CONFIG)
+        loader = CompositionConfigLoader(session_factory=session)
+
+        first = await loader.load(COMPOSITION_ID)
+        second = await loader.load(COMPOSITION_ID)
+
+        assert first == second == (ORIGINAL_CONFIG, hash_composition_config(ORIGINAL_CONFIG))
+        assert session.executed == 1
+
+        loader.invalidate(COMPOSITION_ID)
+        await loader.load(COMPOSITION_ID)
+        assert session.executed == 2
+
+    @pytest.mark.asyncio
+    async def test_expired_entry_is_reloaded(self):
+        session = FakeSession(ORIGINAL_CONFIG)
+        loader = CompositionConfigLoader(session_factory=session, ttl_seconds=0.0)
+
+        await loader.load(COMPOSITION_ID)
+        await loader.load(COMPOSITION_ID)
+
+        assert session.executed == 2
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("composition_id", [str(uuid.uuid4()), "comp_456"])
+    async def test_missing_composition(self, composition_id):
+        loader = CompositionConfigLoader(session_factory=FakeSession(None))
+
+        with pytest.raises(ValueError, match="not found"):
+            await loader.load(composition_id)
+
+
+class TestRecompositionStore:
+    """Test cases for RecompositionStore"""
+
+    @pytest.mark.asyncio
+    async def test_add_returns_existing_record_on_conflict(self, service):
+        existing = RecompositionRecord(
+            recomposition_id="recomp_existing",
+            composition_id=COMPOSITION_ID,
+            generation_id="gen_123",
+            edit_plan=make_plan(),
+            updated_config=await service._build_updated_config("gen_123", COMPOSITION_ID, make_plan())
+        )
+        session = FakeSession(commit_error=IntegrityError("INSERT", {}, Exception("duplicate key")))
+        store = RecompositionStore(session_factory=session)
+
+        with patch.object(store, "find_active", AsyncMock(return_value=existing)):
+            record, created = await store.add(existing.model_copy(update={"recomposition_id": "recomp_new"}), "c", "p")
+
+        assert created is False
+        assert record.recomposition_id == "recomp_existing"
+        assert session.added[0].id == "recomp_new"
+        assert session.added[0].edit_plan["request_id"] == "edit_1"
+
+    @pytest.mark.asyncio
+    async def test_claim_pending_needs_a_returned_row(self, service):
+        record = RecompositionRecord(
+            recomposition_id="recomp_pending",
+            composition_id=COMPOSITION_ID,
+            generation_id="gen_123",
+            edit_plan=make_plan(),
+            updated_config=await service._build_updated_config("gen_123", COMPOSITION_ID, make_plan()),
+            updated_at=datetime.now(timezone.utc)
+        )
+
+        assert await RecompositionStore(session_factory=FakeSession("recomp_pending")).claim_pending(record)
+        assert not await RecompositionStore(session_factory=FakeSession(None)).claim_pending(record)
+
+
+class TestRecompositionDeduplication:
+    """Identical edits of the same composition version reuse one FFmpeg job"""
+
+    @pytest.mark.asyncio
+    async def test_identical_edit_returns_existing_job(self, service):
+        first = await service.trigger_recomposition(make_request(make_plan("edit_1")))
+        second = await service.trigger_recomposition(make_request(make_plan("edit_2")))
+
+        assert second.recomposition_id == first.recomposition_id
+        assert second.ffmpeg_job_id == first.ffmpeg_job_id == "ffmpeg_job_1"
+        assert second.estimated_duration_seconds == 45.0
+        assert (first.deduplicated, second.deduplicated) == (False, True)
+        assert service._trigger_ffmpeg_job.await_count == 1
+
+        record = await service.get_recomposition_record(first.recomposition_id)
+        assert record.status == RecompositionStatus.TRIGGERED
+
+    @pytest.mark.asyncio
+    async def test_different_edit_or_config_version_renders_again(self, service):
+        first = await service.trigger_recomposition(make_request(make_plan(trim_end=8.0)))
+        other_edit = await service.trigger_recomposition(make_request(make_plan(trim_end=9.0)))
+
+        service.config_loader.session_factory.value = {**ORIGINAL_CONFIG, "target_duration": 20.0}
+        service.config_loader.invalidate(COMPOSITION_ID)
+        new_version = await service.trigger_recomposition(make_request(make_plan(trim_end=8.0)))
+
+        assert len({first.recomposition_id, other_edit.recomposition_id, new_version.recomposition_id}) == 3
+        assert service._trigger_ffmpeg_job.await_count == 3
+
+    @pytest.mark.asyncio
+    async def test_failed_trigger_frees_edit_for_retry(self, service):
+        service._trigger_ffmpeg_job.side_effect = Exception("backend down")
+        with pytest.raises(Exception, match="backend down"):
+            await service.trigger_recomposition(make_request(make_plan()))
+
+        failed_id = next(iter(service.record_store.rows))
+        assert (await service.get_recomposition_record(failed_id)).status == RecompositionStatus.FAILED
+
+        service._trigger_ffmpeg_job.side_effect = None
+        service._trigger_ffmpeg_job.return_value = FFmpegJobTriggerResponse(
+            job_id="ffmpeg_job_retry", status="queued", estimated_duration=30.0
+        )
+        retry = await service.trigger_recomposition(make_request(make_plan()))
+
+        assert retry.recomposition_id != failed_id
+        assert retry.deduplicated is False
+
+    @pytest.mark.asyncio
+    async def test_stale_pending_record_is_resumed_once(self, service):
+        """Two replicas finding the same stale pending record trigger it once"""
+        other = make_service(service.record_store)
+        stale = RecompositionRecord(
+            recomposition_id="recomp_stale",
+            composition_id=COMPOSITION_ID,
+            generation_id="gen_123",
+            edit_plan=make_plan(),
+            updated_config=await service._build_updated_config("gen_123", COMPOSITION_ID, make_plan()),
+            created_at=datetime.utcnow() - timedelta(minutes=5)
+        )
+        config_hash, plan_hash = hash_composition_config(ORIGINAL_CONFIG), hash_edit_plan(make_plan())
+        await service.record_store.add(stale, config_hash, plan_hash)
+
+        # Both replicas read the record before either resumes it
+        found = await service.record_store.find_active(COMPOSITION_ID, config_hash, plan_hash)
+        results = await asyncio.gather(
+            service._reuse_recomposition(found, make_request(make_plan())),
+            other._reuse_recomposition(found.model_copy(deep=True), make_request(make_plan())),
+            return_exceptions=True
+        )
+
+        resumed = [result for result in results if not isinstance(result, Exception)]
+        assert [response.recomposition_id for response in resumed] == ["recomp_stale"]
+        assert "already being triggered" in str(next(r for r in results if isinstance(r, Exception)))
+        assert service._trigger_ffmpeg_job.await_count + other._trigger_ffmpeg_job.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_completed_recomposition_is_still_reused(self, service):
+        first = await service.trigger_recomposition(make_request(make_plan()))
+        assert await service.update_recomposition_status(first.recomposition_id, RecompositionStatus.COMPLETED)
+
+        again = await service.trigger_recomposition(make_request(make_plan()))
+
+        assert again.recomposition_id == first.recomposition_id
+        assert again.status == RecompositionStatus.COMPLETED
+        assert await service.update_recomposition_status("recomp_missing", RecompositionStatus.FAILED) is False
@@ -2,32 +2,79 @@
 Unit tests for Recomposition Trigger Service - PR 403
 """
 
-import pytest
-import asyncio
-from unittest.mock import AsyncMock, MagicMock, patch
+import uuid
 from datetime import datetime
-from freezegun import freeze_time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+import app  # noqa: F401 - the API package must be loaded before db
 
-from services.recomposition_trigger_service import RecompositionTriggerService
-from models.recomposition import (
+from ..models.edit_intent import EditOperation, EditPlan, EditTarget, FFmpegOperation
+from ..models.recomposition import (
+    ClipEditInstruction,
+    RecompositionRecord,
+    RecompositionStatus,
     RecompositionTriggerRequest,
     RecompositionTriggerResponse,
+    TransitionEditInstruction,
     UpdatedCompositionConfig,
-    RecompositionRecord,
-    RecompositionStatus,
-    ClipEditInstruction,
-    FFmpegJobTriggerRequest,
-    FFmpegJobTriggerResponse
 )
-from models.edit_intent import EditPlan, FFmpegOperation, EditOperation, EditTarget
+from ..services.recomposition_store import CompositionConfigLoader
+from ..services.recomposition_trigger_service import RecompositionTriggerService
+from .recomposition_fakes import FakeSession, InMemoryRecordStore
+
+COMPOSITION_ID = str(uuid.uuid4())
+ORIGINAL_CONFIG = {
+    "target_duration": 30.0,
+    "resolution": "1920x1080",
+    "frame_rate": 30,
+    "clips": [{"index": 0, "duration": 10.0}, {"index": 1, "duration": 10.0}],
+    "transitions": [],
+    "overlays": []
+}
 
 
 @pytest.fixture
-def recomposition_service():
-    """Create RecompositionTriggerService instance"""
+def record_store():
+    """In-memory recomposition records"""
+    return InMemoryRecordStore()
+
+
+@pytest.fixture
+def recomposition_service(record_store):
+    """Create RecompositionTriggerService over in-memory records and a fixed config"""
     return RecompositionTriggerService(
         ffmpeg_backend_url="http://ffmpeg-backend:8000",
-        request_timeout=30.0
+        request_timeout=30.0,
+        record_store=record_store,
+        config_loader=CompositionConfigLoader(session_factory=FakeSession(ORIGINAL_CONFIG))
+    )
+
+
+def make_plan() -> EditPlan:
+    return EditPlan(
+        generation_id="gen_789",
+        request_id="edit_789",
+        natural_language_request="Leave it as it is",
+        interpreted_intent="No changes",
+        confidence_score=0.8,
+        estimated_duration_seconds=0.0
+    )
+
+
+def make_record(edit_plan: EditPlan) -> RecompositionRecord:
+    return RecompositionRecord(
+        recomposition_id="recomp_123",
+        composition_id=COMPOSITION_ID,
+        generation_id="gen_789",
+        edit_plan=edit_plan,
+        updated_config=UpdatedCompositionConfig(
+            original_config=ORIGINAL_CONFIG,
+            composition_id=COMPOSITION_ID,
+            generation_id="gen_789",
+            target_duration=30.0
+        )
     )
 
 
@@ -35,12 +82,17 @@ def recomposition_service():
 def sample_edit_plan():
     """Create sample edit plan for testing"""
     return EditPlan(
+        generation_id="gen_123",
+        request_id="edit_123",
+        natural_language_request="Trim the first clip and crossfade into the second",
+        interpreted_intent="Trim clip 0 and add a crossfade between clips 0 and 1",
         operations=[
             FFmpegOperation(
                 operation_type=EditOperation.TRIM,
                 target_type=EditTarget.CLIP,
                 target_clips=[0],
                 target_time_range={"start": 2.0, "end": 8.0},
+                description="Test operation",
                 priority=1
             ),
             FFmpegOperation(
@@ -52,11 +104,13 @@ def sample_edit_plan():
                     "duration": 1.0,
                     "easing": "linear"
                 },
+                description="Test operation",
                 priority=2
             )
         ],
         confidence_score=0.85,
-        safety_check_passed=True
+        safety_check_passed=True,
+        estimated_duration_seconds=5.0
     )
 
 
@@ -65,7 +119,7 @@ def sample_trigger_request(sample_edit_plan):
     """Create sample trigger request"""
     return RecompositionTriggerRequest(
         generation_id="gen_123",
-        composition_id="comp_456",
+        composition_id=COMPOSITION_ID,
         edit_plan=sample_edit_plan,
         priority="normal"
     )
@@ -78,7 +132,7 @@ class TestRecompositionTriggerService:
         """Test service initializes correctly"""
         assert recomposition_service.ffmpeg_backend_url == "http://ffmpeg-backend:8000"
         assert recomposition_service.request_timeout == 30.0
-        assert isinstance(recomposition_service._recomposition_records, dict)
+        assert isinstance(recomposition_service.record_store, InMemoryRecordStore)
 
     @pytest.mark.asyncio
     @patch('httpx.AsyncClient')
@@ -99,8 +153,7 @@ class TestRecompositionTriggerService:
         }
         mock_client.post.return_value = mock_response
 
-        with freeze_time("2024-01-01 12:00:00"):
-            response = await recomposition_service.trigger_recomposition(sample_trigger_request)
+        response = await recomposition_service.trigger_recomposition(sample_trigger_request)
 
         # Verify response structure
         assert isinstance(response, RecompositionTriggerResponse)
@@ -110,11 +163,11 @@ class TestRecompositionTriggerService:
         assert "recompositions" in response.status_url
 
         # Verify record was created and stored
-        record = recomposition_service.get_recomposition_record(response.recomposition_id)
+        record = await recomposition_service.get_recomposition_record(response.recomposition_id)
         assert record is not None
         assert record.status == RecompositionStatus.TRIGGERED
         assert record.ffmpeg_job_id == "ffmpeg_job_789"
-        assert record.composition_id == "comp_456"
+        assert record.composition_id == COMPOSITION_ID
         assert record.generation_id == "gen_123"
 
         # Verify HTTP request was made correctly
@@ -123,7 +176,7 @@ class TestRecompositionTriggerService:
         assert call_args[0][0] == "http://ffmpeg-backend:8000/api/v1/compositions"
         request_data = call_args[1]["json"]
 
-        assert request_data["composition_id"] == "comp_456"
+        assert request_data["composition_id"] == COMPOSITION_ID
         assert request_data["generation_id"] == "gen_123"
         assert request_data["priority"] == "normal"
         assert "config" in request_data
@@ -144,34 +197,19 @@ class TestRecompositionTriggerService:
             with pytest.raises(Exception, match="Recomposition trigger failed"):
                 await recomposition_service.trigger_recomposition(sample_trigger_request)
 
-    def test_build_updated_config(self, recomposition_service, sample_edit_plan):
+    @pytest.mark.asyncio
+    async def test_build_updated_config(self, recomposition_service, sample_edit_plan):
         """Test building updated config from edit plan"""
-        # This would normally be async, but we're testing the logic
-        # In real usage, this is called from trigger_recomposition
-
-        # Create a mock for the async _get_original_composition_config call
-        original_config = {
-            "target_duration": 30.0,
-            "resolution": "1920x1080",
-            "frame_rate": 30,
-            "clips": [{"index": 0, "duration": 10.0}, {"index": 1, "duration": 10.0}],
-            "transitions": [],
-            "overlays": []
-        }
-
-        with patch.object(recomposition_service, '_get_original_composition_config', return_value=original_config):
-            # Call the method directly (normally async)
-            import asyncio
-            config = asyncio.run(recomposition_service._build_updated_config(
-                "gen_123", "comp_456", sample_edit_plan
-            ))
+        config = await recomposition_service._build_updated_config(
+            "gen_123", COMPOSITION_ID, sample_edit_plan
+        )
 
-            assert isinstance(config, UpdatedCompositionConfig)
-            assert config.composition_id == "comp_456"
-            assert config.generation_id == "gen_123"
-            assert config.target_duration == 30.0
-            assert len(config.clip_edits) == 1  # One trim operation
-            assert len(config.transition_edits) == 1  # One merge operation
+        assert isinstance(config, UpdatedCompositionConfig)
+        assert config.composition_id == COMPOSITION_ID
+        assert config.generation_id == "gen_123"
+        assert config.target_duration == 30.0
+        assert len(config.clip_edits) == 1  # One trim operation
+        assert len(config.transition_edits) == 1  # One merge operation
 
     def test_convert_clip_operation_trim(self, recomposition_service):
         """Test converting clip trim operation"""
@@ -180,6 +218,7 @@ class TestRecompositionTriggerService:
             target_type=EditTarget.CLIP,
             target_clips=[1],
             target_time_range={"start": 3.0, "end": 7.0},
+            description="Test operation",
             priority=1
         )
 
@@ -197,6 +236,7 @@ class TestRecompositionTriggerService:
             target_type=EditTarget.CLIP,
             target_clips=[0],
             # No target_time_range
+            description="Test operation",
             priority=1
         )
 
@@ -216,6 +256,7 @@ class TestRecompositionTriggerService:
                 "duration": 2.0,
                 "easing": "ease_in_out"
             },
+            description="Test operation",
             priority=1
         )
 
@@ -231,7 +272,7 @@ class TestRecompositionTriggerService:
         """Test converting overlay operation"""
         operation = FFmpegOperation(
             operation_type=EditOperation.MERGE,  # Overlays often come from merge operations
-            target_type=EditTarget.OVERLAY,
+            target_type=EditTarget.VISUAL,
             target_clips=[0],
             parameters={
                 "overlay_id": "text_001",
@@ -239,6 +280,7 @@ class TestRecompositionTriggerService:
                 "position": {"x": 100, "y": 200},
                 "timing": {"start_time": 5.0, "end_time": 10.0}
             },
+            description="Test operation",
             priority=1
         )
 
@@ -253,6 +295,7 @@ class TestRecompositionTriggerService:
     def test_create_edit_summary(self, recomposition_service):
         """Test creating edit summary"""
         config = UpdatedCompositionConfig(
+            original_config=ORIGINAL_CONFIG,
             composition_id="comp_123",
             generation_id="gen_456",
             target_duration=30.0,
@@ -268,6 +311,7 @@ class TestRecompositionTriggerService:
     def test_create_edit_summary_no_changes(self, recomposition_service):
         """Test creating edit summary with no changes"""
         config = UpdatedCompositionConfig(
+            original_config=ORIGINAL_CONFIG,
             composition_id="comp_123",
             generation_id="gen_456",
             target_duration=30.0,
@@ -279,68 +323,56 @@ class TestRecompositionTriggerService:
         summary = recomposition_service._create_edit_summary(config)
         assert "no changes" in summary
 
-    def test_get_recomposition_record(self, recomposition_service):
+    @pytest.mark.asyncio
+    async def test_get_recomposition_record(self, recomposition_service, record_store, sample_edit_plan):
         """Test getting recomposition record"""
-        # Create a mock record
-        record = RecompositionRecord(
-            recomposition_id="recomp_123",
-            composition_id="comp_456",
-            generation_id="gen_789",
-            edit_plan=EditPlan(operations=[]),
-            updated_config=UpdatedCompositionConfig(
-                composition_id="comp_456",
-                generation_id="gen_789",
-                target_duration=30.0
-            )
-        )
-
-        recomposition_service._recomposition_records["recomp_123"] = record
+        await record_store.add(make_record(sample_edit_plan), "config_hash", "plan_hash")
 
-        retrieved = recomposition_service.get_recomposition_record("recomp_123")
+        retrieved = await recomposition_service.get_recomposition_record("recomp_123")
         assert retrieved is not None
         assert retrieved.recomposition_id == "recomp_123"
 
         # Test non-existent record
-        assert recomposition_service.get_recomposition_record("nonexistent") is None
+        assert await recomposition_service.get_recomposition_record("nonexistent") is None
 
-    def test_update_recomposition_status(self, recomposition_service):
+    @pytest.mark.asyncio
+    async def test_update_recomposition_status(self, recomposition_service, record_store, sample_edit_plan):
         """Test updating recomposition status"""
-        # Create and store a record
-        record = RecompositionRecord(
-            recomposition_id="recomp_123",
-            composition_id="comp_456",
-            generation_id="gen_789",
-            edit_plan=EditPlan(operations=[]),
-            updated_config=UpdatedCompositionConfig(
-                composition_id="comp_456",
-                generation_id="gen_789",
-                target_duration=30.0
-            )
-        )
-        recomposition_service._recomposition_records["recomp_123"] = record
+        await record_store.add(make_record(sample_edit_plan), "config_hash", "plan_hash")
 
         # Test successful completion
-        success = recomposition_service.update_recomposition_status("recomp_123", RecompositionStatus.COMPLETED)
+        success = await recomposition_service.update_recomposition_status("recomp_123", RecompositionStatus.COMPLETED)
         assert success is True
+        record = await recomposition_service.get_recomposition_record("recomp_123")
         assert record.status == RecompositionStatus.COMPLETED
         assert record.completed_at is not None
 
         # Test failure status
-        success = recomposition_service.update_recomposition_status(
+        success = await recomposition_service.update_recomposition_status(
             "recomp_123",
             RecompositionStatus.FAILED,
             "Processing error",
             {"details": "FFmpeg failed"}
         )
         assert success is True
+        record = await recomposition_service.get_recomposition_record("recomp_123")
         assert record.status == RecompositionStatus.FAILED
         assert record.error_message == "Processing error"
         assert record.error_details == {"details": "FFmpeg failed"}
 
         # Test non-existent record
-        success = recomposition_service.update_recomposition_status("nonexistent", RecompositionStatus.COMPLETED)
+        success = await recomposition_service.update_recomposition_status("nonexistent", RecompositionStatus.COMPLETED)
         assert success is False
 
+    @pytest.mark.asyncio
+    async def test_get_all_recomposition_records(self, recomposition_service, record_store, sample_edit_plan):
+        """Test listing recomposition records per composition"""
+        await record_store.add(make_record(sample_edit_plan), "config_hash", "plan_hash")
+
+        records = await recomposition_service.get_all_recomposition_records(COMPOSITION_ID)
+        assert [record.recomposition_id for record in records] == ["recomp_123"]
+        assert await recomposition_service.get_all_recomposition_records(str(uuid.uuid4())) == []
+
 
 class TestRecompositionRecord:
     """Test cases for RecompositionRecord model"""
@@ -351,8 +383,9 @@ class TestRecompositionRecord:
             recomposition_id="recomp_123",
             composition_id="comp_456",
             generation_id="gen_789",
-            edit_plan=EditPlan(operations=[]),
+            edit_plan=make_plan(),
             updated_config=UpdatedCompositionConfig(
+                original_config=ORIGINAL_CONFIG,
                 composition_id="comp_456",
                 generation_id="gen_789",
                 target_duration=30.0
@@ -370,8 +403,9 @@ class TestRecompositionRecord:
             recomposition_id="recomp_123",
             composition_id="comp_456",
             generation_id="gen_789",
-            edit_plan=EditPlan(operations=[]),
+            edit_plan=make_plan(),
             updated_config=UpdatedCompositionConfig(
+                original_config=ORIGINAL_CONFIG,
                 composition_id="comp_456",
                 generation_id="gen_789",
                 target_duration=30.0
@@ -390,8 +424,9 @@ class TestRecompositionRecord:
             recomposition_id="recomp_123",
             composition_id="comp_456",
             generation_id="gen_789",
-            edit_plan=EditPlan(operations=[]),
+            edit_plan=make_plan(),
             updated_config=UpdatedCompositionConfig(
+                original_config=ORIGINAL_CONFIG,
                 composition_id="comp_456",
                 generation_id="gen_789",
                 target_duration=30.0
@@ -410,8 +445,9 @@ class TestRecompositionRecord:
             recomposition_id="recomp_123",
             composition_id="comp_456",
             generation_id="gen_789",
-            edit_plan=EditPlan(operations=[]),
+            edit_plan=make_plan(),
             updated_config=UpdatedCompositionConfig(
+                original_config=ORIGINAL_CONFIG,
                 composition_id="comp_456",
                 generation_id="gen_789",
                 target_duration=30.0
@@ -432,8 +468,9 @@ class TestRecompositionRecord:
             recomposition_id="recomp_123",
             composition_id="comp_456",
             generation_id="gen_789",
-            edit_plan=EditPlan(operations=[]),
+            edit_plan=make_plan(),
             updated_config=UpdatedCompositionConfig(
+                original_config=ORIGINAL_CONFIG,
                 composition_id="comp_456",
                 generation_id="gen_789",
                 target_duration=30.0
@@ -476,6 +513,7 @@ class TestUpdatedCompositionConfig:
     def test_config_has_changes_false(self):
         """Test config with no changes"""
         config = UpdatedCompositionConfig(
+            original_config=ORIGINAL_CONFIG,
             composition_id="comp_123",
             generation_id="gen_456",
             target_duration=30.0,
@@ -492,6 +530,7 @@ class TestUpdatedCompositionConfig:
         edit2 = ClipEditInstruction(clip_index=2, trim_end=5.0)
 
         config = UpdatedCompositionConfig(
+            original_config=ORIGINAL_CONFIG,
             composition_id="comp_123",
             generation_id="gen_456",
             target_duration=30.0,
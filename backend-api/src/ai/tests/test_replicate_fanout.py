@@ -0,0 +1,314 @@
+"""
+Unit tests for the Replicate fan-out engine
+"""
+
+import asyncio
+import itertools
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from ..core.replicate_fanout import LatencyTracker, ReplicateFanout, TokenBucket, poll_intervals
+from ..models.replicate_client import FanoutConfig
+
+
+class RateLimitError(Exception):
+    """Stand-in for replicate.exceptions.ReplicateError with status 429"""
+
+    status = 429
+
+
+class APIError(Exception):
+    """Stand-in for replicate.exceptions.ReplicateError with an HTTP status"""
+
+    def __init__(self, status):
+        super().__init__(f"HTTP {status}")
+        self.status = status
+
+
+def make_client(statuses=None):
+    """Create a fake Replicate client whose predictions walk through `statuses`"""
+    counter = itertools.count(1)
+    statuses = statuses or {}
+    polls = {}
+
+    def create(**kwargs):
+        return SimpleNamespace(id=f"pred_{next(counter)}", status="starting")
+
+    def get(prediction_id):
+        sequence = statuses.get(prediction_id, ["succeeded"])
+        index = polls.get(prediction_id, 0)
+        polls[prediction_id] = index + 1
+        return SimpleNamespace(id=prediction_id, status=sequence[min(index, len(sequence) - 1)])
+
+    client = MagicMock()
+    client.predictions.create.side_effect = create
+    client.predictions.get.side_effect = get
+    return client
+
+
+@pytest.fixture
+def fast_config():
+    return FanoutConfig(
+        max_concurrency_per_model=2,
+        requests_per_second=1000.0,
+        burst=100,
+        retry_base_delay=0.0,
+        poll_initial_interval=0.001,
+        poll_max_interval=0.005,
+        poll_jitter=0.0,
+    )
+
+
+class TestTokenBucket:
+    """Test cases for TokenBucket"""
+
+    @pytest.mark.asyncio
+    async def test_burst_is_immediate(self):
+        bucket = TokenBucket(rate=1.0, capacity=3)
+        for _ in range(3):
+            assert await bucket.acquire() < 0.05
+
+    @pytest.mark.asyncio
+    async def test_waits_when_empty(self):
+        bucket = TokenBucket(rate=50.0, capacity=1)
+        await bucket.acquire()
+        waited = await bucket.acquire()
+        assert waited >= 0.015
+
+    @pytest.mark.asyncio
+    async def test_pause_blocks_acquire(self):
+        bucket = TokenBucket(rate=1000.0, capacity=10)
+        bucket.pause(0.03)
+        assert await bucket.acquire() >= 0.025
+
+
+class TestPolling:
+    """Test cases for polling schedule and latency tracking"""
+
+    def test_intervals_back_off_to_cap(self):
+        config = FanoutConfig(poll_initial_interval=1.0, poll_max_interval=4.0, poll_backoff_factor=2.0, poll_jitter=0.0)
+        intervals = list(itertools.islice(poll_intervals(config), 5))
+        assert intervals == [1.0, 1.0, 2.0, 4.0, 4.0]
+
+    def test_first_interval_uses_expected_latency(self):
+        config = FanoutConfig(poll_initial_interval=1.0, poll_max_interval=15.0, poll_jitter=0.0)
+        assert next(poll_intervals(config, expected_latency=20.0)) == 10.0
+        assert next(poll_intervals(config, expected_latency=100.0)) == 15.0
+
+    def test_latency_percentile(self):
+        tracker = LatencyTracker()
+        assert tracker.percentile(0.5) is None
+        for value in range(1, 11):
+            tracker.record(float(value))
+        assert tracker.percentile(0.5) == 5.0
+        assert tracker.percentile(0.95) == 10.0
+
+
+class TestReplicateFanout:
+    """Test cases for ReplicateFanout"""
+
+    @pytest.mark.asyncio
+    async def test_submit_passes_model_and_inputs(self, fast_config):
+        client = make_client()
+        fanout = ReplicateFanout(fast_config, client=client)
+
+        prediction = await fanout.submit("owner/model", input={"prompt": "hi"}, webhook=None)
+
+        assert prediction.id == "pred_1"
+        client.predictions.create.assert_called_once_with(model="owner/model", input={"prompt": "hi"}, webhook=None)
+
+    @pytest.mark.asyncio
+    async def test_submit_keeps_explicit_version(self, fast_config):
+        client = make_client()
+        fanout = ReplicateFanout(fast_config, client=client)
+
+        await fanout.submit("owner/model", version="abc123", input={})
+
+        client.predictions.create.assert_called_once_with(version="abc123", input={})
+
+    @pytest.mark.asyncio
+    async def test_concurrency_bounded_per_model(self, fast_config):
+        in_flight = 0
+        peak = 0
+
+        async def slow_create(**kwargs):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return SimpleNamespace(id="pred", status="starting")
+
+        fanout = ReplicateFanout(fast_config, client=make_client())
+        fanout._create = lambda model, kwargs: slow_create(**kwargs)
+
+        await asyncio.gather(*(fanout.submit("a/model", input={}) for _ in range(6)))
+        assert peak == fast_config.max_concurrency_per_model
+
+    @pytest.mark.asyncio
+    async def test_rate_limited_create_is_retried(self, fast_config):
+        client = make_client()
+        client.predictions.create.side_effect = [
+            RateLimitError("slow down"),
+            SimpleNamespace(id="pred_ok", status="starting"),
+        ]
+        fanout = ReplicateFanout(fast_config, client=client)
+
+        prediction = await fanout.submit("a/model", input={})
+
+        assert prediction.id == "pred_ok"
+        assert client.predictions.create.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_create_gives_up_after_retries(self, fast_config):
+        client = make_client()
+        client.predictions.create.side_effect = RateLimitError("slow down")
+        fanout = ReplicateFanout(fast_config.model_copy(update={"max_submit_retries": 1}), client=client)
+
+        with pytest.raises(RateLimitError):
+            await fanout.submit("a/model", input={})
+        assert client.predictions.create.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_server_error_is_retried(self, fast_config):
+        client = make_client()
+        client.predictions.create.side_effect = [APIError(503), SimpleNamespace(id="pred_ok", status="starting")]
+        fanout = ReplicateFanout(fast_config, client=client)
+
+        prediction = await fanout.submit("a/model", input={})
+
+        assert prediction.id == "pred_ok"
+        assert client.predictions.create.call_count == 2
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("error", [APIError(422), TimeoutError("read timed out"), ValueError("bad input")])
+    async def test_other_create_errors_are_not_retried(self, fast_config, error):
+        client = make_client()
+        client.predictions.create.side_effect = error
+        fanout = ReplicateFanout(fast_config, client=client)
+
+        with pytest.raises(type(error)):
+            await fanout.submit("a/model", input={})
+        assert client.predictions.create.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_run_polls_until_terminal(self, fast_config):
+        client = make_client({"pred_1": ["starting", "processing", "succeeded"]})
+        fanout = ReplicateFanout(fast_config, client=client)
+
+        prediction = await fanout.run("a/model", input={})
+
+        assert prediction.status == "succeeded"
+        assert client.predictions.get.call_count == 3
+        assert len(fanout._limits_for("a/model").latency) == 1
+
+    @pytest.mark.asyncio
+    async def test_run_holds_model_slot_until_terminal(self, fast_config):
+        config = fast_config.model_copy(update={"max_concurrency_per_model": 1})
+        client = make_client({"pred_1": ["processing"] * 20 + ["succeeded"]})
+        fanout = ReplicateFanout(config, client=client)
+
+        run = asyncio.create_task(fanout.run("a/model", input={}))
+        await asyncio.sleep(0.005)
+        assert fanout._limits_for("a/model").semaphore.locked()
+        submit = asyncio.create_task(fanout.submit("a/model", input={}))
+        await asyncio.sleep(0)
+        assert not submit.done()
+
+        assert (await run).status == "succeeded"
+        assert (await submit).id == "pred_2"
+
+    @pytest.mark.asyncio
+    async def test_run_times_out_and_frees_slot(self, fast_config):
+        client = make_client({"pred_1": ["processing"]})
+        fanout = ReplicateFanout(fast_config.model_copy(update={"max_concurrency_per_model": 1}), client=client)
+
+        with pytest.raises(TimeoutError):
+            await fanout.run("a/model", timeout=0.02, input={})
+        assert not fanout._limits_for("a/model").semaphore.locked()
+
+    @pytest.mark.asyncio
+    async def test_wait_times_out(self, fast_config):
+        client = make_client({"pred_1": ["processing"]})
+        fanout = ReplicateFanout(fast_config, client=client)
+
+        with pytest.raises(TimeoutError):
+            await fanout.wait("pred_1", timeout=0.02)
+
+    @pytest.mark.asyncio
+    async def test_wait_refused_in_webhook_only_mode(self, fast_config):
+        fanout = ReplicateFanout(fast_config.model_copy(update={"webhook_only": True}), client=make_client())
+
+        with pytest.raises(RuntimeError):
+            await fanout.wait("pred_1")
+
+    @pytest.mark.asyncio
+    async def test_straggler_is_hedged_and_loser_cancelled(self, fast_config):
+        config = fast_config.model_copy(update={"hedge_enabled": True, "hedge_min_samples": 1})
+        client = make_client({"pred_1": ["processing"] * 1000, "pred_2": ["succeeded"]})
+        fanout = ReplicateFanout(config, client=client)
+        fanout._limits_for("a/model").latency.record(0.005)
+
+        prediction = await fanout.run("a/model", timeout=5.0, input={})
+
+        assert prediction.id == "pred_2"
+        assert client.predictions.create.call_count == 2
+        client.predictions.cancel.assert_called_once_with("pred_1")
+
+    @pytest.mark.asyncio
+    async def test_no_hedge_without_samples(self, fast_config):
+        config = fast_config.model_copy(update={"hedge_enabled": True})
+        client = make_client({"pred_1": ["processing", "succeeded"]})
+        fanout = ReplicateFanout(config, client=client)
+
+        prediction = await fanout.run("a/model", input={})
+
+        assert prediction.id == "pred_1"
+        assert client.predictions.create.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_hedge_submission_keeps_primary(self, fast_config):
+        config = fast_config.model_copy(update={"hedge_enabled": True, "hedge_min_samples": 1})
+        client = make_client({"pred_1": ["processing"] * 10 + ["succeeded"]})
+        client.predictions.create.side_effect = [
+            SimpleNamespace(id="pred_1", status="starting"),
+            APIError(422),
+        ]
+        fanout = ReplicateFanout(config, client=client)
+        fanout._limits_for("a/model").latency.record(0.001)
+
+        prediction = await fanout.run("a/model", timeout=5.0, input={})
+
+        assert prediction.id == "pred_1"
+        assert prediction.status == "succeeded"
+        client.predictions.cancel.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_hedge_failure_returns_primary_outcome(self, fast_config):
+        config = fast_config.model_copy(update={"hedge_enabled": True, "hedge_min_samples": 1})
+        client = make_client({"pred_1": ["processing"] * 10 + ["failed"], "pred_2": ["failed"]})
+        fanout = ReplicateFanout(config, client=client)
+        fanout._limits_for("a/model").latency.record(0.001)
+
+        prediction = await fanout.run("a/model", timeout=5.0, input={})
+
+        assert (prediction.id, prediction.status) == ("pred_1", "failed")
+        assert len(fanout._limits_for("a/model").latency) == 1
+
+    @pytest.mark.asyncio
+    async def test_hedges_in_flight_are_capped(self, fast_config):
+        config = fast_config.model_copy(
+            update={"hedge_enabled": True, "hedge_min_samples": 1, "max_hedges_in_flight": 1}
+        )
+        client = make_client({"pred_1": ["processing"] * 5 + ["succeeded"]})
+        fanout = ReplicateFanout(config, client=client)
+        limits = fanout._limits_for("a/model")
+        limits.latency.record(0.001)
+
+        async with limits.hedges:
+            prediction = await fanout.run("a/model", timeout=5.0, input={})
+
+        assert prediction.id == "pred_1"
+        assert client.predictions.create.call_count == 1
@@ -0,0 +1,209 @@
+"""
+Unit tests and micro-benchmarks for the array-backed timeline engine
+"""
+
+import asyncio
+
+import pytest
+
+from ..core.timeline_engine import ClipTimeline
+from ..models.clip_assembly import DatabaseClipMetadata
+from ..models.edit_intent import EditOperation, EditPlan, EditTarget, FFmpegOperation
+from ..services.timeline_edit_planner_service import TimelineEditPlannerService
+
+
+def make_clips(count: int, duration: float = 5.0) -> list:
+    """Create back-to-back clips of equal duration"""
+    return [
+        DatabaseClipMetadata(
+            clip_id=f"clip_{i:03d}",
+            generation_id="gen_123",
+            scene_id=f"scene_{i:03d}",
+            sequence_order=i,
+            start_time_seconds=i * duration,
+            end_time_seconds=(i + 1) * duration,
+            duration_seconds=duration,
+            prompt_used=f"Scene {i}"
+        )
+        for i in range(count)
+    ]
+
+
+def trim(clip_idx: int, duration: float) -> FFmpegOperation:
+    return FFmpegOperation(
+        operation_type=EditOperation.TRIM,
+        target_type=EditTarget.CLIP,
+        target_clips=[clip_idx],
+        parameters={"duration": duration},
+        description=f"Trim clip {clip_idx} to {duration}s"
+    )
+
+
+def reorder(target_clips: list, new_order: list) -> FFmpegOperation:
+    return FFmpegOperation(
+        operation_type=EditOperation.REORDER,
+        target_type=EditTarget.TIMELINE,
+        target_clips=target_clips,
+        parameters={"new_order": new_order},
+        description="Reorder clips"
+    )
+
+
+def make_plan(operations: list, confidence: float = 0.9, request_id: str = "edit_1") -> EditPlan:
+    return EditPlan(
+        generation_id="gen_123",
+        request_id=request_id,
+        natural_language_request="Edit the video",
+        interpreted_intent="Edit the video",
+        operations=operations,
+        confidence_score=confidence,
+        estimated_duration_seconds=1.0
+    )
+
+
+class TestClipTimeline:
+    """Test cases for ClipTimeline"""
+
+    def test_from_clips_sorts_by_sequence_order(self):
+        clips = make_clips(3)
+        clips[0].sequence_order, clips[2].sequence_order = 2, 0
+
+        timeline = ClipTimeline.from_clips(clips)
+
+        assert timeline.index.tolist() == [2, 1, 0]
+        assert timeline.sequence.tolist() == [0, 1, 2]
+        assert timeline.start.tolist() == [10.0, 5.0, 0.0]
+
+    def test_snapshot_copies_only_written_arrays(self):
+        timeline = ClipTimeline.from_clips(make_clips(3))
+        snapshot = timeline.snapshot()
+
+        assert snapshot.apply(trim(0, 2.0)) is True
+
+        assert timeline.end.tolist() == [5.0, 10.0, 15.0]
+        assert timeline.duration.tolist() == [5.0, 5.0, 5.0]
+        assert snapshot.end.tolist() == [2.0, 10.0, 15.0]
+        assert snapshot.start is timeline.start
+        assert snapshot.sequence is timeline.sequence
+
+        # The parent copies on write too, leaving the snapshot intact
+        timeline.apply(trim(1, 1.0))
+        assert snapshot.end.tolist() == [2.0, 10.0, 15.0]
+
+    def test_apply_and_recalculate(self):
+        timeline = ClipTimeline.from_clips(make_clips(3))
+
+        applied = timeline.apply_all([trim(0, 3.0), reorder([0, 2], [2, 0])])
+        timeline.recalculate()
+
+        assert applied == [True, True]
+        assert timeline.index.tolist() == [2, 1, 0]
+        assert timeline.start.tolist() == [0.0, 5.0, 10.0]
+        assert timeline.end.tolist() == [5.0, 10.0, 13.0]
+        assert timeline.duration.tolist() == [5.0, 5.0, 3.0]
+        assert timeline.total_duration() == 13.0
+
+    def test_recalculate_closes_gaps_and_overlaps(self):
+        clips = make_clips(3)
+        clips[1].start_time_seconds, clips[1].end_time_seconds = 6.0, 11.0
+        clips[2].start_time_seconds, clips[2].end_time_seconds = 10.0, 15.0
+        timeline = ClipTimeline.from_clips(clips)
+
+        timeline.recalculate()
+
+        assert timeline.start.tolist() == [0.0, 5.0, 10.0]
+        assert timeline.end.tolist() == [5.0, 10.0, 15.0]
+
+    def test_reorder_rejects_unknown_sequence_order(self):
+        timeline = ClipTimeline.from_clips(make_clips(3))
+        assert timeline.apply(reorder([0, 7], [7, 0])) is False
+        assert timeline.sequence.tolist() == [0, 1, 2]
+
+    def test_validate_reports_out_of_range_trim(self):
+        result = ClipTimeline.from_clips(make_clips(3)).validate([trim(99, 2.0)])
+
+        assert result['is_feasible'] is False
+        assert result['errors'] == [
+            "Operation 0 (trim) references invalid clip index 99 (valid range: 0-2)"
+        ]
+        assert result['error_message'] == "Validation failed: 1 errors found"
+
+    def test_validate_checks_trim_against_duration(self):
+        result = ClipTimeline.from_clips(make_clips(3)).validate([trim(1, 6.0)])
+
+        assert result['errors'] == ["Cannot trim clip 1 to 6.0s (original: 5.0s)"]
+
+    def test_empty_timeline(self):
+        timeline = ClipTimeline.from_clips([])
+        timeline.recalculate()
+        assert len(timeline) == 0
+        assert timeline.total_duration() == 0.0
+
+
+class TestPlannerOnTimeline:
+    """The planner simulates plans on the timeline without touching its input"""
+
+    @pytest.mark.asyncio
+    async def test_plan_leaves_input_clips_unchanged(self):
+        clips = make_clips(3)
+        service = TimelineEditPlannerService(use_mock=True)
+
+        result = await service.plan_timeline_edits(
+            make_plan([trim(0, 3.0), reorder([0, 1], [1, 0])]), clips
+        )
+
+        assert result.is_successful
+        assert [c.clip_id for c in result.modified_clips] == ["clip_001", "clip_000", "clip_002"]
+        assert [c.end_time_seconds for c in result.modified_clips] == [5.0, 8.0, 13.0]
+        assert result.timeline_preview['total_duration'] == 13.0
+        assert [c.end_time_seconds for c in clips] == [5.0, 10.0, 15.0]
+        assert [c.sequence_order for c in clips] == [0, 1, 2]
+
+    def test_rank_edit_plans(self):
+        service = TimelineEditPlannerService(use_mock=True)
+        infeasible = make_plan([trim(9, 1.0)], confidence=0.99, request_id="infeasible")
+        low = make_plan([trim(0, 3.0)], confidence=0.6, request_id="low")
+        high = make_plan([trim(1, 2.0)], confidence=0.8, request_id="high")
+
+        ranked = service.rank_edit_plans([infeasible, low, high], make_clips(3))
+
+        assert [plan.request_id for plan, _ in ranked] == ["high", "low", "infeasible"]
+        assert ranked[0][1]['total_duration'] == 12.0
+        assert ranked[2][1]['is_feasible'] is False
+
+
+def _candidate_plans(size: int, count: int = 20) -> list:
+    """Candidate plans trimming and swapping different clips"""
+    return [
+        make_plan(
+            [trim(i % size, 2.0), reorder([(i + 1) % size, (i + 2) % size], [(i + 2) % size, (i + 1) % size])],
+            confidence=0.5 + (i % 5) / 10,
+            request_id=f"edit_{i}"
+        )
+        for i in range(count)
+    ]
+
+
+@pytest.mark.benchmark(group="timeline-plan")
+@pytest.mark.parametrize("size", [10, 50, 200])
+def test_benchmark_plan_timeline_edits(benchmark, size):
+    clips = make_clips(size)
+    service = TimelineEditPlannerService(use_mock=True)
+    plan = _candidate_plans(size, count=1)[0]
+
+    def run():
+        return asyncio.run(service.plan_timeline_edits(plan, clips))
+
+    result = benchmark(run)
+    assert result.is_successful
+
+
+@pytest.mark.benchmark(group="timeline-rank")
+@pytest.mark.parametrize("size", [10, 50, 200])
+def test_benchmark_rank_edit_plans(benchmark, size):
+    clips = make_clips(size)
+    service = TimelineEditPlannerService(use_mock=True)
+    plans = _candidate_plans(size)
+
+    ranked = benchmark(service.rank_edit_plans, plans, clips)
+    assert len(ranked) == len(plans)
@@ -153,6 +153,7 @@ async def process_clips(
                 "job_id": job_id,
                 "clip_id": clip.clip_id,
                 "clip_url": str(clip.url),
+                "checksum": clip.checksum,
                 "callback_url": str(request_body.callback_url),
                 "operations": [op.value for op in request_body.operations],
                 "processing_options": request_body.processing_options.model_dump(),
@@ -6,6 +6,7 @@ from typing import Any
 from uuid import UUID
 
 from pydantic import BaseModel, Field, HttpUrl, field_validator, model_validator
+from services.ffmpeg.encoder_profiles import EncoderProfile
 
 
 class VideoFormat(str, Enum):
@@ -154,6 +155,16 @@ class OutputSettings(BaseModel):
         pattern=r"^\d+[kKmM]$",
         description="Video bitrate (e.g., '2000k', '5M')",
     )
+    profile: EncoderProfile = Field(
+        default=EncoderProfile.FINAL,
+        description="Encoder profile: draft and preview render fast, archive renders slow",
+    )
+    deadline_seconds: int | None = Field(
+        default=None,
+        ge=10,
+        le=3600,
+        description="Optional render deadline; faster encoder presets are used if needed",
+    )
 
 
 class CompositionCreateRequest(BaseModel):
@@ -173,6 +184,9 @@ class CompositionCreateRequest(BaseModel):
     output: OutputSettings = Field(
         default_factory=OutputSettings, description="Output video settings"
     )
+    callback_url: HttpUrl | None = Field(
+        default=None, description="URL notified with a POST when the composition finishes"
+    )
 
     @model_validator(mode="after")
     def validate_timeline_consistency(self) -> "CompositionCreateRequest":
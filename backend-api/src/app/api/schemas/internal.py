@@ -98,6 +98,11 @@ class ClipToProcess(BaseModel):
         max_length=255,
         description="Unique identifier for this clip from AI Backend",
     )
+    checksum: str | None = Field(
+        default=None,
+        max_length=128,
+        description="Checksum of the clip's source asset, if known",
+    )
     metadata: dict[str, str] = Field(
         default_factory=dict,
         description="Optional metadata to associate with this clip",
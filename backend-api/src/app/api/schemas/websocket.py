@@ -29,6 +29,13 @@ class WSBaseMessage(BaseModel):
         default_factory=datetime.utcnow, description="When the message was created"
     )
     composition_id: UUID = Field(..., description="Composition identifier this message relates to")
+    message_sequence: int | None = Field(
+        None,
+        description=(
+            "Position in the composition's replay log; pass the last one received as "
+            "last_sequence when reconnecting"
+        ),
+    )
 
 
 class WSProgressMessage(WSBaseMessage):
@@ -140,6 +140,8 @@ async def create_composition(
             "format": request.output.format.value,
             "fps": request.output.fps,
             "bitrate": request.output.bitrate,
+            "profile": request.output.profile.value,
+            "deadline_seconds": request.output.deadline_seconds,
         },
     }
 
@@ -188,6 +190,9 @@ async def create_composition(
         "output_format": request.output.format.value,
         "output_resolution": resolution_map.get(request.output.resolution.value, "1920x1080"),
         "output_fps": request.output.fps,
+        "encoder_profile": request.output.profile.value,
+        "deadline_seconds": request.output.deadline_seconds,
+        "callback_url": str(request.callback_url) if request.callback_url else None,
         "priority": "default",  # Could be derived from request or user tier
     }
 
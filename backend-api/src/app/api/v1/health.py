@@ -425,12 +425,15 @@ async def get_metrics(request: Request) -> dict[str, Any]:
         dict: API metrics including request counts, response times, error rates
     """
     try:
-        # Access metrics from middleware if available
+        # Access metrics from middleware if available; the built stack is a
+        # chain of ASGI apps, each wrapping the next through its ``app`` attribute
         metrics_middleware = None
-        for middleware in request.app.middleware_stack:
-            if hasattr(middleware, "cls") and middleware.cls.__name__ == "MetricsMiddleware":
+        middleware = request.app.middleware_stack
+        while middleware is not None:
+            if type(middleware).__name__ == "MetricsMiddleware":
                 metrics_middleware = middleware
                 break
+            middleware = getattr(middleware, "app", None)
 
         if metrics_middleware and hasattr(metrics_middleware, "get_metrics"):
             return metrics_middleware.get_metrics()
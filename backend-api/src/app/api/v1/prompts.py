@@ -5,6 +5,7 @@ from typing import Any
 from fastapi import APIRouter, HTTPException, status
 from openai import OpenAI
 from pydantic import ValidationError
+from services.tracing import span
 
 from app.api.schemas.prompts import VideoPromptRequest, VideoPromptResponse
 
@@ -92,14 +93,15 @@ async def generate_video_clips(request: VideoPromptRequest) -> VideoPromptRespon
         user_content += f"\nEach clip should be {request.clip_length} seconds long."
 
     try:
-        completion = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": SYSTEM_PROMPT},
-                {"role": "user", "content": user_content},
-            ],
-            response_format={"type": "json_object"},
-        )
+        with span("openai.chat.completions", {"openai.model": "gpt-4o"}):
+            completion = client.chat.completions.create(
+                model="gpt-4o",
+                messages=[
+                    {"role": "system", "content": SYSTEM_PROMPT},
+                    {"role": "user", "content": user_content},
+                ],
+                response_format={"type": "json_object"},
+            )
 
         content_str = completion.choices[0].message.content
         if not content_str:
@@ -4,13 +4,19 @@ import asyncio
 import json
 import logging
 import os
+import time
 import uuid
+from collections.abc import Callable
 from datetime import UTC, datetime
 
 from fastapi import APIRouter, HTTPException, Request, status
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
+from redis.exceptions import WatchError
+from services.job_status_notifier import get_job_status_notifier, job_status_channel
+from services.tracing import span
 from workers.redis_pool import get_redis_connection
 
+from ...config import get_settings
 from ..schemas.replicate import (
     AsyncJobResponse,
     FluxSchnellRequest,
@@ -37,6 +43,37 @@ router = APIRouter()
 REPLICATE_WEBHOOK_SECRET = os.getenv("REPLICATE_WEBHOOK_SECRET", "")
 REPLICATE_WEBHOOK_URL = os.getenv("REPLICATE_WEBHOOK_URL", "")  # e.g., "https://yourdomain.com/api/v1/replicate/webhook"
 
+# Model used for scene clip generation
+CLIP_GENERATION_MODEL = "wan-video/wan-2.5-t2v"
+
+_clip_fanout = None
+
+
+def get_clip_fanout():
+    """Get the process-wide fan-out engine used for clip generation.
+
+    Shared across requests so the per-model concurrency and rate limits
+    apply to the whole API process, not to each request separately.
+
+    Returns:
+        ReplicateFanout: Shared fan-out engine
+    """
+    global _clip_fanout
+    if _clip_fanout is None:
+        from ai.core.replicate_fanout import ReplicateFanout
+        from ai.models.replicate_client import FanoutConfig
+
+        settings = get_settings()
+        _clip_fanout = ReplicateFanout(
+            FanoutConfig(
+                max_concurrency_per_model=settings.replicate_max_concurrency_per_model,
+                requests_per_second=settings.replicate_requests_per_second,
+                burst=settings.replicate_burst,
+                webhook_only=True,
+            )
+        )
+    return _clip_fanout
+
 
 def extract_result_from_output(output: object | None) -> tuple[str | None, object | None]:
     """Extract a usable result URL from Replicate outputs and return the raw payload.
@@ -182,7 +219,7 @@ def store_job_metadata(
         logger.error(f"Failed to store job metadata: {e}", exc_info=True)
 
 
-def publish_job_update(
+async def publish_job_update(
     job_id: str,
     status_value: str,
     progress: int | None = None,
@@ -192,6 +229,9 @@ def publish_job_update(
 ) -> None:
     """Publish job update to Redis pub/sub for WebSocket delivery.
 
+    The update is also appended to the stream of the generation the job
+    belongs to, so SSE clients receive it without the Socket.io bridge.
+
     Args:
         job_id: Job identifier
         status_value: Job status (queued, running, succeeded, failed, canceled)
@@ -244,10 +284,416 @@ def publish_job_update(
 
         logger.info(f"Published job update for {job_id}: {mapped_status}")
 
+        # Import here to avoid circular dependency
+        from fastapi_app.services.generation_events import append_job_update
+
+        await append_job_update(job_id, message)
+
     except Exception as e:
         logger.error(f"Failed to publish job update: {e}", exc_info=True)
 
 
+# Job status cache
+AI_JOB_TTL_SECONDS = 86400
+TERMINAL_JOB_STATUSES = frozenset({"succeeded", "failed", "canceled"})
+
+# Replicate prediction status -> status reported by get_ai_job_status
+PREDICTION_STATUS_MAP = {
+    "starting": "processing",
+    "processing": "processing",
+    "succeeded": "succeeded",
+    "failed": "failed",
+    "canceled": "canceled",
+}
+
+# Shortest interval at which waiting clients re-check a job without a notification
+STATUS_RECHECK_MIN_SECONDS = 1.0
+# How long a poll without cached data waits for another caller's refresh
+STATUS_REFRESH_WAIT_SECONDS = 2.0
+STATUS_STREAM_HEARTBEAT_SECONDS = 15.0
+
+
+def read_job_data(redis_conn, job_id: str) -> dict | None:
+    """Read a job's cached metadata and status.
+
+    Args:
+        redis_conn: Redis connection
+        job_id: Replicate prediction ID
+
+    Returns:
+        Cached job data, or None if the job is not cached
+    """
+    job_data_str = redis_conn.get(f"ai_job:{job_id}")
+    return json.loads(job_data_str) if job_data_str else None
+
+
+def update_job_data(redis_conn, job_id: str, update: Callable[[dict], dict | None]) -> dict:
+    """Atomically read-modify-write a job's cache entry and notify waiters.
+
+    The read and write run under WATCH, so a write that lands in between makes
+    the update retry against the new data instead of overwriting it. The
+    stored data is published on the job's status channel in the same
+    transaction.
+
+    Args:
+        redis_conn: Redis connection
+        job_id: Replicate prediction ID
+        update: Gets the current job data ({} if not cached) and returns the
+            data to store, or None to leave the entry unchanged
+
+    Returns:
+        dict: Job data as stored
+    """
+    key = f"ai_job:{job_id}"
+    with redis_conn.pipeline() as pipe:
+        while True:
+            try:
+                pipe.watch(key)
+                current = pipe.get(key)
+                job_data = json.loads(current) if current else {}
+                updated = update(dict(job_data))
+                if updated is None:
+                    return job_data
+
+                payload = json.dumps(updated)
+                pipe.multi()
+                pipe.setex(key, AI_JOB_TTL_SECONDS, payload)
+                pipe.publish(job_status_channel(job_id), payload)
+                pipe.execute()
+                return updated
+            except WatchError:
+                continue
+
+
+def write_job_status(
+    redis_conn,
+    job_id: str,
+    status_value: str,
+    result_url: str | None = None,
+    output: object | None = None,
+    error: str | None = None,
+) -> dict:
+    """Write a job's latest status through to its ai_job cache entry.
+
+    Merges into the existing entry so prompt/model metadata is kept. A
+    terminal status is never replaced by a non-terminal one, so a slow
+    status refresh cannot undo a webhook that landed while it was in flight.
+
+    Args:
+        redis_conn: Redis connection
+        job_id: Replicate prediction ID
+        status_value: Replicate prediction status
+        result_url: Result URL, if the job produced one
+        output: Normalized output payload
+        error: Error message if the job failed
+
+    Returns:
+        dict: Job data as stored
+    """
+    mapped_status = PREDICTION_STATUS_MAP.get(status_value, status_value)
+
+    def apply(job_data: dict) -> dict | None:
+        if (
+            job_data.get("status") in TERMINAL_JOB_STATUSES
+            and mapped_status not in TERMINAL_JOB_STATUSES
+        ):
+            return None
+
+        job_data.update(
+            {
+                "job_id": job_id,
+                "status": mapped_status,
+                "updated_at": datetime.now(UTC).isoformat(),
+            }
+        )
+        if result_url:
+            job_data["result_url"] = result_url
+        if output is not None:
+            job_data["output"] = output
+        if error:
+            job_data["error"] = error
+        return job_data
+
+    return update_job_data(redis_conn, job_id, apply)
+
+
+def _needs_status_refresh(job_data: dict | None) -> bool:
+    """Whether cached job data may be behind Replicate."""
+    if job_data is None:
+        return True
+    job_status = job_data.get("status", "processing")
+    return job_status not in TERMINAL_JOB_STATUSES or (
+        job_status == "succeeded" and not job_data.get("result_url")
+    )
+
+
+def _status_refresh_interval() -> float:
+    """Minimum interval between Replicate refreshes of one job."""
+    settings = get_settings()
+    return (
+        settings.replicate_status_webhook_refresh_seconds
+        if REPLICATE_WEBHOOK_URL
+        else settings.replicate_status_refresh_seconds
+    )
+
+
+def _claim_status_refresh(redis_conn, job_id: str) -> bool:
+    """Claim the next Replicate status refresh for a job.
+
+    The claim is a Redis key set with NX that expires after the minimum
+    refresh interval, so across all API replicas at most one caller per
+    interval queries Replicate for a job; everyone else reads the cache it
+    writes. The interval is longer when webhooks keep the cache current.
+
+    Args:
+        redis_conn: Redis connection
+        job_id: Replicate prediction ID
+
+    Returns:
+        bool: True if this caller should refresh
+    """
+    interval = _status_refresh_interval()
+    if interval <= 0:
+        return True
+    return bool(
+        redis_conn.set(f"ai_job:refresh:{job_id}", "1", nx=True, px=max(1, int(interval * 1000)))
+    )
+
+
+async def resolve_job_status(redis_conn, job_id: str) -> dict | None:
+    """Get a job's current data, refreshing it from Replicate when due.
+
+    Terminal jobs with a result are served from the cache. Otherwise the
+    caller that claims the refresh queries Replicate and writes the result
+    through to the cache; concurrent callers return the cached data.
+
+    Args:
+        redis_conn: Redis connection
+        job_id: Replicate prediction ID
+
+    Returns:
+        Job data, or None if the job is unknown
+    """
+    job_data = read_job_data(redis_conn, job_id)
+    if not _needs_status_refresh(job_data):
+        return job_data
+
+    replicate_api_key = os.getenv("REPLICATE_API_TOKEN")
+    if not replicate_api_key:
+        return job_data
+
+    if not _claim_status_refresh(redis_conn, job_id):
+        if job_data is None:
+            # Another caller is fetching a job we have no data for yet
+            return await wait_for_job_status(
+                redis_conn, job_id, since=None, timeout=STATUS_REFRESH_WAIT_SECONDS, refresh=False
+            )
+        return job_data
+
+    try:
+        import replicate
+
+        with span("replicate.predictions.get", {"replicate.prediction_id": job_id}):
+            prediction = await asyncio.to_thread(replicate.predictions.get, job_id)
+
+        result_url, normalized_output = extract_result_from_output(prediction.output)
+        return write_job_status(
+            redis_conn,
+            job_id,
+            prediction.status,
+            result_url=result_url,
+            output=normalized_output or prediction.output,
+            error=prediction.error,
+        )
+    except Exception as e:
+        logger.error(f"Failed to get job from Replicate: {e}")
+        return job_data
+
+
+async def _next_job_update(
+    redis_conn,
+    job_id: str,
+    updates: asyncio.Queue,
+    timeout: float,
+    refresh: bool,
+) -> dict | None:
+    """Wait for a job's next status notification.
+
+    Without a notification within `timeout`, the job is re-resolved instead
+    (or re-read, without refresh), which is when jobs without webhooks get
+    their status refreshed from Replicate.
+
+    Args:
+        redis_conn: Redis connection
+        job_id: Replicate prediction ID
+        updates: Queue from JobStatusNotifier.watch()
+        timeout: Longest to wait for a notification, in seconds
+        refresh: Whether to refresh from Replicate on timeout
+
+    Returns:
+        Latest job data, or None if the job is unknown
+    """
+    try:
+        return await asyncio.wait_for(updates.get(), timeout=max(0.0, timeout))
+    except asyncio.TimeoutError:
+        if refresh:
+            return await resolve_job_status(redis_conn, job_id)
+        return read_job_data(redis_conn, job_id)
+
+
+def _status_recheck_seconds() -> float:
+    """How long a waiter relies on notifications before re-checking the job."""
+    return max(STATUS_RECHECK_MIN_SECONDS, _status_refresh_interval())
+
+
+async def wait_for_job_status(
+    redis_conn,
+    job_id: str,
+    since: str | None,
+    timeout: float,
+    refresh: bool = True,
+) -> dict | None:
+    """Block until a job's status differs from `since` or the job finishes.
+
+    Waiters sleep on the job's status notifications, which every cache write
+    publishes, and re-check the job only once per refresh interval. Refreshes
+    from Replicate still go through the per-job claim, so waiting clients add
+    no upstream calls.
+
+    Args:
+        redis_conn: Redis connection
+        job_id: Replicate prediction ID
+        since: Status the client already has (default: the current status)
+        timeout: Longest to wait, in seconds
+        refresh: Whether to refresh from Replicate while waiting
+
+    Returns:
+        Latest job data, or None if the job is unknown
+    """
+    deadline = time.monotonic() + timeout
+    notifier = get_job_status_notifier()
+    updates = await notifier.watch(job_id)
+    try:
+        job_data = (
+            await resolve_job_status(redis_conn, job_id)
+            if refresh
+            else read_job_data(redis_conn, job_id)
+        )
+        baseline = since if since is not None else (job_data or {}).get("status")
+
+        while True:
+            if job_data is not None:
+                job_status = job_data.get("status")
+                if job_status != baseline or job_status in TERMINAL_JOB_STATUSES:
+                    break
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            wait = min(remaining, _status_recheck_seconds()) if refresh else remaining
+            job_data = await _next_job_update(redis_conn, job_id, updates, wait, refresh)
+    finally:
+        await notifier.unwatch(job_id, updates)
+
+    return job_data
+
+
+def _job_status_content(job_data: dict) -> dict:
+    """Status fields returned to clients."""
+    return {
+        "status": job_data.get("status", "processing"),
+        "result_url": job_data.get("result_url"),
+        "output": job_data.get("output"),
+        "error": job_data.get("error"),
+    }
+
+
+def _auto_import_job(redis_conn, job_id: str, job_data: dict) -> None:
+    """Enqueue the media import for a finished video job, once.
+
+    Args:
+        redis_conn: Redis connection
+        job_id: Replicate prediction ID
+        job_data: Cached job data with a result URL
+    """
+    import_key = f"imported:{job_id}"
+    result_url = job_data.get("result_url")
+
+    # Check if already imported (deduplication)
+    if redis_conn.exists(import_key):
+        return
+
+    logger.info(
+        f"Polling detected completion for {job_id}, triggering auto-import",
+        extra={"job_id": job_id, "result_url": result_url}
+    )
+
+    try:
+        from workers.job_queue import enqueue_video_import
+
+        # Get metadata from job data or use defaults
+        generation_type = job_data.get("generation_type", "video")
+        prompt = job_data.get("prompt", "")
+        model = job_data.get("model", "unknown")
+
+        # Only trigger for video generation (skip images for now)
+        if generation_type == "video":
+            asset_id = str(uuid.uuid4())
+            user_id = "00000000-0000-0000-0000-000000000001"  # TODO: Get from job metadata
+
+            # Generate sanitized filename
+            file_ext = ".mp4"
+            filename = sanitize_filename(prompt, job_id, file_ext)
+
+            # Determine tags
+            tags = determine_generation_tags(model, generation_type, job_data)
+
+            # Enqueue import job
+            import_job = enqueue_video_import(
+                url=result_url,
+                name=filename,
+                user_id=user_id,
+                asset_id=asset_id,
+                metadata={
+                    "aiGenerated": True,
+                    "prompt": prompt,
+                    "model": model,
+                    "replicate_job_id": job_id,
+                    "tags": tags,
+                }
+            )
+
+            # Mark as imported so we don't trigger again (24hr TTL)
+            redis_conn.setex(import_key, AI_JOB_TTL_SECONDS, "1")
+
+            logger.info(
+                f"Auto-triggered video import from polling for {job_id}",
+                extra={
+                    "job_id": job_id,
+                    "import_job_id": import_job,
+                    "asset_id": asset_id
+                }
+            )
+
+            # Update job data with asset_id for frontend reference
+            update_job_data(
+                redis_conn,
+                job_id,
+                lambda current: {
+                    **(current or job_data),
+                    "asset_id": asset_id,
+                    "import_job_id": import_job,
+                },
+            )
+
+    except Exception as e:
+        logger.error(
+            f"Failed to auto-trigger import from polling: {e}",
+            extra={"job_id": job_id, "result_url": result_url}
+        )
+        # Don't fail the polling request - just log the error
+
+
 @router.post(
     "/nano-banana",
     response_model=AsyncJobResponse,
@@ -329,12 +775,13 @@ async def generate_nano_banana(request_body: NanoBananaRequest) -> JSONResponse:
 
         # Create async prediction with webhook
         try:
-            prediction = replicate.predictions.create(
-                model="google/nano-banana",
-                input=model_input,
-                webhook=REPLICATE_WEBHOOK_URL if REPLICATE_WEBHOOK_URL else None,
-                webhook_events_filter=["completed"]
-            )
+            with span("replicate.predictions.create", {"replicate.model": "google/nano-banana"}):
+                prediction = replicate.predictions.create(
+                    model="google/nano-banana",
+                    input=model_input,
+                    webhook=REPLICATE_WEBHOOK_URL if REPLICATE_WEBHOOK_URL else None,
+                    webhook_events_filter=["completed"]
+                )
 
             job_id = prediction.id
 
@@ -349,7 +796,7 @@ async def generate_nano_banana(request_body: NanoBananaRequest) -> JSONResponse:
             )
 
             # Publish initial job status
-            publish_job_update(job_id, "starting")
+            await publish_job_update(job_id, "starting")
 
             logger.info(
                 "Nano-Banana async job created",
@@ -482,12 +929,16 @@ async def generate_flux_schnell(request_body: FluxSchnellRequest) -> JSONRespons
             )
 
             # Using Flux Schnell model
-            prediction = replicate.predictions.create(
-                model="black-forest-labs/flux-schnell",
-                input=model_input,
-                webhook=webhook_url,
-                webhook_events_filter=["completed"]
-            )
+            with span(
+                "replicate.predictions.create",
+                {"replicate.model": "black-forest-labs/flux-schnell"},
+            ):
+                prediction = replicate.predictions.create(
+                    model="black-forest-labs/flux-schnell",
+                    input=model_input,
+                    webhook=webhook_url,
+                    webhook_events_filter=["completed"]
+                )
 
             job_id = prediction.id
 
@@ -502,7 +953,7 @@ async def generate_flux_schnell(request_body: FluxSchnellRequest) -> JSONRespons
             )
 
             # Publish initial status
-            publish_job_update(job_id, "starting")
+            await publish_job_update(job_id, "starting")
 
             logger.info(
                 "Flux Schnell async job created",
@@ -615,12 +1066,13 @@ async def generate_wan_video_i2v(request_body: WanVideoI2VRequest) -> JSONRespon
         # Create async prediction
         try:
             # Using Wan Video 2.5 I2V model
-            prediction = replicate.predictions.create(
-                model="wan-video/wan-2.5-i2v",
-                input=model_input,
-                webhook=REPLICATE_WEBHOOK_URL if REPLICATE_WEBHOOK_URL else None,
-                webhook_events_filter=["completed"]
-            )
+            with span("replicate.predictions.create", {"replicate.model": "wan-video/wan-2.5-i2v"}):
+                prediction = replicate.predictions.create(
+                    model="wan-video/wan-2.5-i2v",
+                    input=model_input,
+                    webhook=REPLICATE_WEBHOOK_URL if REPLICATE_WEBHOOK_URL else None,
+                    webhook_events_filter=["completed"]
+                )
 
             job_id = prediction.id
 
@@ -636,7 +1088,7 @@ async def generate_wan_video_i2v(request_body: WanVideoI2VRequest) -> JSONRespon
             )
 
             # Publish initial status
-            publish_job_update(job_id, "starting")
+            await publish_job_update(job_id, "starting")
 
             logger.info(
                 "Wan Video async job created",
@@ -754,12 +1206,13 @@ async def generate_wan_video_t2v(request_body: WanVideoT2VRequest) -> JSONRespon
             )
 
             # Using Wan Video 2.5 T2V model
-            prediction = replicate.predictions.create(
-                model="wan-video/wan-2.5-t2v",
-                input=model_input,
-                webhook=webhook_url,
-                webhook_events_filter=["completed"]
-            )
+            with span("replicate.predictions.create", {"replicate.model": "wan-video/wan-2.5-t2v"}):
+                prediction = replicate.predictions.create(
+                    model="wan-video/wan-2.5-t2v",
+                    input=model_input,
+                    webhook=webhook_url,
+                    webhook_events_filter=["completed"]
+                )
 
             job_id = prediction.id
 
@@ -783,7 +1236,7 @@ async def generate_wan_video_t2v(request_body: WanVideoT2VRequest) -> JSONRespon
             )
 
             # Publish initial status
-            publish_job_update(job_id, "starting")
+            await publish_job_update(job_id, "starting")
 
             logger.info(
                 "Wan Video 2.5 T2V async job created",
@@ -913,12 +1366,15 @@ async def generate_seedance_1_pro_fast(request_body: Seedance1ProFastRequest) ->
             )
 
             # Using Seedance-1-Pro-Fast model
-            prediction = replicate.predictions.create(
-                model="bytedance/seedance-1-pro-fast",
-                input=model_input,
-                webhook=webhook_url,
-                webhook_events_filter=["completed"]
-            )
+            with span(
+                "replicate.predictions.create", {"replicate.model": "bytedance/seedance-1-pro-fast"}
+            ):
+                prediction = replicate.predictions.create(
+                    model="bytedance/seedance-1-pro-fast",
+                    input=model_input,
+                    webhook=webhook_url,
+                    webhook_events_filter=["completed"]
+                )
 
             job_id = prediction.id
 
@@ -942,7 +1398,7 @@ async def generate_seedance_1_pro_fast(request_body: Seedance1ProFastRequest) ->
             )
 
             # Publish initial status
-            publish_job_update(job_id, "starting")
+            await publish_job_update(job_id, "starting")
 
             logger.info(
                 "Seedance-1-Pro-Fast async job created",
@@ -1078,12 +1534,13 @@ async def generate_veo_31_fast(request_body: Veo31FastRequest) -> JSONResponse:
             )
 
             # Using Google Veo 3.1 Fast model
-            prediction = replicate.predictions.create(
-                model="google/veo-3.1-fast",
-                input=model_input,
-                webhook=webhook_url,
-                webhook_events_filter=["completed"]
-            )
+            with span("replicate.predictions.create", {"replicate.model": "google/veo-3.1-fast"}):
+                prediction = replicate.predictions.create(
+                    model="google/veo-3.1-fast",
+                    input=model_input,
+                    webhook=webhook_url,
+                    webhook_events_filter=["completed"]
+                )
 
             job_id = prediction.id
 
@@ -1108,7 +1565,7 @@ async def generate_veo_31_fast(request_body: Veo31FastRequest) -> JSONResponse:
             )
 
             # Publish initial status
-            publish_job_update(job_id, "starting")
+            await publish_job_update(job_id, "starting")
 
             logger.info(
                 "Veo 3.1 Fast async job created",
@@ -1229,12 +1686,15 @@ async def generate_hailuo_23_fast(request_body: Hailuo23FastRequest) -> JSONResp
             )
 
             # Using MiniMax Hailuo 2.3 Fast model
-            prediction = replicate.predictions.create(
-                model="minimax/hailuo-2.3-fast",
-                input=model_input,
-                webhook=webhook_url,
-                webhook_events_filter=["completed"]
-            )
+            with span(
+                "replicate.predictions.create", {"replicate.model": "minimax/hailuo-2.3-fast"}
+            ):
+                prediction = replicate.predictions.create(
+                    model="minimax/hailuo-2.3-fast",
+                    input=model_input,
+                    webhook=webhook_url,
+                    webhook_events_filter=["completed"]
+                )
 
             job_id = prediction.id
 
@@ -1258,7 +1718,7 @@ async def generate_hailuo_23_fast(request_body: Hailuo23FastRequest) -> JSONResp
             )
 
             # Publish initial status
-            publish_job_update(job_id, "starting")
+            await publish_job_update(job_id, "starting")
 
             logger.info(
                 "Hailuo 2.3 Fast async job created",
@@ -1382,12 +1842,15 @@ async def generate_kling_v25_turbo_pro(request_body: KlingV25TurboProRequest) ->
             )
 
             # Using Kling v2.5 Turbo Pro model
-            prediction = replicate.predictions.create(
-                model="kwaivgi/kling-v2.5-turbo-pro",
-                input=model_input,
-                webhook=webhook_url,
-                webhook_events_filter=["completed"]
-            )
+            with span(
+                "replicate.predictions.create", {"replicate.model": "kwaivgi/kling-v2.5-turbo-pro"}
+            ):
+                prediction = replicate.predictions.create(
+                    model="kwaivgi/kling-v2.5-turbo-pro",
+                    input=model_input,
+                    webhook=webhook_url,
+                    webhook_events_filter=["completed"]
+                )
 
             job_id = prediction.id
 
@@ -1411,7 +1874,7 @@ async def generate_kling_v25_turbo_pro(request_body: KlingV25TurboProRequest) ->
             )
 
             # Publish initial status
-            publish_job_update(job_id, "starting")
+            await publish_job_update(job_id, "starting")
 
             logger.info(
                 "Kling v2.5 Turbo Pro async job created",
@@ -1534,12 +1997,13 @@ async def generate_lyria_2(request_body: Lyria2Request) -> JSONResponse:
                 },
             )
 
-            prediction = replicate.predictions.create(
-                model="google/lyria-2",
-                input=model_input,
-                webhook=webhook_url,
-                webhook_events_filter=["completed"]
-            )
+            with span("replicate.predictions.create", {"replicate.model": "google/lyria-2"}):
+                prediction = replicate.predictions.create(
+                    model="google/lyria-2",
+                    input=model_input,
+                    webhook=webhook_url,
+                    webhook_events_filter=["completed"]
+                )
 
             job_id = prediction.id
 
@@ -1560,7 +2024,7 @@ async def generate_lyria_2(request_body: Lyria2Request) -> JSONResponse:
                 generation_type="audio"
             )
 
-            publish_job_update(job_id, "starting")
+            await publish_job_update(job_id, "starting")
 
             logger.info(
                 "Lyria 2 async job created",
@@ -1690,12 +2154,13 @@ async def generate_music_01(request_body: Music01Request) -> JSONResponse:
                 },
             )
 
-            prediction = replicate.predictions.create(
-                model="minimax/music-01",
-                input=model_input,
-                webhook=webhook_url,
-                webhook_events_filter=["completed"]
-            )
+            with span("replicate.predictions.create", {"replicate.model": "minimax/music-01"}):
+                prediction = replicate.predictions.create(
+                    model="minimax/music-01",
+                    input=model_input,
+                    webhook=webhook_url,
+                    webhook_events_filter=["completed"]
+                )
 
             job_id = prediction.id
 
@@ -1719,7 +2184,7 @@ async def generate_music_01(request_body: Music01Request) -> JSONResponse:
                 has_song_file=request_body.song_file is not None
             )
 
-            publish_job_update(job_id, "starting")
+            await publish_job_update(job_id, "starting")
 
             logger.info(
                 "Music-01 async job created",
@@ -1837,12 +2302,15 @@ async def generate_stable_audio_25(request_body: StableAudio25Request) -> JSONRe
                 },
             )
 
-            prediction = replicate.predictions.create(
-                model="stability-ai/stable-audio-2.5",
-                input=model_input,
-                webhook=webhook_url,
-                webhook_events_filter=["completed"]
-            )
+            with span(
+                "replicate.predictions.create", {"replicate.model": "stability-ai/stable-audio-2.5"}
+            ):
+                prediction = replicate.predictions.create(
+                    model="stability-ai/stable-audio-2.5",
+                    input=model_input,
+                    webhook=webhook_url,
+                    webhook_events_filter=["completed"]
+                )
 
             job_id = prediction.id
 
@@ -1863,7 +2331,7 @@ async def generate_stable_audio_25(request_body: StableAudio25Request) -> JSONRe
                 generation_type="audio"
             )
 
-            publish_job_update(job_id, "starting")
+            await publish_job_update(job_id, "starting")
 
             logger.info(
                 "Stable Audio 2.5 async job created",
@@ -1908,179 +2376,57 @@ async def generate_stable_audio_25(request_body: StableAudio25Request) -> JSONRe
     "/jobs/{job_id}",
     status_code=status.HTTP_200_OK,
     summary="Get AI generation job status",
-    description="Get status of an AI generation job (for polling fallback with auto-import)",
+    description=(
+        "Get status of an AI generation job (for polling fallback with auto-import). "
+        "Pass wait to long-poll until the status differs from since."
+    ),
 )
 async def get_ai_job_status(
     job_id: str,
-    auto_import: bool = True
+    auto_import: bool = True,
+    wait: float = 0.0,
+    since: str | None = None,
 ) -> JSONResponse:
     """Get AI generation job status with automatic import on completion.
 
-    Checks Redis cache first, then queries Replicate API if needed.
+    Serves the Redis cache, which webhooks keep current. Non-terminal jobs are
+    refreshed from Replicate at most once per minimum refresh interval across
+    all callers. With wait > 0 the request blocks until the status differs
+    from `since` (or from the current status), the job finishes, or the wait
+    runs out.
     When auto_import=True and job succeeds, automatically triggers media import.
 
     Args:
         job_id: Replicate prediction ID
         auto_import: Whether to automatically trigger import on success (default: True)
+        wait: Seconds to wait for a status change (capped by settings, default: 0)
+        since: Status the client already has, for long-polling
 
     Returns:
         JSONResponse with job status
     """
     try:
         redis_conn = get_redis_connection()
-        redis_key = f"ai_job:{job_id}"
 
-        # Try to get from Redis cache first
-        job_data_str = redis_conn.get(redis_key)
-        job_data = json.loads(job_data_str) if job_data_str else None
-
-        # Default values from cache (if present)
-        mapped_status = job_data.get("status", "processing") if job_data else "processing"
-        result_url = job_data.get("result_url") if job_data else None
-        output = job_data.get("output") if job_data else None
-        error = job_data.get("error") if job_data else None
-
-        # Refresh from Replicate when cache is stale (non-terminal) or missing result URL
-        should_refresh = (
-            job_data is None
-            or mapped_status not in {"succeeded", "failed", "canceled"}
-            or (mapped_status == "succeeded" and not result_url)
-        )
-
-        if should_refresh:
-            replicate_api_key = os.getenv("REPLICATE_API_TOKEN")
-            if not replicate_api_key:
-                return JSONResponse(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    content={"error": "Job not found"}
-                )
-
-            try:
-                import replicate
-                os.environ["REPLICATE_API_TOKEN"] = replicate_api_key
-
-                prediction = replicate.predictions.get(job_id)
-
-                # Map Replicate status to our format
-                status_map = {
-                    "starting": "processing",
-                    "processing": "processing",
-                    "succeeded": "succeeded",
-                    "failed": "failed",
-                    "canceled": "canceled"
-                }
-
-                mapped_status = status_map.get(prediction.status, prediction.status)
-                result_url, normalized_output = extract_result_from_output(prediction.output)
-                output = normalized_output or prediction.output
-                error = prediction.error
-
-                # Merge with existing metadata so we keep prompt/model info
-                job_data = {
-                    **(job_data or {}),
-                    "job_id": job_id,
-                    "status": mapped_status,
-                    "result_url": result_url,
-                    "output": output,
-                    "error": error,
-                    "updated_at": datetime.now(UTC).isoformat(),
-                }
-                redis_conn.setex(redis_key, 86400, json.dumps(job_data))
+        if wait > 0:
+            timeout = min(wait, get_settings().replicate_status_max_wait_seconds)
+            job_data = await wait_for_job_status(redis_conn, job_id, since=since, timeout=timeout)
+        else:
+            job_data = await resolve_job_status(redis_conn, job_id)
 
-            except Exception as e:
-                logger.error(f"Failed to get job from Replicate: {e}")
-                # If we have cached data, return it instead of a hard 404
-                if job_data:
-                    mapped_status = job_data.get("status", "processing")
-                    result_url = job_data.get("result_url")
-                    output = job_data.get("output")
-                    error = job_data.get("error")
-                else:
-                    return JSONResponse(
-                        status_code=status.HTTP_404_NOT_FOUND,
-                        content={"error": "Job not found"}
-                    )
+        if job_data is None:
+            return JSONResponse(
+                status_code=status.HTTP_404_NOT_FOUND,
+                content={"error": "Job not found"}
+            )
 
         # Auto-import on first completion detection (polling fallback)
-        if auto_import and mapped_status == "succeeded" and result_url:
-            import_key = f"imported:{job_id}"
-
-            # Check if already imported (deduplication)
-            if not redis_conn.exists(import_key):
-                logger.info(
-                    f"Polling detected completion for {job_id}, triggering auto-import",
-                    extra={"job_id": job_id, "result_url": result_url}
-                )
-
-                try:
-                    from workers.job_queue import enqueue_video_import
-                    import uuid
-
-                            # Get metadata from job data or use defaults
-                    generation_type = job_data.get("generation_type", "video") if job_data else "video"
-                    prompt = job_data.get("prompt", "") if job_data else ""
-                    model = job_data.get("model", "unknown") if job_data else "unknown"
-
-                    # Only trigger for video generation (skip images for now)
-                    if generation_type == "video":
-                        asset_id = str(uuid.uuid4())
-                        user_id = "00000000-0000-0000-0000-000000000001"  # TODO: Get from job metadata
-                        
-                        # Generate sanitized filename
-                        file_ext = ".mp4"
-                        filename = sanitize_filename(prompt, job_id, file_ext)
-                        
-                        # Determine tags
-                        tags = determine_generation_tags(model, generation_type, job_data or {})
-
-                        # Enqueue import job
-                        import_job = enqueue_video_import(
-                            url=result_url,
-                            name=filename,
-                            user_id=user_id,
-                            asset_id=asset_id,
-                            metadata={
-                                "aiGenerated": True,
-                                "prompt": prompt,
-                                "model": model,
-                                "replicate_job_id": job_id,
-                                "tags": tags,
-                            }
-                        )
-
-                        # Mark as imported so we don't trigger again (24hr TTL)
-                        redis_conn.setex(import_key, 86400, "1")
-
-                        logger.info(
-                            f"Auto-triggered video import from polling for {job_id}",
-                            extra={
-                                "job_id": job_id,
-                                "import_job_id": import_job,
-                                "asset_id": asset_id
-                            }
-                        )
-
-                        # Update job data with asset_id for frontend reference
-                        if job_data:
-                            job_data["asset_id"] = asset_id
-                            job_data["import_job_id"] = import_job
-                            redis_conn.setex(redis_key, 86400, json.dumps(job_data))
-
-                except Exception as e:
-                    logger.error(
-                        f"Failed to auto-trigger import from polling: {e}",
-                        extra={"job_id": job_id, "result_url": result_url}
-                    )
-                    # Don't fail the polling request - just log the error
+        if auto_import and job_data.get("status") == "succeeded" and job_data.get("result_url"):
+            _auto_import_job(redis_conn, job_id, job_data)
 
         return JSONResponse(
             status_code=status.HTTP_200_OK,
-            content={
-                "status": mapped_status,
-                "result_url": result_url,
-                "output": output,
-                "error": error,
-            }
+            content=_job_status_content(job_data),
         )
 
     except Exception as e:
@@ -2091,6 +2437,87 @@ async def get_ai_job_status(
         )
 
 
+@router.get(
+    "/jobs/{job_id}/events",
+    status_code=status.HTTP_200_OK,
+    summary="Stream AI generation job status",
+    description="Server-sent events with the job status each time it changes, until it finishes",
+    response_model=None,
+)
+async def stream_ai_job_status(
+    job_id: str,
+    request: Request,
+    auto_import: bool = True,
+) -> StreamingResponse | JSONResponse:
+    """Stream AI generation job status as server-sent events.
+
+    Sends a `status` event with the same fields as get_ai_job_status whenever
+    they change, and closes after the terminal status. Reads the same cache
+    and refresh claim as polling, so open streams add no Replicate calls.
+
+    Args:
+        job_id: Replicate prediction ID
+        request: FastAPI request, used to stop when the client disconnects
+        auto_import: Whether to automatically trigger import on success (default: True)
+
+    Returns:
+        StreamingResponse of text/event-stream, or 404 if the job is unknown
+    """
+    redis_conn = get_redis_connection()
+    job_data = await resolve_job_status(redis_conn, job_id)
+    if job_data is None:
+        return JSONResponse(
+            status_code=status.HTTP_404_NOT_FOUND,
+            content={"error": "Job not found"}
+        )
+
+    async def events():
+        nonlocal job_data
+        deadline = time.monotonic() + get_settings().replicate_status_stream_seconds
+        last_content = None
+        last_sent = time.monotonic()
+
+        notifier = get_job_status_notifier()
+        updates = await notifier.watch(job_id)
+        try:
+            # Re-read once subscribed, so a write made before that is not missed
+            job_data = read_job_data(redis_conn, job_id) or job_data
+
+            while True:
+                content = _job_status_content(job_data) if job_data else None
+                if content is not None and content != last_content:
+                    yield f"event: status\ndata: {json.dumps(content)}\n\n"
+                    last_content = content
+                    last_sent = time.monotonic()
+
+                    if content["status"] in TERMINAL_JOB_STATUSES:
+                        if auto_import and content["status"] == "succeeded" and content["result_url"]:
+                            _auto_import_job(redis_conn, job_id, job_data)
+                        return
+
+                now = time.monotonic()
+                if now >= deadline or await request.is_disconnected():
+                    return
+                if now - last_sent >= STATUS_STREAM_HEARTBEAT_SECONDS:
+                    yield ": keepalive\n\n"
+                    last_sent = now
+
+                wait = min(
+                    deadline - now,
+                    last_sent + STATUS_STREAM_HEARTBEAT_SECONDS - now,
+                    _status_recheck_seconds(),
+                )
+                job_data = await _next_job_update(redis_conn, job_id, updates, wait, refresh=True)
+        finally:
+            await notifier.unwatch(job_id, updates)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 async def generate_video_clips(
     scenes: list[dict],
     micro_prompts: list[str],
@@ -2101,25 +2528,28 @@ async def generate_video_clips(
 ) -> list[dict]:
     """Generate video clips for multiple prompts/scenes using Replicate.
 
+    Submissions go through the shared fan-out engine, so even a parallel
+    batch is bounded by the per-model concurrency limit and paced by the
+    token bucket, with 429 responses backing off every caller together.
+
     Args:
         scenes: List of scene dictionaries (for metadata)
         micro_prompts: List of prompt strings
         generation_id: Unique ID for the generation batch
         aspect_ratio: Aspect ratio for the videos (e.g., "16:9")
-        parallelize: Whether to run generations in parallel
+        parallelize: Whether to submit generations concurrently
         webhook_base_url: Base URL for webhooks
 
     Returns:
         list[dict]: List of video result objects with tracking info
     """
-    import replicate
-    
     # Configure Replicate API token
     replicate_api_key = os.getenv("REPLICATE_API_TOKEN")
     if not replicate_api_key:
         raise Exception("REPLICATE_API_TOKEN environment variable not set")
     os.environ["REPLICATE_API_TOKEN"] = replicate_api_key
 
+    fanout = get_clip_fanout()
     results = []
     
     async def _process_single_clip(prompt: str, index: int) -> dict:
@@ -2136,11 +2566,10 @@ async def generate_video_clips(
             
             logger.info(f"Starting generation for clip {clip_id}", extra={"prompt": prompt[:50], "webhook": webhook_url})
             
-            # Run blocking Replicate call in thread pool
+            # Submit through the fan-out engine (bounded, rate limited, 429-aware)
             # Using Wan Video 2.5 T2V model as default
-            prediction = await asyncio.to_thread(
-                replicate.predictions.create,
-                model="wan-video/wan-2.5-t2v",
+            prediction = await fanout.submit(
+                CLIP_GENERATION_MODEL,
                 input={
                     "prompt": prompt,
                     "aspect_ratio": aspect_ratio,
@@ -2159,7 +2588,7 @@ async def generate_video_clips(
                 job_id=prediction.id,
                 job_type="ai_generation",
                 prompt=prompt,
-                model="wan-video/wan-2.5-t2v",
+                model=CLIP_GENERATION_MODEL,
                 generation_type="video",
                 clip_id=clip_id,
                 generation_id=generation_id,
@@ -2186,7 +2615,7 @@ async def generate_video_clips(
 
     # Execute generations
     if parallelize:
-        # Run all concurrently
+        # Run concurrently; the fan-out engine bounds in-flight submissions
         tasks = []
         for i, prompt in enumerate(micro_prompts):
             tasks.append(_process_single_clip(prompt, i))
@@ -2312,9 +2741,23 @@ async def replicate_webhook(request: Request) -> JSONResponse:
             },
         )
 
+        # Write the status through to the job cache first, so status polls and
+        # streams are served from the cache instead of querying Replicate
+        try:
+            write_job_status(
+                get_redis_connection(),
+                payload.id,
+                payload.status,
+                result_url=result_url,
+                output=normalized_output or payload.output,
+                error=payload.error,
+            )
+        except Exception as e:
+            logger.warning(f"Failed to update job metadata: {e}")
+
         # Publish job update based on status
         if payload.status == "succeeded":
-            publish_job_update(
+            await publish_job_update(
                 job_id=payload.id,
                 status_value="succeeded",
                 progress=100,
@@ -2442,42 +2885,19 @@ async def replicate_webhook(request: Request) -> JSONResponse:
                     # Don't fail the webhook - continue processing
 
         elif payload.status == "failed":
-            publish_job_update(
+            await publish_job_update(
                 job_id=payload.id,
                 status_value="failed",
                 error=payload.error or "Generation failed",
                 result_output=normalized_output or payload.output
             )
         elif payload.status == "canceled":
-            publish_job_update(
+            await publish_job_update(
                 job_id=payload.id,
                 status_value="canceled",
                 result_output=normalized_output or payload.output
             )
 
-        # Update job metadata in Redis
-        try:
-            redis_conn = get_redis_connection()
-            redis_key = f"ai_job:{payload.id}"
-
-            job_data_str = redis_conn.get(redis_key)
-            if job_data_str:
-                job_data = json.loads(job_data_str)
-                job_data["status"] = payload.status
-                job_data["updated_at"] = datetime.now(UTC).isoformat()
-
-                if result_url:
-                    job_data["result_url"] = result_url
-                if payload.error:
-                    job_data["error"] = payload.error
-                if normalized_output or payload.output:
-                    job_data["output"] = normalized_output or payload.output
-
-                redis_conn.setex(redis_key, 86400, json.dumps(job_data))
-
-        except Exception as e:
-            logger.warning(f"Failed to update job metadata: {e}")
-
         return JSONResponse(
             status_code=status.HTTP_200_OK,
             content={"status": "ok", "job_id": payload.id}
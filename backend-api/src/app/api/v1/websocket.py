@@ -266,7 +266,7 @@ async def websocket_composition_updates(
 
             # If reconnecting, send missed messages
             if is_reconnection and last_sequence > 0:
-                missed_messages = reconnect_mgr.get_missed_messages(composition_id, last_sequence)
+                missed_messages = await reconnect_mgr.get_missed_messages(composition_id, last_sequence)
 
                 if missed_messages:
                     logger.info(
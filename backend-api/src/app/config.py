@@ -71,6 +71,25 @@ class Settings(BaseSettings):
         le=1.0,
         description="Disk usage threshold for warnings (0.0-1.0)",
     )
+    log_queue_size: int = Field(
+        default=10000,
+        ge=0,
+        description="Log records buffered for the background writer (0 = write synchronously)",
+    )
+    log_rate_limit_per_second: float = Field(
+        default=5.0,
+        gt=0.0,
+        description="Rate of [CHATGPT_*]/[WEBHOOK] debug lines allowed per logger",
+    )
+    log_rate_limit_burst: int = Field(
+        default=20, ge=1, description="Burst of [CHATGPT_*]/[WEBHOOK] lines allowed per logger"
+    )
+
+    # Tracing settings
+    tracing_backend: Literal["none", "log", "opentelemetry"] = Field(
+        default="none",
+        description="Where job and request spans go (none, log at DEBUG, or OpenTelemetry)",
+    )
 
     # API settings
     api_v1_prefix: str = "/api/v1"
@@ -94,6 +113,18 @@ class Settings(BaseSettings):
         default="redis://localhost:6379/0", description="Redis connection URL"
     )
     redis_max_connections: int = Field(default=50, description="Redis connection pool size")
+    redis_bridge_enabled: bool = Field(
+        default=True,
+        description="Forward all job progress pub/sub to Socket.io (off when clients use SSE)",
+    )
+
+    # Generation event streams (SSE)
+    generation_stream_maxlen: int = Field(
+        default=1000, ge=1, description="Approximate number of events kept per generation stream"
+    )
+    generation_stream_ttl_seconds: int = Field(
+        default=86400, ge=1, description="Generation event stream TTL after its last event"
+    )
 
     # RQ (Job Queue) settings
     rq_default_timeout: int = Field(
@@ -120,6 +151,30 @@ class Settings(BaseSettings):
         default="/usr/bin/ffprobe", description="Path to ffprobe binary"
     )
     ffmpeg_threads: int = Field(default=0, description="Number of threads for FFmpeg (0 = auto)")
+    video_encoder_backend: str = Field(
+        default="libx264",
+        description="Video encoder (libx264, libx265, libsvtav1, libvpx-vp9); "
+        "falls back to libx264 if FFmpeg lacks it",
+    )
+    ken_burns_engine: str = Field(
+        default="zoompan",
+        description="Ken Burns frame synthesis: zoompan (FFmpeg filter) or numpy",
+    )
+    smart_thumbnails: bool = Field(
+        default=True,
+        description="Pick thumbnail frames by brightness, contrast and sharpness "
+        "instead of a fixed timestamp",
+    )
+    ffmpeg_sample_interval: float = Field(
+        default=1.0,
+        ge=0.0,
+        description="Seconds between CPU/memory/I/O samples of a running render (0 = off)",
+    )
+    ffmpeg_sample_max_points: int = Field(
+        default=120,
+        ge=2,
+        description="Samples kept per render; longer renders are downsampled to fit",
+    )
     max_concurrent_jobs: int = Field(default=4, description="Maximum concurrent FFmpeg jobs")
 
     # Media processing settings
@@ -164,6 +219,47 @@ class Settings(BaseSettings):
     # External API Keys
     openai_api_key: str = Field(default="", description="OpenAI API Key for prompt generation")
 
+    # Replicate fan-out settings
+    replicate_max_concurrency_per_model: int = Field(
+        default=4, ge=1, description="Maximum concurrent Replicate create calls per model"
+    )
+    replicate_requests_per_second: float = Field(
+        default=5.0, gt=0.0, description="Sustained Replicate prediction create rate per model"
+    )
+    replicate_burst: int = Field(
+        default=5, ge=1, description="Burst size for Replicate prediction creates per model"
+    )
+
+    # Replicate job status settings
+    replicate_status_refresh_seconds: float = Field(
+        default=5.0, ge=0.0, description="Minimum interval between Replicate status refreshes per job"
+    )
+    replicate_status_webhook_refresh_seconds: float = Field(
+        default=60.0,
+        ge=0.0,
+        description="Minimum refresh interval when webhooks write job status to the cache",
+    )
+    replicate_status_max_wait_seconds: float = Field(
+        default=30.0, gt=0.0, description="Longest a job status long-poll blocks for a change"
+    )
+    replicate_status_stream_seconds: float = Field(
+        default=600.0, gt=0.0, description="Longest a job status event stream stays open"
+    )
+
+    # Callback delivery settings
+    callback_delivery_enabled: bool = Field(
+        default=True, description="Deliver queued job callbacks from the API process"
+    )
+    callback_webhook_secret: str = Field(
+        default="", description="Secret for signing callback payloads (empty disables signing)"
+    )
+    callback_max_attempts: int = Field(
+        default=8, ge=1, description="Delivery attempts before a callback is marked failed"
+    )
+    callback_delivery_concurrency: int = Field(
+        default=32, ge=1, description="Maximum callback deliveries in flight"
+    )
+
     # Feature Flags
     feature_dev_api_enabled: bool = Field(
         default=False, description="Enable development/debugging API endpoints"
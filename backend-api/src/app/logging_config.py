@@ -2,15 +2,24 @@
 
 This module configures application-wide logging with structured JSON output
 including contextual metadata like request IDs, composition IDs, and user IDs.
+
+Log calls only put records on a bounded queue; a background listener thread
+formats them and writes the files, so JSON formatting, file I/O and rollover
+never run on the event loop. Rotated files are gzipped on a separate thread.
 """
 
+import atexit
+import copy
 import gzip
 import logging
 import logging.handlers
 import os
+import queue
 import shutil
 import sys
+import threading
 import time
+from collections.abc import Callable
 from contextvars import ContextVar
 from pathlib import Path
 from typing import Any
@@ -23,6 +32,19 @@ composition_id_ctx: ContextVar[str | None] = ContextVar("composition_id", defaul
 user_id_ctx: ContextVar[str | None] = ContextVar("user_id", default=None)
 job_id_ctx: ContextVar[str | None] = ContextVar("job_id", default=None)
 
+_CONTEXT_VARS = {
+    "request_id": request_id_ctx,
+    "composition_id": composition_id_ctx,
+    "user_id": user_id_ctx,
+    "job_id": job_id_ctx,
+}
+
+# Message prefixes of high-volume debug logs that are rate limited per logger
+RATE_LIMITED_PREFIXES = ("[CHATGPT_", "[WEBHOOK]")
+
+# Queue listeners started by setup_logging, stopped by stop_logging
+_queue_listeners: list[logging.handlers.QueueListener] = []
+
 
 class CustomJsonFormatter(jsonlogger.JsonFormatter):
     """Custom JSON formatter that includes context variables in every log entry."""
@@ -120,7 +142,7 @@ class CompressingTimedRotatingFileHandler(logging.handlers.TimedRotatingFileHand
                 # Compress the most recent rotated file (last in sorted list)
                 source_file = result[-1]
                 if os.path.exists(source_file):
-                    self._compress_file(source_file)
+                    compress_in_background(self._compress_file, source_file)
 
     def _compress_file(self, source_file: str) -> None:
         """Compress a log file with gzip.
@@ -174,7 +196,7 @@ class CompressingRotatingFileHandler(logging.handlers.RotatingFileHandler):
 
             # Compress the rotated file
             if self.compress and os.path.exists(dfn):
-                self._compress_file(dfn)
+                compress_in_background(self._compress_file, dfn)
 
         if not self.delay:
             self.stream = self._open()
@@ -194,6 +216,232 @@ class CompressingRotatingFileHandler(logging.handlers.RotatingFileHandler):
             logging.error(f"Failed to compress log file {source_file}: {e}")
 
 
+def compress_in_background(compress: Callable[[str], None], source_file: str) -> threading.Thread:
+    """Compress a rotated log file on its own thread.
+
+    Rollover runs on the queue listener thread; gzipping a large file there
+    would stall log writing until it finished.
+
+    Args:
+        compress: Handler method that gzips the file and removes the original
+        source_file: Path of the rotated file
+
+    Returns:
+        threading.Thread: The started compression thread
+    """
+    thread = threading.Thread(target=compress, args=(source_file,), name="log-compress")
+    thread.start()
+    return thread
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler for a bounded queue that drops records instead of blocking.
+
+    When the queue is full, DEBUG and INFO records are dropped at once;
+    WARNING and above wait up to block_timeout for space first. The number of
+    dropped records is reported in a warning once the queue has room again.
+
+    Unlike the stock QueueHandler, records are not formatted in the caller:
+    only the message is resolved and the logging context variables captured,
+    and formatting is left to the listener thread.
+    """
+
+    def __init__(self, log_queue: queue.Queue, block_timeout: float = 0.05) -> None:
+        """Initialize non-blocking queue handler.
+
+        Args:
+            log_queue: Bounded queue read by a QueueListener
+            block_timeout: Seconds WARNING+ records wait for space when full
+        """
+        super().__init__(log_queue)
+        self.block_timeout = block_timeout
+        self.dropped = 0
+        self._dropped_lock = threading.Lock()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Resolve the message and capture context for the listener thread.
+
+        Args:
+            record: Record being logged
+
+        Returns:
+            logging.LogRecord: Copy safe to format on another thread
+        """
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+
+        # Context variables are not visible from the listener thread
+        for name, var in _CONTEXT_VARS.items():
+            value = var.get()
+            if value and not hasattr(record, name):
+                setattr(record, name, value)
+
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        """Put a record on the queue, dropping it if the queue stays full.
+
+        Args:
+            record: Prepared record
+        """
+        if self.dropped:
+            self._report_dropped()
+
+        try:
+            self.queue.put_nowait(record)
+            return
+        except queue.Full:
+            pass
+
+        if record.levelno >= logging.WARNING:
+            try:
+                self.queue.put(record, timeout=self.block_timeout)
+                return
+            except queue.Full:
+                pass
+
+        with self._dropped_lock:
+            self.dropped += 1
+
+    def _report_dropped(self) -> None:
+        """Queue a warning with the number of records dropped so far."""
+        with self._dropped_lock:
+            dropped, self.dropped = self.dropped, 0
+
+        record = logging.LogRecord(
+            name=__name__,
+            level=logging.WARNING,
+            pathname=__file__,
+            lineno=0,
+            msg=f"Dropped {dropped} log records because the log queue was full",
+            args=None,
+            exc_info=None,
+        )
+        record.dropped_records = dropped
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._dropped_lock:
+                self.dropped += dropped
+
+
+class LogRateLimitFilter(logging.Filter):
+    """
+    Rate limits high-volume log lines by message prefix, per logger.
+
+    Each (logger, prefix) pair gets a token bucket refilled at `rate` records
+    per second up to `burst`. Records over the limit are dropped; the next
+    record let through carries the number suppressed in `suppressed`.
+    ERROR and above are never limited.
+    """
+
+    def __init__(
+        self,
+        prefixes: tuple[str, ...] = RATE_LIMITED_PREFIXES,
+        rate: float = 5.0,
+        burst: int = 20,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize rate limit filter.
+
+        Args:
+            prefixes: Message prefixes to limit
+            rate: Records per second allowed per logger and prefix
+            burst: Records allowed in a burst
+            clock: Monotonic time source
+        """
+        super().__init__()
+        self.prefixes = prefixes
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        # (logger name, prefix) -> [tokens, last refill time, suppressed count]
+        self._buckets: dict[tuple[str, str], list[float]] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        """Decide whether to log the record.
+
+        Args:
+            record: Record being logged
+
+        Returns:
+            bool: False if the record is over its logger's limit
+        """
+        if record.levelno >= logging.ERROR or not isinstance(record.msg, str):
+            return True
+
+        prefix = next((p for p in self.prefixes if record.msg.startswith(p)), None)
+        if prefix is None:
+            return True
+
+        now = self.clock()
+        with self._lock:
+            bucket = self._buckets.setdefault((record.name, prefix), [self.burst, now, 0])
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+
+            if bucket[0] < 1:
+                bucket[2] += 1
+                return False
+
+            bucket[0] -= 1
+            suppressed, bucket[2] = bucket[2], 0
+
+        if suppressed:
+            record.suppressed = int(suppressed)
+        return True
+
+
+def start_queue_listener(
+    handlers: list[logging.Handler], queue_size: int, rate_limit: LogRateLimitFilter | None
+) -> NonBlockingQueueHandler:
+    """Start a background listener writing to the given handlers.
+
+    Args:
+        handlers: Handlers run on the listener thread
+        queue_size: Maximum queued records
+        rate_limit: Filter applied before records are queued
+
+    Returns:
+        NonBlockingQueueHandler: Handler to attach to a logger
+    """
+    log_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+    queue_handler = NonBlockingQueueHandler(log_queue)
+    if rate_limit is not None:
+        queue_handler.addFilter(rate_limit)
+
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    _queue_listeners.append(listener)
+    return queue_handler
+
+
+def stop_logging() -> None:
+    """Stop the queue listeners, writing out any records still queued."""
+    while _queue_listeners:
+        listener = _queue_listeners.pop()
+        try:
+            listener.stop()
+        except Exception as e:
+            sys.stderr.write(f"Error stopping log listener: {e}\n")
+
+    # Later records fall back to logging's last-resort stderr handler
+    root_logger = logging.getLogger()
+    for handler in list(root_logger.handlers):
+        if isinstance(handler, NonBlockingQueueHandler):
+            root_logger.removeHandler(handler)
+    api_logger = logging.getLogger("api")
+    for handler in list(api_logger.handlers):
+        if isinstance(handler, NonBlockingQueueHandler):
+            api_logger.removeHandler(handler)
+
+
+atexit.register(stop_logging)
+
+
 def cleanup_old_logs(log_dir: Path, retention_days: int) -> None:
     """Clean up log files older than retention period.
 
@@ -269,6 +517,9 @@ def setup_logging(
     compress_rotated: bool = True,
     retention_days: int = 30,
     disk_usage_threshold: float = 0.8,
+    queue_size: int = 10000,
+    rate_limit_per_second: float = 5.0,
+    rate_limit_burst: int = 20,
 ) -> None:
     """Configure structured JSON logging for the application.
 
@@ -284,6 +535,10 @@ def setup_logging(
         compress_rotated: Whether to compress rotated files with gzip
         retention_days: Number of days to keep logs before deletion
         disk_usage_threshold: Disk usage threshold for warnings (0.0-1.0)
+        queue_size: Records buffered for the background writer; 0 writes
+            synchronously from the logging thread
+        rate_limit_per_second: Rate of [CHATGPT_*]/[WEBHOOK] lines allowed per logger
+        rate_limit_burst: Burst of [CHATGPT_*]/[WEBHOOK] lines allowed per logger
     """
     # Determine log level based on environment
     level_map = {
@@ -300,6 +555,7 @@ def setup_logging(
     )
 
     # Configure root logger
+    stop_logging()  # Stop listeners from an earlier setup
     root_logger = logging.getLogger()
     root_logger.setLevel(effective_level)
     root_logger.handlers.clear()  # Clear any existing handlers
@@ -308,7 +564,8 @@ def setup_logging(
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setLevel(effective_level)
     console_handler.setFormatter(formatter)
-    root_logger.addHandler(console_handler)
+    root_handlers: list[logging.Handler] = [console_handler]
+    access_handler: logging.Handler | None = None
 
     # File handlers (if enabled and log_dir provided)
     if enable_file_logging:
@@ -333,7 +590,7 @@ def setup_logging(
         )
         app_handler.setLevel(effective_level)
         app_handler.setFormatter(formatter)
-        root_logger.addHandler(app_handler)
+        root_handlers.append(app_handler)
 
         # Error log file with time-based rotation (WARNING and above)
         error_log_file = log_path / "error.log"
@@ -347,7 +604,7 @@ def setup_logging(
         )
         error_handler.setLevel(logging.WARNING)
         error_handler.setFormatter(formatter)
-        root_logger.addHandler(error_handler)
+        root_handlers.append(error_handler)
 
         # Access log file with size-based rotation for high-volume logs
         access_log_file = log_path / "access.log"
@@ -360,9 +617,26 @@ def setup_logging(
         )
         access_handler.setLevel(logging.INFO)
         access_handler.setFormatter(formatter)
-        # Only add to api logger, not root
-        api_logger = logging.getLogger("api")
-        api_logger.addHandler(access_handler)
+
+    def rate_limit() -> LogRateLimitFilter:
+        """Create a rate limit filter for one handler or queue."""
+        return LogRateLimitFilter(rate=rate_limit_per_second, burst=rate_limit_burst)
+
+    if queue_size > 0:
+        # Handlers run on listener threads; loggers only enqueue
+        root_logger.addHandler(start_queue_listener(root_handlers, queue_size, rate_limit()))
+        if access_handler is not None:
+            # Only add to api logger, not root
+            logging.getLogger("api").addHandler(
+                start_queue_listener([access_handler], queue_size, rate_limit())
+            )
+    else:
+        for handler in root_handlers:
+            handler.addFilter(rate_limit())
+            root_logger.addHandler(handler)
+        if access_handler is not None:
+            access_handler.addFilter(rate_limit())
+            logging.getLogger("api").addHandler(access_handler)
 
     # Configure specific loggers with appropriate levels
     configure_logger("app", effective_level)
@@ -390,6 +664,7 @@ def setup_logging(
             "backup_count": backup_count,
             "compress_rotated": compress_rotated,
             "retention_days": retention_days,
+            "queue_size": queue_size,
         },
     )
 
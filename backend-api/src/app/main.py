@@ -8,6 +8,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.openapi.utils import get_openapi
 from fastapi.responses import FileResponse
 from fastapi.staticfiles import StaticFiles
+from services.tracing import configure_tracing
 
 from .api.internal import router as internal_router
 from .api.v1 import router as api_v1_router
@@ -17,6 +18,7 @@ from .middleware import InternalAuthMiddleware, LoggingMiddleware, RequestIDMidd
 from .middleware.exception_handlers import setup_exception_handlers
 from .middleware.metrics import MetricsMiddleware
 from .middleware.rate_limiting import RateLimitMiddleware
+from .middleware.tracing import TracingMiddleware
 
 # Initialize structured logging
 settings = get_settings()
@@ -32,7 +34,11 @@ setup_logging(
     compress_rotated=settings.log_compress_rotated,
     retention_days=settings.log_retention_days,
     disk_usage_threshold=settings.log_disk_usage_threshold,
+    queue_size=settings.log_queue_size,
+    rate_limit_per_second=settings.log_rate_limit_per_second,
+    rate_limit_burst=settings.log_rate_limit_burst,
 )
+configure_tracing(settings.tracing_backend)
 logger = get_logger(__name__)
 
 
@@ -129,6 +135,7 @@ def create_app() -> FastAPI:  # noqa: C901
     app.add_middleware(InternalAuthMiddleware, rate_limit_per_key=100)
     app.add_middleware(MetricsMiddleware)
     app.add_middleware(LoggingMiddleware)
+    app.add_middleware(TracingMiddleware)
     app.add_middleware(RequestIDMiddleware)
 
     # Setup exception handlers (replaces ErrorHandlerMiddleware with more comprehensive handling)
@@ -216,13 +223,23 @@ def create_app() -> FastAPI:  # noqa: C901
                 logger.warning(f"Failed to start config watcher: {e}")
 
         # Start Redis Bridge for Socket.io updates
-        try:
-            from fastapi_app.services.redis_bridge import get_redis_bridge
-            redis_bridge = get_redis_bridge()
-            await redis_bridge.start()
-            logger.info("Redis Bridge started for Socket.io updates")
-        except Exception as e:
-            logger.error(f"Failed to start Redis Bridge: {e}")
+        if settings.redis_bridge_enabled:
+            try:
+                from fastapi_app.services.redis_bridge import get_redis_bridge
+                redis_bridge = get_redis_bridge()
+                await redis_bridge.start()
+                logger.info("Redis Bridge started for Socket.io updates")
+            except Exception as e:
+                logger.error(f"Failed to start Redis Bridge: {e}")
+
+        # Start callback outbox delivery
+        if settings.callback_delivery_enabled:
+            try:
+                from services.callback_outbox import get_callback_delivery_service
+
+                await get_callback_delivery_service().start()
+            except Exception as e:
+                logger.error(f"Failed to start callback delivery: {e}")
 
         # WebSocket services use lazy initialization - they'll be created
         # when the first WebSocket connection is established
@@ -279,6 +296,31 @@ def create_app() -> FastAPI:  # noqa: C901
             logger.info("Redis Bridge stopped")
         except Exception as e:
             logger.error(f"Failed to stop Redis Bridge: {e}")
+
+        # Stop generation event streams
+        try:
+            from fastapi_app.services.generation_events import get_generation_stream_hub
+
+            await get_generation_stream_hub().close()
+        except Exception as e:
+            logger.error(f"Failed to stop generation event streams: {e}")
+
+        # Stop job status notifications
+        try:
+            from services.job_status_notifier import get_job_status_notifier
+
+            await get_job_status_notifier().close()
+        except Exception as e:
+            logger.error(f"Failed to stop job status notifications: {e}")
+
+        # Stop callback outbox delivery
+        if settings.callback_delivery_enabled:
+            try:
+                from services.callback_outbox import get_callback_delivery_service
+
+                await get_callback_delivery_service().stop()
+            except Exception as e:
+                logger.error(f"Failed to stop callback delivery: {e}")
     return app
 
 
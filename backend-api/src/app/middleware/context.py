@@ -0,0 +1,83 @@
+"""Per-request context shared by the pure ASGI middleware stack."""
+
+import time
+from dataclasses import dataclass, field
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import Message, Scope, Send
+
+# Key under scope["state"], so handlers can read it as request.state.request_context
+REQUEST_CONTEXT_KEY = "request_context"
+
+
+@dataclass
+class RequestContext:
+    """Timing and response details for one HTTP request.
+
+    Created by the outermost middleware that asks for it and reused by every
+    other layer, so the stack takes one start timestamp and wraps ``send``
+    once per request.
+    """
+
+    method: str
+    path: str
+    started: float = field(default_factory=time.perf_counter)
+    request_id: str = ""
+    status_code: int | None = None
+    response_content_length: int | None = None
+    response_started: bool = False
+    response_headers: list[tuple[str, str]] = field(default_factory=list)
+
+    @property
+    def duration_ms(self) -> float:
+        """Milliseconds since the request entered the middleware stack."""
+        return (time.perf_counter() - self.started) * 1000
+
+    def add_response_header(self, name: str, value: str) -> None:
+        """Attach a header to the response when it starts.
+
+        When several layers set the same header, the outermost one wins, as it
+        would when each layer edited the finished response on its way out.
+
+        Args:
+            name: Header name
+            value: Header value
+        """
+        self.response_headers.append((name, value))
+
+
+def bind_request_context(scope: Scope, send: Send) -> tuple[RequestContext, Send]:
+    """Get the request's context, creating it on first use.
+
+    The layer that creates the context also gets a wrapped ``send`` that
+    records the response status and size and applies queued response headers;
+    later layers get their ``send`` back unchanged.
+
+    Args:
+        scope: ASGI HTTP scope
+        send: ASGI send callable of the calling middleware
+
+    Returns:
+        tuple: (context, send callable to pass downstream)
+    """
+    state = scope.setdefault("state", {})
+    context = state.get(REQUEST_CONTEXT_KEY)
+    if context is not None:
+        return context, send
+
+    context = RequestContext(method=scope["method"], path=scope["path"])
+    state[REQUEST_CONTEXT_KEY] = context
+
+    async def send_with_context(message: Message) -> None:
+        if message["type"] == "http.response.start":
+            context.status_code = message["status"]
+            context.response_started = True
+            headers = MutableHeaders(scope=message)
+            for name, value in reversed(context.response_headers):
+                headers[name] = value
+            content_length = headers.get("content-length")
+            if content_length:
+                context.response_content_length = int(content_length)
+        await send(message)
+
+    return context, send_with_context
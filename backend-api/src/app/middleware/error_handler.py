@@ -1,41 +1,54 @@
 """Error handling middleware for consistent error responses."""
 
 import logging
-from collections.abc import Callable
 
-from fastapi import Request, Response
 from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.types import ASGIApp, Receive, Scope, Send
 
+from .context import bind_request_context
 from .request_id import get_request_id
 
 logger = logging.getLogger(__name__)
 
 
-class ErrorHandlerMiddleware(BaseHTTPMiddleware):
+class ErrorHandlerMiddleware:
     """Middleware for consistent error handling and responses."""
 
-    async def dispatch(
-        self, request: Request, call_next: Callable[[Request], Response]
-    ) -> Response:
-        """Handle errors and return consistent JSON responses.
+    def __init__(self, app: ASGIApp) -> None:
+        """Initialize error handler middleware.
 
         Args:
-            request: Incoming HTTP request
-            call_next: Next middleware or route handler
+            app: ASGI application
+        """
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Handle errors and return consistent JSON responses.
 
-        Returns:
-            Response: HTTP response or error response
+        Args:
+            scope: ASGI scope
+            receive: ASGI receive callable
+            send: ASGI send callable
         """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        context, send = bind_request_context(scope, send)
+
         try:
-            return await call_next(request)
+            await self.app(scope, receive, send)
         except Exception as exc:
+            # Too late for an error body once the response has started
+            if context.response_started:
+                raise
+
             request_id = get_request_id()
 
             # Log the exception
             logger.exception(
                 f"Unhandled exception for request {request_id}: {exc!s}",
-                extra={"request_id": request_id, "path": request.url.path},
+                extra={"request_id": request_id, "path": scope["path"]},
             )
 
             # Determine status code based on exception type
@@ -51,7 +64,7 @@ class ErrorHandlerMiddleware(BaseHTTPMiddleware):
             #     error_message = str(exc)
 
             # Return consistent error response
-            return JSONResponse(
+            response = JSONResponse(
                 status_code=status_code,
                 content={
                     "error": {
@@ -61,3 +74,4 @@ class ErrorHandlerMiddleware(BaseHTTPMiddleware):
                     }
                 },
             )
+            await response(scope, receive, send)
@@ -1,39 +1,40 @@
 """Internal API authentication middleware."""
 
+import hashlib
 import logging
 import time
 import uuid
-from collections.abc import Callable
 from datetime import datetime
 from typing import Any
 
 import jwt
-from fastapi import Request, Response, status
+from fastapi import Request, status
 from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
-from workers.redis_pool import get_redis_connection
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 from app.api.schemas.errors import ErrorCode, ErrorResponse
 from app.config import get_settings
+from app.middleware.context import RequestContext, bind_request_context
+from app.middleware.rate_limiting import get_rate_limiter
 
 logger = logging.getLogger(__name__)
 
 
-class InternalAuthMiddleware(BaseHTTPMiddleware):
+class InternalAuthMiddleware:
     """Middleware to enforce authentication for internal API endpoints."""
 
-    def __init__(self, app, rate_limit_per_key: int = 100) -> None:
+    def __init__(self, app: ASGIApp, rate_limit_per_key: int = 100) -> None:
         """Initialize internal auth middleware.
 
         Args:
-            app: FastAPI application
+            app: ASGI application
             rate_limit_per_key: Max requests per minute per API key (default: 100)
         """
-        super().__init__(app)
+        self.app = app
         self.settings = get_settings()
         self.rate_limit_per_key = rate_limit_per_key
         self.window_seconds = 60  # 1 minute window
-        self._redis = get_redis_connection()
+        self._limiter = get_rate_limiter()
 
         logger.info(
             "Internal auth middleware initialized",
@@ -113,7 +114,7 @@ class InternalAuthMiddleware(BaseHTTPMiddleware):
             logger.warning(f"Invalid JWT token: {e}")
             return None
 
-    def _check_rate_limit(self, api_key: str, endpoint: str) -> tuple[bool, int, int]:
+    async def _check_rate_limit(self, api_key: str, endpoint: str) -> tuple[bool, int, int]:
         """Check rate limit for API key.
 
         Args:
@@ -123,56 +124,14 @@ class InternalAuthMiddleware(BaseHTTPMiddleware):
         Returns:
             tuple: (is_allowed, current_count, retry_after_seconds)
         """
-        try:
-            # Create unique key for this API key and endpoint
-            key = f"internal_rate_limit:{api_key[:8]}:{endpoint}"
-            current_time = int(time.time())
-            window_start = current_time - self.window_seconds
-
-            # Use Redis sorted set for sliding window
-            pipe = self._redis.pipeline()
-
-            # Remove old entries outside the window
-            pipe.zremrangebyscore(key, 0, window_start)
-
-            # Count requests in current window
-            pipe.zcard(key)
-
-            # Add current request
-            pipe.zadd(key, {str(current_time): current_time})
-
-            # Set expiration on the key
-            pipe.expire(key, self.window_seconds + 10)
-
-            results = pipe.execute()
-
-            # Get count after removing old entries
-            request_count = results[1]
-
-            if request_count >= self.rate_limit_per_key:
-                # Calculate retry after time
-                oldest_in_window = self._redis.zrange(key, 0, 0, withscores=True)
-                if oldest_in_window:
-                    oldest_time = int(oldest_in_window[0][1])
-                    retry_after = self.window_seconds - (current_time - oldest_time)
-                    retry_after = max(1, retry_after)
-                else:
-                    retry_after = self.window_seconds
-
-                # Remove the current request since we're rejecting it
-                self._redis.zrem(key, str(current_time))
-
-                return False, request_count, retry_after
-
-            return True, request_count + 1, 0
-
-        except Exception as e:
-            logger.exception(
-                "Rate limit check failed",
-                extra={"api_key": api_key[:8], "error": str(e)},
-            )
-            # On Redis failure, allow the request (fail open)
-            return True, 0, 0
+        # Hash the whole key: distinct keys often share their first characters
+        key_id = hashlib.sha256(api_key.encode()).hexdigest()[:16]
+        result = await self._limiter.hit(
+            f"internal_rate_limit:{key_id}:{endpoint}",
+            self.rate_limit_per_key,
+            self.window_seconds,
+        )
+        return result.allowed, result.count, result.retry_after
 
     def _create_error_response(
         self,
@@ -211,24 +170,43 @@ class InternalAuthMiddleware(BaseHTTPMiddleware):
             headers=headers,
         )
 
-    async def dispatch(
-        self,
-        request: Request,
-        call_next: Callable[[Request], Response],
-    ) -> Response:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """Authenticate request before processing.
 
         Args:
-            request: FastAPI request
-            call_next: Next middleware/endpoint
-
-        Returns:
-            Response: HTTP response or error response
+            scope: ASGI scope
+            receive: ASGI receive callable
+            send: ASGI send callable
         """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope)
+
         # Check if this endpoint requires authentication
         if not self._should_authenticate(request):
-            return await call_next(request)
+            await self.app(scope, receive, send)
+            return
+
+        context, send = bind_request_context(scope, send)
+        error_response = await self._authenticate(request, context)
+        if error_response is not None:
+            await error_response(scope, receive, send)
+            return
+
+        await self.app(scope, receive, send)
 
+    async def _authenticate(self, request: Request, context: RequestContext) -> JSONResponse | None:
+        """Authenticate the request and store the result in request state.
+
+        Args:
+            request: FastAPI request
+            context: Shared request context, used for rate limit headers
+
+        Returns:
+            JSONResponse | None: Error response, or None if authenticated
+        """
         # Try API key authentication first
         api_key = request.headers.get("X-API-Key")
         if api_key:
@@ -250,7 +228,7 @@ class InternalAuthMiddleware(BaseHTTPMiddleware):
 
             # Check rate limit for this API key
             endpoint = f"{request.method}:{request.url.path}"
-            is_allowed, current_count, retry_after = self._check_rate_limit(api_key, endpoint)
+            is_allowed, current_count, retry_after = await self._check_rate_limit(api_key, endpoint)
 
             if not is_allowed:
                 logger.warning(
@@ -274,14 +252,13 @@ class InternalAuthMiddleware(BaseHTTPMiddleware):
             request.state.auth_method = "api_key"
             request.state.api_key = api_key
 
-            # Process request and add rate limit headers
-            response = await call_next(request)
-            response.headers["X-RateLimit-Limit"] = str(self.rate_limit_per_key)
-            response.headers["X-RateLimit-Remaining"] = str(
-                max(0, self.rate_limit_per_key - current_count)
+            # Add rate limit headers to the response
+            context.add_response_header("X-RateLimit-Limit", str(self.rate_limit_per_key))
+            context.add_response_header(
+                "X-RateLimit-Remaining", str(max(0, self.rate_limit_per_key - current_count))
             )
 
-            return response
+            return None
 
         # Try JWT token authentication
         auth_header = request.headers.get("Authorization")
@@ -305,7 +282,7 @@ class InternalAuthMiddleware(BaseHTTPMiddleware):
             request.state.auth_method = "jwt"
             request.state.jwt_payload = payload
 
-            return await call_next(request)
+            return None
 
         # No valid authentication provided
         logger.warning(
@@ -1,14 +1,13 @@
 """Logging middleware with structured JSON output."""
 
 import random
-import time
-from collections.abc import Callable
 
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 from ..config import get_settings
 from ..logging_config import get_logger
+from .context import bind_request_context
 
 logger = get_logger("api")
 
@@ -25,17 +24,16 @@ SENSITIVE_HEADERS = {
 }
 
 
-class LoggingMiddleware(BaseHTTPMiddleware):
+class LoggingMiddleware:
     """Middleware for structured request/response logging with sampling support."""
 
-    def __init__(self, app, **kwargs):
+    def __init__(self, app: ASGIApp) -> None:
         """Initialize logging middleware.
 
         Args:
             app: ASGI application
-            **kwargs: Additional middleware arguments
         """
-        super().__init__(app, **kwargs)
+        self.app = app
         self.settings = get_settings()
 
     def _should_log_request(self, path: str) -> bool:
@@ -67,61 +65,74 @@ class LoggingMiddleware(BaseHTTPMiddleware):
             key: value for key, value in headers.items() if key.lower() not in SENSITIVE_HEADERS
         }
 
-    async def dispatch(  # noqa: C901
-        self, request: Request, call_next: Callable[[Request], Response]
-    ) -> Response:
-        """Log request and response information with enhanced tracking.
+    def _request_log_data(self, scope: Scope, headers: Headers) -> dict:
+        """Build the request_started log record.
 
         Args:
-            request: Incoming HTTP request
-            call_next: Next middleware or route handler
+            scope: ASGI HTTP scope
+            headers: Request headers
 
         Returns:
-            Response: HTTP response
+            dict: Log extra fields
         """
-        start_time = time.time()
-        path = request.url.path
-
-        # Check if we should log this request based on sampling
-        should_log = self._should_log_request(path)
-
-        # Prepare request log data
+        query_string = scope.get("query_string", b"")
+        client = scope.get("client")
         request_log_data = {
             "event": "request_started",
-            "method": request.method,
-            "path": path,
-            "query_params": str(request.query_params) if request.query_params else None,
-            "client_host": request.client.host if request.client else None,
-            "user_agent": request.headers.get("user-agent"),
+            "method": scope["method"],
+            "path": scope["path"],
+            "query_params": query_string.decode("latin-1") if query_string else None,
+            "client_host": client[0] if client else None,
+            "user_agent": headers.get("user-agent"),
         }
 
         # Add headers if enabled
-        if should_log and self.settings.log_request_headers:
-            request_log_data["headers"] = self._filter_headers(dict(request.headers))
+        if self.settings.log_request_headers:
+            request_log_data["headers"] = self._filter_headers(dict(headers))
 
         # Add body size if enabled and available
-        if should_log and self.settings.log_request_body_size:
-            content_length = request.headers.get("content-length")
+        if self.settings.log_request_body_size:
+            content_length = headers.get("content-length")
             if content_length:
                 request_log_data["body_size_bytes"] = int(content_length)
 
+        return request_log_data
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Log request and response information with enhanced tracking.
+
+        Args:
+            scope: ASGI scope
+            receive: ASGI receive callable
+            send: ASGI send callable
+        """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        context, send = bind_request_context(scope, send)
+        method = scope["method"]
+        path = scope["path"]
+
+        # Check if we should log this request based on sampling
+        should_log = self._should_log_request(path)
+
         # Log request if sampling allows
         if should_log:
-            logger.info("Request started", extra=request_log_data)
+            logger.info("Request started", extra=self._request_log_data(scope, Headers(scope=scope)))
 
         # Process request
         try:
-            response = await call_next(request)
+            await self.app(scope, receive, send)
         except Exception as exc:
             # Always log errors regardless of sampling
-            duration = time.time() - start_time
             logger.error(
                 f"Request error: {exc!s}",
                 extra={
                     "event": "request_error",
-                    "method": request.method,
+                    "method": method,
                     "path": path,
-                    "duration_ms": round(duration * 1000, 2),
+                    "duration_ms": round(context.duration_ms, 2),
                     "error": str(exc),
                     "error_type": type(exc).__name__,
                 },
@@ -130,30 +141,27 @@ class LoggingMiddleware(BaseHTTPMiddleware):
             raise
 
         # Prepare response log data
-        duration = time.time() - start_time
-        log_message = f"{request.method} {path} - {response.status_code}"
+        status_code = context.status_code or 500
+        log_message = f"{method} {path} - {status_code}"
         log_extra = {
             "event": "request_completed",
-            "method": request.method,
+            "method": method,
             "path": path,
-            "status_code": response.status_code,
-            "duration_ms": round(duration * 1000, 2),
+            "status_code": status_code,
+            "duration_ms": round(context.duration_ms, 2),
         }
 
         # Add response size if enabled
         if should_log and self.settings.log_response_body_size:
-            content_length = response.headers.get("content-length")
-            if content_length:
-                log_extra["response_size_bytes"] = int(content_length)
+            if context.response_content_length is not None:
+                log_extra["response_size_bytes"] = context.response_content_length
 
         # Log response if sampling allows (always log errors and warnings)
-        if should_log or response.status_code >= 400:
+        if should_log or status_code >= 400:
             # Use different log levels based on status code
-            if response.status_code >= 500:
+            if status_code >= 500:
                 logger.error(log_message, extra=log_extra)
-            elif response.status_code >= 400:
+            elif status_code >= 400:
                 logger.warning(log_message, extra=log_extra)
             else:
                 logger.info(log_message, extra=log_extra)
-
-        return response
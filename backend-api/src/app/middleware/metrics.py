@@ -1,20 +1,17 @@
 """Middleware for collecting API metrics and request/response statistics."""
 
-import time
 from collections import defaultdict
-from collections.abc import Callable
 from typing import Any
 
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 from app.logging_config import get_logger
+from app.middleware.context import bind_request_context
 
 logger = get_logger(__name__)
 
 
-class MetricsMiddleware(BaseHTTPMiddleware):
+class MetricsMiddleware:
     """
     Middleware for collecting API performance metrics.
 
@@ -27,7 +24,7 @@ class MetricsMiddleware(BaseHTTPMiddleware):
 
     def __init__(self, app: ASGIApp) -> None:
         """Initialize metrics middleware."""
-        super().__init__(app)
+        self.app = app
         self._metrics: dict[str, Any] = {
             "requests_total": 0,
             "requests_by_endpoint": defaultdict(int),
@@ -36,54 +33,51 @@ class MetricsMiddleware(BaseHTTPMiddleware):
             "errors_total": 0,
         }
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:  # type: ignore[override]
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """
         Process each request and collect metrics.
 
         Args:
-            request: Incoming HTTP request
-            call_next: Next middleware/route handler
-
-        Returns:
-            Response: HTTP response
+            scope: ASGI scope
+            receive: ASGI receive callable
+            send: ASGI send callable
         """
-        # Start timing
-        start_perf = time.perf_counter()
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # Timing comes from the shared request context
+        context, send = bind_request_context(scope, send)
 
         # Extract endpoint info
-        endpoint = f"{request.method} {request.url.path}"
+        method = scope["method"]
+        path = scope["path"]
+        endpoint = f"{method} {path}"
 
         # Process request
-        response = None
         error = None
 
         try:
-            response = await call_next(request)
+            await self.app(scope, receive, send)
         except Exception as e:
             error = e
             logger.error(
                 f"Error processing request: {e}",
                 exc_info=True,
-                extra={"endpoint": endpoint, "method": request.method, "path": request.url.path},
+                extra={"endpoint": endpoint, "method": method, "path": path},
             )
             raise
         finally:
-            # Calculate response time
-            end_perf = time.perf_counter()
-            response_time = (end_perf - start_perf) * 1000  # milliseconds
-
             # Record metrics
             self._record_request_metrics(
                 endpoint=endpoint,
-                method=request.method,
-                path=str(request.url.path),
-                status_code=response.status_code if response else 500,
-                response_time=response_time,
+                method=method,
+                path=path,
+                status_code=context.status_code if error is None and context.status_code else 500,
+                response_time=context.duration_ms,
                 error=error is not None,
             )
 
-        return response
-
     def _record_request_metrics(
         self,
         endpoint: str,
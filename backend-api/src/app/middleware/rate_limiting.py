@@ -1,32 +1,252 @@
-"""Rate limiting middleware using Redis."""
+"""Rate limiting middleware and the shared Redis sliding-window limiter."""
 
 import logging
+import math
 import time
-from collections.abc import Callable
+import uuid
+from dataclasses import dataclass
+from typing import Any
 
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
-from workers.redis_pool import get_redis_connection
+import redis.asyncio as aioredis
+from fastapi import Request
+from starlette.types import ASGIApp, Receive, Scope, Send
 
+from app.config import get_settings
 from app.exceptions import RateLimitExceededError
+from app.middleware.context import bind_request_context
+from app.middleware.exception_handlers import ffmpeg_backend_exception_handler
 
 logger = logging.getLogger(__name__)
 
+# Sliding log over a sorted set of request timestamps (ms), evaluated atomically.
+# Each entry has a unique member, so bursts within the same millisecond still
+# count individually. When the key is well under its limit the script reserves
+# several slots at once; the caller hands them out locally (see _Lease) and
+# releases whatever it did not use on its next call for the same key.
+#
+# KEYS[1]  sorted set for the client/endpoint
+# ARGV[1]  now (ms)            ARGV[2]  window (ms)       ARGV[3]  limit
+# ARGV[4]  member prefix       ARGV[5]  slots to reserve  ARGV[6]  reservation ceiling
+# ARGV[7+] unused members of an expired lease to release
+#
+# Returns {allowed, count, retry_after_ms, granted}
+SLIDING_WINDOW_SCRIPT = """
+local key = KEYS[1]
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local limit = tonumber(ARGV[3])
+local lease = tonumber(ARGV[5])
+local ceiling = tonumber(ARGV[6])
+
+if #ARGV > 6 then
+    redis.call('ZREM', key, unpack(ARGV, 7))
+end
+redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+local count = redis.call('ZCARD', key)
+
+if count >= limit then
+    local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+    local retry = window
+    if oldest[2] then
+        retry = tonumber(oldest[2]) + window - now
+    end
+    return {0, count, retry, 0}
+end
+
+local granted = 1
+if lease > 1 and count + lease <= ceiling then
+    granted = lease
+end
+local entries = {}
+for i = 1, granted do
+    entries[#entries + 1] = now
+    entries[#entries + 1] = ARGV[4] .. ':' .. i
+end
+redis.call('ZADD', key, unpack(entries))
+redis.call('PEXPIRE', key, window)
+return {1, count + 1, 0, granted}
+"""
+
+
+@dataclass(frozen=True)
+class RateLimitResult:
+    """Outcome of a rate limit check."""
+
+    allowed: bool
+    count: int
+    retry_after: int
+
+
+@dataclass
+class _Lease:
+    """Window slots reserved in Redis that this process may hand out locally."""
+
+    prefix: str
+    granted: int
+    first_count: int
+    expires_at: float
+    used: int = 1  # the request that reserved the lease
+
+    def unused_members(self) -> list[str]:
+        return [f"{self.prefix}:{i}" for i in range(self.used + 1, self.granted + 1)]
+
+
+class SlidingWindowRateLimiter:
+    """Async sliding-window rate limiter shared by the HTTP middlewares.
+
+    Every check is a single EVALSHA round trip. Clients that are far below
+    their limit get a few slots reserved at once, and the following requests
+    are admitted from that local lease without touching Redis. Reserved slots
+    count against the window like real requests, so the global limit holds
+    across processes; unused ones are released on the next Redis call.
+    """
+
+    def __init__(
+        self,
+        redis_client: aioredis.Redis | None = None,
+        lease_size: int = 16,
+        lease_ttl: float = 1.0,
+        lease_headroom: float = 0.5,
+        max_leases: int = 10_000,
+    ) -> None:
+        """Initialize the limiter.
+
+        Args:
+            redis_client: Async Redis client (created from settings on first use if omitted)
+            lease_size: Maximum slots reserved per Redis call for under-limit clients
+            lease_ttl: Seconds a local lease stays usable
+            lease_headroom: Fraction of the limit a reservation may fill up to
+            max_leases: Number of tracked leases before expired ones are pruned
+        """
+        self._redis = redis_client
+        self._script: Any = None
+        self.lease_size = lease_size
+        self.lease_ttl = lease_ttl
+        self.lease_headroom = lease_headroom
+        self.max_leases = max_leases
+        self._leases: dict[str, _Lease] = {}
+
+    def _get_script(self) -> Any:
+        if self._script is None:
+            if self._redis is None:
+                settings = get_settings()
+                self._redis = aioredis.from_url(
+                    str(settings.redis_url),
+                    max_connections=settings.redis_max_connections,
+                    decode_responses=True,
+                )
+            # Script objects call EVALSHA and load the script on NOSCRIPT
+            self._script = self._redis.register_script(SLIDING_WINDOW_SCRIPT)
+        return self._script
+
+    def _lease_slots(self, limit: int) -> int:
+        # Leasing only pays off when a handful of slots is a small share of the limit
+        return max(1, min(self.lease_size, limit // 20))
+
+    def _take_from_lease(self, key: str, now: float) -> RateLimitResult | None:
+        lease = self._leases.get(key)
+        if lease is None or lease.used >= lease.granted or now >= lease.expires_at:
+            return None
+        lease.used += 1
+        return RateLimitResult(allowed=True, count=lease.first_count + lease.used - 1, retry_after=0)
+
+    def _prune_leases(self, now: float) -> None:
+        if len(self._leases) < self.max_leases:
+            return
+        for key in [k for k, lease in self._leases.items() if now >= lease.expires_at]:
+            del self._leases[key]
+
+    async def hit(self, key: str, limit: int, window_seconds: int) -> RateLimitResult:
+        """Record a request against a key and report whether it is allowed.
+
+        Redis failures fail open: the request is allowed with a count of 0.
+
+        Args:
+            key: Redis key identifying the client and endpoint
+            limit: Maximum requests per window
+            window_seconds: Window length in seconds
+
+        Returns:
+            RateLimitResult: Decision, requests in the window and retry-after seconds
+        """
+        now = time.monotonic()
+        local = self._take_from_lease(key, now)
+        if local is not None:
+            return local
+
+        expired = self._leases.pop(key, None)
+        release = expired.unused_members() if expired else []
+        lease_slots = self._lease_slots(limit)
+        now_ms = int(time.time() * 1000)
+        prefix = f"{now_ms}:{uuid.uuid4().hex[:12]}"
+
+        try:
+            allowed, count, retry_ms, granted = await self._get_script()(
+                keys=[key],
+                args=[
+                    now_ms,
+                    window_seconds * 1000,
+                    limit,
+                    prefix,
+                    lease_slots,
+                    int(limit * self.lease_headroom),
+                    *release,
+                ],
+            )
+        except Exception as e:
+            logger.exception(
+                "Rate limit check failed",
+                extra={"rate_limit_key": key, "error": str(e)},
+            )
+            # On Redis failure, allow the request (fail open)
+            return RateLimitResult(allowed=True, count=0, retry_after=0)
+
+        if not allowed:
+            retry_after = max(1, math.ceil(int(retry_ms) / 1000))
+            return RateLimitResult(allowed=False, count=int(count), retry_after=retry_after)
+
+        if int(granted) > 1:
+            # A concurrent miss may replace an existing lease; its unused
+            # slots simply age out of the window
+            self._prune_leases(now)
+            self._leases[key] = _Lease(
+                prefix=prefix,
+                granted=int(granted),
+                first_count=int(count),
+                expires_at=now + self.lease_ttl,
+            )
+        return RateLimitResult(allowed=True, count=int(count), retry_after=0)
+
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
+_rate_limiter: SlidingWindowRateLimiter | None = None
+
+
+def get_rate_limiter() -> SlidingWindowRateLimiter:
+    """Get the process-wide rate limiter shared by all middlewares.
+
+    Returns:
+        SlidingWindowRateLimiter: Shared limiter instance
+    """
+    global _rate_limiter
+    if _rate_limiter is None:
+        _rate_limiter = SlidingWindowRateLimiter()
+    return _rate_limiter
+
+
+class RateLimitMiddleware:
     """Middleware to enforce rate limits using Redis."""
 
-    def __init__(self, app, requests_per_minute: int = 10) -> None:
+    def __init__(self, app: ASGIApp, requests_per_minute: int = 10) -> None:
         """Initialize rate limit middleware.
 
         Args:
-            app: FastAPI application
+            app: ASGI application
             requests_per_minute: Maximum requests allowed per minute (default: 10)
         """
-        super().__init__(app)
+        self.app = app
         self.requests_per_minute = requests_per_minute
         self.window_seconds = 60  # 1 minute window
-        self._redis = get_redis_connection()
+        self._limiter = get_rate_limiter()
 
         logger.info(
             "Rate limit middleware initialized",
@@ -82,10 +302,10 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
         # Could implement separate limits for GET if needed
         return False
 
-    def _check_rate_limit(self, client_id: str, endpoint: str) -> tuple[bool, int, int]:
+    async def _check_rate_limit(self, client_id: str, endpoint: str) -> tuple[bool, int, int]:
         """Check if client has exceeded rate limit.
 
-        Uses sliding window algorithm with Redis.
+        Uses the shared sliding-window limiter.
 
         Args:
             client_id: Unique client identifier
@@ -94,78 +314,35 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
         Returns:
             tuple: (is_allowed, current_count, retry_after_seconds)
         """
-        try:
-            # Create unique key for this client and endpoint
-            key = f"rate_limit:{client_id}:{endpoint}"
-            current_time = int(time.time())
-            window_start = current_time - self.window_seconds
-
-            # Use Redis sorted set for sliding window
-            pipe = self._redis.pipeline()
-
-            # Remove old entries outside the window
-            pipe.zremrangebyscore(key, 0, window_start)
-
-            # Count requests in current window
-            pipe.zcard(key)
-
-            # Add current request
-            pipe.zadd(key, {str(current_time): current_time})
-
-            # Set expiration on the key
-            pipe.expire(key, self.window_seconds + 10)
-
-            results = pipe.execute()
-
-            # Get count after removing old entries
-            request_count = results[1]
-
-            if request_count >= self.requests_per_minute:
-                # Calculate retry after time
-                # Get oldest request in window
-                oldest_in_window = self._redis.zrange(key, 0, 0, withscores=True)
-                if oldest_in_window:
-                    oldest_time = int(oldest_in_window[0][1])
-                    retry_after = self.window_seconds - (current_time - oldest_time)
-                    retry_after = max(1, retry_after)  # At least 1 second
-                else:
-                    retry_after = self.window_seconds
-
-                # Remove the current request since we're rejecting it
-                self._redis.zrem(key, str(current_time))
-
-                return False, request_count, retry_after
-
-            return True, request_count + 1, 0
-
-        except Exception as e:
-            logger.exception(
-                "Rate limit check failed",
-                extra={"client_id": client_id, "error": str(e)},
-            )
-            # On Redis failure, allow the request (fail open)
-            return True, 0, 0
+        result = await self._limiter.hit(
+            f"rate_limit:{client_id}:{endpoint}",
+            self.requests_per_minute,
+            self.window_seconds,
+        )
+        return result.allowed, result.count, result.retry_after
 
-    async def dispatch(
-        self,
-        request: Request,
-        call_next: Callable[[Request], Response],
-    ) -> Response:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """Check rate limits before processing request.
 
+        Rejected requests get a 429 response with a Retry-After header.
+
         Args:
-            request: FastAPI request
-            call_next: Next middleware/endpoint
+            scope: ASGI scope
+            receive: ASGI receive callable
+            send: ASGI send callable
+        """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-        Returns:
-            Response: HTTP response
+        request = Request(scope)
 
-        Raises:
-            RateLimitExceededError: If rate limit is exceeded
-        """
         # Check if this endpoint should be rate limited
         if not self._should_rate_limit(request):
-            return await call_next(request)
+            await self.app(scope, receive, send)
+            return
+
+        context, send = bind_request_context(scope, send)
 
         # Get client identifier
         client_id = self._get_client_identifier(request)
@@ -174,7 +351,7 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
         endpoint = f"{request.method}:{request.url.path}"
 
         # Check rate limit
-        is_allowed, current_count, retry_after = self._check_rate_limit(client_id, endpoint)
+        is_allowed, current_count, retry_after = await self._check_rate_limit(client_id, endpoint)
 
         if not is_allowed:
             logger.warning(
@@ -188,20 +365,23 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
                 },
             )
 
-            raise RateLimitExceededError(
-                limit=self.requests_per_minute,
-                window=self.window_seconds,
-                retry_after=retry_after,
+            response = await ffmpeg_backend_exception_handler(
+                request,
+                RateLimitExceededError(
+                    limit=self.requests_per_minute,
+                    window=self.window_seconds,
+                    retry_after=retry_after,
+                ),
             )
-
-        # Add rate limit headers to response
-        response = await call_next(request)
+            response.headers["Retry-After"] = str(retry_after)
+            await response(scope, receive, send)
+            return
 
         # Add rate limit info to response headers
-        response.headers["X-RateLimit-Limit"] = str(self.requests_per_minute)
-        response.headers["X-RateLimit-Remaining"] = str(
-            max(0, self.requests_per_minute - current_count)
+        context.add_response_header("X-RateLimit-Limit", str(self.requests_per_minute))
+        context.add_response_header(
+            "X-RateLimit-Remaining", str(max(0, self.requests_per_minute - current_count))
         )
-        response.headers["X-RateLimit-Reset"] = str(int(time.time()) + self.window_seconds)
+        context.add_response_header("X-RateLimit-Reset", str(int(time.time()) + self.window_seconds))
 
-        return response
+        await self.app(scope, receive, send)
@@ -1,13 +1,13 @@
 """Request ID middleware for tracking requests through the system."""
 
 import uuid
-from collections.abc import Callable
 from contextvars import ContextVar
 
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 from ..logging_config import clear_context, set_request_id
+from .context import bind_request_context
 
 # Context variable to store request ID
 request_id_var: ContextVar[str] = ContextVar("request_id", default="")
@@ -22,26 +22,34 @@ def get_request_id() -> str:
     return request_id_var.get()
 
 
-class RequestIDMiddleware(BaseHTTPMiddleware):
+class RequestIDMiddleware:
     """Middleware to add unique request ID to each request."""
 
-    async def dispatch(
-        self, request: Request, call_next: Callable[[Request], Response]
-    ) -> Response:
-        """Process request and add request ID header.
+    def __init__(self, app: ASGIApp) -> None:
+        """Initialize request ID middleware.
 
         Args:
-            request: Incoming HTTP request
-            call_next: Next middleware or route handler
+            app: ASGI application
+        """
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Assign a request ID and add it to the response headers.
 
-        Returns:
-            Response: HTTP response with X-Request-ID header
+        Args:
+            scope: ASGI scope
+            receive: ASGI receive callable
+            send: ASGI send callable
         """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
         # Clear previous request context
         clear_context()
 
         # Try to get request ID from header, otherwise generate new one
-        request_id = request.headers.get("X-Request-ID", str(uuid.uuid4()))
+        request_id = Headers(scope=scope).get("X-Request-ID") or str(uuid.uuid4())
 
         # Store in context variable for use in logging and error handling
         request_id_var.set(request_id)
@@ -49,10 +57,10 @@ class RequestIDMiddleware(BaseHTTPMiddleware):
         # Also set in logging context for structured logging
         set_request_id(request_id)
 
-        # Process request
-        response = await call_next(request)
-
-        # Add request ID to response headers
-        response.headers["X-Request-ID"] = request_id
+        # Share with handlers (request.state.request_id) and other middleware
+        context, send = bind_request_context(scope, send)
+        context.request_id = request_id
+        scope["state"]["request_id"] = request_id
+        context.add_response_header("X-Request-ID", request_id)
 
-        return response
+        await self.app(scope, receive, send)
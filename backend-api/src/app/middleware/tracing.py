@@ -0,0 +1,49 @@
+"""Middleware opening a trace span for each HTTP request."""
+
+from services.tracing import TRACEPARENT_HEADER, continue_trace, span
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.middleware.context import bind_request_context
+
+
+class TracingMiddleware:
+    """
+    Middleware wrapping each request in an "http.request" span.
+
+    An incoming traceparent header is continued, so a caller's trace carries
+    on through the API and, via RQ job meta, into the workers.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        """Initialize tracing middleware.
+
+        Args:
+            app: ASGI application
+        """
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Run the request inside a span.
+
+        Args:
+            scope: ASGI scope
+            receive: ASGI receive callable
+            send: ASGI send callable
+        """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        context, send = bind_request_context(scope, send)
+        carrier = {TRACEPARENT_HEADER: Headers(scope=scope).get(TRACEPARENT_HEADER, "")}
+
+        attributes = {"http.method": scope["method"], "http.target": scope["path"]}
+        with continue_trace(carrier), span("http.request", attributes) as current:
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                if context.status_code is not None:
+                    current.set_attribute("http.status_code", context.status_code)
+                if context.request_id:
+                    current.set_attribute("http.request_id", context.request_id)
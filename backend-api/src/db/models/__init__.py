@@ -2,14 +2,19 @@
 Database models.
 """
 
+from db.models.callback import CallbackOutbox, CallbackOutboxStatus
 from db.models.composition import Composition, CompositionStatus
 from db.models.folder import Folder
 from db.models.job import JobMetric, JobStatus, JobType, MetricType, ProcessingJob
 from db.models.media import MediaAsset, MediaAssetStatus, MediaAssetType
 from db.models.project import Project
+from db.models.recomposition import Recomposition, RecompositionStatus
 from db.models.user import User
 
 __all__ = [
+    # Callback models
+    "CallbackOutbox",
+    "CallbackOutboxStatus",
     # Composition models
     "Composition",
     "CompositionStatus",
@@ -28,6 +33,9 @@ __all__ = [
     "MediaAssetStatus",
     # Project models
     "Project",
+    # Recomposition models
+    "Recomposition",
+    "RecompositionStatus",
     # User models
     "User",
 ]
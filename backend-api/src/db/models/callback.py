@@ -0,0 +1,86 @@
+"""
+Callback outbox model for reliable completion notifications.
+"""
+
+import enum
+import uuid
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import CheckConstraint, DateTime, Enum, Index, Integer, String, Text, func
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from db.base import BaseModel
+
+
+class CallbackOutboxStatus(str, enum.Enum):
+    """Delivery state of an outbox entry."""
+
+    PENDING = "pending"
+    DELIVERED = "delivered"
+    FAILED = "failed"
+
+
+class CallbackOutbox(BaseModel):
+    """
+    Callback waiting to be delivered to a partner URL.
+
+    Rows are written in the same transaction as the job status change they
+    report, and delivered later by the callback delivery service, so workers
+    never wait on a partner's endpoint.
+
+    Attributes:
+        id: UUID primary key, sent as the X-Callback-ID idempotency key
+        callback_url: URL to POST the payload to
+        payload: JSON body of the callback
+        request_id: Request ID sent as X-Request-ID (optional)
+        status: Delivery state
+        attempts: Number of delivery attempts made
+        next_attempt_at: When the entry is next due (also the claim lease)
+        last_status_code: HTTP status of the last attempt
+        last_error: Error of the last failed attempt
+        delivered_at: When the callback was delivered
+    """
+
+    __tablename__ = "callback_outbox"
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+
+    callback_url: Mapped[str] = mapped_column(String(2048), nullable=False)
+    payload: Mapped[dict[str, Any]] = mapped_column(JSONB, nullable=False)
+    request_id: Mapped[str | None] = mapped_column(String(255), nullable=True)
+
+    status: Mapped[CallbackOutboxStatus] = mapped_column(
+        Enum(
+            CallbackOutboxStatus,
+            name="callback_outbox_status",
+            values_callable=lambda x: [e.value for e in x],
+        ),
+        default=CallbackOutboxStatus.PENDING,
+        nullable=False,
+    )
+
+    # Delivery scheduling
+    attempts: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    next_attempt_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+    # Last attempt outcome
+    last_status_code: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    delivered_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        # Drain query: due pending entries in schedule order
+        Index("ix_callback_outbox_status_next_attempt_at", "status", "next_attempt_at"),
+        CheckConstraint("attempts >= 0", name="ck_callback_outbox_attempts_positive"),
+    )
+
+    def __repr__(self) -> str:
+        """String representation of callback outbox entry."""
+        return (
+            f"<CallbackOutbox(id={self.id}, status={self.status.value}, "
+            f"attempts={self.attempts})>"
+        )
@@ -136,6 +136,12 @@ class MetricType(str, enum.Enum):
     QUEUE_WAIT_TIME = "queue_wait_time"
     MEMORY_USAGE = "memory_usage"
     CPU_USAGE = "cpu_usage"
+    ENCODER_CPU = "encoder_cpu"
+    ENCODER_MEMORY = "encoder_memory"
+    ENCODER_READ_BYTES = "encoder_read_bytes"
+    ENCODER_WRITE_BYTES = "encoder_write_bytes"
+    ENCODE_FPS = "encode_fps"
+    ENCODE_SPEED = "encode_speed"
 
 
 class JobMetric(BaseModel):
@@ -0,0 +1,113 @@
+"""
+Recomposition model for re-renders triggered by timeline edits.
+"""
+
+import enum
+import uuid
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import DateTime, Enum, Float, ForeignKey, Index, String, Text, text
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from db.base import BaseModel
+
+
+class RecompositionStatus(str, enum.Enum):
+    """Lifecycle state of a recomposition."""
+
+    PENDING = "pending"
+    TRIGGERED = "triggered"
+    PROCESSING = "processing"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+class Recomposition(BaseModel):
+    """
+    Re-render of a composition with an edit plan applied.
+
+    A recomposition is identified for deduplication by its composition, the
+    hash of the composition config it was built from, and the hash of the
+    edit plan's operations: while one is live (not failed or cancelled), the
+    same edit on the same config returns it instead of rendering again.
+
+    Attributes:
+        id: Recomposition ID (e.g. "recomp_<hex>")
+        composition_id: Composition being recomposed
+        generation_id: Generation job the composition belongs to
+        config_hash: SHA-256 of the composition config the edit was applied to
+        plan_hash: SHA-256 of the edit plan's operations
+        status: Current status
+        ffmpeg_job_id: FFmpeg backend job rendering it, once triggered
+        estimated_duration_seconds: FFmpeg backend's estimate of the render time
+        edit_plan: Edit plan that triggered it (JSON)
+        updated_config: Composition config sent to the FFmpeg backend (JSON)
+        triggered_at: When the FFmpeg job was triggered
+        completed_at: When it completed or failed
+        error_message: Error message if failed
+        error_details: Detailed error information
+    """
+
+    __tablename__ = "recompositions"
+
+    id: Mapped[str] = mapped_column(String(64), primary_key=True)
+
+    composition_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("compositions.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    generation_id: Mapped[str] = mapped_column(String(255), nullable=False)
+
+    # Deduplication key (with composition_id)
+    config_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    plan_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+
+    status: Mapped[RecompositionStatus] = mapped_column(
+        Enum(
+            RecompositionStatus,
+            name="recomposition_status",
+            values_callable=lambda x: [e.value for e in x],
+        ),
+        default=RecompositionStatus.PENDING,
+        nullable=False,
+        index=True,
+    )
+
+    # FFmpeg job tracking
+    ffmpeg_job_id: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    estimated_duration_seconds: Mapped[float | None] = mapped_column(Float, nullable=True)
+
+    # Edit source and result config
+    edit_plan: Mapped[dict[str, Any]] = mapped_column(JSONB, nullable=False)
+    updated_config: Mapped[dict[str, Any]] = mapped_column(JSONB, nullable=False)
+
+    triggered_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    completed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    # Error tracking
+    error_message: Mapped[str | None] = mapped_column(Text, nullable=True)
+    error_details: Mapped[dict[str, Any] | None] = mapped_column(JSONB, nullable=True)
+
+    __table_args__ = (
+        # At most one live recomposition per edit of a given config
+        Index(
+            "uq_recompositions_active_edit",
+            "composition_id",
+            "config_hash",
+            "plan_hash",
+            unique=True,
+            postgresql_where=text("status NOT IN ('failed', 'cancelled')"),
+        ),
+    )
+
+    def __repr__(self) -> str:
+        """String representation of Recomposition."""
+        return (
+            f"<Recomposition(id={self.id}, composition_id={self.composition_id}, "
+            f"status={self.status.value})>"
+        )
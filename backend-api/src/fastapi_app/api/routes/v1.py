@@ -706,6 +706,30 @@ async def store_clips(
         raise HTTPException(status_code=500, detail=f"Failed to store clips: {str(e)}")
 
 
+@api_v1_router.get("/generations/{generation_id}/events")
+async def stream_generation_events(generation_id: str, request: Request) -> StreamingResponse:
+    """
+    Stream a generation's progress as Server-Sent Events.
+
+    Sends the same events as the Socket.io room (progress, clip_completed,
+    status_change, completed, error), read from the generation's Redis Stream.
+    Per-clip Replicate job updates are appended where they are published, so
+    they arrive even with the Socket.io bridge (REDIS_BRIDGE_ENABLED) off.
+    Event IDs are stream entry IDs, so a reconnecting client resumes after
+    its Last-Event-ID header without missing events.
+    """
+    from fastapi_app.services.generation_events import get_generation_stream_hub
+
+    last_event_id = request.headers.get("last-event-id") or request.query_params.get("last_event_id")
+    hub = get_generation_stream_hub()
+
+    return StreamingResponse(
+        hub.events(generation_id, last_event_id=last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @api_v1_router.get("/generations/{generation_id}", response_model=GenerationResponse)
 async def get_generation(generation_id: str, request: Request) -> GenerationResponse:
     """
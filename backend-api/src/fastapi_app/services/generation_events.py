@@ -0,0 +1,431 @@
+"""
+Generation Events - Per-generation Redis Streams behind the SSE progress endpoint
+
+Every generation update is appended to the Redis Stream
+`generation:{generation_id}:events`. Stream entry IDs double as SSE event IDs,
+so a client that reconnects with Last-Event-ID replays what it missed from
+the stream.
+
+Each API process reads only the streams of generations it has SSE clients
+for, with a single XREAD over all of them, instead of pattern-subscribing to
+every job's progress.
+"""
+
+import asyncio
+import json
+import logging
+import weakref
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+
+import redis.asyncio as aioredis
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Seconds between SSE comment frames that keep idle connections open
+SSE_HEARTBEAT_SECONDS = 15.0
+
+# Events buffered per client before it is disconnected to resume from the stream
+SUBSCRIBER_QUEUE_SIZE = 1000
+
+StreamEntry = Tuple[str, Dict[str, str]]
+
+
+def generation_stream_key(generation_id: str) -> str:
+    """Redis Stream key holding a generation's events"""
+    return f"generation:{generation_id}:events"
+
+
+def _entry_id(entry_id: str) -> Tuple[int, int]:
+    """Sortable form of a stream entry ID ("<ms>-<seq>")"""
+    ms, _, seq = entry_id.partition("-")
+    return int(ms), int(seq or 0)
+
+
+async def append_generation_event(
+    generation_id: str,
+    event: str,
+    data: Dict[str, Any],
+    hub: Optional["GenerationStreamHub"] = None,
+) -> Optional[str]:
+    """
+    Append an event to a generation's stream
+
+    Args:
+        generation_id: Generation ID
+        event: Event name (same names as the Socket.io events)
+        data: Event payload
+        hub: Stream hub whose Redis client is used (default: the process-wide hub)
+
+    Returns:
+        Stream entry ID, or None if the event could not be stored
+    """
+    return await (hub or get_generation_stream_hub()).append(generation_id, event, data)
+
+
+def job_update_events(
+    update: Dict[str, Any], job_data: Dict[str, Any]
+) -> List[Tuple[str, Dict[str, Any]]]:
+    """
+    Generation events for one clip job's update
+
+    The Socket.io bridge and the generation streams both use this, so SSE
+    clients get the same per-clip events as the Socket.io room.
+
+    Args:
+        update: Job update as published on job:progress:{job_id}
+        job_data: The job's ai_job:{job_id} entry (clip_index, total_clips)
+
+    Returns:
+        List of (event, payload); payload keys are the emit_* arguments
+    """
+    status = update.get("status")
+    clip = {
+        "clip_number": job_data.get("clip_index", 0),
+        "total_clips": job_data.get("total_clips", 1),
+    }
+
+    if status == "succeeded":
+        done = {
+            "step": "completed",
+            **clip,
+            "percentage": 100.0,
+            "message": "Clip generated successfully",
+        }
+        events = [("progress", done)]
+        if (update.get("result") or {}).get("url"):
+            # Raw job updates carry no clip ID, thumbnail or duration
+            completed = {"clip_id": update.get("jobId"), "thumbnail_url": "", "duration": 0.0}
+            events.append(("clip_completed", completed))
+        return events
+
+    if status == "failed":
+        error = {
+            "code": "GENERATION_FAILED",
+            "message": update.get("error", "Unknown error"),
+            "recoverable": True,
+        }
+        return [("error", error)]
+
+    progress = update.get("progress", 0)
+    running = {
+        "step": "generating",
+        **clip,
+        "percentage": float(progress) if progress else 0.0,
+        "message": update.get("message", status),
+    }
+    return [("progress", running)]
+
+
+async def append_job_update(
+    job_id: str,
+    update: Dict[str, Any],
+    hub: Optional["GenerationStreamHub"] = None,
+) -> List[str]:
+    """
+    Append a clip job's update to the stream of the generation it belongs to
+
+    The generation is looked up from the job's ai_job:{job_id} entry; jobs
+    outside a generation have no stream and are skipped.
+
+    Args:
+        job_id: Replicate prediction ID
+        update: Job update as published on job:progress:{job_id}
+        hub: Stream hub whose Redis client is used (default: the process-wide hub)
+
+    Returns:
+        Entry IDs of the appended events
+    """
+    hub = hub or get_generation_stream_hub()
+    try:
+        job_data_str = await hub.redis.get(f"ai_job:{job_id}")
+        job_data = json.loads(job_data_str) if job_data_str else {}
+    except Exception as e:
+        logger.error(f"Failed to look up generation of job {job_id}: {str(e)}")
+        return []
+
+    generation_id = job_data.get("generation_id")
+    if not generation_id:
+        return []
+
+    entry_ids = []
+    for event, payload in job_update_events(update, job_data):
+        entry_id = await hub.append(generation_id, event, payload)
+        if entry_id is not None:
+            entry_ids.append(entry_id)
+    return entry_ids
+
+
+def format_sse(entry_id: str, fields: Dict[str, str]) -> str:
+    """Format a stream entry as an SSE frame"""
+    return f"id: {entry_id}\nevent: {fields.get('event', 'message')}\ndata: {fields.get('data', '{}')}\n\n"
+
+
+class GenerationStreamHub:
+    """
+    Fans generation streams out to the SSE clients of this process
+
+    A single reader task XREADs the streams of all locally watched
+    generations and pushes entries to each client's queue. A generation's
+    stream is read only while at least one local client watches it, and the
+    reader stops when nobody is watching.
+    """
+
+    def __init__(
+        self,
+        redis_client: Optional[aioredis.Redis] = None,
+        block_ms: int = 1000,
+        batch_size: int = 100,
+    ):
+        """
+        Initialize the hub
+
+        Args:
+            redis_client: Async Redis client (default: created from settings.redis_url)
+            block_ms: Longest a read blocks before picking up newly watched generations
+            batch_size: Entries read per stream per XREAD
+        """
+        self._redis = redis_client
+        self.block_ms = block_ms
+        self.batch_size = batch_size
+
+        # generation_id -> client queues, and the last entry ID read for it
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._cursors: Dict[str, str] = {}
+        self._reader: Optional[asyncio.Task] = None
+
+        # Serializes the first subscribers of a generation; a lock lives only
+        # while a subscribe holds or waits for it
+        self._subscribe_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = (
+            weakref.WeakValueDictionary()
+        )
+
+    @property
+    def redis(self) -> aioredis.Redis:
+        if self._redis is None:
+            self._redis = aioredis.from_url(
+                str(settings.redis_url), encoding="utf-8", decode_responses=True
+            )
+        return self._redis
+
+    async def append(self, generation_id: str, event: str, data: Dict[str, Any]) -> Optional[str]:
+        """
+        Append an event to a generation's stream
+
+        The stream is trimmed to about `generation_stream_maxlen` entries and
+        its TTL refreshed in the same round trip.
+
+        Args:
+            generation_id: Generation ID
+            event: Event name (same names as the Socket.io events)
+            data: Event payload
+
+        Returns:
+            Stream entry ID, or None if the event could not be stored
+        """
+        try:
+            key = generation_stream_key(generation_id)
+
+            pipe = self.redis.pipeline(transaction=False)
+            pipe.xadd(
+                key,
+                {"event": event, "data": json.dumps(data)},
+                maxlen=settings.generation_stream_maxlen,
+                approximate=True,
+            )
+            pipe.expire(key, settings.generation_stream_ttl_seconds)
+            entry_id, _ = await pipe.execute()
+            return entry_id
+        except Exception as e:
+            logger.error(f"Failed to append {event} event for generation {generation_id}: {str(e)}")
+            return None
+
+    def watched_generations(self) -> List[str]:
+        """Generations with at least one local client"""
+        return list(self._subscribers)
+
+    async def subscribe(self, generation_id: str) -> asyncio.Queue:
+        """
+        Start receiving a generation's new events
+
+        Args:
+            generation_id: Generation ID
+
+        Returns:
+            Queue of (entry_id, fields) entries appended from now on; None is
+            queued if the client falls too far behind and must resume
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+
+        lock = self._subscribe_locks.get(generation_id)
+        if lock is None:
+            lock = self._subscribe_locks[generation_id] = asyncio.Lock()
+
+        async with lock:
+            if generation_id not in self._cursors:
+                # Start reading after the current tail, so nothing appended from
+                # here on is missed even before the reader picks the stream up.
+                # Concurrent first subscribers wait here and share this cursor.
+                tail = await self.redis.xrevrange(generation_stream_key(generation_id), count=1)
+                self._cursors[generation_id] = tail[0][0] if tail else "0-0"
+                self._subscribers[generation_id] = set()
+
+            self._subscribers[generation_id].add(queue)
+
+        if self._reader is None or self._reader.done():
+            self._reader = asyncio.create_task(self._read_loop())
+
+        return queue
+
+    def unsubscribe(self, generation_id: str, queue: asyncio.Queue) -> None:
+        """Stop delivering a generation's events to a queue"""
+        queues = self._subscribers.get(generation_id)
+        if queues is None:
+            return
+
+        queues.discard(queue)
+        if not queues:
+            del self._subscribers[generation_id]
+            self._cursors.pop(generation_id, None)
+
+    async def replay(self, generation_id: str, after_id: str) -> List[StreamEntry]:
+        """
+        Events appended to a generation's stream after an entry ID
+
+        Args:
+            generation_id: Generation ID
+            after_id: Last entry ID the client received
+
+        Returns:
+            List of (entry_id, fields), oldest first
+        """
+        return await self.redis.xrange(generation_stream_key(generation_id), min=f"({after_id}")
+
+    async def events(
+        self, generation_id: str, last_event_id: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """
+        SSE frames for a generation, resuming after `last_event_id`
+
+        Args:
+            generation_id: Generation ID
+            last_event_id: Last-Event-ID sent by a reconnecting client
+
+        Yields:
+            SSE frames, with comment frames while idle
+        """
+        if last_event_id:
+            try:
+                _entry_id(last_event_id)
+            except ValueError:
+                logger.warning(f"Ignoring malformed Last-Event-ID {last_event_id!r}")
+                last_event_id = None
+
+        queue = await self.subscribe(generation_id)
+        try:
+            last_seen = (0, 0)
+            if last_event_id:
+                # Subscribed first, so live entries queued meanwhile are
+                # only skipped, never lost
+                for entry_id, fields in await self.replay(generation_id, last_event_id):
+                    yield format_sse(entry_id, fields)
+                    last_seen = _entry_id(entry_id)
+
+            while True:
+                try:
+                    entry = await asyncio.wait_for(queue.get(), timeout=SSE_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+
+                if entry is None:
+                    logger.warning(
+                        f"SSE client for generation {generation_id} fell behind, closing"
+                    )
+                    return
+
+                entry_id, fields = entry
+                if _entry_id(entry_id) <= last_seen:
+                    continue
+                yield format_sse(entry_id, fields)
+                last_seen = _entry_id(entry_id)
+        finally:
+            self.unsubscribe(generation_id, queue)
+
+    async def _read_loop(self) -> None:
+        """Read watched streams and deliver entries until nobody is watching"""
+        logger.info("Generation stream reader started")
+
+        while self._cursors:
+            streams = {
+                generation_stream_key(generation_id): cursor
+                for generation_id, cursor in self._cursors.items()
+            }
+            try:
+                response = await self.redis.xread(
+                    streams, count=self.batch_size, block=self.block_ms
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Generation stream read failed: {str(e)}")
+                await asyncio.sleep(1)
+                continue
+
+            for key, entries in response or []:
+                generation_id = key.split(":", 1)[1].rsplit(":", 1)[0]
+                cursor = self._cursors.get(generation_id)
+                if cursor is None:
+                    continue
+
+                # A generation re-watched during the read starts at a newer cursor
+                entries = [entry for entry in entries if _entry_id(entry[0]) > _entry_id(cursor)]
+                if not entries:
+                    continue
+
+                self._cursors[generation_id] = entries[-1][0]
+                for queue in list(self._subscribers.get(generation_id, ())):
+                    self._deliver(queue, entries)
+
+        logger.info("Generation stream reader stopped")
+
+    @staticmethod
+    def _deliver(queue: asyncio.Queue, entries: List[StreamEntry]) -> None:
+        for entry in entries:
+            try:
+                queue.put_nowait(entry)
+            except asyncio.QueueFull:
+                # Drop the backlog and tell the client to reconnect; it
+                # resumes from the stream with its Last-Event-ID
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(None)
+                return
+
+    async def close(self) -> None:
+        """Stop the reader and close the Redis client"""
+        self._subscribers.clear()
+        self._cursors.clear()
+
+        if self._reader and not self._reader.done():
+            self._reader.cancel()
+            try:
+                await self._reader
+            except asyncio.CancelledError:
+                pass
+
+        if self._redis is not None:
+            await self._redis.close()
+            self._redis = None
+
+
+# Global instance
+_generation_stream_hub: Optional[GenerationStreamHub] = None
+
+
+def get_generation_stream_hub() -> GenerationStreamHub:
+    """Get or create the process-wide generation stream hub"""
+    global _generation_stream_hub
+    if _generation_stream_hub is None:
+        _generation_stream_hub = GenerationStreamHub()
+    return _generation_stream_hub
@@ -9,6 +9,7 @@ from typing import Optional
 
 import redis.asyncio as aioredis
 from app.config import settings
+from fastapi_app.services.generation_events import job_update_events
 from fastapi_app.services.websocket_manager import get_websocket_manager
 
 logger = logging.getLogger(__name__)
@@ -113,7 +114,6 @@ class RedisBridge:
                 
             data = json.loads(data_str)
             job_id = data.get("jobId")
-            status = data.get("status")
             
             if not job_id:
                 return
@@ -129,58 +129,15 @@ class RedisBridge:
                 logger.debug(f"No generation_id found for job {job_id}, skipping broadcast")
                 return
                 
-            clip_index = job_data.get("clip_index", 0)
-            total_clips = job_data.get("total_clips", 1)
-            
             logger.debug(f"Forwarding Redis update for job {job_id} to generation {generation_id}")
-            
-            # Map status to Socket.io events
-            if status == "succeeded":
-                # Job succeeded, but we might not be "done" with the whole generation
-                # For now, just emit progress 100%
-                result = data.get("result", {})
-                video_url = result.get("url")
-                
-                await self.ws_manager.emit_progress(
-                    generation_id=generation_id,
-                    step="completed", 
-                    clip_number=clip_index,
-                    total_clips=total_clips,
-                    percentage=100.0,
-                    message="Clip generated successfully"
-                )
-                
-                if video_url:
-                    # Also emit clip_completed
-                    await self.ws_manager.emit_clip_completed(
-                        generation_id=generation_id,
-                        clip_id=job_id, # Use job_id as clip_id for now
-                        thumbnail_url="", # No thumbnail in raw update
-                        duration=0.0 # No duration in raw update
-                    )
-
-            elif status == "failed":
-                error_msg = data.get("error", "Unknown error")
-                await self.ws_manager.emit_error(
-                    generation_id=generation_id,
-                    code="GENERATION_FAILED",
-                    message=error_msg,
-                    recoverable=True
-                )
-                
-            else:
-                # Processing/Starting
-                progress = data.get("progress", 0)
-                msg = data.get("message", status)
-                
-                await self.ws_manager.emit_progress(
-                    generation_id=generation_id,
-                    step="generating",
-                    clip_number=clip_index,
-                    total_clips=total_clips,
-                    percentage=float(progress) if progress else 0.0,
-                    message=msg
-                )
+
+            emitters = {
+                "progress": self.ws_manager.emit_progress,
+                "clip_completed": self.ws_manager.emit_clip_completed,
+                "error": self.ws_manager.emit_error,
+            }
+            for event, payload in job_update_events(data, job_data):
+                await emitters[event](generation_id=generation_id, **payload)
 
         except Exception as e:
             logger.error(f"Error handling Redis message: {e}", exc_info=True)
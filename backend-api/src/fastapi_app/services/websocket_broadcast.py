@@ -6,6 +6,7 @@ import logging
 import json
 from datetime import datetime
 from typing import Optional, Any, Dict
+from fastapi_app.services.generation_events import append_generation_event
 from fastapi_app.services.websocket_manager import get_websocket_manager
 from workers.redis_pool import get_redis_connection
 
@@ -60,7 +61,16 @@ async def broadcast_progress(
             message=message
         )
         
-        # 2. Publish to Redis for Raw WebSocket clients (legacy path)
+        # 2. Append to the generation's event stream (SSE clients)
+        await append_generation_event(generation_id, "progress", {
+            "step": step,
+            "clip_number": clip_number,
+            "total_clips": total_clips,
+            "percentage": percentage,
+            "message": message
+        })
+
+        # 3. Publish to Redis for Raw WebSocket clients (legacy path)
         _publish_legacy_update(generation_id, {
             "event": "job.processing",
             "jobId": generation_id,
@@ -100,7 +110,14 @@ async def broadcast_clip_completed(
             duration=duration
         )
         
-        # 2. Publish to Redis (legacy)
+        # 2. Append to the generation's event stream (SSE clients)
+        await append_generation_event(generation_id, "clip_completed", {
+            "clip_id": clip_id,
+            "thumbnail_url": thumbnail_url,
+            "duration": duration
+        })
+
+        # 3. Publish to Redis (legacy)
         # Note: Frontend doesn't have specific handler for individual clips yet,
         # but we can send a progress update
         _publish_legacy_update(generation_id, {
@@ -143,7 +160,14 @@ async def broadcast_status_change(
             message=message
         )
         
-        # 2. Publish to Redis (legacy)
+        # 2. Append to the generation's event stream (SSE clients)
+        await append_generation_event(generation_id, "status_change", {
+            "old_status": old_status,
+            "new_status": new_status,
+            "message": message
+        })
+
+        # 3. Publish to Redis (legacy)
         # Map status to what frontend expects
         frontend_status = new_status
         if new_status == "processing":
@@ -191,7 +215,14 @@ async def broadcast_completed(
             duration=duration
         )
         
-        # 2. Publish to Redis (legacy)
+        # 2. Append to the generation's event stream (SSE clients)
+        await append_generation_event(generation_id, "completed", {
+            "video_url": video_url,
+            "thumbnail_url": thumbnail_url,
+            "duration": duration
+        })
+
+        # 3. Publish to Redis (legacy)
         _publish_legacy_update(generation_id, {
             "event": "job.succeeded",
             "jobId": generation_id,
@@ -237,7 +268,14 @@ async def broadcast_error(
             recoverable=recoverable
         )
         
-        # 2. Publish to Redis (legacy)
+        # 2. Append to the generation's event stream (SSE clients)
+        await append_generation_event(generation_id, "error", {
+            "code": code,
+            "message": message,
+            "recoverable": recoverable
+        })
+
+        # 3. Publish to Redis (legacy)
         _publish_legacy_update(generation_id, {
             "event": "job.failed",
             "jobId": generation_id,
@@ -7,6 +7,7 @@ when clip processing completes, with retry logic and signature verification.
 
 import hashlib
 import hmac
+import json
 import logging
 import time
 from dataclasses import dataclass
@@ -75,12 +76,66 @@ class CallbackNotifierError(Exception):
     pass
 
 
+def sign_payload(payload: dict[str, Any], secret: str) -> str:
+    """Generate the HMAC signature header value for a callback payload.
+
+    Args:
+        payload: Callback payload dict
+        secret: Webhook secret key
+
+    Returns:
+        str: Signature in the format "sha256=<hex>"
+    """
+    # Serialize payload to JSON (deterministic)
+    payload_bytes = json.dumps(payload, sort_keys=True).encode("utf-8")
+
+    # Generate HMAC-SHA256 signature
+    signature = hmac.new(
+        secret.encode("utf-8"),
+        payload_bytes,
+        hashlib.sha256,
+    ).hexdigest()
+
+    return f"sha256={signature}"
+
+
+def build_processing_complete_payload(
+    request_id: str,
+    results: list[dict[str, Any]],
+) -> dict[str, Any]:
+    """Build the payload reporting completed clip processing.
+
+    Args:
+        request_id: Original request ID
+        results: List of processing results
+
+    Returns:
+        dict: Callback payload
+    """
+    # Count successful and failed clips
+    successful = sum(1 for r in results if r.get("status") == "completed")
+    failed = sum(1 for r in results if r.get("status") == "failed")
+
+    return {
+        "request_id": request_id,
+        "completed_at": datetime.now(UTC).isoformat(),
+        "results": results,
+        "total_successful": successful,
+        "total_failed": failed,
+    }
+
+
 class CallbackNotifier:
     """
     Service for sending HTTP callbacks to AI Backend.
 
     Implements retry logic with exponential backoff, webhook signature
     verification, and timeout handling.
+
+    Retries sleep in the calling thread, so a worker sending through this
+    class is held for the whole backoff schedule. Workers should write to the
+    callback outbox (services.callback_outbox) instead and let the delivery
+    service retry.
     """
 
     def __init__(
@@ -319,19 +374,7 @@ class CallbackNotifier:
         Returns:
             str: Hex-encoded HMAC signature
         """
-        import json
-
-        # Serialize payload to JSON (deterministic)
-        payload_bytes = json.dumps(payload, sort_keys=True).encode("utf-8")
-
-        # Generate HMAC-SHA256 signature
-        signature = hmac.new(
-            self.webhook_secret.encode("utf-8"),
-            payload_bytes,
-            hashlib.sha256,
-        ).hexdigest()
-
-        return f"sha256={signature}"
+        return sign_payload(payload, self.webhook_secret)
 
     @staticmethod
     def verify_signature(
@@ -349,23 +392,11 @@ class CallbackNotifier:
         Returns:
             bool: True if signature is valid
         """
-        import json
-
         if not signature.startswith("sha256="):
             return False
 
-        expected_sig = signature[7:]  # Remove "sha256=" prefix
-
-        # Generate expected signature
-        payload_bytes = json.dumps(payload, sort_keys=True).encode("utf-8")
-        calculated_sig = hmac.new(
-            secret.encode("utf-8"),
-            payload_bytes,
-            hashlib.sha256,
-        ).hexdigest()
-
         # Compare using constant-time comparison
-        return hmac.compare_digest(expected_sig, calculated_sig)
+        return hmac.compare_digest(signature, sign_payload(payload, secret))
 
     def _calculate_retry_delay(self, retry_count: int) -> float:
         """Calculate retry delay using exponential backoff.
@@ -407,18 +438,7 @@ class CallbackNotifier:
         Returns:
             CallbackResult with delivery details
         """
-        # Count successful and failed clips
-        successful = sum(1 for r in results if r.get("status") == "completed")
-        failed = sum(1 for r in results if r.get("status") == "failed")
-
-        # Build callback payload
-        payload = {
-            "request_id": request_id,
-            "completed_at": datetime.now(UTC).isoformat(),
-            "results": results,
-            "total_successful": successful,
-            "total_failed": failed,
-        }
+        payload = build_processing_complete_payload(request_id, results)
 
         return self.send_callback(
             callback_url=callback_url,
@@ -0,0 +1,576 @@
+"""
+Outbox-based callback delivery.
+
+Workers record callbacks in the callback_outbox table in the same transaction
+as the job status change they report (enqueue_callback), and return as soon
+as the render is done. CallbackDeliveryService drains the table from the API
+process: it claims due entries, delivers them concurrently over one pooled
+HTTP client with a global and a per-host concurrency limit and a circuit
+breaker per host, records each entry's outcome as soon as it is known, and
+schedules retries with exponential backoff in the table rather than sleeping.
+
+Delivery is at least once; every request carries the outbox entry ID in
+X-Callback-ID so receivers can discard duplicates.
+"""
+
+import asyncio
+import logging
+import math
+import random
+import time
+import uuid
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from typing import Any
+from urllib.parse import urlsplit
+
+import httpx
+from app.config import get_settings
+from db.models.callback import CallbackOutbox, CallbackOutboxStatus
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from services.callback_notifier import sign_payload
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_callback(
+    session: Session | AsyncSession,
+    callback_url: str,
+    payload: dict[str, Any],
+    request_id: str | None = None,
+) -> CallbackOutbox:
+    """Add a callback to the outbox in the caller's transaction.
+
+    Nothing is sent here; the entry becomes visible to the delivery service
+    when the caller commits, so the callback is recorded if and only if the
+    state change it reports is.
+
+    Args:
+        session: Open database session (sync or async)
+        callback_url: URL to POST the payload to
+        payload: Callback payload dict
+        request_id: Optional request ID for tracking
+
+    Returns:
+        CallbackOutbox: The pending entry
+    """
+    entry = CallbackOutbox(
+        id=uuid.uuid4(),
+        callback_url=callback_url,
+        payload=payload,
+        request_id=request_id,
+        status=CallbackOutboxStatus.PENDING,
+        attempts=0,
+        next_attempt_at=datetime.now(UTC),
+    )
+    session.add(entry)
+
+    logger.info(
+        "Callback queued in outbox",
+        extra={
+            "callback_id": str(entry.id),
+            "callback_url": callback_url,
+            "request_id": request_id,
+        },
+    )
+
+    return entry
+
+
+class HostCircuitBreaker:
+    """
+    Circuit breaker for one callback host.
+
+    After `failure_threshold` consecutive failures the circuit opens and no
+    requests are sent to the host for `reset_timeout` seconds. Then a single
+    trial request is let through (half-open): success closes the circuit,
+    failure opens it again.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize circuit breaker.
+
+        Args:
+            failure_threshold: Consecutive failures that open the circuit
+            reset_timeout: Seconds the circuit stays open
+            clock: Monotonic time source
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self.consecutive_failures = 0
+        self.opened_at: float | None = None
+        self._trial_in_flight = False
+
+    @property
+    def is_open(self) -> bool:
+        """Whether requests to the host are currently blocked."""
+        return self.opened_at is not None and (
+            self._trial_in_flight or self._clock() - self.opened_at < self.reset_timeout
+        )
+
+    @property
+    def retry_after(self) -> float:
+        """Seconds until the host may be tried again."""
+        if self.opened_at is None:
+            return 0.0
+        remaining = self.opened_at + self.reset_timeout - self._clock()
+        # Past the timeout the host is blocked only by an in-flight trial; if
+        # the trial fails the next one is a full interval away
+        return remaining if remaining > 0 else self.reset_timeout
+
+    def allow_request(self) -> bool:
+        """Check whether a request may be sent, claiming the half-open trial."""
+        if self.opened_at is None:
+            return True
+        if self.is_open:
+            return False
+        self._trial_in_flight = True
+        return True
+
+    def release_trial(self) -> None:
+        """Give back a half-open trial that sent no request."""
+        self._trial_in_flight = False
+
+    def record_success(self) -> None:
+        """Record a delivered request and close the circuit."""
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        """Record a failed request, opening the circuit at the threshold."""
+        self.consecutive_failures += 1
+        if self._trial_in_flight or self.consecutive_failures >= self.failure_threshold:
+            self.opened_at = self._clock()
+        self._trial_in_flight = False
+
+
+@dataclass
+class ClaimedCallback:
+    """
+    Snapshot of an outbox entry claimed for delivery.
+
+    Attributes:
+        id: Outbox entry ID
+        callback_url: URL to POST the payload to
+        payload: Callback payload
+        request_id: Optional request ID
+        attempts: Attempts made before this one
+    """
+
+    id: uuid.UUID
+    callback_url: str
+    payload: dict[str, Any]
+    request_id: str | None
+    attempts: int
+
+
+@dataclass
+class DeliveryOutcome:
+    """
+    Result of one delivery attempt.
+
+    Attributes:
+        callback: The claimed entry
+        delivered: Whether the receiver accepted the callback (2xx)
+        attempted: Whether a request was sent (False when the circuit was open)
+        status_code: HTTP status code, if a response was received
+        error: Error message if not delivered
+        retry_after: Seconds to wait before the next attempt
+    """
+
+    callback: ClaimedCallback
+    delivered: bool
+    attempted: bool = True
+    status_code: int | None = None
+    error: str | None = None
+    retry_after: float | None = None
+
+
+class CallbackDeliveryService:
+    """
+    Drains the callback outbox.
+
+    Example:
+        >>> service = CallbackDeliveryService()
+        >>> await service.start()   # on application startup
+        >>> await service.stop()    # on application shutdown
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession] | None = None,
+        webhook_secret: str | None = None,
+        max_attempts: int | None = None,
+        concurrency: int | None = None,
+        per_host_concurrency: int = 4,
+        timeout: float = 10.0,
+        base_retry_delay: float = 5.0,
+        max_retry_delay: float = 3600.0,
+        batch_size: int = 100,
+        poll_interval: float = 1.0,
+        lease_seconds: float = 0.0,
+        failure_threshold: int = 5,
+        reset_timeout: float = 60.0,
+    ) -> None:
+        """Initialize delivery service.
+
+        Args:
+            session_factory: Creates database sessions (default: AsyncSessionLocal)
+            webhook_secret: Secret key for webhook signature (optional)
+            max_attempts: Attempts before an entry is marked failed
+            concurrency: Maximum deliveries in flight
+            per_host_concurrency: Maximum deliveries in flight per host
+            timeout: Limit on each HTTP request, connecting included (seconds)
+            base_retry_delay: Base delay for exponential backoff (seconds)
+            max_retry_delay: Maximum delay between attempts (seconds)
+            batch_size: Entries claimed per drain
+            poll_interval: Seconds to wait when the outbox is empty
+            lease_seconds: How long a claim lasts before another drainer may
+                           take the entry (covers crashes mid-delivery); raised
+                           to the longest a claimed batch can take
+            failure_threshold: Consecutive failures that open a host's circuit
+            reset_timeout: Seconds a host's circuit stays open
+        """
+        settings = get_settings()
+
+        if session_factory is None:
+            from db.session import AsyncSessionLocal
+
+            session_factory = AsyncSessionLocal
+
+        self.session_factory = session_factory
+        self.webhook_secret = webhook_secret or settings.callback_webhook_secret or None
+        self.max_attempts = max_attempts or settings.callback_max_attempts
+        self.concurrency = concurrency or settings.callback_delivery_concurrency
+        self.per_host_concurrency = per_host_concurrency
+        self.timeout = timeout
+        self.base_retry_delay = base_retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.lease_seconds = max(lease_seconds, self.max_batch_seconds)
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self.client: httpx.AsyncClient | None = None
+        self.breakers: dict[str, HostCircuitBreaker] = {}
+        self._slots = asyncio.Semaphore(self.concurrency)
+        self._host_slots: dict[str, asyncio.Semaphore] = {}
+        self._task: asyncio.Task | None = None
+        self._running = False
+
+    @property
+    def max_batch_seconds(self) -> float:
+        """Longest a claimed batch can take to deliver and record.
+
+        The worst case is a batch for a single host that times out on every
+        request: its entries go through the host's slots a few at a time.
+        One more timeout is allowed for recording the outcomes.
+        """
+        rounds = math.ceil(self.batch_size / min(self.per_host_concurrency, self.concurrency))
+        return (rounds + 1) * self.timeout
+
+    async def start(self) -> None:
+        """Start draining the outbox in the background."""
+        if self._running:
+            return
+
+        self._running = True
+        self._task = asyncio.create_task(self._run())
+        logger.info(
+            "Callback delivery service started",
+            extra={"concurrency": self.concurrency, "max_attempts": self.max_attempts},
+        )
+
+    async def stop(self) -> None:
+        """Stop draining and close the HTTP client."""
+        self._running = False
+
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        if self.client:
+            await self.client.aclose()
+            self.client = None
+
+        logger.info("Callback delivery service stopped")
+
+    async def _run(self) -> None:
+        """Drain until stopped, polling when the outbox is empty."""
+        while self._running:
+            try:
+                claimed = await self.drain_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Callback outbox drain failed: {e}", exc_info=True)
+                claimed = 0
+
+            if claimed < self.batch_size:
+                await asyncio.sleep(self.poll_interval)
+
+    async def drain_once(self) -> int:
+        """Claim due entries, deliver them concurrently and record the outcomes.
+
+        Each entry's outcome is written as soon as its delivery finishes, so
+        entries for a slow host do not hold back the rest of the batch.
+
+        Returns:
+            int: Number of entries claimed
+        """
+        claimed = await self._claim_due()
+        if not claimed:
+            return 0
+
+        results = await asyncio.gather(
+            *(self._deliver_and_record(callback) for callback in claimed),
+            return_exceptions=True,
+        )
+        for callback, result in zip(claimed, results, strict=True):
+            if isinstance(result, Exception):
+                # The lease expires and the entry is claimed again
+                logger.error(
+                    f"Callback delivery failed: {result}",
+                    extra={"callback_id": str(callback.id)},
+                )
+
+        return len(claimed)
+
+    async def _deliver_and_record(self, callback: ClaimedCallback) -> None:
+        """Deliver one callback and write its outcome."""
+        outcome = await self._deliver(callback)
+        await self._record([outcome])
+
+    async def _claim_due(self) -> list[ClaimedCallback]:
+        """Claim due pending entries by pushing their next_attempt_at past a lease.
+
+        FOR UPDATE SKIP LOCKED lets several API processes drain the same
+        table without claiming an entry twice.
+        """
+        now = datetime.now(UTC)
+
+        async with self.session_factory() as session:
+            result = await session.execute(
+                select(CallbackOutbox)
+                .where(
+                    CallbackOutbox.status == CallbackOutboxStatus.PENDING,
+                    CallbackOutbox.next_attempt_at <= now,
+                )
+                .order_by(CallbackOutbox.next_attempt_at)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            entries = result.scalars().all()
+
+            lease_until = now + timedelta(seconds=self.lease_seconds)
+            claimed = []
+            for entry in entries:
+                entry.next_attempt_at = lease_until
+                claimed.append(
+                    ClaimedCallback(
+                        id=entry.id,
+                        callback_url=entry.callback_url,
+                        payload=entry.payload,
+                        request_id=entry.request_id,
+                        attempts=entry.attempts,
+                    )
+                )
+
+            await session.commit()
+
+        return claimed
+
+    async def _deliver(self, callback: ClaimedCallback) -> DeliveryOutcome:
+        """Deliver one callback, respecting the host's circuit and slot limit."""
+        host = urlsplit(callback.callback_url).netloc
+        breaker = self.breakers.setdefault(
+            host, HostCircuitBreaker(self.failure_threshold, self.reset_timeout)
+        )
+
+        if not breaker.allow_request():
+            return DeliveryOutcome(
+                callback=callback,
+                delivered=False,
+                attempted=False,
+                error=f"Circuit open for {host}",
+                retry_after=breaker.retry_after,
+            )
+
+        # Take the host slot first, so entries queued for a busy host do not
+        # hold global slots that other hosts could use
+        host_slots = self._host_slots.setdefault(host, asyncio.Semaphore(self.per_host_concurrency))
+        async with host_slots, self._slots:
+            outcome = await self._post(callback)
+
+        if not outcome.attempted:
+            breaker.release_trial()
+        elif outcome.delivered:
+            breaker.record_success()
+        else:
+            breaker.record_failure()
+            outcome.retry_after = self._calculate_retry_delay(callback.attempts)
+
+        return outcome
+
+    async def _post(self, callback: ClaimedCallback) -> DeliveryOutcome:
+        """Send one callback request."""
+        if self.client is None:
+            # One client for all deliveries: httpx keeps a connection pool per
+            # host, so repeated callbacks to a partner reuse connections
+            self.client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.concurrency,
+                    max_keepalive_connections=self.concurrency,
+                ),
+            )
+
+        headers = {
+            "Content-Type": "application/json",
+            "X-Callback-ID": str(callback.id),
+        }
+        if self.webhook_secret:
+            headers["X-Webhook-Signature"] = sign_payload(callback.payload, self.webhook_secret)
+        if callback.request_id:
+            headers["X-Request-ID"] = callback.request_id
+
+        try:
+            async with asyncio.timeout(self.timeout):
+                response = await self.client.post(
+                    callback.callback_url, json=callback.payload, headers=headers
+                )
+        except httpx.PoolTimeout:
+            # Nothing was sent; not the host's fault and not an attempt
+            return DeliveryOutcome(
+                callback=callback,
+                delivered=False,
+                attempted=False,
+                error="No connection available",
+                retry_after=self.poll_interval,
+            )
+        except (httpx.TimeoutException, TimeoutError):
+            return DeliveryOutcome(
+                callback=callback,
+                delivered=False,
+                error=f"Request timed out after {self.timeout}s",
+            )
+        except httpx.HTTPError as e:
+            return DeliveryOutcome(callback=callback, delivered=False, error=f"HTTP error: {e!s}")
+
+        if 200 <= response.status_code < 300:
+            return DeliveryOutcome(
+                callback=callback, delivered=True, status_code=response.status_code
+            )
+
+        return DeliveryOutcome(
+            callback=callback,
+            delivered=False,
+            status_code=response.status_code,
+            error=f"HTTP {response.status_code}: {response.text[:200]}",
+        )
+
+    async def _record(self, outcomes: list[DeliveryOutcome]) -> None:
+        """Write delivery outcomes back to the outbox."""
+        now = datetime.now(UTC)
+
+        async with self.session_factory() as session:
+            entries = {
+                entry.id: entry
+                for entry in (
+                    await session.execute(
+                        select(CallbackOutbox).where(
+                            CallbackOutbox.id.in_([o.callback.id for o in outcomes])
+                        )
+                    )
+                )
+                .scalars()
+                .all()
+            }
+
+            for outcome in outcomes:
+                entry = entries.get(outcome.callback.id)
+                if entry is None:
+                    continue
+
+                if outcome.attempted:
+                    entry.attempts = outcome.callback.attempts + 1
+                    entry.last_status_code = outcome.status_code
+                entry.last_error = outcome.error
+
+                if outcome.delivered:
+                    entry.status = CallbackOutboxStatus.DELIVERED
+                    entry.delivered_at = now
+                    logger.info(
+                        "Callback delivered",
+                        extra={
+                            "callback_id": str(entry.id),
+                            "callback_url": entry.callback_url,
+                            "attempts": entry.attempts,
+                        },
+                    )
+                elif entry.attempts >= self.max_attempts:
+                    entry.status = CallbackOutboxStatus.FAILED
+                    logger.error(
+                        "Callback delivery failed after all retries",
+                        extra={
+                            "callback_id": str(entry.id),
+                            "callback_url": entry.callback_url,
+                            "attempts": entry.attempts,
+                            "error": outcome.error,
+                        },
+                    )
+                else:
+                    entry.next_attempt_at = now + timedelta(seconds=outcome.retry_after or 0.0)
+                    logger.warning(
+                        "Callback delivery deferred",
+                        extra={
+                            "callback_id": str(entry.id),
+                            "callback_url": entry.callback_url,
+                            "attempts": entry.attempts,
+                            "retry_after": round(outcome.retry_after or 0.0, 1),
+                            "error": outcome.error,
+                        },
+                    )
+
+            await session.commit()
+
+    def _calculate_retry_delay(self, retry_count: int) -> float:
+        """Calculate retry delay using exponential backoff with ±25% jitter.
+
+        Args:
+            retry_count: Number of retries so far (0-indexed)
+
+        Returns:
+            float: Delay in seconds
+        """
+        delay = self.base_retry_delay * (2**retry_count)
+        delay *= random.uniform(0.75, 1.25)  # noqa: S311
+        return min(delay, self.max_retry_delay)
+
+
+# Global delivery service (one per API process)
+_delivery_service: CallbackDeliveryService | None = None
+
+
+def get_callback_delivery_service() -> CallbackDeliveryService:
+    """Get the process-wide callback delivery service."""
+    global _delivery_service
+    if _delivery_service is None:
+        _delivery_service = CallbackDeliveryService()
+    return _delivery_service
@@ -13,8 +13,10 @@ from typing import Any
 
 from app.config import get_settings
 
+from services.ffmpeg.encoder import resolve_backend
 from services.ffmpeg.normalizer import NormalizationSettings, VideoNormalizer
 from services.thumbnail_generator import ThumbnailGenerator
+from services.thumbnail_scoring import ThumbnailFrameScorer
 
 logger = logging.getLogger(__name__)
 
@@ -79,6 +81,7 @@ class ClipProcessingOptions:
         }
 
         width, height = resolution_map.get(self.target_resolution, (1280, 720))
+        settings = get_settings()
 
         return NormalizationSettings(
             target_width=width,
@@ -86,6 +89,7 @@ class ClipProcessingOptions:
             target_fps=float(self.target_fps),
             scale_mode="fit" if self.maintain_aspect_ratio else "force",
             preserve_aspect_ratio=self.maintain_aspect_ratio,
+            encoder_backend=resolve_backend(settings.video_encoder_backend, settings.ffmpeg_path),
         )
 
 
@@ -161,10 +165,18 @@ class ClipProcessor:
         )
 
         # Initialize thumbnail generator
+        frame_scorer = None
+        if settings.smart_thumbnails:
+            frame_scorer = ThumbnailFrameScorer(
+                ffmpeg_path=settings.ffmpeg_path,
+                cache_dir=self.cache_dir / "thumbnail_scores",
+            )
+
         self.thumbnail_generator = ThumbnailGenerator(
             ffmpeg_path=settings.ffmpeg_path,
             ffprobe_path=settings.ffprobe_path,
             output_dir=self.temp_dir / "thumbnails",
+            frame_scorer=frame_scorer,
         )
 
         logger.info(
@@ -205,6 +217,7 @@ class ClipProcessor:
         output_path: str | Path | None = None,
         options: ClipProcessingOptions | None = None,
         progress_callback: Any = None,
+        checksum: str | None = None,
     ) -> ClipProcessingResult:
         """Process a single clip with normalization and format conversion.
 
@@ -213,6 +226,8 @@ class ClipProcessor:
             output_path: Path for output clip (optional)
             options: Processing options
             progress_callback: Callback function for progress updates
+            checksum: Source asset checksum keying the cached thumbnail frame
+                      selection (default: keyed by the processed file)
 
         Returns:
             ClipProcessingResult with processing details
@@ -266,6 +281,7 @@ class ClipProcessor:
                 thumbnail_results = self.thumbnail_generator.generate_multiple_thumbnails(
                     video_path=result.output_path,
                     timestamp=1.0,  # Default 1 second
+                    checksum=checksum,
                 )
 
                 # Map size names to paths
@@ -342,6 +358,7 @@ class ClipProcessor:
         clip_id: str,
         options: ClipProcessingOptions | None = None,
         progress_callback: Any = None,
+        checksum: str | None = None,
     ) -> ClipProcessingResult:
         """Download and process a clip from URL.
 
@@ -350,6 +367,7 @@ class ClipProcessor:
             clip_id: Unique identifier for clip
             options: Processing options
             progress_callback: Callback for progress updates
+            checksum: Source asset checksum, if known
 
         Returns:
             ClipProcessingResult with processing details
@@ -385,6 +403,7 @@ class ClipProcessor:
                 output_path=output_path,
                 options=options,
                 progress_callback=progress_callback,
+                checksum=checksum,
             )
 
         except Exception as e:
@@ -2,14 +2,32 @@
 
 from services.ffmpeg.audio_mixer import AudioMixerBuilder, AudioTrack
 from services.ffmpeg.command_builder import FFmpegCommandBuilder, InputFile, OutputFile
+from services.ffmpeg.composition_planner import (
+    CompositionIR,
+    CompositionPlan,
+    CompositionPlanError,
+    CompositionPlanner,
+    FilterGraph,
+)
 from services.ffmpeg.concat_builder import ConcatDemuxerBuilder, ConcatSegment
 from services.ffmpeg.encoder import (
+    BACKEND_PRESETS,
     AudioEncoderSettings,
+    BackendPresets,
+    EncoderBackend,
     H264EncoderBuilder,
     H264EncoderSettings,
     H264Preset,
     H264Profile,
     H264Tune,
+    detect_encoder_backends,
+    resolve_backend,
+)
+from services.ffmpeg.encoder_profiles import (
+    EncodeSpeedTracker,
+    EncoderProfile,
+    EncoderProfileEngine,
+    EncoderSelection,
 )
 from services.ffmpeg.filter_builder import (
     Clip,
@@ -25,6 +43,7 @@ from services.ffmpeg.normalizer import (
     VideoNormalizerError,
 )
 from services.ffmpeg.security import FFmpegCommandValidator, FFmpegSecurityError
+from services.ffmpeg.stream_copy import StreamCopyClip, StreamCopyPlan, StreamCopyPlanner
 from services.ffmpeg.text_overlay import (
     TextAnimation,
     TextOverlayBuilder,
@@ -68,6 +87,12 @@ __all__ = [
     # Audio mixer
     "AudioMixerBuilder",
     "AudioTrack",
+    # Composition planner
+    "CompositionPlanner",
+    "CompositionPlan",
+    "CompositionPlanError",
+    "CompositionIR",
+    "FilterGraph",
     # Concat builder
     "ConcatDemuxerBuilder",
     "ConcatSegment",
@@ -78,11 +103,25 @@ __all__ = [
     "H264Preset",
     "H264Profile",
     "H264Tune",
+    "EncoderBackend",
+    "BackendPresets",
+    "BACKEND_PRESETS",
+    "detect_encoder_backends",
+    "resolve_backend",
+    # Encoder profiles
+    "EncoderProfile",
+    "EncoderProfileEngine",
+    "EncoderSelection",
+    "EncodeSpeedTracker",
     # Normalizer
     "VideoNormalizer",
     "NormalizationSettings",
     "NormalizationResult",
     "VideoNormalizerError",
+    # Stream copy
+    "StreamCopyPlanner",
+    "StreamCopyPlan",
+    "StreamCopyClip",
     # Timeline Assembler
     "TimelineAssembler",
     "AssembledTimeline",
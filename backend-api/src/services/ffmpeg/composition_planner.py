@@ -0,0 +1,907 @@
+"""
+Composition planning: compile a composition config into FFmpeg arguments.
+
+The planner lowers `composition_config` into a small intermediate
+representation, runs optimization passes over it, and emits FFmpeg input,
+filter and map arguments. Encoder and muxer arguments stay with the caller.
+
+The IR has two levels:
+
+- SegmentNode: one per timeline clip, with its source file, trims and probe data
+- FilterGraph: FilterNode chains between stream labels, lowered from the segments
+
+Passes are plain functions so each one can be tested on its own:
+
+- merge_adjacent_trims: back-to-back cuts from the same source become one segment
+- drop_noop_filters: scale/setsar/fps that would not change a stream are removed
+- fuse_linear_chains: single-consumer chains are merged, which folds the
+  overlays (and, for single clips, the scaling) into one drawtext chain
+
+Overlay and volume filters come from TextOverlayBuilder and AudioMixerBuilder
+and are parsed back into FilterNodes, so the passes can rewrite them. The
+timeline is a plain cut list (composition_config has no transitions), so
+TimelineAssembler and TransitionProcessor are not involved. FilterGraph.validate
+replaces FilterChainValidator here, since the latter rejects source filters
+such as the anullsrc used for silent clips.
+
+Copy vs. encode is decided last: the whole composition is concatenated with
+-c copy when StreamCopyPlanner accepts it, otherwise audio that reaches the
+output unfiltered is copied while the video is re-encoded. Mixing copied and
+re-encoded video segments is not attempted (see StreamCopyPlanner).
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from services.ffmpeg.audio_mixer import AudioMixerBuilder
+from services.ffmpeg.encoder import BACKEND_PRESETS, EncoderBackend
+from services.ffmpeg.input_manager import InputFileManager, MediaFileInfo
+from services.ffmpeg.stream_copy import (
+    SQUARE_PIXEL_RATIOS,
+    StreamCopyClip,
+    StreamCopyPlan,
+    StreamCopyPlanner,
+)
+from services.ffmpeg.text_overlay import TextOverlayBuilder, TextPosition, TextStyle
+
+logger = logging.getLogger(__name__)
+
+# Labels like "0:v" or "2:a" refer to input streams rather than filter outputs
+INPUT_LABEL_PATTERN = re.compile(r"^\d+:[va]$")
+
+# A builder-emitted chain: leading labels, filters, trailing labels
+LABEL_PATTERN = re.compile(r"\[([^\]]+)\]")
+FILTER_CHAIN_PATTERN = re.compile(
+    r"^(?P<inputs>(?:\[[^\]]+\])*)(?P<body>.*?)(?P<outputs>(?:\[[^\]]+\])*)$", re.DOTALL
+)
+
+# Silence length when a clip's duration cannot be probed
+DEFAULT_SILENCE_SECONDS = 10.0
+
+# Music volume when neither the asset nor the audio settings give one
+DEFAULT_MUSIC_VOLUME = 0.3
+
+# Overlay text style: no outline, on a translucent black box
+OVERLAY_FONT_SIZE = 24
+OVERLAY_BOX_COLOR = "0x000000@0.5"
+
+
+def is_input_label(label: str) -> bool:
+    """Check whether a label refers to an input stream (e.g. "0:v")."""
+    return bool(INPUT_LABEL_PATTERN.match(label))
+
+
+class CompositionPlanError(Exception):
+    """Exception raised when a composition cannot be planned."""
+
+    pass
+
+
+@dataclass
+class FilterOp:
+    """
+    A single filter in a chain.
+
+    Attributes:
+        name: Filter name (scale, fps, drawtext, ...)
+        args: Filter arguments, already formatted for FFmpeg
+    """
+
+    name: str
+    args: str = ""
+
+    def render(self) -> str:
+        """Render as `name=args`."""
+        return f"{self.name}={self.args}" if self.args else self.name
+
+
+@dataclass
+class FilterNode:
+    """
+    A filter chain from input labels to output labels.
+
+    Attributes:
+        inputs: Labels consumed by the first filter
+        ops: Filters applied in order
+        outputs: Labels produced by the last filter
+    """
+
+    inputs: list[str]
+    ops: list[FilterOp]
+    outputs: list[str]
+
+    def render(self) -> str:
+        """Render as `[in]op1,op2[out]`."""
+        inputs = "".join(f"[{label}]" for label in self.inputs)
+        outputs = "".join(f"[{label}]" for label in self.outputs)
+        return inputs + ",".join(op.render() for op in self.ops) + outputs
+
+
+@dataclass
+class FilterGraph:
+    """
+    Filter graph IR for a composition.
+
+    Attributes:
+        nodes: Filter chains, in definition order
+        video_out: Label mapped as the output video
+        audio_out: Label mapped as the output audio (None = no audio)
+    """
+
+    nodes: list[FilterNode] = field(default_factory=list)
+    video_out: str = "0:v"
+    audio_out: str | None = None
+
+    def consumers(self, label: str) -> list[FilterNode]:
+        """Get the nodes that read a label."""
+        return [node for node in self.nodes if label in node.inputs]
+
+    def bypass(self, node: FilterNode) -> None:
+        """
+        Remove a pass-through node, reconnecting its consumers to its input.
+
+        Args:
+            node: Node with one input, one output and no filters left
+        """
+        source, target = node.inputs[0], node.outputs[0]
+        self.nodes.remove(node)
+        for consumer in self.nodes:
+            consumer.inputs = [source if label == target else label for label in consumer.inputs]
+        if self.video_out == target:
+            self.video_out = source
+        if self.audio_out == target:
+            self.audio_out = source
+
+    def validate(self) -> None:
+        """
+        Check every label is defined before use and consumed at most once.
+
+        Raises:
+            CompositionPlanError: If the graph is not well formed
+        """
+        produced: set[str] = set()
+        consumed: set[str] = set()
+        for node in self.nodes:
+            for label in node.inputs:
+                if not is_input_label(label) and label not in produced:
+                    raise CompositionPlanError(f"Label [{label}] used before it is defined")
+                if label in consumed and not is_input_label(label):
+                    raise CompositionPlanError(f"Label [{label}] consumed twice")
+                consumed.add(label)
+            for label in node.outputs:
+                if label in produced:
+                    raise CompositionPlanError(f"Label [{label}] defined twice")
+                produced.add(label)
+
+        for label in (self.video_out, self.audio_out):
+            if label is not None and not is_input_label(label) and label not in produced:
+                raise CompositionPlanError(f"Output label [{label}] is never defined")
+
+    def render(self) -> str:
+        """Render the -filter_complex expression."""
+        return ";".join(node.render() for node in self.nodes)
+
+
+@dataclass
+class SegmentNode:
+    """
+    A timeline clip in the composition IR.
+
+    Attributes:
+        path: Local path to the source file
+        trim_start: Start point in the source (seconds)
+        trim_end: End point in the source (seconds, None = end of file)
+        info: Probe data (None if the probe failed)
+    """
+
+    path: Path
+    trim_start: float = 0.0
+    trim_end: float | None = None
+    info: MediaFileInfo | None = None
+
+    @property
+    def trimmed(self) -> bool:
+        """Check whether the segment cuts into its source."""
+        return self.trim_start > 0 or self.trim_end is not None
+
+    @property
+    def has_audio(self) -> bool:
+        """Check whether the source has an audio stream."""
+        return self.info is not None and self.info.has_audio
+
+    @property
+    def duration(self) -> float | None:
+        """Get the segment length in seconds, if known."""
+        if self.trim_end is not None:
+            return max(0.0, self.trim_end - self.trim_start)
+        if self.info is not None and self.info.duration is not None:
+            return max(0.0, self.info.duration - self.trim_start)
+        return None
+
+
+@dataclass
+class MusicNode:
+    """
+    A background audio track in the composition IR.
+
+    Attributes:
+        path: Local path to the audio file
+        volume: Mix volume (1.0 = unchanged)
+    """
+
+    path: Path
+    volume: float = DEFAULT_MUSIC_VOLUME
+
+
+@dataclass
+class CompositionIR:
+    """
+    Compiled composition, before lowering to a filter graph.
+
+    Attributes:
+        width: Output width in pixels
+        height: Output height in pixels
+        fps: Output frame rate
+        segments: Timeline clips in order
+        overlays: Overlay configs from the composition
+        music: Background audio tracks
+        original_audio_volume: Volume of the clips' audio when music is mixed in
+    """
+
+    width: int
+    height: int
+    fps: float
+    segments: list[SegmentNode]
+    overlays: list[dict[str, Any]] = field(default_factory=list)
+    music: list[MusicNode] = field(default_factory=list)
+    original_audio_volume: float = 1.0
+
+    @property
+    def duration(self) -> float | None:
+        """Get the output length in seconds, if every segment's is known."""
+        durations = [segment.duration for segment in self.segments]
+        if not durations or any(duration is None for duration in durations):
+            return None
+        return sum(durations)
+
+
+@dataclass
+class StreamFormat:
+    """
+    Video format of a stream at some point in a filter chain.
+
+    Attributes:
+        width: Width in pixels
+        height: Height in pixels
+        fps: Frame rate
+        square_pixels: Whether the sample aspect ratio is 1:1
+    """
+
+    width: int | None
+    height: int | None
+    fps: float | None
+    square_pixels: bool
+
+    @classmethod
+    def from_info(cls, info: MediaFileInfo | None) -> StreamFormat | None:
+        """Build from probe data (None if there is no video stream)."""
+        video = info.primary_video_stream if info is not None else None
+        if video is None:
+            return None
+        return cls(
+            width=video.width,
+            height=video.height,
+            fps=video.fps,
+            square_pixels=video.sample_aspect_ratio in SQUARE_PIXEL_RATIOS,
+        )
+
+
+@dataclass
+class CompositionPlan:
+    """
+    Planned FFmpeg invocation for a composition.
+
+    Attributes:
+        ir: Optimized composition IR
+        graph: Optimized filter graph
+        stream_copy: Whole-composition stream-copy plan
+        copy_audio: Whether the output audio can be copied instead of re-encoded
+        optimizations: Rewrites applied, by pass name
+    """
+
+    ir: CompositionIR
+    graph: FilterGraph
+    stream_copy: StreamCopyPlan
+    copy_audio: bool = False
+    optimizations: dict[str, int] = field(default_factory=dict)
+
+    @property
+    def has_audio(self) -> bool:
+        """Check whether the output has an audio stream."""
+        return self.graph.audio_out is not None
+
+    @property
+    def duration_seconds(self) -> float | None:
+        """Get the output length in seconds, if known."""
+        return self.ir.duration
+
+    def input_args(self) -> list[str]:
+        """
+        Build the -i arguments, seeking into trimmed clips.
+
+        Trims are applied as input options rather than trim filters so FFmpeg
+        seeks to the nearest keyframe instead of decoding the skipped part.
+        """
+        args: list[str] = []
+        for segment in self.ir.segments:
+            if segment.trim_start > 0:
+                args.extend(["-ss", _format_seconds(segment.trim_start)])
+            if segment.trim_end is not None:
+                args.extend(["-t", _format_seconds(segment.duration)])
+            args.extend(["-i", str(segment.path)])
+        for track in self.ir.music:
+            args.extend(["-i", str(track.path)])
+        return args
+
+    def filter_args(self) -> list[str]:
+        """Build the -filter_complex and -map arguments."""
+        args: list[str] = []
+        if self.graph.nodes:
+            args.extend(["-filter_complex", self.graph.render()])
+        args.extend(["-map", _map_spec(self.graph.video_out)])
+        if self.graph.audio_out is not None:
+            args.extend(["-map", _map_spec(self.graph.audio_out)])
+        return args
+
+
+def _format_seconds(value: float | None) -> str:
+    """Format seconds for FFmpeg without float noise."""
+    return f"{value or 0.0:.6f}".rstrip("0").rstrip(".")
+
+
+def _map_spec(label: str) -> str:
+    """Convert a graph label to a -map specifier."""
+    return f"{label}:0" if is_input_label(label) else f"[{label}]"
+
+
+def _split_filters(chain: str) -> list[str]:
+    """Split a filter chain on commas outside quotes and escapes."""
+    parts: list[str] = []
+    current: list[str] = []
+    quoted = escaped = False
+    for char in chain:
+        if escaped:
+            escaped = False
+        elif char == "\\":
+            escaped = True
+        elif char == "'":
+            quoted = not quoted
+        elif char == "," and not quoted:
+            parts.append("".join(current))
+            current = []
+            continue
+        current.append(char)
+    parts.append("".join(current))
+    return parts
+
+
+def parse_filter_node(expression: str) -> FilterNode:
+    """
+    Parse a single `[in]op1,op2[out]` chain, as emitted by the filter builders.
+
+    Args:
+        expression: Filter chain with its input and output labels
+
+    Returns:
+        FilterNode: Parsed chain
+
+    Raises:
+        CompositionPlanError: If the expression is not a single chain
+    """
+    match = FILTER_CHAIN_PATTERN.match(expression.strip())
+    if match is None or not match.group("body"):
+        raise CompositionPlanError(f"Not a filter chain: {expression}")
+
+    ops = []
+    for part in _split_filters(match.group("body")):
+        name, _, args = part.partition("=")
+        ops.append(FilterOp(name, args))
+
+    return FilterNode(
+        inputs=LABEL_PATTERN.findall(match.group("inputs")),
+        ops=ops,
+        outputs=LABEL_PATTERN.findall(match.group("outputs")),
+    )
+
+
+def merge_adjacent_trims(segments: list[SegmentNode]) -> list[SegmentNode]:
+    """
+    Merge consecutive segments that continue the same source.
+
+    A clip cut at 5s followed by the same file from 5s is one read of the
+    file; merging saves an input, a seek and a concat boundary.
+
+    Args:
+        segments: Segments in timeline order
+
+    Returns:
+        list[SegmentNode]: Segments with continuations merged
+    """
+    merged: list[SegmentNode] = []
+    for segment in segments:
+        previous = merged[-1] if merged else None
+        if (
+            previous is not None
+            and previous.path == segment.path
+            and previous.trim_end is not None
+            and abs(previous.trim_end - segment.trim_start) < 1e-6
+        ):
+            merged[-1] = SegmentNode(
+                path=previous.path,
+                trim_start=previous.trim_start,
+                trim_end=segment.trim_end,
+                info=previous.info,
+            )
+        else:
+            merged.append(segment)
+    return merged
+
+
+def drop_noop_filters(
+    graph: FilterGraph,
+    formats: dict[str, StreamFormat],
+    fps_tolerance: float = 0.01,
+) -> int:
+    """
+    Remove scale, setsar and fps filters that would not change a stream.
+
+    The format of each input stream is traced through its chain; filters
+    that set what the stream already has are dropped, and chains left empty
+    are bypassed. Tracing stops at the first filter it does not model.
+
+    Args:
+        graph: Filter graph to rewrite in place
+        formats: Probed format per video input label (e.g. "0:v")
+        fps_tolerance: Frame rate difference treated as equal
+
+    Returns:
+        int: Number of filters removed
+    """
+    removed = 0
+    for node in list(graph.nodes):
+        if len(node.inputs) != 1 or node.inputs[0] not in formats:
+            continue
+
+        source = formats[node.inputs[0]]
+        state = StreamFormat(source.width, source.height, source.fps, source.square_pixels)
+        kept: list[FilterOp] = []
+        for position, op in enumerate(node.ops):
+            noop = _apply_format_op(op, state, fps_tolerance)
+            if noop is None:
+                kept.extend(node.ops[position:])
+                break
+            if noop:
+                removed += 1
+            else:
+                kept.append(op)
+
+        node.ops = kept
+        if not kept and len(node.outputs) == 1:
+            graph.bypass(node)
+
+    return removed
+
+
+def _apply_format_op(op: FilterOp, state: StreamFormat, fps_tolerance: float) -> bool | None:
+    """
+    Apply a format filter to a traced stream format.
+
+    Args:
+        op: Filter to apply
+        state: Format before the filter (updated in place)
+        fps_tolerance: Frame rate difference treated as equal
+
+    Returns:
+        True if the filter changes nothing, False if it does, None if it is not modeled
+    """
+    if op.name == "scale":
+        width, height = (int(value) for value in op.args.split(":"))
+        if (width, height) == (state.width, state.height):
+            return True
+        state.width, state.height = width, height
+        return False
+    if op.name == "setsar" and op.args == "1":
+        if state.square_pixels:
+            return True
+        state.square_pixels = True
+        return False
+    if op.name == "fps":
+        fps = float(op.args)
+        if state.fps is not None and abs(state.fps - fps) <= fps_tolerance:
+            return True
+        state.fps = fps
+        return False
+    return None
+
+
+def fuse_linear_chains(graph: FilterGraph) -> int:
+    """
+    Merge chains whose only output feeds exactly one single-input chain.
+
+    `[v]drawtext=a[o0];[o0]drawtext=b[o1]` becomes `[v]drawtext=a,drawtext=b[o1]`,
+    so FFmpeg allocates one filter chain instead of one per overlay.
+
+    Args:
+        graph: Filter graph to rewrite in place
+
+    Returns:
+        int: Number of chains merged away
+    """
+    fused = 0
+    changed = True
+    while changed:
+        changed = False
+        for node in graph.nodes:
+            if len(node.outputs) != 1:
+                continue
+            consumers = graph.consumers(node.outputs[0])
+            if len(consumers) != 1 or len(consumers[0].inputs) != 1:
+                continue
+            consumer = consumers[0]
+            node.ops = node.ops + consumer.ops
+            node.outputs = consumer.outputs
+            graph.nodes.remove(consumer)
+            fused += 1
+            changed = True
+            break
+    return fused
+
+
+class CompositionPlanner:
+    """
+    Compiles composition configs into optimized FFmpeg arguments.
+
+    Example:
+        >>> planner = CompositionPlanner()
+        >>> plan = planner.plan(config, {"clip_0": Path("a.mp4")}, 1920, 1080, 30)
+        >>> if not plan.stream_copy.eligible:
+        ...     cmd = ["ffmpeg", *plan.input_args(), *plan.filter_args(), "-c:v", "libx264", "out.mp4"]
+    """
+
+    def __init__(
+        self,
+        input_manager: InputFileManager | None = None,
+        stream_copy_planner: StreamCopyPlanner | None = None,
+        segment_passes: list[Callable[[list[SegmentNode]], list[SegmentNode]]] | None = None,
+        backend: EncoderBackend = EncoderBackend.LIBX264,
+    ) -> None:
+        """
+        Initialize the planner.
+
+        Args:
+            input_manager: Probe helper (default: ffprobe from PATH)
+            stream_copy_planner: Whole-composition copy check (default: shares input_manager
+                and requires the backend's codec)
+            segment_passes: Passes over the segment list (default: merge_adjacent_trims)
+            backend: Encoder backend the output is rendered with
+        """
+        self.input_manager = input_manager or InputFileManager()
+        self.stream_copy_planner = stream_copy_planner or StreamCopyPlanner(
+            input_manager=self.input_manager,
+            video_codec=BACKEND_PRESETS[backend].codec_name,
+        )
+        self.segment_passes = (
+            segment_passes if segment_passes is not None else [merge_adjacent_trims]
+        )
+        self.text_overlays = TextOverlayBuilder()
+        self.audio_mixer = AudioMixerBuilder()
+
+    def plan(
+        self,
+        composition_config: dict[str, Any],
+        input_files: dict[str, Path],
+        width: int,
+        height: int,
+        fps: float,
+    ) -> CompositionPlan:
+        """
+        Compile, optimize and lower a composition.
+
+        Args:
+            composition_config: Composition configuration (assets, overlays, audio)
+            input_files: Mapping of asset ID to local file path
+            width: Output width in pixels
+            height: Output height in pixels
+            fps: Output frame rate
+
+        Returns:
+            CompositionPlan: Inputs, filter graph and copy decisions
+
+        Raises:
+            CompositionPlanError: If the composition has no video clips
+        """
+        ir = self.compile(composition_config, input_files, width, height, fps)
+        optimizations: dict[str, int] = {}
+
+        for segment_pass in self.segment_passes:
+            before = len(ir.segments)
+            ir.segments = segment_pass(ir.segments)
+            optimizations[segment_pass.__name__] = before - len(ir.segments)
+
+        stream_copy = self._plan_stream_copy(ir)
+
+        graph = self.lower(ir)
+        formats = {
+            f"{index}:v": stream_format
+            for index, segment in enumerate(ir.segments)
+            if (stream_format := StreamFormat.from_info(segment.info)) is not None
+        }
+        optimizations["drop_noop_filters"] = drop_noop_filters(graph, formats)
+        optimizations["fuse_linear_chains"] = fuse_linear_chains(graph)
+        graph.validate()
+
+        plan = CompositionPlan(
+            ir=ir,
+            graph=graph,
+            stream_copy=stream_copy,
+            copy_audio=self._can_copy_audio(ir, graph),
+            optimizations=optimizations,
+        )
+
+        logger.info(
+            "Planned composition",
+            extra={
+                "segments": len(ir.segments),
+                "filter_chains": len(graph.nodes),
+                "stream_copy": stream_copy.eligible,
+                "copy_audio": plan.copy_audio,
+                **optimizations,
+            },
+        )
+
+        return plan
+
+    def compile(
+        self,
+        composition_config: dict[str, Any],
+        input_files: dict[str, Path],
+        width: int,
+        height: int,
+        fps: float,
+    ) -> CompositionIR:
+        """
+        Build the composition IR from the config, probing each clip once.
+
+        Args:
+            composition_config: Composition configuration
+            input_files: Mapping of asset ID to local file path
+            width: Output width in pixels
+            height: Output height in pixels
+            fps: Output frame rate
+
+        Returns:
+            CompositionIR: Unoptimized IR
+
+        Raises:
+            CompositionPlanError: If the composition has no video clips
+        """
+        audio_config = composition_config.get("audio") or {}
+        music_volume = audio_config.get("music_volume", DEFAULT_MUSIC_VOLUME)
+
+        segments: list[SegmentNode] = []
+        music: list[MusicNode] = []
+        for asset in composition_config.get("assets", []):
+            path = input_files.get(asset.get("id"))
+            if path is None:
+                continue
+            if asset.get("type", "video") == "audio":
+                volume = asset.get("volume")
+                music.append(
+                    MusicNode(path=path, volume=music_volume if volume is None else volume)
+                )
+            else:
+                segments.append(
+                    SegmentNode(
+                        path=path,
+                        trim_start=asset.get("trim_start") or 0.0,
+                        trim_end=asset.get("trim_end"),
+                        info=self._probe(path),
+                    )
+                )
+
+        if not segments:
+            raise CompositionPlanError("No video assets found in composition")
+
+        return CompositionIR(
+            width=width,
+            height=height,
+            fps=fps,
+            segments=segments,
+            overlays=list(composition_config.get("overlays") or []),
+            music=music,
+            original_audio_volume=audio_config.get("original_audio_volume", 0.7),
+        )
+
+    def lower(self, ir: CompositionIR) -> FilterGraph:
+        """
+        Lower the IR to a filter graph, one chain per step.
+
+        Segment i is input i and music track j is input len(segments) + j,
+        matching CompositionPlan.input_args().
+
+        Args:
+            ir: Composition IR
+
+        Returns:
+            FilterGraph: Unoptimized graph
+        """
+        graph = FilterGraph()
+        any_audio = any(segment.has_audio for segment in ir.segments)
+        segment_count = len(ir.segments)
+
+        video_labels: list[str] = []
+        audio_labels: list[str] = []
+        for index, segment in enumerate(ir.segments):
+            graph.nodes.append(
+                FilterNode(
+                    inputs=[f"{index}:v"],
+                    ops=[
+                        FilterOp("scale", f"{ir.width}:{ir.height}"),
+                        FilterOp("setsar", "1"),
+                        FilterOp("fps", _format_seconds(ir.fps)),
+                    ],
+                    outputs=[f"v{index}"],
+                )
+            )
+            video_labels.append(f"v{index}")
+
+            if segment.has_audio:
+                audio_labels.append(f"{index}:a")
+            elif any_audio:
+                # Concat needs an audio stream from every clip
+                graph.nodes.append(self._silence(segment.duration, f"a{index}"))
+                audio_labels.append(f"a{index}")
+
+        if segment_count > 1:
+            concat_inputs = [
+                label
+                for pair in zip(video_labels, audio_labels or [None] * segment_count, strict=True)
+                for label in pair
+                if label is not None
+            ]
+            concat_outputs = ["outv", "outa"] if any_audio else ["outv"]
+            graph.nodes.append(
+                FilterNode(
+                    inputs=concat_inputs,
+                    ops=[FilterOp("concat", f"n={segment_count}:v=1:a={1 if any_audio else 0}")],
+                    outputs=concat_outputs,
+                )
+            )
+            video_label = "outv"
+            audio_label = "outa" if any_audio else None
+        else:
+            video_label = video_labels[0]
+            audio_label = audio_labels[0] if audio_labels else None
+
+        for index, overlay in enumerate(ir.overlays):
+            node = parse_filter_node(self._overlay_filter(overlay, f"ov{index}"))
+            node.inputs = [video_label]
+            graph.nodes.append(node)
+            video_label = f"ov{index}"
+
+        if ir.music:
+            if audio_label is None:
+                graph.nodes.append(self._silence(ir.duration, "clip_audio"))
+                audio_label = "clip_audio"
+            clip_mix = parse_filter_node(
+                self.audio_mixer.build_volume_filter(0, ir.original_audio_volume, "clip_mix")
+            )
+            clip_mix.inputs = [audio_label]
+            graph.nodes.append(clip_mix)
+            mix_inputs = ["clip_mix"]
+            for index, track in enumerate(ir.music):
+                graph.nodes.append(
+                    parse_filter_node(
+                        self.audio_mixer.build_volume_filter(
+                            segment_count + index, track.volume, f"music{index}"
+                        )
+                    )
+                )
+                mix_inputs.append(f"music{index}")
+            # amix stops with the clips' audio, so music never extends the video
+            graph.nodes.append(
+                FilterNode(
+                    inputs=mix_inputs,
+                    ops=[FilterOp("amix", f"inputs={len(mix_inputs)}:duration=first")],
+                    outputs=["mixa"],
+                )
+            )
+            audio_label = "mixa"
+
+        graph.video_out = video_label
+        graph.audio_out = audio_label
+        return graph
+
+    def _overlay_filter(self, overlay: dict[str, Any], output_label: str) -> str:
+        """Build the drawtext chain for a text overlay with TextOverlayBuilder."""
+        try:
+            position = TextPosition(overlay.get("position") or TextPosition.BOTTOM_CENTER)
+        except ValueError:
+            position = TextPosition.BOTTOM_CENTER
+        font_color = overlay.get("font_color") or "#FFFFFF"
+
+        return self.text_overlays.create_text_overlay(
+            input_index=0,
+            text=overlay.get("text", ""),
+            position=position,
+            start_time=overlay.get("start_time") or 0,
+            end_time=overlay.get("end_time"),
+            style=TextStyle(
+                font_size=overlay.get("font_size") or OVERLAY_FONT_SIZE,
+                font_color=f"0x{font_color.lstrip('#')}",
+                border_width=0,
+                background_color=OVERLAY_BOX_COLOR,
+            ),
+            output_label=output_label,
+        )
+
+    def _probe(self, path: Path) -> MediaFileInfo | None:
+        """Probe a clip, returning None (no audio, keep every filter) on failure."""
+        try:
+            return self.input_manager.probe_file(path)
+        except (FileNotFoundError, ValueError) as e:
+            logger.warning(f"Probe failed for {path}: {e}")
+            return None
+
+    @staticmethod
+    def _silence(duration: float | None, label: str) -> FilterNode:
+        """Build a silent stereo source of the given length."""
+        seconds = duration if duration else DEFAULT_SILENCE_SECONDS
+        return FilterNode(
+            inputs=[],
+            ops=[
+                FilterOp(
+                    "anullsrc",
+                    f"channel_layout=stereo:sample_rate=48000:duration={_format_seconds(seconds)}",
+                )
+            ],
+            outputs=[label],
+        )
+
+    def _plan_stream_copy(self, ir: CompositionIR) -> StreamCopyPlan:
+        """Check whether the whole composition can be concatenated with -c copy."""
+        if ir.music:
+            return StreamCopyPlan.rejected("background audio needs mixing")
+        if any(segment.info is None for segment in ir.segments):
+            return StreamCopyPlan.rejected("probe failed")
+
+        return self.stream_copy_planner.plan(
+            [
+                StreamCopyClip(
+                    path=segment.path,
+                    trim_start=segment.trim_start,
+                    trim_end=segment.trim_end,
+                )
+                for segment in ir.segments
+            ],
+            ir.width,
+            ir.height,
+            ir.fps,
+            has_overlays=bool(ir.overlays),
+            infos=[segment.info for segment in ir.segments],
+        )
+
+    @staticmethod
+    def _can_copy_audio(ir: CompositionIR, graph: FilterGraph) -> bool:
+        """Check whether the output audio is an unfiltered AAC input stream."""
+        if graph.audio_out is None or not is_input_label(graph.audio_out):
+            return False
+        segment = ir.segments[int(graph.audio_out.split(":")[0])]
+        audio = segment.info.primary_audio_stream if segment.info is not None else None
+        return audio is not None and audio.codec_name == "aac"
@@ -1,16 +1,24 @@
 """
-H.264 Encoding Configuration for FFmpeg.
+Video Encoding Configuration for FFmpeg.
 
-This module provides utilities for configuring H.264 video encoding with
+This module provides utilities for configuring video encoding with
 CRF-based quality control, presets, profiles, and optimization settings.
+Settings are expressed on the familiar x264 scales (CRF 0-51, ultrafast to
+veryslow) and translated per encoder backend: libx264, libx265, libsvtav1 or
+libvpx-vp9, all CPU-only.
 """
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+import logging
+import subprocess
+from dataclasses import dataclass, field
 from enum import Enum
+from functools import lru_cache
 from typing import Any
 
+logger = logging.getLogger(__name__)
+
 
 class H264Preset(str, Enum):
     """H.264 encoding presets (speed vs compression tradeoff)."""
@@ -48,10 +56,203 @@ class H264Tune(str, Enum):
     ZEROLATENCY = "zerolatency"  # For live streaming (no B-frames)
 
 
+class EncoderBackend(str, Enum):
+    """Software video encoders the builder can target."""
+
+    LIBX264 = "libx264"  # H.264, plays everywhere (default)
+    LIBX265 = "libx265"  # HEVC, ~40% smaller than H.264 at equal quality
+    LIBSVTAV1 = "libsvtav1"  # AV1, smallest files, fast at high presets
+    LIBVPX_VP9 = "libvpx-vp9"  # VP9, for WebM delivery
+
+
+@dataclass(frozen=True)
+class BackendPresets:
+    """
+    How x264-style settings translate to one encoder backend.
+
+    Attributes:
+        codec_name: Codec name as reported by ffprobe (h264, hevc, av1, vp9)
+        speed_args: Encoder arguments for each x264 preset
+        crf_scale: Multiplier from x264 CRF to the backend's CRF
+        crf_offset: Offset added after scaling
+        max_crf: Highest CRF the backend accepts
+        profiles: Backend profile per H.264 profile (None = no -profile:v)
+        supports_x264_options: Whether -tune, -level, -bf and -refs apply
+        extra_args: Arguments always added for this backend
+    """
+
+    codec_name: str
+    speed_args: dict[H264Preset, list[str]]
+    crf_scale: float = 1.0
+    crf_offset: int = 0
+    max_crf: int = 51
+    profiles: dict[H264Profile, str] | None = None
+    supports_x264_options: bool = False
+    extra_args: list[str] = field(default_factory=list)
+
+    def crf_for(self, crf: int) -> int:
+        """Map an x264 CRF to the backend's scale."""
+        return max(0, min(self.max_crf, round(crf * self.crf_scale) + self.crf_offset))
+
+
+# Speed presets for SVT-AV1 (0 = slowest, 13 = fastest) matched to x264 presets
+_SVT_AV1_PRESETS = {
+    H264Preset.ULTRAFAST: "12",
+    H264Preset.SUPERFAST: "11",
+    H264Preset.VERYFAST: "10",
+    H264Preset.FASTER: "9",
+    H264Preset.FAST: "8",
+    H264Preset.MEDIUM: "7",
+    H264Preset.SLOW: "6",
+    H264Preset.SLOWER: "5",
+    H264Preset.VERYSLOW: "4",
+}
+
+# libvpx deadline and cpu-used per x264 preset (cpu-used above 5 needs realtime)
+_VP9_SPEEDS = {
+    H264Preset.ULTRAFAST: ("realtime", "8"),
+    H264Preset.SUPERFAST: ("realtime", "7"),
+    H264Preset.VERYFAST: ("good", "5"),
+    H264Preset.FASTER: ("good", "4"),
+    H264Preset.FAST: ("good", "3"),
+    H264Preset.MEDIUM: ("good", "2"),
+    H264Preset.SLOW: ("good", "1"),
+    H264Preset.SLOWER: ("good", "0"),
+    H264Preset.VERYSLOW: ("best", "0"),
+}
+
+BACKEND_PRESETS: dict[EncoderBackend, BackendPresets] = {
+    EncoderBackend.LIBX264: BackendPresets(
+        codec_name="h264",
+        speed_args={preset: ["-preset", preset.value] for preset in H264Preset},
+        profiles={profile: profile.value for profile in H264Profile},
+        supports_x264_options=True,
+    ),
+    # x265 CRF 28 looks like x264 CRF 23
+    EncoderBackend.LIBX265: BackendPresets(
+        codec_name="hevc",
+        speed_args={preset: ["-preset", preset.value] for preset in H264Preset},
+        crf_offset=5,
+        profiles={
+            H264Profile.BASELINE: "main",
+            H264Profile.MAIN: "main",
+            H264Profile.HIGH: "main",
+            H264Profile.HIGH10: "main10",
+            H264Profile.HIGH422: "main422-10",
+            H264Profile.HIGH444: "main444-8",
+        },
+        # hvc1 tag so Apple players accept HEVC in MP4
+        extra_args=["-tag:v", "hvc1"],
+    ),
+    # SVT-AV1 CRF 35 looks like x264 CRF 23
+    EncoderBackend.LIBSVTAV1: BackendPresets(
+        codec_name="av1",
+        speed_args={preset: ["-preset", value] for preset, value in _SVT_AV1_PRESETS.items()},
+        crf_scale=1.5,
+        max_crf=63,
+    ),
+    # libvpx-vp9 needs -b:v 0 for constant-quality CRF; VP9 CRF 32 looks like x264 CRF 23
+    EncoderBackend.LIBVPX_VP9: BackendPresets(
+        codec_name="vp9",
+        speed_args={
+            preset: ["-deadline", deadline, "-cpu-used", cpu_used]
+            for preset, (deadline, cpu_used) in _VP9_SPEEDS.items()
+        },
+        crf_scale=1.4,
+        max_crf=63,
+        extra_args=["-row-mt", "1"],
+    ),
+}
+
+
+def parse_encoder_list(output: str) -> frozenset[str]:
+    """
+    Parse the encoder names from `ffmpeg -encoders` output.
+
+    Args:
+        output: stdout of `ffmpeg -hide_banner -encoders`
+
+    Returns:
+        Names of all listed encoders
+    """
+    names: set[str] = set()
+    for line in output.splitlines():
+        parts = line.split()
+        # Encoder lines look like " V....D libx264  libx264 H.264 / AVC ..."
+        if len(parts) >= 2 and len(parts[0]) == 6 and parts[0][0] in "VAS" and parts[1] != "=":
+            names.add(parts[1])
+    return frozenset(names)
+
+
+@lru_cache(maxsize=None)
+def detect_encoder_backends(ffmpeg_path: str = "ffmpeg") -> frozenset[EncoderBackend]:
+    """
+    Detect which encoder backends the FFmpeg build supports.
+
+    Runs `ffmpeg -encoders` once per binary; call it at worker startup so
+    jobs never pay for the probe.
+
+    Args:
+        ffmpeg_path: Path to the FFmpeg binary
+
+    Returns:
+        Available backends (empty if FFmpeg cannot be run)
+    """
+    try:
+        result = subprocess.run(  # noqa: S603
+            [ffmpeg_path, "-hide_banner", "-encoders"],
+            capture_output=True,
+            text=True,
+            check=True,
+            timeout=30,
+        )
+    except (OSError, subprocess.SubprocessError) as e:
+        logger.warning(f"Could not list FFmpeg encoders: {e}")
+        return frozenset()
+
+    encoders = parse_encoder_list(result.stdout)
+    backends = frozenset(backend for backend in EncoderBackend if backend.value in encoders)
+
+    logger.info(
+        "Detected encoder backends",
+        extra={"ffmpeg_path": ffmpeg_path, "backends": sorted(b.value for b in backends)},
+    )
+
+    return backends
+
+
+def resolve_backend(
+    requested: EncoderBackend | str,
+    ffmpeg_path: str = "ffmpeg",
+) -> EncoderBackend:
+    """
+    Use the requested backend if FFmpeg has it, otherwise fall back to libx264.
+
+    Args:
+        requested: Preferred backend
+        ffmpeg_path: Path to the FFmpeg binary
+
+    Returns:
+        Backend to encode with
+    """
+    backend = EncoderBackend(requested)
+    if backend == EncoderBackend.LIBX264:
+        return backend
+    available = detect_encoder_backends(ffmpeg_path)
+    if backend in available:
+        return backend
+
+    logger.warning(
+        f"Encoder backend {backend.value} not available, falling back to libx264",
+        extra={"requested": backend.value, "available": sorted(b.value for b in available)},
+    )
+    return EncoderBackend.LIBX264
+
+
 @dataclass
 class H264EncoderSettings:
     """
-    Configuration for H.264 video encoding.
+    Configuration for video encoding, on x264 scales.
 
     Attributes:
         crf: Constant Rate Factor (0-51, lower = better quality, 18-28 recommended)
@@ -67,6 +268,7 @@ class H264EncoderSettings:
         max_bitrate: Maximum bitrate in kbps
         buffer_size: VBV buffer size in kbps
         two_pass: Enable two-pass encoding for better quality
+        backend: Encoder the settings are translated for
     """
 
     crf: int = 21
@@ -82,6 +284,7 @@ class H264EncoderSettings:
     max_bitrate: int | None = None  # kbps
     buffer_size: int | None = None  # kbps
     two_pass: bool = False
+    backend: EncoderBackend = EncoderBackend.LIBX264
 
     def __post_init__(self) -> None:
         """Validate settings."""
@@ -97,10 +300,11 @@ class H264EncoderSettings:
 
 class H264EncoderBuilder:
     """
-    Builder for H.264 encoding parameters.
+    Builder for video encoding parameters.
 
     Provides utilities for generating FFmpeg arguments for H.264 encoding
-    with various quality and optimization settings.
+    with various quality and optimization settings, translated for the
+    settings' encoder backend.
 
     Example:
         >>> builder = H264EncoderBuilder()
@@ -119,11 +323,11 @@ class H264EncoderBuilder:
         include_codec: bool = True,
     ) -> list[str]:
         """
-        Build FFmpeg arguments for H.264 encoding.
+        Build FFmpeg arguments for the settings' encoder backend.
 
         Args:
             settings: Encoder settings configuration
-            include_codec: Whether to include "-c:v libx264" (default: True)
+            include_codec: Whether to include "-c:v <backend>" (default: True)
 
         Returns:
             List of FFmpeg arguments
@@ -134,10 +338,11 @@ class H264EncoderBuilder:
             >>> # ['-c:v', 'libx264', '-crf', '21', '-preset', 'medium', ...]
         """
         args: list[str] = []
+        backend = BACKEND_PRESETS[settings.backend]
 
         # Video codec
         if include_codec:
-            args.extend(["-c:v", "libx264"])
+            args.extend(["-c:v", settings.backend.value])
 
         # Quality/bitrate settings
         if settings.bitrate is not None:
@@ -151,21 +356,25 @@ class H264EncoderBuilder:
                 args.extend(["-bufsize", f"{settings.buffer_size}k"])
         else:
             # CRF mode (constant quality)
-            args.extend(["-crf", str(settings.crf)])
+            args.extend(["-crf", str(backend.crf_for(settings.crf))])
+            if settings.backend == EncoderBackend.LIBVPX_VP9:
+                args.extend(["-b:v", "0"])
 
         # Preset
-        args.extend(["-preset", settings.preset.value])
+        args.extend(backend.speed_args[settings.preset])
 
         # Profile
-        args.extend(["-profile:v", settings.profile.value])
+        if backend.profiles is not None:
+            args.extend(["-profile:v", backend.profiles[settings.profile]])
 
-        # Tune (optional)
-        if settings.tune is not None:
-            args.extend(["-tune", settings.tune.value])
+        if backend.supports_x264_options:
+            # Tune (optional)
+            if settings.tune is not None:
+                args.extend(["-tune", settings.tune.value])
 
-        # Level (optional)
-        if settings.level is not None:
-            args.extend(["-level", settings.level])
+            # Level (optional)
+            if settings.level is not None:
+                args.extend(["-level", settings.level])
 
         # Pixel format
         args.extend(["-pix_fmt", settings.pixel_format])
@@ -174,22 +383,16 @@ class H264EncoderBuilder:
         if settings.keyframe_interval > 0:
             args.extend(["-g", str(settings.keyframe_interval)])
 
-        # B-frames
-        if settings.b_frames is not None:
-            args.extend(["-bf", str(settings.b_frames)])
-
-        # Reference frames
-        if settings.ref_frames is not None:
-            args.extend(["-refs", str(settings.ref_frames)])
-
-        # Additional x264 options for optimization
-        x264_params: list[str] = []
+        if backend.supports_x264_options:
+            # B-frames
+            if settings.b_frames is not None:
+                args.extend(["-bf", str(settings.b_frames)])
 
-        # Fast start for web playback (move moov atom to beginning)
-        # This is typically added as a global option, not x264-params
+            # Reference frames
+            if settings.ref_frames is not None:
+                args.extend(["-refs", str(settings.ref_frames)])
 
-        if x264_params:
-            args.extend(["-x264-params", ":".join(x264_params)])
+        args.extend(backend.extra_args)
 
         return args
 
@@ -0,0 +1,494 @@
+"""
+Encoder profiles for composition renders.
+
+Maps an output profile (draft, preview, final, archive) and the output
+resolution to encoder settings for the worker's encoder backend, built
+through H264EncoderBuilder, and picks a faster preset when the measured encode
+speed says the profile's preset would miss the render deadline. Each profile
+also picks how the MP4 is muxed, so most renders avoid the +faststart rewrite
+of the finished file.
+"""
+
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass, field, replace
+from enum import Enum
+
+from services.ffmpeg.encoder import (
+    EncoderBackend,
+    H264EncoderBuilder,
+    H264EncoderSettings,
+    H264Preset,
+    H264Profile,
+)
+
+
+class EncoderProfile(str, Enum):
+    """Output profiles, from cheapest to most expensive to encode."""
+
+    DRAFT = "draft"  # Quick look while editing
+    PREVIEW = "preview"  # Shareable review copy
+    FINAL = "final"  # Web delivery (default)
+    ARCHIVE = "archive"  # Best quality, smallest file per quality
+
+
+class Mp4MuxMode(str, Enum):
+    """How the moov atom ends up at the front of an MP4/MOV output."""
+
+    # Write moov at the end, then rewrite the whole file to move it forward
+    FASTSTART = "faststart"
+    # Empty moov up front, media in fragments; no rewrite, streams as it is written
+    FRAGMENTED = "fragmented"
+    # Reserve space for moov up front and fill it in at the end; no rewrite
+    RESERVED_MOOV = "reserved_moov"
+
+
+# Presets ordered from fastest to slowest
+PRESET_ORDER: tuple[H264Preset, ...] = (
+    H264Preset.ULTRAFAST,
+    H264Preset.SUPERFAST,
+    H264Preset.VERYFAST,
+    H264Preset.FASTER,
+    H264Preset.FAST,
+    H264Preset.MEDIUM,
+    H264Preset.SLOW,
+    H264Preset.SLOWER,
+    H264Preset.VERYSLOW,
+)
+
+# Approximate x264 throughput of each preset relative to medium
+PRESET_RELATIVE_SPEED: dict[H264Preset, float] = {
+    H264Preset.ULTRAFAST: 6.0,
+    H264Preset.SUPERFAST: 4.5,
+    H264Preset.VERYFAST: 3.0,
+    H264Preset.FASTER: 1.8,
+    H264Preset.FAST: 1.4,
+    H264Preset.MEDIUM: 1.0,
+    H264Preset.SLOW: 0.6,
+    H264Preset.SLOWER: 0.3,
+    H264Preset.VERYSLOW: 0.15,
+}
+
+# Resolution tiers by output height: (max height, tier name)
+RESOLUTION_TIERS: tuple[tuple[int, str], ...] = (
+    (480, "sd"),
+    (720, "hd"),
+    (1080, "fhd"),
+)
+LARGEST_TIER = "uhd"
+
+# (preset, crf) per profile and resolution tier. Higher resolutions hide more
+# quantization, so CRF creeps up; 4K steps the preset down to keep CPU bounded.
+PROFILE_TABLES: dict[EncoderProfile, dict[str, tuple[H264Preset, int]]] = {
+    EncoderProfile.DRAFT: {
+        "sd": (H264Preset.ULTRAFAST, 30),
+        "hd": (H264Preset.ULTRAFAST, 30),
+        "fhd": (H264Preset.ULTRAFAST, 31),
+        "uhd": (H264Preset.ULTRAFAST, 32),
+    },
+    EncoderProfile.PREVIEW: {
+        "sd": (H264Preset.VERYFAST, 26),
+        "hd": (H264Preset.VERYFAST, 26),
+        "fhd": (H264Preset.VERYFAST, 27),
+        "uhd": (H264Preset.SUPERFAST, 28),
+    },
+    EncoderProfile.FINAL: {
+        "sd": (H264Preset.MEDIUM, 22),
+        "hd": (H264Preset.MEDIUM, 23),
+        "fhd": (H264Preset.MEDIUM, 23),
+        "uhd": (H264Preset.FAST, 24),
+    },
+    EncoderProfile.ARCHIVE: {
+        "sd": (H264Preset.SLOW, 18),
+        "hd": (H264Preset.SLOW, 18),
+        "fhd": (H264Preset.SLOWER, 18),
+        "uhd": (H264Preset.SLOW, 19),
+    },
+}
+
+
+# Mux mode per profile. Draft and preview are watched in the browser and
+# thrown away, so fragmented output is fine. Final keeps a regular MP4 for the
+# widest player support, but reserves the moov space instead of rewriting the
+# file. Archive is encoded slowly anyway and gets the most compact file.
+PROFILE_MUX_MODES: dict[EncoderProfile, Mp4MuxMode] = {
+    EncoderProfile.DRAFT: Mp4MuxMode.FRAGMENTED,
+    EncoderProfile.PREVIEW: Mp4MuxMode.FRAGMENTED,
+    EncoderProfile.FINAL: Mp4MuxMode.RESERVED_MOOV,
+    EncoderProfile.ARCHIVE: Mp4MuxMode.FASTSTART,
+}
+
+# Containers that take -movflags / -moov_size
+MP4_FAMILY_FORMATS = {"mp4", "mov", "m4v"}
+
+
+def resolution_tier(height: int) -> str:
+    """
+    Get the resolution tier name for an output height.
+
+    Args:
+        height: Output height in pixels
+
+    Returns:
+        Tier name ("sd", "hd", "fhd" or "uhd")
+    """
+    for max_height, tier in RESOLUTION_TIERS:
+        if height <= max_height:
+            return tier
+    return LARGEST_TIER
+
+
+def estimate_moov_size(
+    duration_seconds: float,
+    fps: float,
+    audio_sample_rate: int = 48000,
+) -> int:
+    """
+    Estimate a safe reserved size for the moov atom.
+
+    The sample tables grow with the number of samples: each video frame costs
+    at most ~24 bytes (size, chunk offset, timing, composition offset and sync
+    entries) and each AAC frame of 1024 samples ~12 bytes. The estimate doubles
+    that and adds a fixed allowance for headers, because FFmpeg fails the
+    encode if the reserved space turns out too small.
+
+    Args:
+        duration_seconds: Output duration
+        fps: Output frame rate
+        audio_sample_rate: Audio sample rate in Hz
+
+    Returns:
+        Bytes to reserve
+    """
+    video_samples = duration_seconds * fps
+    audio_samples = duration_seconds * audio_sample_rate / 1024
+    table_bytes = video_samples * 24 + audio_samples * 12
+    return int(table_bytes * 2) + 64 * 1024
+
+
+def build_mux_args(
+    mode: Mp4MuxMode,
+    duration_seconds: float | None = None,
+    fps: float = 30.0,
+) -> list[str]:
+    """
+    Build FFmpeg muxer arguments for an MP4/MOV output.
+
+    Args:
+        mode: Mux mode
+        duration_seconds: Output duration; reserving moov space needs it and
+            falls back to faststart without it
+        fps: Output frame rate
+
+    Returns:
+        List of FFmpeg arguments
+    """
+    if mode == Mp4MuxMode.FRAGMENTED:
+        return ["-movflags", "frag_keyframe+empty_moov+default_base_moof"]
+
+    if mode == Mp4MuxMode.RESERVED_MOOV and duration_seconds:
+        return ["-moov_size", str(estimate_moov_size(duration_seconds, fps))]
+
+    return ["-movflags", "+faststart"]
+
+
+class EncodeSpeedTracker:
+    """
+    Tracks measured encode throughput on this worker.
+
+    Throughput is stored in megapixel-frames per second normalized to the
+    medium preset, so a measurement taken with one preset predicts the others
+    through PRESET_RELATIVE_SPEED. Measurements are smoothed with an
+    exponentially weighted moving average.
+    """
+
+    def __init__(
+        self,
+        default_throughput: float = 60.0,
+        smoothing: float = 0.3,
+    ) -> None:
+        """
+        Initialize the tracker.
+
+        Args:
+            default_throughput: Medium-preset megapixel-frames/s assumed before
+                any measurement (about 30 fps at 1080p)
+            smoothing: Weight of each new measurement (0-1)
+        """
+        self.default_throughput = default_throughput
+        self.smoothing = smoothing
+        self._throughput: float | None = None
+        self._samples = 0
+        self._lock = threading.Lock()
+
+    @property
+    def samples(self) -> int:
+        """Number of measurements recorded."""
+        return self._samples
+
+    @property
+    def throughput(self) -> float:
+        """Medium-equivalent throughput in megapixel-frames per second."""
+        return self._throughput if self._throughput is not None else self.default_throughput
+
+    def record(
+        self,
+        preset: H264Preset,
+        frames: int,
+        width: int,
+        height: int,
+        elapsed_seconds: float,
+    ) -> None:
+        """
+        Record one finished encode.
+
+        Args:
+            preset: Preset used for the encode
+            frames: Number of frames encoded
+            width: Output width in pixels
+            height: Output height in pixels
+            elapsed_seconds: Wall-clock encode time
+        """
+        if frames <= 0 or elapsed_seconds <= 0:
+            return
+
+        megapixel_frames = frames * width * height / 1_000_000
+        normalized = megapixel_frames / elapsed_seconds / PRESET_RELATIVE_SPEED[preset]
+
+        with self._lock:
+            if self._throughput is None:
+                self._throughput = normalized
+            else:
+                self._throughput += self.smoothing * (normalized - self._throughput)
+            self._samples += 1
+
+    def estimate_seconds(
+        self,
+        preset: H264Preset,
+        frames: int,
+        width: int,
+        height: int,
+    ) -> float:
+        """
+        Estimate encode time for a render.
+
+        Args:
+            preset: Preset to estimate for
+            frames: Number of frames to encode
+            width: Output width in pixels
+            height: Output height in pixels
+
+        Returns:
+            Estimated wall-clock seconds
+        """
+        megapixel_frames = frames * width * height / 1_000_000
+        return megapixel_frames / (self.throughput * PRESET_RELATIVE_SPEED[preset])
+
+
+@dataclass
+class EncoderSelection:
+    """
+    Encoder settings chosen for a render.
+
+    Attributes:
+        profile: Requested output profile
+        settings: H.264 settings to encode with
+        table_preset: Preset from the profile table, before deadline selection
+        mux_args: MP4/MOV muxer arguments for the profile
+        estimated_seconds: Predicted encode time with the chosen preset
+    """
+
+    profile: EncoderProfile
+    settings: H264EncoderSettings
+    table_preset: H264Preset
+    mux_args: list[str] = field(default_factory=lambda: ["-movflags", "+faststart"])
+    estimated_seconds: float | None = None
+
+    @property
+    def deadline_adjusted(self) -> bool:
+        """Whether a faster preset was chosen to meet the deadline."""
+        return self.settings.preset != self.table_preset
+
+
+class EncoderProfileEngine:
+    """
+    Resolves output profiles into H.264 encoder settings.
+
+    Example:
+        >>> engine = EncoderProfileEngine()
+        >>> selection = engine.select(EncoderProfile.PREVIEW, 1280, 720, fps=30)
+        >>> args = engine.build_encoder_args(selection.settings)
+        >>> # ['-c:v', 'libx264', '-crf', '26', '-preset', 'veryfast', ...]
+    """
+
+    def __init__(
+        self,
+        speed_tracker: EncodeSpeedTracker | None = None,
+        deadline_headroom: float = 0.8,
+        backend: EncoderBackend = EncoderBackend.LIBX264,
+    ) -> None:
+        """
+        Initialize the engine.
+
+        Args:
+            speed_tracker: Encode speed measurements (default: shared tracker for the backend)
+            deadline_headroom: Fraction of the deadline the encode may use,
+                leaving the rest for download, upload and estimate error
+            backend: Encoder backend the settings are built for
+        """
+        self.builder = H264EncoderBuilder()
+        self.backend = backend
+        self.speed_tracker = speed_tracker or get_encode_speed_tracker(backend)
+        self.deadline_headroom = deadline_headroom
+
+    def settings_for(
+        self,
+        profile: EncoderProfile,
+        width: int,
+        height: int,
+        fps: float = 30.0,
+    ) -> H264EncoderSettings:
+        """
+        Build encoder settings from the profile table.
+
+        Args:
+            profile: Output profile
+            width: Output width in pixels
+            height: Output height in pixels
+            fps: Output frame rate
+
+        Returns:
+            H264EncoderSettings for the profile and resolution
+        """
+        preset, crf = PROFILE_TABLES[profile][resolution_tier(height)]
+        keyframe_interval = max(1, round(fps * 2))  # Keyframe every 2 seconds
+
+        if profile == EncoderProfile.ARCHIVE:
+            settings = self.builder.create_archive_settings(quality_level=crf)
+        elif profile == EncoderProfile.FINAL:
+            settings = self.builder.create_web_optimized_settings(quality_level=crf)
+            # Level 4.0 only covers up to 1080p30; let x264 pick above that
+            if height > 1080 or fps > 30:
+                settings = replace(settings, level=None)
+        else:
+            settings = H264EncoderSettings(crf=crf, profile=H264Profile.HIGH)
+
+        return replace(
+            settings, preset=preset, keyframe_interval=keyframe_interval, backend=self.backend
+        )
+
+    def select_preset_for_deadline(
+        self,
+        ceiling: H264Preset,
+        frames: int,
+        width: int,
+        height: int,
+        deadline_seconds: float,
+    ) -> tuple[H264Preset, float]:
+        """
+        Pick the slowest preset, up to `ceiling`, predicted to meet the deadline.
+
+        Presets are tried from `ceiling` towards ultrafast, so a render never
+        spends more CPU than its profile allows and only gets faster when the
+        measured encode speed says it has to.
+
+        Args:
+            ceiling: Slowest preset allowed (from the profile table)
+            frames: Number of frames to encode
+            width: Output width in pixels
+            height: Output height in pixels
+            deadline_seconds: Time available for the render
+
+        Returns:
+            Tuple of (preset, estimated encode seconds)
+        """
+        budget = deadline_seconds * self.deadline_headroom
+        candidates = PRESET_ORDER[: PRESET_ORDER.index(ceiling) + 1]
+
+        for preset in reversed(candidates):
+            estimate = self.speed_tracker.estimate_seconds(preset, frames, width, height)
+            if estimate <= budget:
+                return preset, estimate
+
+        # Nothing fits; the fastest preset is the best we can do
+        fastest = PRESET_ORDER[0]
+        return fastest, self.speed_tracker.estimate_seconds(fastest, frames, width, height)
+
+    def select(
+        self,
+        profile: EncoderProfile | str,
+        width: int,
+        height: int,
+        fps: float = 30.0,
+        duration_seconds: float | None = None,
+        deadline_seconds: float | None = None,
+    ) -> EncoderSelection:
+        """
+        Choose encoder settings for a render.
+
+        Args:
+            profile: Output profile (enum or its value)
+            width: Output width in pixels
+            height: Output height in pixels
+            fps: Output frame rate
+            duration_seconds: Output duration, needed for deadline selection
+            deadline_seconds: Time available for the render (None = no deadline)
+
+        Returns:
+            EncoderSelection with the settings to use
+        """
+        profile = EncoderProfile(profile)
+        settings = self.settings_for(profile, width, height, fps)
+        selection = EncoderSelection(
+            profile=profile,
+            settings=settings,
+            table_preset=settings.preset,
+            mux_args=build_mux_args(PROFILE_MUX_MODES[profile], duration_seconds, fps),
+        )
+
+        if duration_seconds and deadline_seconds:
+            frames = int(duration_seconds * fps)
+            preset, estimate = self.select_preset_for_deadline(
+                settings.preset, frames, width, height, deadline_seconds
+            )
+            selection.settings = replace(settings, preset=preset)
+            selection.estimated_seconds = estimate
+
+        return selection
+
+    def build_encoder_args(self, settings: H264EncoderSettings) -> list[str]:
+        """
+        Build FFmpeg video encoder arguments.
+
+        Args:
+            settings: Encoder settings
+
+        Returns:
+            List of FFmpeg arguments
+        """
+        return self.builder.build_encoder_args(settings)
+
+
+_speed_trackers: dict[EncoderBackend, EncodeSpeedTracker] = {}
+_speed_trackers_lock = threading.Lock()
+
+
+def get_encode_speed_tracker(
+    backend: EncoderBackend = EncoderBackend.LIBX264,
+) -> EncodeSpeedTracker:
+    """
+    Get the process-wide encode speed tracker for a backend.
+
+    Backends differ too much in speed to share one measurement.
+
+    Args:
+        backend: Encoder backend
+
+    Returns:
+        Shared EncodeSpeedTracker instance
+    """
+    with _speed_trackers_lock:
+        if backend not in _speed_trackers:
+            _speed_trackers[backend] = EncodeSpeedTracker()
+        return _speed_trackers[backend]
@@ -13,6 +13,8 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import Any
 
+from services.tracing import traced
+
 
 @dataclass
 class StreamInfo:
@@ -29,6 +31,11 @@ class StreamInfo:
         bit_rate: Bitrate in bits per second
         sample_rate: Audio sample rate (audio streams only)
         channels: Number of audio channels (audio streams only)
+        pix_fmt: Pixel format (video streams only)
+        profile: Codec profile (e.g. "High" for H.264)
+        sample_aspect_ratio: Sample aspect ratio as "N:D" (video streams only)
+        level: Codec level (e.g. 40 for H.264 level 4.0)
+        extradata_hash: Hash of the codec extradata, e.g. the H.264 SPS/PPS
     """
 
     index: int
@@ -41,6 +48,11 @@ class StreamInfo:
     bit_rate: int | None = None
     sample_rate: int | None = None
     channels: int | None = None
+    pix_fmt: str | None = None
+    profile: str | None = None
+    sample_aspect_ratio: str | None = None
+    level: int | None = None
+    extradata_hash: str | None = None
 
     @property
     def is_video(self) -> bool:
@@ -157,6 +169,7 @@ class InputFileManager:
         """
         self.ffprobe_path = ffprobe_path
 
+    @traced("ffprobe")
     def probe_file(self, file_path: str | Path) -> MediaFileInfo:
         """
         Probe a media file and extract comprehensive information.
@@ -189,6 +202,8 @@ class InputFileManager:
             "json",
             "-show_format",
             "-show_streams",
+            "-show_data_hash",
+            "SHA256",
             str(path),
         ]
 
@@ -292,6 +307,16 @@ class InputFileManager:
 
             channels = int(stream_data.get("channels", 0)) or None
 
+            # ffprobe reports an unknown level as -99
+            level = None
+            if "level" in stream_data:
+                try:
+                    level = int(stream_data["level"])
+                except (ValueError, TypeError):
+                    pass
+                if level is not None and level < 0:
+                    level = None
+
             return StreamInfo(
                 index=index,
                 codec_type=codec_type,
@@ -303,12 +328,68 @@ class InputFileManager:
                 bit_rate=bit_rate,
                 sample_rate=sample_rate,
                 channels=channels,
+                pix_fmt=stream_data.get("pix_fmt"),
+                profile=stream_data.get("profile"),
+                sample_aspect_ratio=stream_data.get("sample_aspect_ratio"),
+                level=level,
+                extradata_hash=stream_data.get("extradata_hash"),
             )
 
         except Exception:
             # If parsing fails for any reason, return None
             return None
 
+    def probe_keyframes(self, file_path: str | Path) -> list[float]:
+        """
+        List keyframe timestamps of the first video stream.
+
+        Only keyframes are decoded (-skip_frame nokey), so this is fast even
+        for long files.
+
+        Args:
+            file_path: Path to the media file
+
+        Returns:
+            Sorted keyframe presentation times in seconds
+
+        Raises:
+            ValueError: If ffprobe fails
+        """
+        cmd = [
+            self.ffprobe_path,
+            "-v",
+            "quiet",
+            "-select_streams",
+            "v:0",
+            "-skip_frame",
+            "nokey",
+            "-show_entries",
+            "frame=pts_time",
+            "-of",
+            "csv=p=0",
+            str(file_path),
+        ]
+
+        try:
+            result = subprocess.run(
+                cmd,
+                capture_output=True,
+                text=True,
+                check=True,
+                timeout=30,
+            )
+        except subprocess.CalledProcessError as e:
+            raise ValueError(f"ffprobe failed for {file_path}: {e.stderr}") from e
+        except subprocess.TimeoutExpired as e:
+            raise ValueError(f"ffprobe timed out for {file_path}") from e
+
+        keyframes: list[float] = []
+        for line in result.stdout.splitlines():
+            value = line.strip().rstrip(",")
+            if value and value != "N/A":
+                keyframes.append(float(value))
+        return sorted(keyframes)
+
     def validate_file(
         self,
         file_path: str | Path,
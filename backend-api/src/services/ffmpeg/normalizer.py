@@ -13,8 +13,15 @@ import subprocess
 from dataclasses import dataclass
 from pathlib import Path
 
+from services.ffmpeg.encoder import (
+    EncoderBackend,
+    H264EncoderBuilder,
+    H264EncoderSettings,
+    H264Preset,
+)
 from services.ffmpeg.input_manager import InputFileManager, MediaFileInfo
 from services.ffmpeg.validator import FilterChainValidator
+from services.tracing import span
 
 logger = logging.getLogger(__name__)
 
@@ -30,6 +37,7 @@ class NormalizationSettings:
         scale_mode: Scaling mode (force, fit, fill)
         preserve_aspect_ratio: Whether to preserve aspect ratio
         pad_color: Color for padding when preserving aspect ratio
+        encoder_backend: Video encoder for the normalized output
     """
 
     target_width: int = 1280
@@ -38,6 +46,7 @@ class NormalizationSettings:
     scale_mode: str = "fit"  # force, fit, fill
     preserve_aspect_ratio: bool = True
     pad_color: str = "black"
+    encoder_backend: EncoderBackend = EncoderBackend.LIBX264
 
     def __post_init__(self) -> None:
         """Validate settings after initialization."""
@@ -239,13 +248,14 @@ class VideoNormalizer:
                 extra={"command": " ".join(cmd[:10]) + " ..."},
             )
 
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=timeout,
-                check=True,
-            )
+            with span("ffmpeg.normalize", {"ffmpeg.input": str(input_path)}):
+                result = subprocess.run(
+                    cmd,
+                    capture_output=True,
+                    text=True,
+                    timeout=timeout,
+                    check=True,
+                )
 
             logger.debug("FFmpeg normalization completed", extra={"stderr": result.stderr[:500]})
 
@@ -362,16 +372,15 @@ class VideoNormalizer:
 
         cmd.extend(["-vf", filter_string])
 
-        # Video codec settings - use libx264 with fast preset for normalization
+        # Video codec settings - fast preset at reasonable quality for normalization
         cmd.extend(
-            [
-                "-c:v",
-                "libx264",
-                "-preset",
-                "fast",  # Fast encoding for normalization
-                "-crf",
-                "23",  # Reasonable quality
-            ]
+            H264EncoderBuilder().build_encoder_args(
+                H264EncoderSettings(
+                    crf=23,
+                    preset=H264Preset.FAST,
+                    backend=settings.encoder_backend,
+                )
+            )
         )
 
         # Audio handling - copy if exists, otherwise handle gracefully
@@ -419,7 +428,8 @@ class VideoNormalizer:
         settings_key = (
             f"{settings.target_width}x{settings.target_height}_"
             f"{settings.target_fps}fps_{settings.scale_mode}_"
-            f"{settings.preserve_aspect_ratio}_{settings.pad_color}"
+            f"{settings.preserve_aspect_ratio}_{settings.pad_color}_"
+            f"{settings.encoder_backend.value}"
         )
 
         # Combine and hash
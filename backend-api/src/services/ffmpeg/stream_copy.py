@@ -0,0 +1,272 @@
+"""
+Stream-copy planning for compositions that need no re-encode.
+
+When every clip already matches the output resolution, frame rate and codec,
+there are no overlays, and every trim lands on a keyframe, the composition is
+a plain concatenation: it can go through the concat demuxer with -c copy and
+finish in seconds instead of re-encoding every frame.
+"""
+
+from __future__ import annotations
+
+import bisect
+import logging
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from services.ffmpeg.concat_builder import ConcatSegment
+from services.ffmpeg.input_manager import InputFileManager, MediaFileInfo
+
+logger = logging.getLogger(__name__)
+
+# Container formats the concat demuxer can copy H.264/AAC out of
+COPYABLE_FORMATS = {"mov", "mp4", "m4a", "3gp", "3g2", "mj2"}
+
+# Sample aspect ratios that mean square pixels (the re-encode path forces setsar=1)
+SQUARE_PIXEL_RATIOS = {None, "1:1", "0:1", "N/A"}
+
+
+@dataclass
+class StreamCopyClip:
+    """
+    A clip to concatenate.
+
+    Attributes:
+        path: Local path to the clip
+        trim_start: Start point in the source (seconds)
+        trim_end: End point in the source (seconds, None = end of file)
+    """
+
+    path: Path
+    trim_start: float = 0.0
+    trim_end: float | None = None
+
+
+@dataclass
+class StreamCopyPlan:
+    """
+    Outcome of stream-copy planning.
+
+    Attributes:
+        eligible: Whether the composition can be stream-copied
+        reason: Why it cannot (None when eligible)
+        segments: Concat demuxer segments, with trims snapped to keyframes
+        has_audio: Whether the inputs carry audio to copy
+    """
+
+    eligible: bool
+    reason: str | None = None
+    segments: list[ConcatSegment] = field(default_factory=list)
+    has_audio: bool = False
+
+    @classmethod
+    def rejected(cls, reason: str) -> StreamCopyPlan:
+        """Create a plan that falls back to re-encoding."""
+        return cls(eligible=False, reason=reason)
+
+
+class StreamCopyPlanner:
+    """
+    Decides from probe data whether a composition can skip re-encoding.
+
+    Partial GOPs at trim points are not re-encoded ("smart cut"): the
+    re-encoded pieces would carry their own SPS/PPS, which a single MP4 avcC
+    cannot describe, so any trim that is not on a keyframe falls back to the
+    normal re-encode path.
+
+    Example:
+        >>> planner = StreamCopyPlanner()
+        >>> plan = planner.plan([StreamCopyClip(Path("a.mp4")), StreamCopyClip(Path("b.mp4"))],
+        ...                     width=1920, height=1080, fps=30)
+        >>> if plan.eligible:
+        ...     # ffmpeg -f concat -safe 0 -i list.txt -c copy out.mp4
+        ...     pass
+    """
+
+    def __init__(
+        self,
+        input_manager: InputFileManager | None = None,
+        video_codec: str = "h264",
+        pixel_format: str = "yuv420p",
+        fps_tolerance: float = 0.01,
+    ) -> None:
+        """
+        Initialize the planner.
+
+        Args:
+            input_manager: Probe helper (default: ffprobe from PATH)
+            video_codec: Codec the output must have (the encoder backend's codec_name)
+            pixel_format: Pixel format the output must have
+            fps_tolerance: Allowed frame rate difference
+        """
+        self.input_manager = input_manager or InputFileManager()
+        self.video_codec = video_codec
+        self.pixel_format = pixel_format
+        self.fps_tolerance = fps_tolerance
+
+    def plan(
+        self,
+        clips: list[StreamCopyClip],
+        width: int,
+        height: int,
+        fps: float,
+        has_overlays: bool = False,
+        infos: list[MediaFileInfo] | None = None,
+    ) -> StreamCopyPlan:
+        """
+        Plan a stream-copy concatenation.
+
+        Args:
+            clips: Clips in timeline order
+            width: Output width in pixels
+            height: Output height in pixels
+            fps: Output frame rate
+            has_overlays: Whether the composition draws overlays
+            infos: Probe data for each clip, if already known
+
+        Returns:
+            StreamCopyPlan; check `eligible` before using the segments
+        """
+        if not clips:
+            return StreamCopyPlan.rejected("no clips")
+        if has_overlays:
+            return StreamCopyPlan.rejected("overlays need a re-encode")
+
+        if infos is None:
+            try:
+                infos = [self.input_manager.probe_file(clip.path) for clip in clips]
+            except (FileNotFoundError, ValueError) as e:
+                return StreamCopyPlan.rejected(f"probe failed: {e}")
+
+        reason = self._check_streams(infos, width, height, fps)
+        if reason:
+            return StreamCopyPlan.rejected(reason)
+
+        segments: list[ConcatSegment] = []
+        for clip, info in zip(clips, infos):
+            segment = self._segment_for(clip, info, fps)
+            if segment is None:
+                return StreamCopyPlan.rejected(f"{clip.path.name}: trim is not on a keyframe")
+            segments.append(segment)
+
+        return StreamCopyPlan(eligible=True, segments=segments, has_audio=infos[0].has_audio)
+
+    def _check_streams(
+        self,
+        infos: list[MediaFileInfo],
+        width: int,
+        height: int,
+        fps: float,
+    ) -> str | None:
+        """
+        Check every input matches the output and each other.
+
+        Returns:
+            Reason the inputs cannot be copied, or None if they can
+        """
+        first_video = infos[0].primary_video_stream
+        first_audio = infos[0].primary_audio_stream
+
+        for info in infos:
+            name = info.path.name
+            formats = set((info.format_name or "").split(","))
+            if not formats & COPYABLE_FORMATS:
+                return f"{name}: container {info.format_name} cannot be copied"
+
+            if len(info.video_streams) != 1:
+                return f"{name}: expected one video stream, found {len(info.video_streams)}"
+            video = info.video_streams[0]
+
+            if video.codec_name != self.video_codec:
+                return f"{name}: codec {video.codec_name} != {self.video_codec}"
+            if (video.width, video.height) != (width, height):
+                return f"{name}: resolution {video.resolution} != {width}x{height}"
+            if video.fps is None or abs(video.fps - fps) > self.fps_tolerance:
+                return f"{name}: frame rate {video.fps} != {fps}"
+            if video.pix_fmt != self.pixel_format:
+                return f"{name}: pixel format {video.pix_fmt} != {self.pixel_format}"
+            if video.sample_aspect_ratio not in SQUARE_PIXEL_RATIOS:
+                return f"{name}: non-square pixels ({video.sample_aspect_ratio})"
+            if video.profile != first_video.profile:
+                return f"{name}: profile {video.profile} differs from {first_video.profile}"
+            if video.level != first_video.level:
+                return f"{name}: level {video.level} differs from {first_video.level}"
+            # One avcC/hvcC describes the whole output, so every clip needs the same SPS/PPS
+            if video.extradata_hash != first_video.extradata_hash:
+                return f"{name}: codec parameter sets differ from {infos[0].path.name}"
+
+            # Audio must be absent everywhere or identical everywhere
+            if len(info.audio_streams) > 1:
+                return f"{name}: multiple audio streams"
+            audio = info.primary_audio_stream
+            if (audio is None) != (first_audio is None):
+                return f"{name}: audio present in some clips only"
+            if audio is not None and (
+                audio.codec_name,
+                audio.sample_rate,
+                audio.channels,
+            ) != (first_audio.codec_name, first_audio.sample_rate, first_audio.channels):
+                return f"{name}: audio format differs between clips"
+
+        return None
+
+    def _segment_for(
+        self,
+        clip: StreamCopyClip,
+        info: MediaFileInfo,
+        fps: float,
+    ) -> ConcatSegment | None:
+        """
+        Build the concat segment for a clip, snapping trims to keyframes.
+
+        Returns:
+            ConcatSegment, or None if a trim falls inside a GOP
+        """
+        half_frame = 0.5 / fps
+        trims_start = clip.trim_start > half_frame
+        trims_end = (
+            clip.trim_end is not None
+            and info.duration is not None
+            and clip.trim_end < info.duration - half_frame
+        )
+
+        if not trims_start and not trims_end:
+            return ConcatSegment(file_path=clip.path)
+
+        try:
+            keyframes = self.input_manager.probe_keyframes(clip.path)
+        except ValueError as e:
+            logger.warning(f"Keyframe probe failed for {clip.path}: {e}")
+            return None
+
+        inpoint = 0.0
+        outpoint = None
+        if trims_start:
+            inpoint = self._keyframe_near(keyframes, clip.trim_start, half_frame)
+            if inpoint is None:
+                return None
+        if trims_end:
+            outpoint = self._keyframe_near(keyframes, clip.trim_end, half_frame)
+            if outpoint is None:
+                return None
+
+        return ConcatSegment(file_path=clip.path, inpoint=inpoint, outpoint=outpoint)
+
+    @staticmethod
+    def _keyframe_near(keyframes: list[float], target: float, tolerance: float) -> float | None:
+        """
+        Find the keyframe within `tolerance` of `target`.
+
+        Args:
+            keyframes: Sorted keyframe times
+            target: Time to match
+            tolerance: Maximum distance in seconds
+
+        Returns:
+            Keyframe time, or None if no keyframe is close enough
+        """
+        index = bisect.bisect_left(keyframes, target)
+        for candidate in keyframes[max(0, index - 1) : index + 1]:
+            if abs(candidate - target) <= tolerance:
+                return candidate
+        return None
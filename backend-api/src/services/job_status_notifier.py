@@ -0,0 +1,209 @@
+"""
+Change notifications for cached AI job status.
+
+Every write to a job's `ai_job:{job_id}` cache entry publishes the stored job
+data on `ai_job:{job_id}:status` in the same transaction. Long-polls and event
+streams wait on those messages instead of re-reading the cache on a timer.
+
+All waiters in a process share one Pub/Sub connection, subscribed only to the
+jobs somebody is waiting on. A single reader task hands each message to the
+waiters of its job.
+"""
+
+import asyncio
+import json
+import logging
+from dataclasses import dataclass, field
+from typing import Any
+
+import redis.asyncio as aioredis
+from app.config import get_settings
+from redis.asyncio.client import PubSub
+
+logger = logging.getLogger(__name__)
+
+# Seconds a reader poll blocks before checking whether anyone is still waiting
+READ_TIMEOUT_SECONDS = 1.0
+
+
+def job_status_channel(job_id: str) -> str:
+    """Pub/Sub channel announcing writes to a job's cache entry."""
+    return f"ai_job:{job_id}:status"
+
+
+@dataclass
+class _JobWaiters:
+    """Local waiters for one job, and whether its channel is subscribed."""
+
+    queues: set[asyncio.Queue] = field(default_factory=set)
+    subscribed: asyncio.Event = field(default_factory=asyncio.Event)
+
+
+class JobStatusNotifier:
+    """
+    Delivers job status notifications to the waiters of this process.
+
+    Each waiter gets a queue holding the most recent job data published for
+    its job; older updates it has not read yet are replaced, since only the
+    latest status matters.
+
+    Example:
+        >>> notifier = get_job_status_notifier()
+        >>> updates = await notifier.watch(job_id)
+        >>> try:
+        ...     job_data = await asyncio.wait_for(updates.get(), timeout=30)
+        ... finally:
+        ...     await notifier.unwatch(job_id, updates)
+    """
+
+    def __init__(self, redis_client: aioredis.Redis | None = None) -> None:
+        """
+        Initialize the notifier.
+
+        Args:
+            redis_client: Async Redis client (default: created from settings.redis_url)
+        """
+        self._redis = redis_client
+        self._pubsub: PubSub | None = None
+        self._waiters: dict[str, _JobWaiters] = {}
+        self._reader: asyncio.Task | None = None
+
+    @property
+    def redis(self) -> aioredis.Redis:
+        """Async Redis client, created on first use."""
+        if self._redis is None:
+            settings = get_settings()
+            self._redis = aioredis.from_url(
+                str(settings.redis_url),
+                max_connections=settings.redis_max_connections,
+                decode_responses=True,
+            )
+        return self._redis
+
+    async def watch(self, job_id: str) -> asyncio.Queue:
+        """
+        Start receiving a job's status notifications.
+
+        Returns once the job's channel is subscribed, so a cache read made
+        afterwards cannot miss a write: the write is either visible to the
+        read or announced on the queue.
+
+        Args:
+            job_id: Replicate prediction ID
+
+        Returns:
+            Queue of job data dicts, as stored in the cache
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=1)
+
+        waiters = self._waiters.get(job_id)
+        if waiters is None:
+            # Registered before the await, so concurrent watchers share one SUBSCRIBE
+            waiters = self._waiters[job_id] = _JobWaiters()
+            waiters.queues.add(queue)
+            try:
+                if self._pubsub is None:
+                    self._pubsub = self.redis.pubsub()
+                await self._pubsub.subscribe(job_status_channel(job_id))
+            except Exception as e:
+                logger.error(f"Failed to subscribe to status of job {job_id}: {e}")
+            finally:
+                waiters.subscribed.set()
+        else:
+            waiters.queues.add(queue)
+            await waiters.subscribed.wait()
+
+        if self._reader is None or self._reader.done():
+            self._reader = asyncio.create_task(self._read_loop())
+
+        return queue
+
+    async def unwatch(self, job_id: str, queue: asyncio.Queue) -> None:
+        """
+        Stop delivering a job's notifications to a queue.
+
+        Args:
+            job_id: Replicate prediction ID
+            queue: Queue returned by watch()
+        """
+        waiters = self._waiters.get(job_id)
+        if waiters is None:
+            return
+
+        waiters.queues.discard(queue)
+        if waiters.queues:
+            return
+
+        del self._waiters[job_id]
+        try:
+            if self._pubsub is not None:
+                await self._pubsub.unsubscribe(job_status_channel(job_id))
+        except Exception as e:
+            logger.warning(f"Failed to unsubscribe from status of job {job_id}: {e}")
+
+    async def _read_loop(self) -> None:
+        """Deliver notifications until nobody is waiting."""
+        while self._waiters and self._pubsub is not None:
+            try:
+                message = await self._pubsub.get_message(
+                    ignore_subscribe_messages=True, timeout=READ_TIMEOUT_SECONDS
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Job status notification read failed: {e}")
+                await asyncio.sleep(READ_TIMEOUT_SECONDS)
+                continue
+
+            if message is None:
+                continue
+
+            job_id = message["channel"].removeprefix("ai_job:").removesuffix(":status")
+            waiters = self._waiters.get(job_id)
+            if waiters is None:
+                continue
+
+            try:
+                job_data = json.loads(message["data"])
+            except (TypeError, ValueError):
+                logger.warning(f"Ignoring malformed status notification for job {job_id}")
+                continue
+
+            for queue in list(waiters.queues):
+                self._deliver(queue, job_data)
+
+    @staticmethod
+    def _deliver(queue: asyncio.Queue, job_data: dict[str, Any]) -> None:
+        """Replace any unread update with the latest one."""
+        if queue.full():
+            queue.get_nowait()
+        queue.put_nowait(job_data)
+
+    async def close(self) -> None:
+        """Stop the reader and close the Redis connections."""
+        self._waiters.clear()
+
+        if self._reader is not None and not self._reader.done():
+            self._reader.cancel()
+            try:
+                await self._reader
+            except asyncio.CancelledError:
+                pass
+
+        if self._pubsub is not None:
+            await self._pubsub.aclose()
+            self._pubsub = None
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
+
+
+_notifier: JobStatusNotifier | None = None
+
+
+def get_job_status_notifier() -> JobStatusNotifier:
+    """Get the process-wide job status notifier."""
+    global _notifier
+    if _notifier is None:
+        _notifier = JobStatusNotifier()
+    return _notifier
@@ -1,13 +1,14 @@
 """Metrics collection service for job and performance monitoring."""
 
 import uuid
-from datetime import UTC, datetime
+from datetime import UTC, datetime, timedelta
 from decimal import Decimal
 from typing import Any
 
 import psutil
 from app.logging_config import get_logger
 from db.models import JobMetric, MetricType
+from services.resource_sampler import ResourceSample
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -316,6 +317,52 @@ class MetricsCollector:
 
         return metrics
 
+    def add_resource_samples(
+        self,
+        composition_id: uuid.UUID,
+        samples: list[ResourceSample],
+        started_at: datetime,
+        processing_job_id: uuid.UUID | None = None,
+    ) -> int:
+        """
+        Add an FFmpeg resource time series to the batch.
+
+        Each sample becomes one metric per measurement, timestamped at its
+        point in the render. Flushed with the rest of the batch.
+
+        Args:
+            composition_id: UUID of the composition
+            samples: Time series from a ProcessSampler
+            started_at: When sampling started
+            processing_job_id: Optional UUID of the processing job
+
+        Returns:
+            int: Number of metrics added
+        """
+        count = 0
+        for sample in samples:
+            recorded_at = started_at + timedelta(seconds=sample.elapsed)
+            values = [
+                (MetricType.ENCODER_CPU, round(sample.cpu_percent, 2), "percent"),
+                (MetricType.ENCODER_MEMORY, round(sample.rss_bytes / (1024 * 1024), 2), "MB"),
+                (MetricType.ENCODER_READ_BYTES, sample.read_bytes, "bytes"),
+                (MetricType.ENCODER_WRITE_BYTES, sample.write_bytes, "bytes"),
+                (MetricType.ENCODE_FPS, round(sample.fps, 2), "fps"),
+                (MetricType.ENCODE_SPEED, round(sample.speed, 3), "x"),
+            ]
+            for metric_type, value, unit in values:
+                self.add_to_batch(
+                    metric_type=metric_type,
+                    value=value,
+                    unit=unit,
+                    composition_id=composition_id,
+                    processing_job_id=processing_job_id,
+                    recorded_at=recorded_at,
+                )
+                count += 1
+
+        return count
+
     async def get_metric_summary(
         self,
         metric_type: MetricType,
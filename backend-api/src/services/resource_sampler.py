@@ -0,0 +1,207 @@
+"""
+Resource sampling for FFmpeg child processes.
+
+JobMetricsContext measures the Python worker, but a render's CPU, memory and
+I/O are spent in the FFmpeg child. ProcessSampler polls that child from a
+background thread and keeps a compact time series: once the series reaches
+its point limit, adjacent points are merged and later samples are averaged
+over twice as many polls, so a long render costs the same as a short one.
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from typing import Any
+
+import psutil
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ResourceSample:
+    """
+    Resource usage of a process at one point of a render.
+
+    Attributes:
+        elapsed: Seconds since sampling started
+        cpu_percent: CPU usage since the previous sample (100 = one core)
+        rss_bytes: Resident memory
+        read_bytes: Bytes read since the process started
+        write_bytes: Bytes written since the process started
+        fps: Encode speed in frames per second, from FFmpeg progress
+        speed: Encode speed as a multiple of real time, from FFmpeg progress
+    """
+
+    elapsed: float
+    cpu_percent: float
+    rss_bytes: int
+    read_bytes: int = 0
+    write_bytes: int = 0
+    fps: float = 0.0
+    speed: float = 0.0
+
+
+def merge_samples(samples: list[ResourceSample]) -> ResourceSample:
+    """Merge consecutive samples into one point.
+
+    CPU and encode speed are averaged, memory keeps its peak, and the
+    cumulative I/O counters and elapsed time keep their latest value.
+
+    Args:
+        samples: Consecutive samples, oldest first
+
+    Returns:
+        ResourceSample: The merged point
+    """
+    count = len(samples)
+    last = samples[-1]
+    return ResourceSample(
+        elapsed=last.elapsed,
+        cpu_percent=sum(s.cpu_percent for s in samples) / count,
+        rss_bytes=max(s.rss_bytes for s in samples),
+        read_bytes=last.read_bytes,
+        write_bytes=last.write_bytes,
+        fps=sum(s.fps for s in samples) / count,
+        speed=sum(s.speed for s in samples) / count,
+    )
+
+
+class ProcessSampler:
+    """
+    Samples a process's CPU, memory and I/O in a background thread.
+
+    Example:
+        >>> sampler = ProcessSampler(process.pid, interval=1.0)
+        >>> sampler.start()
+        >>> ...  # feed sampler.update_progress(fps, speed) while it runs
+        >>> sampler.stop()
+        >>> sampler.summary()["peak_rss_mb"]
+    """
+
+    def __init__(self, pid: int, interval: float = 1.0, max_points: int = 120) -> None:
+        """Initialize process sampler.
+
+        Args:
+            pid: Process to sample
+            interval: Seconds between samples
+            max_points: Points kept before the series is downsampled (at least 2)
+        """
+        self.pid = pid
+        self.interval = interval
+        self.max_points = max(2, max_points)
+        self.started_at: datetime | None = None
+        self.samples: list[ResourceSample] = []
+
+        self._process: psutil.Process | None = None
+        self._pending: list[ResourceSample] = []
+        self._stride = 1  # Polls averaged into each new point
+        self._progress = (0.0, 0.0)
+        self._start_time = 0.0
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        """Start sampling; does nothing if the process is already gone."""
+        try:
+            self._process = psutil.Process(self.pid)
+            self._process.cpu_percent(None)  # First call only sets the baseline
+        except psutil.Error as e:
+            logger.debug(f"Not sampling process {self.pid}: {e}")
+            return
+
+        self.started_at = datetime.now(UTC)
+        self._start_time = time.monotonic()
+        self._thread = threading.Thread(
+            target=self._run, name=f"process-sampler-{self.pid}", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> list[ResourceSample]:
+        """Stop sampling and return the time series."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 1.0)
+            self._thread = None
+
+        if self._pending:
+            self.samples.append(merge_samples(self._pending))
+            self._pending = []
+        return self.samples
+
+    def update_progress(self, fps: float, speed: float) -> None:
+        """Record the latest encode speed, to be attached to the next sample."""
+        self._progress = (fps, speed)
+
+    def sample(self) -> ResourceSample | None:
+        """Take one sample and add it to the series.
+
+        Returns:
+            ResourceSample: The raw sample, or None if the process has exited
+        """
+        if self._process is None:
+            return None
+
+        try:
+            with self._process.oneshot():
+                cpu_percent = self._process.cpu_percent(None)
+                rss_bytes = self._process.memory_info().rss
+                # I/O counters are not available on every platform
+                io_counters = getattr(self._process, "io_counters", None)
+                io = io_counters() if io_counters else None
+        except psutil.Error:
+            return None
+
+        fps, speed = self._progress
+        sample = ResourceSample(
+            elapsed=time.monotonic() - self._start_time,
+            cpu_percent=cpu_percent,
+            rss_bytes=rss_bytes,
+            read_bytes=io.read_bytes if io else 0,
+            write_bytes=io.write_bytes if io else 0,
+            fps=fps,
+            speed=speed,
+        )
+        self._add(sample)
+        return sample
+
+    def summary(self) -> dict[str, Any]:
+        """Summarize the series for job metadata and logs."""
+        if not self.samples:
+            return {"samples": 0}
+
+        last = self.samples[-1]
+        count = len(self.samples)
+        return {
+            "samples": count,
+            "cpu_percent_avg": round(sum(s.cpu_percent for s in self.samples) / count, 1),
+            "cpu_percent_max": round(max(s.cpu_percent for s in self.samples), 1),
+            "peak_rss_mb": round(max(s.rss_bytes for s in self.samples) / (1024 * 1024), 1),
+            "read_mb": round(last.read_bytes / (1024 * 1024), 2),
+            "write_mb": round(last.write_bytes / (1024 * 1024), 2),
+            "fps_avg": round(sum(s.fps for s in self.samples) / count, 2),
+            "speed_avg": round(sum(s.speed for s in self.samples) / count, 3),
+        }
+
+    def _add(self, sample: ResourceSample) -> None:
+        """Add a raw sample, downsampling the series when it is full."""
+        self._pending.append(sample)
+        if len(self._pending) < self._stride:
+            return
+
+        self.samples.append(merge_samples(self._pending))
+        self._pending = []
+
+        if len(self.samples) >= self.max_points:
+            self.samples = [
+                merge_samples(self.samples[i : i + 2]) for i in range(0, len(self.samples), 2)
+            ]
+            self._stride *= 2
+
+    def _run(self) -> None:
+        """Sample until stopped or the process exits."""
+        while not self._stop_event.wait(self.interval):
+            if self.sample() is None:
+                break
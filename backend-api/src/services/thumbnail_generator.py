@@ -2,11 +2,15 @@
 Thumbnail Generation Service for video clips.
 
 This module provides functionality to extract thumbnail images from video clips
-using FFmpeg with support for multiple sizes and formats.
+using FFmpeg with support for multiple sizes and formats. All sizes of a
+thumbnail come from one seek and one decode, split into scaled outputs inside a
+single FFmpeg process; storyboard sprite sheets for timeline scrubbing are
+likewise built in one FFmpeg pass.
 """
 
 import logging
 import subprocess
+from collections.abc import Callable
 from dataclasses import dataclass
 from enum import Enum
 from pathlib import Path
@@ -14,6 +18,8 @@ from pathlib import Path
 from app.config import get_settings
 
 from services.ffmpeg.input_manager import InputFileManager
+from services.thumbnail_scoring import ThumbnailFrameScorer
+from services.tracing import traced
 
 logger = logging.getLogger(__name__)
 
@@ -41,6 +47,100 @@ THUMBNAIL_DIMENSIONS = {
     ThumbnailSize.LARGE: (1280, 720),
 }
 
+# Encoder arguments per output format
+FORMAT_ARGS = {
+    ThumbnailFormat.WEBP: [
+        "-c:v",
+        "libwebp",
+        "-quality",
+        "80",  # WebP quality
+        "-compression_level",
+        "6",  # Compression level (0-6)
+    ],
+    ThumbnailFormat.JPEG: ["-q:v", "2"],  # JPEG quality (2-31, lower is better)
+    ThumbnailFormat.PNG: ["-compression_level", "6"],  # PNG compression
+}
+
+# Each storyboard tile is a separate seek (an input) in the same FFmpeg process
+MAX_STORYBOARD_TILES = 100
+
+
+@dataclass
+class ThumbnailOutput:
+    """One image written by a thumbnail extraction.
+
+    Attributes:
+        path: Output image path
+        width: Width in pixels
+        height: Height in pixels (None = scale to width, keeping aspect ratio)
+        format: Image format
+    """
+
+    path: Path
+    width: int
+    height: int | None
+    format: ThumbnailFormat
+
+    @property
+    def scale_filter(self) -> str:
+        """Filter chain fitting the frame to this output's size."""
+        if self.height is None:
+            return f"scale={self.width}:-1"
+        return (
+            f"scale={self.width}:{self.height}:force_original_aspect_ratio=decrease,"
+            f"pad={self.width}:{self.height}:(ow-iw)/2:(oh-ih)/2:color=black"
+        )
+
+
+def build_thumbnail_command(
+    ffmpeg_path: str,
+    video_path: str | Path,
+    timestamp: float,
+    outputs: list[ThumbnailOutput],
+) -> list[str]:
+    """Build one FFmpeg command writing every output from a single frame.
+
+    The input is seeked and the frame decoded once; with several outputs the
+    frame is split inside the filter graph and each branch is scaled and
+    encoded to its own file.
+
+    Args:
+        ffmpeg_path: Path to ffmpeg executable
+        video_path: Path to video file
+        timestamp: Timestamp in seconds for frame extraction
+        outputs: Images to write
+
+    Returns:
+        list[str]: FFmpeg command
+    """
+    cmd = [
+        ffmpeg_path,
+        "-y",  # Overwrite output
+        "-ss",
+        str(timestamp),  # Seek to timestamp
+        "-i",
+        str(video_path),
+    ]
+
+    if len(outputs) == 1:
+        output = outputs[0]
+        cmd.extend(["-vframes", "1", "-vf", output.scale_filter])
+        cmd.extend(FORMAT_ARGS[output.format])
+        cmd.append(str(output.path))
+        return cmd
+
+    branches = "".join(f"[s{i}]" for i in range(len(outputs)))
+    chains = [f"[0:v]split={len(outputs)}{branches}"]
+    chains.extend(f"[s{i}]{output.scale_filter}[o{i}]" for i, output in enumerate(outputs))
+    cmd.extend(["-filter_complex", ";".join(chains)])
+
+    for i, output in enumerate(outputs):
+        cmd.extend(["-map", f"[o{i}]", "-frames:v", "1"])
+        cmd.extend(FORMAT_ARGS[output.format])
+        cmd.append(str(output.path))
+
+    return cmd
+
 
 @dataclass
 class ThumbnailMetadata:
@@ -80,6 +180,40 @@ class ThumbnailResult:
     was_fallback: bool = False
 
 
+@dataclass
+class StoryboardResult:
+    """A sprite sheet of evenly spaced frames for timeline scrubbing.
+
+    Tiles are laid out left to right, top to bottom, one per timestamp.
+
+    Attributes:
+        path: Path to the sprite sheet
+        timestamps: Video timestamp of each tile (seconds)
+        columns: Tiles per row
+        rows: Number of rows
+        tile_width: Tile width in pixels
+        tile_height: Tile height in pixels
+        format: Image format
+        video_duration: Total video duration (seconds)
+        was_fallback: Whether fallback format was used
+    """
+
+    path: Path
+    timestamps: list[float]
+    columns: int
+    rows: int
+    tile_width: int
+    tile_height: int
+    format: str
+    video_duration: float
+    was_fallback: bool = False
+
+    def tile_rect(self, index: int) -> tuple[int, int, int, int]:
+        """Get the (x, y, width, height) of a tile in the sprite sheet."""
+        row, column = divmod(index, self.columns)
+        return (column * self.tile_width, row * self.tile_height, self.tile_width, self.tile_height)
+
+
 class ThumbnailGeneratorError(Exception):
     """Exception raised for thumbnail generation errors."""
 
@@ -99,6 +233,7 @@ class ThumbnailGenerator:
         ffmpeg_path: str | None = None,
         ffprobe_path: str | None = None,
         output_dir: str | Path | None = None,
+        frame_scorer: ThumbnailFrameScorer | None = None,
     ) -> None:
         """Initialize thumbnail generator.
 
@@ -106,12 +241,15 @@ class ThumbnailGenerator:
             ffmpeg_path: Path to ffmpeg executable
             ffprobe_path: Path to ffprobe executable
             output_dir: Directory for thumbnail output
+            frame_scorer: Content-aware frame selection; when set, the
+                          best-scoring frame replaces the requested timestamp
         """
         settings = get_settings()
 
         self.ffmpeg_path = ffmpeg_path or settings.ffmpeg_path
         self.ffprobe_path = ffprobe_path or settings.ffprobe_path
         self.input_manager = InputFileManager(ffprobe_path=self.ffprobe_path)
+        self.frame_scorer = frame_scorer
 
         # Setup output directory
         if output_dir:
@@ -138,6 +276,7 @@ class ThumbnailGenerator:
         format: ThumbnailFormat = ThumbnailFormat.WEBP,
         use_fallback: bool = True,
         timeout: int = 30,
+        checksum: str | None = None,
     ) -> ThumbnailResult:
         """Generate a single thumbnail from video.
 
@@ -149,6 +288,7 @@ class ThumbnailGenerator:
             format: Output format
             use_fallback: Whether to fallback to JPEG if WebP fails
             timeout: FFmpeg timeout in seconds
+            checksum: Asset checksum keying the cached frame selection
 
         Returns:
             ThumbnailResult with thumbnail details
@@ -172,24 +312,10 @@ class ThumbnailGenerator:
             },
         )
 
-        # Probe video to get duration
-        try:
-            media_info = self.input_manager.probe_file(video_path)
-            video_duration = media_info.duration
-        except Exception as e:
-            logger.warning(f"Failed to probe video duration: {e}")
-            video_duration = None
-
-        # Validate timestamp
-        if video_duration and timestamp > video_duration:
-            logger.warning(
-                f"Timestamp {timestamp}s exceeds video duration {video_duration}s, "
-                f"using 1 second instead"
-            )
-            timestamp = min(1.0, video_duration - 0.1)
-
-        # Adjust timestamp for smart frame selection
-        adjusted_timestamp = self._select_smart_timestamp(video_path, timestamp, video_duration)
+        video_duration = self._probe_duration(video_path)
+        timestamp, adjusted_timestamp = self._resolve_timestamp(
+            video_path, timestamp, video_duration, checksum
+        )
 
         # Get dimensions for size
         width, height = THUMBNAIL_DIMENSIONS[size]
@@ -282,42 +408,88 @@ class ThumbnailGenerator:
         sizes: list[ThumbnailSize] | None = None,
         timestamp: float = 1.0,
         format: ThumbnailFormat = ThumbnailFormat.WEBP,
+        use_fallback: bool = True,
+        timeout: int = 30,
+        checksum: str | None = None,
     ) -> dict[str, ThumbnailResult]:
         """Generate multiple thumbnail sizes from same video.
 
+        The video is probed once and the frame is seeked and decoded once;
+        every size is written by the same FFmpeg process.
+
         Args:
             video_path: Path to video file
             sizes: List of thumbnail sizes (defaults to all)
             timestamp: Timestamp for frame extraction
             format: Output format
+            use_fallback: Whether to fallback to JPEG if WebP fails
+            timeout: FFmpeg timeout in seconds
+            checksum: Asset checksum keying the cached frame selection
 
         Returns:
-            dict: Map of size name to ThumbnailResult
+            dict: Map of size name to ThumbnailResult (empty if extraction failed)
 
         Raises:
-            ThumbnailGeneratorError: If generation fails
+            FileNotFoundError: If video file doesn't exist
         """
         if sizes is None:
             sizes = [ThumbnailSize.SMALL, ThumbnailSize.MEDIUM, ThumbnailSize.LARGE]
 
-        results = {}
+        video_path = Path(video_path)
+
+        if not video_path.exists():
+            raise FileNotFoundError(f"Video file not found: {video_path}")
+
+        video_duration = self._probe_duration(video_path)
+        timestamp, adjusted_timestamp = self._resolve_timestamp(
+            video_path, timestamp, video_duration, checksum
+        )
 
+        outputs = []
         for size in sizes:
-            try:
-                result = self.generate_thumbnail(
-                    video_path=video_path,
-                    timestamp=timestamp,
-                    size=size,
-                    format=format,
-                )
-                results[size.value] = result
+            width, height = THUMBNAIL_DIMENSIONS[size]
+            filename = f"{video_path.stem}_{size.value}_{int(timestamp)}s.{format.value}"
+            outputs.append(ThumbnailOutput(self.output_dir / filename, width, height, format))
+
+        try:
+            outputs, was_fallback = self._run_with_fallback(
+                lambda batch: build_thumbnail_command(
+                    self.ffmpeg_path, video_path, adjusted_timestamp, batch
+                ),
+                outputs,
+                use_fallback=use_fallback,
+                timeout=timeout,
+            )
+        except ThumbnailGeneratorError as e:
+            logger.error(
+                "Failed to generate thumbnails",
+                extra={"video": str(video_path), "error": str(e)},
+            )
+            return {}
 
-            except Exception as e:
+        results = {}
+
+        for size, output in zip(sizes, outputs, strict=True):
+            if not output.path.exists():
                 logger.error(
                     f"Failed to generate {size.value} thumbnail",
-                    extra={"video": str(video_path), "error": str(e)},
+                    extra={"video": str(video_path), "error": "output file not found"},
                 )
-                # Continue with other sizes
+                continue
+
+            results[size.value] = ThumbnailResult(
+                path=output.path,
+                metadata=ThumbnailMetadata(
+                    size=size.value,
+                    width=output.width,
+                    height=output.height,
+                    format=output.format.value,
+                    file_size=output.path.stat().st_size,
+                    timestamp=adjusted_timestamp,
+                    video_duration=video_duration,
+                ),
+                was_fallback=was_fallback,
+            )
 
         logger.info(
             f"Generated {len(results)} thumbnails",
@@ -326,6 +498,191 @@ class ThumbnailGenerator:
 
         return results
 
+    def generate_storyboard(
+        self,
+        video_path: str | Path,
+        output_path: str | Path | None = None,
+        count: int = 20,
+        columns: int = 5,
+        tile_width: int = 160,
+        tile_height: int = 90,
+        format: ThumbnailFormat = ThumbnailFormat.JPEG,
+        use_fallback: bool = True,
+        timeout: int = 120,
+    ) -> StoryboardResult:
+        """Generate a storyboard sprite sheet for timeline scrubbing.
+
+        Frames are taken at the middle of `count` equal slices of the video.
+        Each frame is its own keyframe seek into the same FFmpeg process, so
+        the cost grows with the number of tiles rather than the video length;
+        the frames are scaled, concatenated and tiled into one image.
+
+        Args:
+            video_path: Path to video file
+            output_path: Path for the sprite sheet (optional)
+            count: Number of tiles
+            columns: Tiles per row
+            tile_width: Tile width in pixels
+            tile_height: Tile height in pixels
+            format: Output format
+            use_fallback: Whether to fallback to JPEG if WebP fails
+            timeout: FFmpeg timeout in seconds
+
+        Returns:
+            StoryboardResult with the sprite sheet and tile layout
+
+        Raises:
+            ValueError: If count or columns is out of range
+            ThumbnailGeneratorError: If generation fails
+            FileNotFoundError: If video file doesn't exist
+        """
+        if not 1 <= count <= MAX_STORYBOARD_TILES:
+            raise ValueError(f"count must be between 1 and {MAX_STORYBOARD_TILES}, got {count}")
+        if columns < 1:
+            raise ValueError(f"columns must be positive, got {columns}")
+
+        video_path = Path(video_path)
+
+        if not video_path.exists():
+            raise FileNotFoundError(f"Video file not found: {video_path}")
+
+        video_duration = self._probe_duration(video_path)
+        if not video_duration:
+            raise ThumbnailGeneratorError(
+                f"Cannot build storyboard without video duration: {video_path}"
+            )
+
+        timestamps = [round((i + 0.5) * video_duration / count, 3) for i in range(count)]
+        columns = min(columns, count)
+        rows = -(-count // columns)
+
+        if output_path:
+            output_path = Path(output_path)
+        else:
+            output_path = self.output_dir / f"{video_path.stem}_storyboard.{format.value}"
+
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+
+        logger.info(
+            "Generating storyboard",
+            extra={
+                "video": str(video_path),
+                "count": count,
+                "layout": f"{columns}x{rows}",
+            },
+        )
+
+        outputs, was_fallback = self._run_with_fallback(
+            lambda batch: self._build_storyboard_command(
+                video_path, timestamps, batch[0], columns, rows
+            ),
+            [ThumbnailOutput(output_path, tile_width, tile_height, format)],
+            use_fallback=use_fallback,
+            timeout=timeout,
+        )
+        output = outputs[0]
+
+        if not output.path.exists():
+            raise ThumbnailGeneratorError(
+                f"Storyboard generation completed but file not found: {output.path}"
+            )
+
+        return StoryboardResult(
+            path=output.path,
+            timestamps=timestamps,
+            columns=columns,
+            rows=rows,
+            tile_width=tile_width,
+            tile_height=tile_height,
+            format=output.format.value,
+            video_duration=video_duration,
+            was_fallback=was_fallback,
+        )
+
+    def _build_storyboard_command(
+        self,
+        video_path: Path,
+        timestamps: list[float],
+        output: ThumbnailOutput,
+        columns: int,
+        rows: int,
+    ) -> list[str]:
+        """Build the single FFmpeg command for a storyboard.
+
+        Args:
+            video_path: Path to video file
+            timestamps: Timestamp of each tile
+            output: Sprite sheet output, sized to one tile
+            columns: Tiles per row
+            rows: Number of rows
+
+        Returns:
+            list[str]: FFmpeg command
+        """
+        cmd = [self.ffmpeg_path, "-y"]
+        chains = []
+
+        for i, timestamp in enumerate(timestamps):
+            cmd.extend(["-ss", str(timestamp), "-i", str(video_path)])
+            chains.append(f"[{i}:v]trim=end_frame=1,{output.scale_filter},setsar=1[t{i}]")
+
+        tiles = "".join(f"[t{i}]" for i in range(len(timestamps)))
+        chains.append(f"{tiles}concat=n={len(timestamps)}:v=1:a=0,tile={columns}x{rows}")
+
+        cmd.extend(["-filter_complex", ";".join(chains), "-frames:v", "1"])
+        cmd.extend(FORMAT_ARGS[output.format])
+        cmd.append(str(output.path))
+
+        return cmd
+
+    def _run_with_fallback(
+        self,
+        build_command: Callable[[list[ThumbnailOutput]], list[str]],
+        outputs: list[ThumbnailOutput],
+        use_fallback: bool,
+        timeout: int,
+    ) -> tuple[list[ThumbnailOutput], bool]:
+        """Run an extraction, retrying WebP outputs as JPEG if it fails.
+
+        Args:
+            build_command: Builds the FFmpeg command for a set of outputs
+            outputs: Images to write
+            use_fallback: Whether to fallback to JPEG if WebP fails
+            timeout: FFmpeg timeout in seconds
+
+        Returns:
+            tuple: (outputs actually written, whether fallback was used)
+
+        Raises:
+            ThumbnailGeneratorError: If extraction fails
+        """
+        try:
+            self._run_ffmpeg(build_command(outputs), timeout)
+            return outputs, False
+
+        except ThumbnailGeneratorError as e:
+            has_webp = any(output.format == ThumbnailFormat.WEBP for output in outputs)
+            if not (has_webp and use_fallback):
+                raise
+
+            logger.warning(f"WebP generation failed, falling back to JPEG: {e}")
+
+            fallback = [
+                (
+                    ThumbnailOutput(
+                        output.path.with_suffix(".jpeg"),
+                        output.width,
+                        output.height,
+                        ThumbnailFormat.JPEG,
+                    )
+                    if output.format == ThumbnailFormat.WEBP
+                    else output
+                )
+                for output in outputs
+            ]
+            self._run_ffmpeg(build_command(fallback), timeout)
+            return fallback, True
+
     def _extract_frame(
         self,
         video_path: Path,
@@ -350,51 +707,25 @@ class ThumbnailGenerator:
         Raises:
             ThumbnailGeneratorError: If extraction fails
         """
-        # Build FFmpeg command
-        cmd = [
+        cmd = build_thumbnail_command(
             self.ffmpeg_path,
-            "-y",  # Overwrite output
-            "-ss",
-            str(timestamp),  # Seek to timestamp
-            "-i",
-            str(video_path),
-            "-vframes",
-            "1",  # Extract 1 frame
-            "-vf",
-            f"scale={width}:{height}:force_original_aspect_ratio=decrease,"
-            f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2:color=black",
-        ]
-
-        # Format-specific settings
-        if format == ThumbnailFormat.WEBP:
-            cmd.extend(
-                [
-                    "-c:v",
-                    "libwebp",
-                    "-quality",
-                    "80",  # WebP quality
-                    "-compression_level",
-                    "6",  # Compression level (0-6)
-                ]
-            )
-        elif format == ThumbnailFormat.JPEG:
-            cmd.extend(
-                [
-                    "-q:v",
-                    "2",  # JPEG quality (2-31, lower is better)
-                ]
-            )
-        elif format == ThumbnailFormat.PNG:
-            cmd.extend(
-                [
-                    "-compression_level",
-                    "6",  # PNG compression
-                ]
-            )
+            video_path,
+            timestamp,
+            [ThumbnailOutput(output_path, width, height, format)],
+        )
+        self._run_ffmpeg(cmd, timeout)
 
-        cmd.append(str(output_path))
+    @traced("ffmpeg.thumbnail")
+    def _run_ffmpeg(self, cmd: list[str], timeout: int) -> None:
+        """Run an FFmpeg thumbnail command.
 
-        # Execute FFmpeg
+        Args:
+            cmd: FFmpeg command
+            timeout: FFmpeg timeout in seconds
+
+        Raises:
+            ThumbnailGeneratorError: If FFmpeg fails or times out
+        """
         try:
             logger.debug(
                 "Executing FFmpeg for thumbnail",
@@ -420,6 +751,47 @@ class ThumbnailGenerator:
             error_msg = e.stderr[:500] if e.stderr else "Unknown error"
             raise ThumbnailGeneratorError(f"FFmpeg failed: {error_msg}") from e
 
+    def _probe_duration(self, video_path: Path) -> float | None:
+        """Probe the video duration, or None if the probe fails."""
+        try:
+            media_info = self.input_manager.probe_file(video_path)
+            return media_info.duration
+        except Exception as e:
+            logger.warning(f"Failed to probe video duration: {e}")
+            return None
+
+    def _resolve_timestamp(
+        self,
+        video_path: Path,
+        timestamp: float,
+        video_duration: float | None,
+        checksum: str | None = None,
+    ) -> tuple[float, float]:
+        """Validate a requested timestamp against the video duration.
+
+        With a frame scorer, the best-scoring frame is extracted instead;
+        the requested timestamp is only used if no frame is usable.
+
+        Returns:
+            tuple: (validated timestamp, smart-adjusted timestamp to extract)
+        """
+        if video_duration and timestamp > video_duration:
+            logger.warning(
+                f"Timestamp {timestamp}s exceeds video duration {video_duration}s, "
+                f"using 1 second instead"
+            )
+            timestamp = min(1.0, video_duration - 0.1)
+
+        if self.frame_scorer and video_duration:
+            best_timestamp = self.frame_scorer.best_timestamp(
+                video_path, video_duration, checksum=checksum
+            )
+            if best_timestamp is not None:
+                return timestamp, best_timestamp
+
+        # Adjust timestamp for smart frame selection
+        return timestamp, self._select_smart_timestamp(video_path, timestamp, video_duration)
+
     def _select_smart_timestamp(
         self,
         video_path: Path,
@@ -428,10 +800,9 @@ class ThumbnailGenerator:
     ) -> float:
         """Select a smart timestamp to avoid black frames or transitions.
 
-        This is a basic implementation. More advanced implementations could:
-        - Analyze frame brightness to avoid black frames
-        - Detect scene changes and avoid transitions
-        - Use content-aware frame selection
+        Keeps the timestamp away from the first and last frames. Content-aware
+        selection (black, flat and blurry frame avoidance) is done by the
+        frame scorer when one is configured.
 
         Args:
             video_path: Path to video file
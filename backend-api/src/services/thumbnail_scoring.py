@@ -0,0 +1,373 @@
+"""
+Content-aware frame selection for thumbnails.
+
+This module scores candidate frames of a video by brightness, contrast and
+sharpness and picks the best one for a thumbnail. Candidates are the video's
+keyframes, decoded at low resolution in a single FFmpeg pass (only keyframes
+are decoded at all), and scored together as one NumPy array. Videos with too
+few keyframes, such as short clips encoded as a single GOP, are sampled
+evenly instead, which decodes every frame but only once. The chosen
+timestamp is cached per asset checksum, so thumbnailing the same asset again
+costs nothing; the cache keeps the most recently used selections only.
+"""
+
+import hashlib
+import json
+import logging
+import re
+import subprocess
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Candidate frames are scored at this size, in grayscale
+SAMPLE_WIDTH = 96
+SAMPLE_HEIGHT = 54
+
+# Luma limits: mean below/above these is a black/blown-out frame, and a
+# standard deviation below MIN_CONTRAST is a flat frame (fades, solid cards)
+BLACK_LEVEL = 32.0
+WHITE_LEVEL = 235.0
+MIN_CONTRAST = 8.0
+
+# Relative weight of each statistic in the final score
+BRIGHTNESS_WEIGHT = 0.25
+CONTRAST_WEIGHT = 0.35
+SHARPNESS_WEIGHT = 0.40
+
+# Candidates closer than this to the start or end of the video are skipped
+EDGE_MARGIN = 0.5
+
+# Fewer usable keyframes than this and the video is sampled evenly instead
+MIN_KEYFRAME_CANDIDATES = 4
+
+# Cached selections kept before the least recently used are deleted
+MAX_CACHE_ENTRIES = 10_000
+
+_PTS_TIME_PATTERN = re.compile(r"pts_time:\s*(-?[\d.]+)")
+
+
+@dataclass
+class FrameScore:
+    """Statistics and score of one candidate frame.
+
+    Attributes:
+        timestamp: Frame timestamp in seconds
+        brightness: Mean luma (0-255)
+        contrast: Luma standard deviation
+        sharpness: Variance of the Laplacian
+        score: Combined score (0 = unusable, higher is better)
+    """
+
+    timestamp: float
+    brightness: float
+    contrast: float
+    sharpness: float
+    score: float
+
+
+def score_frames(frames: np.ndarray, timestamps: list[float]) -> list[FrameScore]:
+    """Score a stack of grayscale frames.
+
+    Black, blown-out and flat frames score 0. The others combine closeness of
+    the mean luma to mid-gray, contrast, and sharpness relative to the
+    sharpest usable frame.
+
+    Args:
+        frames: uint8 array of shape (frames, height, width)
+        timestamps: Timestamp of each frame
+
+    Returns:
+        list[FrameScore]: One score per frame, in input order
+    """
+    if len(frames) == 0:
+        return []
+
+    luma = frames.astype(np.float32)
+    brightness = luma.mean(axis=(1, 2))
+    contrast = luma.std(axis=(1, 2))
+
+    laplacian = (
+        4 * luma[:, 1:-1, 1:-1]
+        - luma[:, :-2, 1:-1]
+        - luma[:, 2:, 1:-1]
+        - luma[:, 1:-1, :-2]
+        - luma[:, 1:-1, 2:]
+    )
+    sharpness = laplacian.var(axis=(1, 2))
+
+    usable = (brightness >= BLACK_LEVEL) & (brightness <= WHITE_LEVEL) & (contrast >= MIN_CONTRAST)
+
+    brightness_score = 1.0 - np.abs(brightness - 128.0) / 128.0
+    contrast_score = np.minimum(contrast / 64.0, 1.0)
+    max_sharpness = sharpness[usable].max() if usable.any() else 0.0
+    sharpness_score = sharpness / max_sharpness if max_sharpness > 0 else np.zeros_like(sharpness)
+
+    score = (
+        BRIGHTNESS_WEIGHT * brightness_score
+        + CONTRAST_WEIGHT * contrast_score
+        + SHARPNESS_WEIGHT * sharpness_score
+    )
+    score = np.where(usable, score, 0.0)
+
+    return [
+        FrameScore(
+            timestamp=timestamp,
+            brightness=float(brightness[i]),
+            contrast=float(contrast[i]),
+            sharpness=float(sharpness[i]),
+            score=float(score[i]),
+        )
+        for i, timestamp in enumerate(timestamps)
+    ]
+
+
+class ThumbnailFrameScorer:
+    """
+    Picks the best thumbnail frame of a video.
+
+    Example:
+        >>> scorer = ThumbnailFrameScorer(cache_dir="/tmp/thumbnail_scores")
+        >>> timestamp = scorer.best_timestamp("clip.mp4", video_duration=12.0,
+        ...                                   checksum=asset.checksum)
+    """
+
+    def __init__(
+        self,
+        ffmpeg_path: str = "ffmpeg",
+        cache_dir: str | Path | None = None,
+        max_candidates: int = 40,
+        timeout: int = 60,
+        max_cache_entries: int = MAX_CACHE_ENTRIES,
+    ) -> None:
+        """Initialize frame scorer.
+
+        Args:
+            ffmpeg_path: Path to ffmpeg executable
+            cache_dir: Directory for cached selections (None disables caching)
+            max_candidates: Maximum number of keyframes to score
+            timeout: FFmpeg timeout in seconds
+            max_cache_entries: Cached selections kept in cache_dir
+        """
+        self.ffmpeg_path = ffmpeg_path
+        self.max_candidates = max_candidates
+        self.timeout = timeout
+        self.max_cache_entries = max_cache_entries
+
+        self.cache_dir: Path | None
+        if cache_dir:
+            self.cache_dir = Path(cache_dir)
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+        else:
+            self.cache_dir = None
+
+    def best_timestamp(
+        self,
+        video_path: str | Path,
+        video_duration: float,
+        checksum: str | None = None,
+    ) -> float | None:
+        """Find the timestamp of the best-scoring frame.
+
+        Args:
+            video_path: Path to video file
+            video_duration: Video duration in seconds
+            checksum: Asset content checksum used as the cache key
+                      (default: derived from path, size and modification time)
+
+        Returns:
+            float: Best timestamp, or None if no frame is usable or
+                   scoring failed
+        """
+        video_path = Path(video_path)
+        cache_path = self._get_cache_path(video_path, checksum) if self.cache_dir else None
+
+        if cache_path and cache_path.exists():
+            try:
+                cached = json.loads(cache_path.read_text())
+                # Mark as recently used, so pruning keeps it
+                cache_path.touch()
+                logger.debug(
+                    "Using cached thumbnail frame",
+                    extra={"video": str(video_path), "timestamp": cached["timestamp"]},
+                )
+                return cached["timestamp"]
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"Ignoring unreadable thumbnail score cache: {e}")
+
+        try:
+            scores = self.score_video(video_path, video_duration)
+        except (subprocess.SubprocessError, OSError, ValueError) as e:
+            # Failures are not cached; the next attempt scores again
+            logger.warning(
+                f"Frame scoring failed, using requested timestamp: {e}",
+                extra={"video": str(video_path)},
+            )
+            return None
+
+        best = max(scores, key=lambda frame: frame.score, default=None)
+        timestamp = best.timestamp if best and best.score > 0 else None
+
+        logger.info(
+            "Selected thumbnail frame",
+            extra={
+                "video": str(video_path),
+                "candidates": len(scores),
+                "timestamp": timestamp,
+                "score": round(best.score, 3) if best else None,
+            },
+        )
+
+        if cache_path:
+            cache_path.write_text(json.dumps({"timestamp": timestamp}))
+            self._prune_cache()
+
+        return timestamp
+
+    def score_video(self, video_path: Path, video_duration: float) -> list[FrameScore]:
+        """Decode and score the candidate frames of a video.
+
+        Args:
+            video_path: Path to video file
+            video_duration: Video duration in seconds
+
+        Returns:
+            list[FrameScore]: Scores of candidates away from the video edges
+
+        Raises:
+            subprocess.SubprocessError: If FFmpeg fails or times out
+            ValueError: If FFmpeg output cannot be parsed
+        """
+        scores = self._score_sample(video_path, video_duration, keyframes_only=True)
+        if sum(frame.score > 0 for frame in scores) < MIN_KEYFRAME_CANDIDATES:
+            scores = self._score_sample(video_path, video_duration, keyframes_only=False)
+        return scores
+
+    def _score_sample(
+        self,
+        video_path: Path,
+        video_duration: float,
+        keyframes_only: bool,
+    ) -> list[FrameScore]:
+        """Score one sample of frames, skipping those near the video edges."""
+        frames, timestamps = self._sample_frames(video_path, video_duration, keyframes_only)
+
+        inside = [
+            i
+            for i, timestamp in enumerate(timestamps)
+            if EDGE_MARGIN <= timestamp <= video_duration - EDGE_MARGIN
+        ]
+        return score_frames(frames[inside], [timestamps[i] for i in inside])
+
+    def _sample_frames(
+        self,
+        video_path: Path,
+        video_duration: float,
+        keyframes_only: bool,
+    ) -> tuple[np.ndarray, list[float]]:
+        """Decode a low-resolution grayscale sample of frames in one FFmpeg pass.
+
+        With keyframes_only, keyframes closer together than
+        duration / max_candidates are dropped so long videos are thinned
+        evenly; otherwise max_candidates frames are taken at even intervals.
+        showinfo reports each frame's timestamp on stderr.
+
+        Args:
+            video_path: Path to video file
+            video_duration: Video duration in seconds
+            keyframes_only: Whether to decode keyframes only
+
+        Returns:
+            tuple: (uint8 array of shape (frames, height, width), timestamps)
+        """
+        cmd = [self.ffmpeg_path, "-hide_banner", "-nostats"]
+
+        if keyframes_only:
+            min_gap = video_duration / self.max_candidates
+            cmd.extend(["-skip_frame", "nokey"])
+            sample_filter = f"select='isnan(prev_selected_t)+gte(t-prev_selected_t,{min_gap:.3f})'"
+        else:
+            sample_filter = f"fps={self.max_candidates}/{video_duration:.3f}"
+
+        cmd.extend(
+            [
+                "-i",
+                str(video_path),
+                "-an",
+                "-vf",
+                f"{sample_filter},scale={SAMPLE_WIDTH}:{SAMPLE_HEIGHT},format=gray,showinfo",
+                "-fps_mode",
+                "passthrough",
+                "-f",
+                "rawvideo",
+                "pipe:1",
+            ]
+        )
+
+        result = subprocess.run(cmd, capture_output=True, timeout=self.timeout, check=True)
+
+        frame_size = SAMPLE_WIDTH * SAMPLE_HEIGHT
+        frames = np.frombuffer(result.stdout, dtype=np.uint8)
+        timestamps = [
+            float(match)
+            for match in _PTS_TIME_PATTERN.findall(result.stderr.decode(errors="replace"))
+        ]
+
+        if frames.size != len(timestamps) * frame_size:
+            raise ValueError(
+                f"Decoded {frames.size // frame_size} frames but found "
+                f"{len(timestamps)} timestamps"
+            )
+
+        return frames.reshape(-1, SAMPLE_HEIGHT, SAMPLE_WIDTH), timestamps
+
+    def _get_cache_path(self, video_path: Path, checksum: str | None) -> Path:
+        """Get the cache file for a video's selected frame.
+
+        Args:
+            video_path: Path to video file
+            checksum: Asset content checksum, if known
+
+        Returns:
+            Path to cache file
+        """
+        if not self.cache_dir:
+            raise ValueError("Cache directory not configured")
+
+        if checksum:
+            key = checksum
+        else:
+            # Without a checksum, fall back to path, size and modification time
+            file_stat = video_path.stat()
+            key = f"{video_path}_{file_stat.st_size}_{file_stat.st_mtime}"
+
+        cache_key = hashlib.sha256(f"{key}_{self.max_candidates}".encode()).hexdigest()
+        return self.cache_dir / f"frame_{cache_key[:16]}.json"
+
+    def _prune_cache(self) -> int:
+        """Delete the least recently used selections beyond max_cache_entries.
+
+        Returns:
+            int: Number of cache files deleted
+        """
+        if not self.cache_dir:
+            return 0
+
+        deleted_count = 0
+        try:
+            entries = [(path.stat().st_mtime, path) for path in self.cache_dir.glob("frame_*.json")]
+            excess = len(entries) - self.max_cache_entries
+            if excess <= 0:
+                return 0
+
+            for _, path in sorted(entries)[:excess]:
+                path.unlink(missing_ok=True)
+                deleted_count += 1
+        except OSError as e:
+            logger.warning(f"Failed to prune thumbnail score cache: {e}")
+
+        logger.debug(f"Pruned {deleted_count} cached thumbnail frames")
+        return deleted_count
@@ -0,0 +1,388 @@
+"""
+Lightweight tracing for the API and workers.
+
+Code opens spans with span() around a unit of work (a job stage, an FFmpeg
+run, an S3 transfer, a Replicate request); spans nest through a context
+variable. Trace context crosses process boundaries as a W3C traceparent
+string: the API adds it to RQ job meta (inject_context) and the worker
+continues the trace from it (continue_trace).
+
+The backend is chosen once per process with configure_tracing():
+- "none" (default): span() does nothing and costs next to nothing
+- "log": finished spans are logged at DEBUG with their trace and span IDs
+- "opentelemetry": spans go through the opentelemetry-api tracer, so the
+  SDK and exporters configured for the deployment receive them
+
+Tests pass an InMemorySpanExporter to collect finished spans.
+"""
+
+import functools
+import inspect
+import logging
+import re
+import secrets
+import time
+from collections.abc import Callable, Iterator, Mapping
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Protocol
+
+logger = logging.getLogger(__name__)
+
+TRACEPARENT_HEADER = "traceparent"
+
+_TRACEPARENT_PATTERN = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$")
+
+
+@dataclass
+class Span:
+    """
+    A timed unit of work.
+
+    Attributes:
+        name: Span name (e.g. "job.download", "ffmpeg.encode")
+        trace_id: 32-hex-digit trace ID shared by all spans of a trace
+        span_id: 16-hex-digit span ID
+        parent_id: Span ID of the parent span, if any
+        attributes: Key/value details (OpenTelemetry-style dotted keys)
+        start_time: Start time (epoch seconds)
+        end_time: End time (epoch seconds), None while open
+        status: "ok" or "error"
+        error: Exception summary if the span failed
+    """
+
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: str | None = None
+    attributes: dict[str, Any] = field(default_factory=dict)
+    start_time: float = field(default_factory=time.time)
+    end_time: float | None = None
+    status: str = "ok"
+    error: str | None = None
+
+    @property
+    def duration_ms(self) -> float | None:
+        """Span duration in milliseconds, None while open."""
+        if self.end_time is None:
+            return None
+        return (self.end_time - self.start_time) * 1000
+
+    @property
+    def traceparent(self) -> str:
+        """W3C traceparent value identifying this span."""
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Set an attribute on the span."""
+        self.attributes[key] = value
+
+    def record_exception(self, exc: BaseException) -> None:
+        """Mark the span as failed with the given exception."""
+        self.status = "error"
+        self.error = f"{type(exc).__name__}: {exc}"
+
+
+class _NoopSpan:
+    """Span handed out when tracing is disabled."""
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def record_exception(self, exc: BaseException) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+# Reusable contexts, so disabled tracing allocates nothing per span
+_NOOP_SPAN_CONTEXT = nullcontext(NOOP_SPAN)
+_NOOP_CONTEXT = nullcontext()
+
+
+class SpanExporter(Protocol):
+    """Receives finished spans."""
+
+    def export(self, span: Span) -> None:
+        """Handle a finished span."""
+        ...
+
+
+class InMemorySpanExporter:
+    """Collects finished spans in a list, for tests."""
+
+    def __init__(self) -> None:
+        self.spans: list[Span] = []
+
+    def export(self, span: Span) -> None:
+        self.spans.append(span)
+
+    def names(self) -> list[str]:
+        """Names of the finished spans, in finishing order."""
+        return [span.name for span in self.spans]
+
+    def get(self, name: str) -> Span:
+        """Get the first finished span with the given name.
+
+        Raises:
+            KeyError: If no span has that name
+        """
+        for span in self.spans:
+            if span.name == name:
+                return span
+        raise KeyError(name)
+
+    def clear(self) -> None:
+        """Forget all collected spans."""
+        self.spans.clear()
+
+
+class LoggingSpanExporter:
+    """Logs finished spans at DEBUG."""
+
+    def export(self, span: Span) -> None:
+        logger.debug(
+            f"Span {span.name} finished in {span.duration_ms:.1f}ms",
+            extra={
+                "trace_id": span.trace_id,
+                "span_id": span.span_id,
+                "parent_span_id": span.parent_id,
+                "span_name": span.name,
+                "duration_ms": round(span.duration_ms or 0.0, 2),
+                "status": span.status,
+                "error": span.error,
+                **{f"span.{key}": value for key, value in span.attributes.items()},
+            },
+        )
+
+
+def parse_traceparent(value: str | None) -> tuple[str, str] | None:
+    """Parse a W3C traceparent value.
+
+    Args:
+        value: traceparent header or meta value
+
+    Returns:
+        tuple: (trace_id, parent span_id), or None if missing or malformed
+    """
+    if not value:
+        return None
+    match = _TRACEPARENT_PATTERN.match(value.strip().lower())
+    if not match or set(match.group(1)) == {"0"} or set(match.group(2)) == {"0"}:
+        return None
+    return match.group(1), match.group(2)
+
+
+class Tracer:
+    """
+    Tracer that records nothing (the default).
+
+    Subclasses override span, inject and continue_trace.
+    """
+
+    def span(self, name: str, attributes: Mapping[str, Any] | None = None) -> Any:
+        """Open a span for the duration of the block."""
+        return _NOOP_SPAN_CONTEXT
+
+    def inject(self) -> dict[str, str]:
+        """Get the current trace context as a carrier dict."""
+        return {}
+
+    def continue_trace(self, carrier: Mapping[str, str] | None) -> Any:
+        """Make spans opened in the block children of the carrier's span."""
+        return _NOOP_CONTEXT
+
+    def current_span(self) -> Any:
+        """Get the innermost open span."""
+        return NOOP_SPAN
+
+
+# Innermost open span of the recording tracer (or a remote parent)
+_current_span: ContextVar[Span | None] = ContextVar("current_span", default=None)
+
+
+class RecordingTracer(Tracer):
+    """Tracer that records spans and hands finished ones to an exporter."""
+
+    def __init__(self, exporter: SpanExporter) -> None:
+        """Initialize recording tracer.
+
+        Args:
+            exporter: Receives each span when it finishes
+        """
+        self.exporter = exporter
+
+    @contextmanager
+    def span(self, name: str, attributes: Mapping[str, Any] | None = None) -> Iterator[Span]:
+        parent = _current_span.get()
+        span = Span(
+            name=name,
+            trace_id=parent.trace_id if parent else secrets.token_hex(16),
+            span_id=secrets.token_hex(8),
+            parent_id=parent.span_id if parent else None,
+            attributes=dict(attributes or {}),
+        )
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.record_exception(e)
+            raise
+        finally:
+            span.end_time = time.time()
+            _current_span.reset(token)
+            self.exporter.export(span)
+
+    def inject(self) -> dict[str, str]:
+        current = _current_span.get()
+        return {TRACEPARENT_HEADER: current.traceparent} if current else {}
+
+    def current_span(self) -> Any:
+        return _current_span.get() or NOOP_SPAN
+
+    @contextmanager
+    def continue_trace(self, carrier: Mapping[str, str] | None) -> Iterator[None]:
+        parsed = parse_traceparent((carrier or {}).get(TRACEPARENT_HEADER))
+        if parsed is None:
+            yield
+            return
+
+        trace_id, span_id = parsed
+        token = _current_span.set(Span(name="remote", trace_id=trace_id, span_id=span_id))
+        try:
+            yield
+        finally:
+            _current_span.reset(token)
+
+
+class OpenTelemetryTracer(Tracer):
+    """Tracer backed by the opentelemetry-api package.
+
+    Spans are created with the global OpenTelemetry tracer and context is
+    propagated with the global propagator, so whatever SDK and exporters the
+    deployment installs receive them.
+    """
+
+    def __init__(self) -> None:
+        """Initialize OpenTelemetry tracer.
+
+        Raises:
+            ImportError: If opentelemetry-api is not installed
+        """
+        from opentelemetry import context, propagate, trace
+
+        self._context = context
+        self._propagate = propagate
+        self._trace = trace
+        self._tracer = trace.get_tracer("delicious-lotus")
+
+    @contextmanager
+    def span(self, name: str, attributes: Mapping[str, Any] | None = None) -> Iterator[Any]:
+        with self._tracer.start_as_current_span(name, attributes=dict(attributes or {})) as span:
+            yield span
+
+    def inject(self) -> dict[str, str]:
+        carrier: dict[str, str] = {}
+        self._propagate.inject(carrier)
+        return carrier
+
+    def current_span(self) -> Any:
+        return self._trace.get_current_span()
+
+    @contextmanager
+    def continue_trace(self, carrier: Mapping[str, str] | None) -> Iterator[None]:
+        token = self._context.attach(self._propagate.extract(dict(carrier or {})))
+        try:
+            yield
+        finally:
+            self._context.detach(token)
+
+
+_tracer: Tracer = Tracer()
+
+
+def configure_tracing(backend: str = "none", exporter: SpanExporter | None = None) -> Tracer:
+    """Set the process-wide tracer.
+
+    Args:
+        backend: "none", "log" or "opentelemetry"; ignored if exporter is given
+        exporter: Record spans to this exporter (e.g. InMemorySpanExporter)
+
+    Returns:
+        Tracer: The configured tracer
+    """
+    global _tracer
+
+    if exporter is not None:
+        _tracer = RecordingTracer(exporter)
+    elif backend == "log":
+        _tracer = RecordingTracer(LoggingSpanExporter())
+    elif backend == "opentelemetry":
+        try:
+            _tracer = OpenTelemetryTracer()
+        except ImportError:
+            logger.warning("opentelemetry-api not installed, tracing disabled")
+            _tracer = Tracer()
+    else:
+        _tracer = Tracer()
+
+    return _tracer
+
+
+def get_tracer() -> Tracer:
+    """Get the process-wide tracer."""
+    return _tracer
+
+
+def span(name: str, attributes: Mapping[str, Any] | None = None) -> Any:
+    """Open a span on the process-wide tracer.
+
+    Example:
+        >>> with span("s3.download", {"s3.key": key}) as current:
+        ...     download()
+        ...     current.set_attribute("s3.bytes", size)
+    """
+    return _tracer.span(name, attributes)
+
+
+def current_span() -> Any:
+    """Get the innermost open span, to add attributes to it."""
+    return _tracer.current_span()
+
+
+def traced(name: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Decorator running each call of a function (sync or async) in a span.
+
+    Args:
+        name: Span name
+    """
+
+    def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                with span(name):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with span(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def inject_context() -> dict[str, str]:
+    """Get the current trace context to pass to another process."""
+    return _tracer.inject()
+
+
+def continue_trace(carrier: Mapping[str, str] | None) -> Any:
+    """Continue a trace received from another process."""
+    return _tracer.continue_trace(carrier)
@@ -3,6 +3,7 @@
 import asyncio
 import logging
 from collections import defaultdict
+from collections.abc import Callable
 from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Any
@@ -13,6 +14,9 @@ from fastapi import WebSocket
 
 logger = logging.getLogger(__name__)
 
+# Frames buffered per connection before further queued sends are refused
+OUTBOUND_QUEUE_SIZE = 100
+
 
 @dataclass
 class ConnectionInfo:
@@ -27,6 +31,9 @@ class ConnectionInfo:
     heartbeat_sequence: int = 0
     missed_heartbeats: int = 0
     reconnection_token: str | None = None
+    # Frames waiting to be written by the connection's writer task (None once removed)
+    outbound: "asyncio.Queue[str] | None" = field(default=None, repr=False)
+    writer_task: "asyncio.Task[None] | None" = field(default=None, repr=False)
 
     def __hash__(self) -> int:
         """Make ConnectionInfo hashable by using websocket id."""
@@ -64,6 +71,8 @@ class ConnectionManager:
             self._connections: dict[UUID, set[ConnectionInfo]] = defaultdict(set)
             # Lock for thread-safe operations
             self._operation_lock = asyncio.Lock()
+            # Callbacks run for every added connection
+            self._connection_listeners: list[Callable[[ConnectionInfo], None]] = []
             self._initialized = True
             logger.info("ConnectionManager initialized")
 
@@ -94,11 +103,19 @@ class ConnectionManager:
                 state=state,
             )
             self._connections[composition_id].add(conn_info)
+            self._start_writer(conn_info)
             logger.info(
                 f"Added WebSocket connection for composition {composition_id}, "
                 f"user {user_id}, total connections: {len(self._connections[composition_id])}"
             )
-            return conn_info
+
+        for listener in self._connection_listeners:
+            try:
+                listener(conn_info)
+            except Exception as e:
+                logger.error(f"Connection listener failed: {e}")
+
+        return conn_info
 
     async def remove_connection(
         self, websocket: WebSocket, composition_id: UUID
@@ -127,6 +144,7 @@ class ConnectionManager:
 
             if conn_info:
                 self._connections[composition_id].discard(conn_info)
+                self._stop_writer(conn_info)
                 # Clean up empty composition entries
                 if not self._connections[composition_id]:
                     del self._connections[composition_id]
@@ -283,6 +301,7 @@ class ConnectionManager:
             async with self._operation_lock:
                 for conn in failed_connections:
                     self._connections[composition_id].discard(conn)
+                    self._stop_writer(conn)
                     logger.info(
                         f"Removed failed connection for composition {composition_id}, "
                         f"user {conn.user_id}"
@@ -333,6 +352,74 @@ class ConnectionManager:
         )
         return False
 
+    def enqueue_frame(self, conn: ConnectionInfo, frame: str) -> bool:
+        """
+        Queue a serialized frame on a connection without waiting for the send.
+
+        Args:
+            conn: Connection to send to
+            frame: Text frame to send
+
+        Returns:
+            True if the frame was queued, False if the connection was removed
+            or its outbound queue is full
+        """
+        if conn.outbound is None:
+            return False
+
+        try:
+            conn.outbound.put_nowait(frame)
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    def add_connection_listener(self, listener: Callable[[ConnectionInfo], None]) -> None:
+        """
+        Register a callback run for every connection added from now on.
+
+        Args:
+            listener: Callback receiving the new ConnectionInfo
+        """
+        if listener not in self._connection_listeners:
+            self._connection_listeners.append(listener)
+
+    def remove_connection_listener(self, listener: Callable[[ConnectionInfo], None]) -> None:
+        """
+        Unregister a connection listener.
+
+        Args:
+            listener: Callback previously passed to add_connection_listener
+        """
+        if listener in self._connection_listeners:
+            self._connection_listeners.remove(listener)
+
+    def _start_writer(self, conn: ConnectionInfo) -> None:
+        """Create a connection's outbound queue and the task draining it."""
+        conn.outbound = asyncio.Queue(maxsize=OUTBOUND_QUEUE_SIZE)
+        conn.writer_task = asyncio.create_task(self._write_loop(conn))
+
+    def _stop_writer(self, conn: ConnectionInfo) -> None:
+        """Drop a removed connection's outbound queue and stop its writer task."""
+        conn.outbound = None
+        if conn.writer_task and conn.writer_task is not asyncio.current_task():
+            conn.writer_task.cancel()
+        conn.writer_task = None
+
+    async def _write_loop(self, conn: ConnectionInfo) -> None:
+        """Send a connection's queued frames in order until it fails or is removed."""
+        queue = conn.outbound
+        while queue is not None:
+            frame = await queue.get()
+            try:
+                await conn.websocket.send_text(frame)
+            except Exception as e:
+                logger.error(
+                    f"Failed to send queued frame for composition {conn.composition_id}, "
+                    f"user {conn.user_id}: {e}"
+                )
+                await self.remove_connection(conn.websocket, conn.composition_id)
+                return
+
     async def get_all_composition_ids(self) -> set[UUID]:
         """
         Get all composition IDs that have active connections.
@@ -3,10 +3,11 @@
 import asyncio
 import logging
 from datetime import datetime, timedelta
+from uuid import UUID
 
 from app.api.schemas.websocket import WSHeartbeatMessage
 
-from .connection_manager import ConnectionManager
+from .connection_manager import ConnectionInfo, ConnectionManager
 
 logger = logging.getLogger(__name__)
 
@@ -15,8 +16,10 @@ class HeartbeatManager:
     """
     Manages heartbeat/ping-pong mechanism for WebSocket connections.
 
-    Sends periodic ping messages to all connections and monitors responses
-    to detect and clean up stale connections.
+    Connections are spread over the slots of a timer wheel that turns once per
+    ping interval. Each tick pings only the connections in the current slot,
+    queueing a frame serialized once per composition for that tick, and closes
+    those whose heartbeat deadline has passed, so no tick scans every connection.
     """
 
     def __init__(
@@ -24,6 +27,7 @@ class HeartbeatManager:
         connection_manager: ConnectionManager,
         ping_interval: int = 30,
         max_missed_heartbeats: int = 3,
+        wheel_slots: int = 30,
     ) -> None:
         """
         Initialize heartbeat manager.
@@ -32,18 +36,35 @@ class HeartbeatManager:
             connection_manager: WebSocket connection manager instance
             ping_interval: Seconds between ping messages (default: 30)
             max_missed_heartbeats: Maximum consecutive missed heartbeats before cleanup (default: 3)
+            wheel_slots: Timer wheel slots per ping interval (default: 30)
         """
         self.connection_manager = connection_manager
         self.ping_interval = ping_interval
         self.max_missed_heartbeats = max_missed_heartbeats
+        self.wheel_slots = wheel_slots
         self._running = False
         self._heartbeat_task: asyncio.Task[None] | None = None
         self._sequence_counter = 0
+
+        # Timer wheel: the slot under the cursor is due on the next tick
+        self._wheel: list[set[ConnectionInfo]] = [set() for _ in range(wheel_slots)]
+        self._cursor = 0
+        self._next_slot = 0
         logger.info(
             f"HeartbeatManager initialized with {ping_interval}s interval, "
             f"max {max_missed_heartbeats} missed heartbeats"
         )
 
+    @property
+    def tick_seconds(self) -> float:
+        """Seconds between timer wheel ticks."""
+        return self.ping_interval / self.wheel_slots
+
+    @property
+    def heartbeat_timeout(self) -> timedelta:
+        """Silence after which a connection's heartbeat deadline expires."""
+        return timedelta(seconds=self.ping_interval * (self.max_missed_heartbeats + 1))
+
     async def start(self) -> None:
         """Start the heartbeat monitoring loop."""
         if self._running:
@@ -51,39 +72,65 @@ class HeartbeatManager:
             return
 
         self._running = True
+        self.connection_manager.add_connection_listener(self.schedule)
+        for composition_id in await self.connection_manager.get_all_composition_ids():
+            for conn in await self.connection_manager.get_connections(composition_id):
+                self.schedule(conn)
+
         self._heartbeat_task = asyncio.create_task(self._heartbeat_loop())
         logger.info("Heartbeat manager started")
 
     async def stop(self) -> None:
         """Stop the heartbeat monitoring loop."""
         self._running = False
+        self.connection_manager.remove_connection_listener(self.schedule)
         if self._heartbeat_task and not self._heartbeat_task.done():
             self._heartbeat_task.cancel()
             try:
                 await self._heartbeat_task
             except asyncio.CancelledError:
                 logger.info("Heartbeat task cancelled")
+        for slot in self._wheel:
+            slot.clear()
         logger.info("Heartbeat manager stopped")
 
+    def schedule(self, conn: ConnectionInfo) -> None:
+        """
+        Add a connection to the timer wheel.
+
+        Slots are handed out round-robin, so connections opened together (for
+        example after a deploy) are still pinged spread over the interval.
+        Removed connections are dropped from their slot when it next comes up.
+
+        Args:
+            conn: Connection to ping
+        """
+        if any(conn in slot for slot in self._wheel):
+            return
+        self._wheel[self._next_slot].add(conn)
+        self._next_slot = (self._next_slot + 1) % self.wheel_slots
+
     async def _heartbeat_loop(self) -> None:
         """
-        Main loop for sending heartbeat pings and monitoring responses.
+        Main loop turning the timer wheel.
 
-        Continuously sends ping messages at regular intervals and checks
-        for stale connections.
+        Ticks run on a fixed schedule so a slow tick does not push back the
+        following ones.
         """
         logger.info("Starting heartbeat loop")
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time()
 
         while self._running:
             try:
-                # Send heartbeat pings to all connections
-                await self._send_heartbeat_pings()
+                stale = self._process_slot(self._wheel[self._cursor])
+                self._cursor = (self._cursor + 1) % self.wheel_slots
 
-                # Check for stale connections and clean them up
-                await self._cleanup_stale_connections()
+                if stale:
+                    await self._close_stale_connections(stale)
 
-                # Wait for next heartbeat interval
-                await asyncio.sleep(self.ping_interval)
+                next_tick += self.tick_seconds
+                await asyncio.sleep(max(0.0, next_tick - loop.time()))
 
             except asyncio.CancelledError:
                 logger.info("Heartbeat loop cancelled")
@@ -93,145 +140,96 @@ class HeartbeatManager:
                 logger.exception(f"Error in heartbeat loop: {e}")
                 # Continue running even if there's an error
                 await asyncio.sleep(5)
+                next_tick = loop.time()
 
         logger.info("Heartbeat loop stopped")
 
-    async def _send_heartbeat_pings(self) -> None:
-        """Send heartbeat ping messages to all active connections."""
-        self._sequence_counter += 1
-        composition_ids = await self.connection_manager.get_all_composition_ids()
+    def _process_slot(self, slot: set[ConnectionInfo]) -> list[ConnectionInfo]:
+        """
+        Ping the connections in a timer wheel slot.
 
-        if not composition_ids:
-            logger.debug("No active connections to send heartbeat pings")
-            return
+        Pings are queued on each connection's outbound queue without waiting
+        for the sends. A ping that cannot be queued counts as missed.
+
+        Args:
+            slot: Connections due on this tick
 
-        total_sent = 0
-        total_failed = 0
-
-        for composition_id in composition_ids:
-            connections = await self.connection_manager.get_connections(composition_id)
-
-            for conn in connections:
-                try:
-                    # Create heartbeat message
-                    heartbeat_msg = WSHeartbeatMessage(
-                        composition_id=composition_id,
-                        sequence=self._sequence_counter,
-                    )
-
-                    # Send to connection
-                    success = await self.connection_manager.send_to_connection(
-                        conn.websocket, composition_id, heartbeat_msg
-                    )
-
-                    if success:
-                        total_sent += 1
-                    else:
-                        total_failed += 1
-                        # Increment missed heartbeat counter
-                        await self.connection_manager.increment_missed_heartbeat(
-                            conn.websocket, composition_id
-                        )
-
-                except Exception as e:
-                    logger.error(
-                        f"Failed to send heartbeat to connection for composition {composition_id}: {e}"
-                    )
-                    total_failed += 1
-                    # Increment missed heartbeat counter
-                    try:
-                        await self.connection_manager.increment_missed_heartbeat(
-                            conn.websocket, composition_id
-                        )
-                    except Exception:
-                        pass
-
-        if total_sent > 0 or total_failed > 0:
+        Returns:
+            Connections whose heartbeat deadline expired, removed from the wheel
+        """
+        self._sequence_counter += 1
+        now = datetime.utcnow()
+        frames: dict[UUID, str] = {}
+        stale = []
+        sent = 0
+
+        for conn in list(slot):
+            if conn.outbound is None:
+                # Removed from the connection manager since its last ping
+                slot.discard(conn)
+                continue
+
+            if (
+                conn.missed_heartbeats >= self.max_missed_heartbeats
+                or now - conn.last_heartbeat > self.heartbeat_timeout
+            ):
+                slot.discard(conn)
+                stale.append(conn)
+                continue
+
+            frame = frames.get(conn.composition_id)
+            if frame is None:
+                frame = WSHeartbeatMessage(
+                    composition_id=conn.composition_id,
+                    sequence=self._sequence_counter,
+                    timestamp=now,
+                ).model_dump_json()
+                frames[conn.composition_id] = frame
+
+            if self.connection_manager.enqueue_frame(conn, frame):
+                sent += 1
+            else:
+                conn.missed_heartbeats += 1
+
+        if slot or stale:
             logger.debug(
-                f"Sent heartbeat pings: {total_sent} successful, {total_failed} failed "
+                f"Queued {sent} heartbeat pings, {len(slot) - sent} missed, {len(stale)} stale "
                 f"(sequence: {self._sequence_counter})"
             )
+        return stale
 
-    async def _cleanup_stale_connections(self) -> None:
+    async def _close_stale_connections(self, stale: list[ConnectionInfo]) -> None:
         """
-        Identify and clean up stale connections that haven't responded to heartbeats.
+        Close and remove connections whose heartbeat deadline expired.
 
-        Closes connections that have missed more than max_missed_heartbeats consecutive pings.
+        Args:
+            stale: Connections that missed too many heartbeats or went silent
         """
-        composition_ids = await self.connection_manager.get_all_composition_ids()
-        stale_count = 0
-
-        for composition_id in composition_ids:
-            connections = await self.connection_manager.get_connections(composition_id)
-
-            for conn in connections.copy():  # Copy to avoid modification during iteration
-                try:
-                    # Check if connection has missed too many heartbeats
-                    if conn.missed_heartbeats >= self.max_missed_heartbeats:
-                        logger.warning(
-                            f"Connection stale for composition {composition_id}, "
-                            f"user {conn.user_id}: {conn.missed_heartbeats} missed heartbeats"
-                        )
-
-                        # Close the WebSocket connection
-                        try:
-                            await conn.websocket.close(
-                                code=1000,
-                                reason=f"Connection timeout: missed {conn.missed_heartbeats} heartbeats",
-                            )
-                        except Exception as e:
-                            logger.debug(f"Error closing stale connection: {e}")
-
-                        # Remove from connection manager
-                        await self.connection_manager.remove_connection(
-                            conn.websocket, composition_id
-                        )
-
-                        stale_count += 1
-                        logger.info(
-                            f"Cleaned up stale connection for composition {composition_id}, "
-                            f"user {conn.user_id}"
-                        )
-
-                    # Also check if connection hasn't sent heartbeat in a long time
-                    # (fallback in case missed_heartbeats counter isn't working)
-                    elif conn.last_heartbeat:
-                        time_since_heartbeat = datetime.utcnow() - conn.last_heartbeat
-                        max_silence_duration = timedelta(
-                            seconds=self.ping_interval * (self.max_missed_heartbeats + 1)
-                        )
-
-                        if time_since_heartbeat > max_silence_duration:
-                            logger.warning(
-                                f"Connection silent for {time_since_heartbeat.total_seconds()}s "
-                                f"for composition {composition_id}, user {conn.user_id}"
-                            )
-
-                            try:
-                                await conn.websocket.close(
-                                    code=1000,
-                                    reason=f"Connection timeout: no activity for {int(time_since_heartbeat.total_seconds())}s",
-                                )
-                            except Exception as e:
-                                logger.debug(f"Error closing silent connection: {e}")
-
-                            await self.connection_manager.remove_connection(
-                                conn.websocket, composition_id
-                            )
-
-                            stale_count += 1
-                            logger.info(
-                                f"Cleaned up silent connection for composition {composition_id}, "
-                                f"user {conn.user_id}"
-                            )
-
-                except Exception as e:
-                    logger.error(
-                        f"Error checking stale connection for composition {composition_id}: {e}"
-                    )
-
-        if stale_count > 0:
-            logger.info(f"Cleaned up {stale_count} stale connections")
+        for conn in stale:
+            if conn.missed_heartbeats >= self.max_missed_heartbeats:
+                reason = f"Connection timeout: missed {conn.missed_heartbeats} heartbeats"
+            else:
+                silence = datetime.utcnow() - conn.last_heartbeat
+                reason = f"Connection timeout: no activity for {int(silence.total_seconds())}s"
+
+            logger.warning(
+                f"Connection stale for composition {conn.composition_id}, "
+                f"user {conn.user_id}: {reason}"
+            )
+
+            try:
+                await conn.websocket.close(code=1000, reason=reason)
+            except Exception as e:
+                logger.debug(f"Error closing stale connection: {e}")
+
+            try:
+                await self.connection_manager.remove_connection(conn.websocket, conn.composition_id)
+            except Exception as e:
+                logger.error(
+                    f"Error removing stale connection for composition {conn.composition_id}: {e}"
+                )
+
+        logger.info(f"Cleaned up {len(stale)} stale connections")
 
     async def get_stats(self) -> dict:
         """
@@ -245,6 +243,8 @@ class HeartbeatManager:
             "ping_interval": self.ping_interval,
             "max_missed_heartbeats": self.max_missed_heartbeats,
             "current_sequence": self._sequence_counter,
+            "wheel_slots": self.wheel_slots,
+            "scheduled_connections": sum(len(slot) for slot in self._wheel),
         }
 
     @property
@@ -8,18 +8,56 @@ from datetime import datetime
 from typing import Any
 from uuid import UUID
 
+import redis.asyncio as aioredis
 from app.api.schemas.websocket import WSBaseMessage
+from app.config import get_settings
 from redis import Redis
 
 logger = logging.getLogger(__name__)
 
+# Appends a message to a composition's replay stream, once per published message.
+# Every API replica subscribed to the composition receives the same pub/sub
+# message; the first to run the script appends it and records the entry ID under
+# a short-lived marker keyed by the publisher-assigned message ID, the others get
+# that same ID back. Messages without an ID have no marker and are always
+# appended. Entry IDs are "0-<n>", so Redis assigns the sequence number n.
+#
+# KEYS[1]  replay stream            KEYS[2]  marker for this message ID (optional)
+# ARGV[1]  approximate max length   ARGV[2]  stream TTL (s)   ARGV[3]  marker TTL (s)
+# ARGV[4]  message JSON             ARGV[5]  stored_at timestamp
+#
+# Returns the entry ID
+APPEND_MESSAGE_SCRIPT = """
+if KEYS[2] then
+    local seen = redis.call('GET', KEYS[2])
+    if seen then
+        return seen
+    end
+end
+local id = redis.call(
+    'XADD', KEYS[1], 'MAXLEN', '~', ARGV[1], '0-*', 'message', ARGV[4], 'stored_at', ARGV[5]
+)
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+if KEYS[2] then
+    redis.call('SET', KEYS[2], id, 'EX', ARGV[3])
+end
+return id
+"""
+
+
+def _sequence(entry_id: str) -> int:
+    """Sequence number of a replay stream entry ID ("0-<sequence>")."""
+    return int(entry_id.rsplit("-", 1)[1])
+
 
 class ReconnectionManager:
     """
     Manages WebSocket reconnection tokens and message recovery.
 
-    Stores recent messages in Redis for recovery during reconnection
-    and generates reconnection tokens for state continuity.
+    Stores recent messages in a per-composition Redis Stream for recovery
+    during reconnection and generates reconnection tokens for state continuity.
+    Message sequence numbers are the stream's entry IDs, so they are assigned
+    by Redis and agree across API replicas.
     """
 
     def __init__(
@@ -27,18 +65,27 @@ class ReconnectionManager:
         redis_client: Redis,
         message_ttl: int = 300,  # 5 minutes
         max_stored_messages: int = 100,
+        async_redis_client: aioredis.Redis | None = None,
+        dedupe_ttl: int = 30,
     ) -> None:
         """
         Initialize reconnection manager.
 
         Args:
-            redis_client: Redis client instance
+            redis_client: Redis client instance (reconnection tokens)
             message_ttl: TTL for stored messages in seconds (default: 300 = 5 minutes)
-            max_stored_messages: Maximum messages to store per composition (default: 100)
+            max_stored_messages: Approximate messages kept per composition (default: 100)
+            async_redis_client: Async Redis client for the replay stream
+                (created from settings on first use if omitted)
+            dedupe_ttl: Seconds a message ID is recognised when other replicas
+                append the same message again (default: 30)
         """
         self.redis_client = redis_client
         self.message_ttl = message_ttl
         self.max_stored_messages = max_stored_messages
+        self.dedupe_ttl = dedupe_ttl
+        self._async_redis = async_redis_client
+        self._append_script: Any = None
         logger.info(
             f"ReconnectionManager initialized with {message_ttl}s TTL, "
             f"max {max_stored_messages} messages per composition"
@@ -110,73 +157,114 @@ class ReconnectionManager:
             logger.error(f"Error validating reconnection token: {e}")
             return None, None
 
-    def store_message(self, composition_id: UUID, message: WSBaseMessage, sequence: int) -> bool:
+    @property
+    def async_redis(self) -> aioredis.Redis:
+        """Async Redis client used for the replay stream."""
+        if self._async_redis is None:
+            settings = get_settings()
+            self._async_redis = aioredis.from_url(
+                str(settings.redis_url),
+                max_connections=settings.redis_max_connections,
+                decode_responses=True,
+            )
+        return self._async_redis
+
+    @staticmethod
+    def _stream_key(composition_id: UUID) -> str:
+        return f"composition:{composition_id}:replay"
+
+    async def append_message(
+        self,
+        composition_id: UUID,
+        message: WSBaseMessage,
+        message_id: str | None = None,
+    ) -> int | None:
         """
-        Store a message in Redis for potential recovery during reconnection.
+        Append a message to the composition's replay stream.
+
+        One EVALSHA round trip; replicas appending a message with the same
+        message ID get the same sequence number back instead of appending it
+        again.
 
         Args:
             composition_id: Composition UUID
             message: WebSocket message to store
-            sequence: Message sequence number
+            message_id: Publisher-assigned ID identifying the message across
+                replicas (default: none, the message is always appended)
 
         Returns:
-            True if stored successfully, False otherwise
+            The message's sequence number, or None if it could not be stored
         """
-        messages_key = f"composition:{composition_id}:messages"
+        stream_key = self._stream_key(composition_id)
+        keys = [stream_key]
+        if message_id:
+            keys.append(f"{stream_key}:seen:{message_id}")
 
         try:
-            # Create message entry with sequence number
-            message_entry = {
-                "sequence": sequence,
-                "timestamp": datetime.utcnow().isoformat(),
-                "message": message.model_dump(mode="json"),
-            }
-
-            # Add to sorted set (sorted by sequence number)
-            self.redis_client.zadd(messages_key, {json.dumps(message_entry): sequence})
-
-            # Set TTL on the key
-            self.redis_client.expire(messages_key, self.message_ttl)
-
-            # Trim to max stored messages (keep most recent)
-            message_count = self.redis_client.zcard(messages_key)
-            if message_count > self.max_stored_messages:
-                # Remove oldest messages
-                remove_count = message_count - self.max_stored_messages
-                self.redis_client.zremrangebyrank(messages_key, 0, remove_count - 1)
-
+            if self._append_script is None:
+                # Script objects call EVALSHA and load the script on NOSCRIPT
+                self._append_script = self.async_redis.register_script(APPEND_MESSAGE_SCRIPT)
+
+            entry_id = await self._append_script(
+                keys=keys,
+                args=[
+                    self.max_stored_messages,
+                    self.message_ttl,
+                    self.dedupe_ttl,
+                    message.model_dump_json(exclude={"message_sequence"}),
+                    datetime.utcnow().isoformat(),
+                ],
+            )
+            sequence = _sequence(entry_id)
             logger.debug(f"Stored message {sequence} for composition {composition_id}")
-            return True
+            return sequence
 
         except Exception as e:
             logger.error(f"Failed to store message for composition {composition_id}: {e}")
-            return False
+            return None
 
-    def get_missed_messages(self, composition_id: UUID, last_sequence: int) -> list[dict[str, Any]]:
+    async def get_missed_messages(
+        self, composition_id: UUID, last_sequence: int
+    ) -> list[dict[str, Any]]:
         """
         Retrieve messages that were sent after a given sequence number.
 
+        If the stream restarted since the client's last message (it expired
+        while idle), every stored message is returned.
+
         Args:
             composition_id: Composition UUID
             last_sequence: Last sequence number the client received
 
         Returns:
-            List of messages with sequence numbers greater than last_sequence
+            List of {"sequence", "timestamp", "message"} entries with sequence
+            numbers greater than last_sequence, oldest first
         """
-        messages_key = f"composition:{composition_id}:messages"
+        stream_key = self._stream_key(composition_id)
 
         try:
-            # Get all messages with sequence > last_sequence
-            message_entries = self.redis_client.zrangebyscore(
-                messages_key, last_sequence + 1, "+inf"
-            )
+            latest_sequence = await self.get_latest_sequence(composition_id)
+            if last_sequence == latest_sequence:
+                return []
+
+            # A client ahead of the stream saw a previous incarnation of it
+            start = last_sequence + 1 if last_sequence < latest_sequence else 1
+            entries = await self.async_redis.xrange(stream_key, min=f"0-{start}", max="+")
 
             missed_messages = []
-            for entry_str in message_entries:
+            for entry_id, fields in entries:
                 try:
-                    entry = json.loads(entry_str)
-                    missed_messages.append(entry)
-                except json.JSONDecodeError as e:
+                    sequence = _sequence(entry_id)
+                    message = json.loads(fields["message"])
+                    message["message_sequence"] = sequence
+                    missed_messages.append(
+                        {
+                            "sequence": sequence,
+                            "timestamp": fields.get("stored_at"),
+                            "message": message,
+                        }
+                    )
+                except (KeyError, ValueError) as e:
                     logger.warning(f"Failed to parse stored message: {e}")
                     continue
 
@@ -192,7 +280,7 @@ class ReconnectionManager:
             )
             return []
 
-    def get_latest_sequence(self, composition_id: UUID) -> int:
+    async def get_latest_sequence(self, composition_id: UUID) -> int:
         """
         Get the latest sequence number for a composition.
 
@@ -202,22 +290,15 @@ class ReconnectionManager:
         Returns:
             Latest sequence number, or 0 if none found
         """
-        messages_key = f"composition:{composition_id}:messages"
-
         try:
-            # Get the highest score (sequence number) in the sorted set
-            latest = self.redis_client.zrange(messages_key, -1, -1, withscores=True)
-
-            if latest:
-                return int(latest[0][1])  # Return the score (sequence number)
-
-            return 0
+            latest = await self.async_redis.xrevrange(self._stream_key(composition_id), count=1)
+            return _sequence(latest[0][0]) if latest else 0
 
         except Exception as e:
             logger.error(f"Failed to get latest sequence for composition {composition_id}: {e}")
             return 0
 
-    def clear_messages(self, composition_id: UUID) -> bool:
+    async def clear_messages(self, composition_id: UUID) -> bool:
         """
         Clear all stored messages for a composition.
 
@@ -227,10 +308,8 @@ class ReconnectionManager:
         Returns:
             True if cleared successfully, False otherwise
         """
-        messages_key = f"composition:{composition_id}:messages"
-
         try:
-            self.redis_client.delete(messages_key)
+            await self.async_redis.delete(self._stream_key(composition_id))
             logger.debug(f"Cleared stored messages for composition {composition_id}")
             return True
 
@@ -259,7 +338,7 @@ class ReconnectionManager:
             logger.error(f"Failed to extend token TTL: {e}")
             return False
 
-    def get_stats(self, composition_id: UUID) -> dict[str, Any]:
+    async def get_stats(self, composition_id: UUID) -> dict[str, Any]:
         """
         Get statistics about stored messages for a composition.
 
@@ -269,16 +348,18 @@ class ReconnectionManager:
         Returns:
             Dictionary with message storage statistics
         """
-        messages_key = f"composition:{composition_id}:messages"
+        stream_key = self._stream_key(composition_id)
 
         try:
-            message_count = self.redis_client.zcard(messages_key)
-            latest_sequence = self.get_latest_sequence(composition_id)
-            ttl = self.redis_client.ttl(messages_key)
+            async with self.async_redis.pipeline(transaction=False) as pipe:
+                pipe.xlen(stream_key)
+                pipe.xrevrange(stream_key, count=1)
+                pipe.ttl(stream_key)
+                message_count, latest, ttl = await pipe.execute()
 
             return {
                 "stored_message_count": message_count,
-                "latest_sequence": latest_sequence,
+                "latest_sequence": _sequence(latest[0][0]) if latest else 0,
                 "ttl_seconds": ttl if ttl > 0 else 0,
             }
 
@@ -4,16 +4,18 @@ import asyncio
 import json
 import logging
 from typing import TYPE_CHECKING, Any
-from uuid import UUID
+from uuid import UUID, uuid4
 
 import redis.asyncio as aioredis
 from app.api.schemas.websocket import (
     ProcessingStage,
+    WSBaseMessage,
     WSErrorMessage,
     WSProgressMessage,
     WSStatusMessage,
 )
 from app.config import settings
+from redis import Redis
 from redis.exceptions import ConnectionError as RedisConnectionError
 from redis.exceptions import RedisError
 
@@ -24,6 +26,35 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger(__name__)
 
+# Seconds a broadcast waits for its replay sequence before going out without one
+SEQUENCE_WAIT_SECONDS = 0.1
+
+
+def publish_composition_message(
+    redis_client: Redis, composition_id: UUID | str, message_data: dict[str, Any]
+) -> str:
+    """
+    Publish an update to a composition's progress channel.
+
+    The message is stamped with a unique message_id, so the API replicas that
+    receive it store it in the replay log once, while separate publishes of
+    identical data are stored separately.
+
+    Args:
+        redis_client: Redis client to publish with
+        composition_id: Composition UUID
+        message_data: Message payload ("type" plus the message fields)
+
+    Returns:
+        The assigned message ID
+    """
+    message_id = uuid4().hex
+    redis_client.publish(
+        f"composition:{composition_id}:progress",
+        json.dumps({**message_data, "message_id": message_id}),
+    )
+    return message_id
+
 
 class RedisSubscriber:
     """
@@ -53,8 +84,8 @@ class RedisSubscriber:
         self._running = False
         self._listener_task: asyncio.Task[None] | None = None
         self._reconnect_task: asyncio.Task[None] | None = None
+        self._pending_appends: set[asyncio.Task[int | None]] = set()
         self._max_reconnect_delay = 60  # Maximum delay between reconnection attempts
-        self._message_sequence: dict[UUID, int] = {}  # Track message sequences per composition
         logger.info("RedisSubscriber initialized")
 
     async def connect(self) -> None:
@@ -273,15 +304,10 @@ class RedisSubscriber:
             ws_message = self._create_ws_message(composition_id, message_data)
 
             if ws_message:
-                # Get next sequence number for this composition
-                if composition_id not in self._message_sequence:
-                    self._message_sequence[composition_id] = 0
-                self._message_sequence[composition_id] += 1
-                sequence = self._message_sequence[composition_id]
-
-                # Store message for reconnection if manager available
-                if self.reconnection_manager:
-                    self.reconnection_manager.store_message(composition_id, ws_message, sequence)
+                sequence = await self._store_message(
+                    composition_id, ws_message, message_data.get("message_id")
+                )
+                ws_message.message_sequence = sequence
 
                 # Broadcast to all WebSocket connections for this composition
                 sent_count = await self.connection_manager.broadcast_to_composition(
@@ -299,6 +325,45 @@ class RedisSubscriber:
         except Exception as e:
             logger.exception(f"Error handling message: {e}")
 
+    async def _store_message(
+        self, composition_id: UUID, ws_message: WSBaseMessage, message_id: str | None
+    ) -> int | None:
+        """
+        Store a message for reconnection and get its sequence number.
+
+        Redis assigns the sequence, shared by every API replica. The append
+        runs as its own task; if it takes longer than SEQUENCE_WAIT_SECONDS the
+        message is broadcast without a sequence and the append still completes
+        in the background, so a slow Redis never holds up live updates.
+
+        Args:
+            composition_id: Composition UUID
+            ws_message: Message to store
+            message_id: Publisher-assigned message ID, if any
+
+        Returns:
+            The message's sequence number, or None if it is not known in time
+        """
+        if not self.reconnection_manager:
+            return None
+
+        append = asyncio.create_task(
+            self.reconnection_manager.append_message(
+                composition_id, ws_message, message_id=message_id
+            )
+        )
+        self._pending_appends.add(append)
+        append.add_done_callback(self._pending_appends.discard)
+
+        done, _ = await asyncio.wait({append}, timeout=SEQUENCE_WAIT_SECONDS)
+        if append not in done:
+            logger.warning(
+                f"Replay log append for composition {composition_id} is slow, "
+                "broadcasting without a sequence"
+            )
+            return None
+        return append.result()
+
     def _create_ws_message(
         self, composition_id: UUID, message_data: dict[str, Any]
     ) -> WSProgressMessage | WSStatusMessage | WSErrorMessage | None:
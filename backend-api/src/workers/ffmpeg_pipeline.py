@@ -10,6 +10,19 @@ from pathlib import Path
 from typing import Any
 
 from app.config import settings
+from services.ffmpeg.composition_planner import CompositionPlan, CompositionPlanner
+from services.ffmpeg.concat_builder import ConcatDemuxerBuilder
+from services.ffmpeg.encoder import BACKEND_PRESETS, H264EncoderSettings, resolve_backend
+from services.ffmpeg.encoder_profiles import (
+    MP4_FAMILY_FORMATS,
+    EncoderProfile,
+    EncoderProfileEngine,
+    EncoderSelection,
+)
+from services.ffmpeg.input_manager import InputFileManager
+from services.ffmpeg.stream_copy import StreamCopyPlanner
+from services.resource_sampler import ProcessSampler
+from services.tracing import span
 
 logger = logging.getLogger(__name__)
 
@@ -39,6 +52,55 @@ class FFmpegCommandBuilder:
         self.output_format = output_format
         self.ffmpeg_path = settings.ffmpeg_path
         self.threads = settings.ffmpeg_threads
+        backend = resolve_backend(settings.video_encoder_backend, settings.ffmpeg_path)
+        self.encoder_engine = EncoderProfileEngine(backend=backend)
+        input_manager = InputFileManager(ffprobe_path=settings.ffprobe_path)
+        self.planner = CompositionPlanner(
+            input_manager=input_manager,
+            stream_copy_planner=StreamCopyPlanner(
+                input_manager=input_manager,
+                video_codec=BACKEND_PRESETS[backend].codec_name,
+            ),
+        )
+
+    def _video_encoder_args(
+        self,
+        resolution: str,
+        fps: int,
+        encoder_settings: H264EncoderSettings | None,
+    ) -> list[str]:
+        """Build video encoder arguments, defaulting to the final profile.
+
+        Args:
+            resolution: Output resolution (WxH)
+            fps: Output frame rate
+            encoder_settings: Explicit encoder settings, if any
+
+        Returns:
+            list[str]: FFmpeg video encoder arguments
+        """
+        if encoder_settings is None:
+            width, height = (int(value) for value in resolution.split("x"))
+            encoder_settings = self.encoder_engine.settings_for(
+                EncoderProfile.FINAL, width, height, fps
+            )
+        return self.encoder_engine.build_encoder_args(encoder_settings)
+
+    def _mux_args(self, output_file: Path, mux_args: list[str] | None) -> list[str]:
+        """Build muxer arguments, defaulting to +faststart for MP4/MOV outputs.
+
+        Args:
+            output_file: Output video file path
+            mux_args: Explicit muxer arguments, if any
+
+        Returns:
+            list[str]: FFmpeg muxer arguments
+        """
+        if output_file.suffix.lstrip(".").lower() not in MP4_FAMILY_FORMATS:
+            return []
+        if mux_args is None:
+            return ["-movflags", "+faststart"]
+        return list(mux_args)
 
     def build_simple_composition(
         self,
@@ -47,8 +109,10 @@ class FFmpegCommandBuilder:
         resolution: str = "1920x1080",
         fps: int = 30,
         composition_config: dict[str, Any] | None = None,
+        encoder_settings: H264EncoderSettings | None = None,
+        mux_args: list[str] | None = None,
     ) -> list[str]:
-        """Build a simple FFmpeg command for concatenating videos.
+        """Build an FFmpeg command for concatenating videos.
 
         Args:
             input_files: List of input video file paths or dict mapping asset IDs to paths
@@ -56,6 +120,8 @@ class FFmpegCommandBuilder:
             resolution: Output resolution (WxH)
             fps: Output frame rate
             composition_config: Optional composition configuration for trimming
+            encoder_settings: H.264 settings (default: final profile for the resolution)
+            mux_args: MP4/MOV muxer arguments (default: +faststart)
 
         Returns:
             list[str]: FFmpeg command arguments
@@ -63,12 +129,46 @@ class FFmpegCommandBuilder:
         if not input_files:
             raise ValueError("No input files provided")
 
-        # Normalize input_files to dict format for consistent handling
+        # Normalize input_files to dict format, pairing paths with assets by position
         if isinstance(input_files, list):
-            input_files_dict = {f"asset_{i}": path for i, path in enumerate(input_files)}
-        else:
-            input_files_dict = input_files
+            input_files = {f"asset_{i}": path for i, path in enumerate(input_files)}
+        assets = (composition_config or {}).get("assets", [])
+        config = {
+            **(composition_config or {}),
+            "assets": [
+                {**(assets[i] if i < len(assets) else {}), "id": asset_id, "type": "video"}
+                for i, asset_id in enumerate(input_files)
+            ],
+        }
+
+        return self.build_complex_composition(
+            composition_config=config,
+            input_files=input_files,
+            output_file=output_file,
+            resolution=resolution,
+            fps=fps,
+            encoder_settings=encoder_settings,
+            mux_args=mux_args,
+        )
+
+    def build_stream_copy_composition(
+        self,
+        concat_file: Path,
+        output_file: Path,
+        has_audio: bool,
+        mux_args: list[str] | None = None,
+    ) -> list[str]:
+        """Build an FFmpeg command that concatenates inputs without re-encoding.
 
+        Args:
+            concat_file: Concat demuxer list (see ConcatDemuxerBuilder)
+            output_file: Output video file path
+            has_audio: Whether the inputs carry audio to copy
+            mux_args: MP4/MOV muxer arguments (default: +faststart)
+
+        Returns:
+            list[str]: FFmpeg command arguments
+        """
         cmd = [
             self.ffmpeg_path,
             "-y",  # Overwrite output file
@@ -76,256 +176,25 @@ class FFmpegCommandBuilder:
             "pipe:1",  # Progress output to stdout
             "-loglevel",
             "warning",  # Only show warnings/errors
+            "-f",
+            "concat",
+            "-safe",
+            "0",
+            "-i",
+            str(concat_file),
+            "-map",
+            "0:v:0",
         ]
+        if has_audio:
+            cmd.extend(["-map", "0:a:0"])
 
-        # Add input files
-        for file_path in input_files_dict.values():
-            cmd.extend(["-i", str(file_path)])
-
-        # Get asset timing information for trimming
-        assets = composition_config.get("assets", []) if composition_config else []
-
-        # Track whether output will have audio
-        output_has_audio = False
-
-        # Build filter complex for concatenation
-        if len(input_files_dict) > 1:
-            # Check which files have audio streams
-            files_with_audio = []
-            for i, (file_id, file_path) in enumerate(input_files_dict.items()):
-                has_audio = self.has_audio_stream(file_path)
-                files_with_audio.append(has_audio)
-
-                logger.debug(
-                    f"Input {i} ({file_id}): has_audio={has_audio}",
-                    extra={"input_index": i, "file_id": file_id, "has_audio": has_audio},
-                )
-
-            # Determine if output should have audio (at least one input has audio)
-            any_has_audio = any(files_with_audio)
-            output_has_audio = any_has_audio
-
-            # Scale, trim, and concatenate inputs
-            filter_parts = []
-            for i, asset in enumerate(assets[: len(input_files_dict)]):
-                # Use trim_start/trim_end for extracting from source video
-                trim_start = asset.get("trim_start", 0)
-                trim_end = asset.get("trim_end")
-                has_audio = files_with_audio[i] if i < len(files_with_audio) else False
-
-                if trim_start or trim_end:
-                    # Apply trim filter for video
-                    duration = trim_end - trim_start if trim_end else None
-                    trim_filter = f"[{i}:v]trim=start={trim_start}"
-                    if trim_end:
-                        trim_filter += f":duration={duration}"
-                    trim_filter += (
-                        f",setpts=PTS-STARTPTS,scale={resolution},setsar=1,fps={fps}[v{i}]"
-                    )
-                    filter_parts.append(trim_filter)
-
-                    # Only apply audio trim if this file has audio
-                    if has_audio:
-                        audio_trim = f"[{i}:a]atrim=start={trim_start}"
-                        if trim_end:
-                            audio_trim += f":duration={duration}"
-                        audio_trim += f",asetpts=PTS-STARTPTS[a{i}]"
-                        filter_parts.append(audio_trim)
-                    elif any_has_audio:
-                        # File has no audio but we need audio for concat - generate silence
-                        silence_duration = duration if duration else 10  # Default 10s if no end
-                        filter_parts.append(
-                            f"anullsrc=channel_layout=stereo:sample_rate=48000:duration={silence_duration}[a{i}]"
-                        )
-                else:
-                    # No trimming - just scale video
-                    filter_parts.append(f"[{i}:v]scale={resolution},setsar=1,fps={fps}[v{i}]")
-
-                    # Handle audio
-                    if has_audio:
-                        filter_parts.append(f"[{i}:a]acopy[a{i}]")
-                    elif any_has_audio:
-                        # Generate silence to match other streams (10 seconds default)
-                        filter_parts.append(
-                            f"anullsrc=channel_layout=stereo:sample_rate=48000:duration=10[a{i}]"
-                        )
-
-            # Build concat filter based on whether we have audio
-            if any_has_audio:
-                concat_inputs = "".join([f"[v{i}][a{i}]" for i in range(len(input_files_dict))])
-                filter_parts.append(
-                    f"{concat_inputs}concat=n={len(input_files_dict)}:v=1:a=1[outv][outa]"
-                )
-                map_args = ["-map", "[outv]", "-map", "[outa]"]
-            else:
-                # No audio in any file - video-only concat
-                concat_inputs = "".join([f"[v{i}]" for i in range(len(input_files_dict))])
-                filter_parts.append(
-                    f"{concat_inputs}concat=n={len(input_files_dict)}:v=1:a=0[outv]"
-                )
-                map_args = ["-map", "[outv]"]
-
-            # Add text overlays if provided
-            overlays = composition_config.get("overlays", []) if composition_config else []
-            if overlays:
-                video_label = "outv"
-                for i, overlay in enumerate(overlays):
-                    next_label = f"overlay{i}" if i < len(overlays) - 1 else "final_outv"
-                    overlay_filter = self._build_overlay_filter(overlay, video_label, next_label)
-                    filter_parts.append(overlay_filter)
-                    video_label = next_label
-
-                # Update map to use final overlay output
-                map_args = ["-map", f"[{video_label}]", "-map", "[outa]"] if any_has_audio else ["-map", f"[{video_label}]"]
-
-            filter_complex = ";".join(filter_parts)
-
-            cmd.extend(["-filter_complex", filter_complex] + map_args)
-        else:
-            # Single file - scale and optionally trim
-            asset = assets[0] if assets else {}
-            # Use trim_start/trim_end for extracting from source video
-            trim_start = asset.get("trim_start", 0)
-            trim_end = asset.get("trim_end")
-
-            # Check if the input file has audio
-            first_file = next(iter(input_files_dict.values()))
-            has_audio = self.has_audio_stream(first_file)
-            output_has_audio = has_audio
-
-            if trim_start or trim_end:
-                # Apply trim filter for single file
-                duration = trim_end - trim_start if trim_end else None
-
-                video_trim = f"[0:v]trim=start={trim_start}"
-                if duration:
-                    video_trim += f":duration={duration}"
-                video_trim += f",setpts=PTS-STARTPTS,scale={resolution},setsar=1,fps={fps}[v]"
-
-                if has_audio:
-                    # Video has audio - apply audio trim as well
-                    audio_trim = f"[0:a]atrim=start={trim_start}"
-                    if duration:
-                        audio_trim += f":duration={duration}"
-                    audio_trim += ",asetpts=PTS-STARTPTS[a]"
-
-                    filter_parts = [video_trim, audio_trim]
-
-                    # Add text overlays if provided
-                    overlays = composition_config.get("overlays", []) if composition_config else []
-                    video_label = "v"
-                    if overlays:
-                        for i, overlay in enumerate(overlays):
-                            next_label = f"overlay{i}" if i < len(overlays) - 1 else "final_v"
-                            overlay_filter = self._build_overlay_filter(overlay, video_label, next_label)
-                            filter_parts.append(overlay_filter)
-                            video_label = next_label
-
-                    filter_complex = ";".join(filter_parts)
-
-                    cmd.extend(
-                        [
-                            "-filter_complex",
-                            filter_complex,
-                            "-map",
-                            f"[{video_label}]",
-                            "-map",
-                            "[a]",
-                        ]
-                    )
-                else:
-                    # Video has no audio - only trim video
-                    filter_parts = [video_trim]
-
-                    # Add text overlays if provided
-                    overlays = composition_config.get("overlays", []) if composition_config else []
-                    video_label = "v"
-                    if overlays:
-                        for i, overlay in enumerate(overlays):
-                            next_label = f"overlay{i}" if i < len(overlays) - 1 else "final_v"
-                            overlay_filter = self._build_overlay_filter(overlay, video_label, next_label)
-                            filter_parts.append(overlay_filter)
-                            video_label = next_label
-
-                    filter_complex = ";".join(filter_parts)
-
-                    cmd.extend(
-                        [
-                            "-filter_complex",
-                            filter_complex,
-                            "-map",
-                            f"[{video_label}]",
-                        ]
-                    )
-            else:
-                # Just scale (no trimming)
-                overlays = composition_config.get("overlays", []) if composition_config else []
-                if overlays:
-                    # Use filter_complex for scale + overlays
-                    scale_filter = f"[0:v]scale={resolution},setsar=1,fps={fps}[v]"
-                    filter_parts = [scale_filter]
-
-                    if has_audio:
-                        filter_parts.append("[0:a]acopy[a]")
-
-                    video_label = "v"
-                    for i, overlay in enumerate(overlays):
-                        next_label = f"overlay{i}" if i < len(overlays) - 1 else "final_v"
-                        overlay_filter = self._build_overlay_filter(overlay, video_label, next_label)
-                        filter_parts.append(overlay_filter)
-                        video_label = next_label
-
-                    filter_complex = ";".join(filter_parts)
-
-                    cmd.extend(["-filter_complex", filter_complex])
-                    cmd.extend(["-map", f"[{video_label}]"])
-                    if has_audio:
-                        cmd.extend(["-map", "[a]"])
-                else:
-                    # Just scale, no overlays
-                    cmd.extend(["-vf", f"scale={resolution},setsar=1,fps={fps}"])
-
-        # Output settings
-        cmd.extend(
-            [
-                "-c:v",
-                "libx264",  # H.264 codec
-                "-preset",
-                "medium",  # Encoding preset
-                "-crf",
-                "23",  # Constant Rate Factor (quality)
-            ]
-        )
-
-        # Only add audio codec settings if output has audio
-        if output_has_audio:
-            cmd.extend(
-                [
-                    "-c:a",
-                    "aac",  # AAC audio codec
-                    "-b:a",
-                    "192k",  # Audio bitrate
-                ]
-            )
-
-        cmd.extend(
-            [
-                "-movflags",
-                "+faststart",  # Enable fast start for MP4
-                "-threads",
-                str(self.threads),
-                str(output_file),
-            ]
-        )
+        cmd.extend(["-c", "copy"])
+        cmd.extend(self._mux_args(output_file, mux_args))
+        cmd.append(str(output_file))
 
         logger.info(
-            "Built FFmpeg command",
-            extra={
-                "input_count": len(input_files_dict),
-                "output": str(output_file),
-                "resolution": resolution,
-                "fps": fps,
-            },
+            "Built FFmpeg stream-copy command",
+            extra={"concat_file": str(concat_file), "output": str(output_file)},
         )
 
         return cmd
@@ -337,211 +206,60 @@ class FFmpegCommandBuilder:
         output_file: Path,
         resolution: str = "1920x1080",
         fps: int = 30,
+        encoder_settings: H264EncoderSettings | None = None,
+        mux_args: list[str] | None = None,
+        plan: CompositionPlan | None = None,
     ) -> list[str]:
-        """Build a complex FFmpeg command based on composition configuration.
+        """Build an FFmpeg command from the composition planner's output.
 
         Args:
-            composition_config: Composition configuration with layout, effects, etc.
+            composition_config: Composition configuration with assets, overlays and audio
             input_files: Mapping of asset ID to file path
             output_file: Output video file path
             resolution: Output resolution (WxH)
             fps: Output frame rate
+            encoder_settings: H.264 settings (default: final profile for the resolution)
+            mux_args: MP4/MOV muxer arguments (default: +faststart)
+            plan: Existing plan for this composition (default: plan it now)
 
         Returns:
             list[str]: FFmpeg command arguments
-        """
-        # Separate video and audio-only assets
-        assets = composition_config.get("assets", [])
-        video_files = []
-        audio_files = []
-
-        for asset in assets:
-            asset_id = asset.get("id")
-            asset_type = asset.get("type", "video")
-
-            if asset_id in input_files:
-                if asset_type == "audio":
-                    audio_files.append(input_files[asset_id])
-                else:
-                    video_files.append(input_files[asset_id])
 
-        logger.info(
-            "Building composition with separated assets",
-            extra={
-                "video_count": len(video_files),
-                "audio_count": len(audio_files),
-                "total_inputs": len(input_files),
-            },
-        )
-
-        # If we have video files, process them
-        if video_files:
-            # If we have background audio, we'll mix it in
-            if audio_files:
-                return self._build_video_with_audio(
-                    video_files=video_files,
-                    audio_files=audio_files,
-                    output_file=output_file,
-                    resolution=resolution,
-                    fps=fps,
-                    composition_config=composition_config,
-                )
-            else:
-                # Just video, no background audio
-                return self.build_simple_composition(
-                    input_files=video_files,
-                    output_file=output_file,
-                    resolution=resolution,
-                    fps=fps,
-                    composition_config=composition_config,
-                )
-        else:
-            raise ValueError("No video assets found in composition")
-
-    def _build_video_with_audio(
-        self,
-        video_files: list[Path],
-        audio_files: list[Path],
-        output_file: Path,
-        resolution: str,
-        fps: int,
-        composition_config: dict[str, Any],
-    ) -> list[str]:
-        """Build FFmpeg command for video with background audio mixing.
-
-        Args:
-            video_files: List of video file paths
-            audio_files: List of audio file paths (background music, etc.)
-            output_file: Output file path
-            resolution: Output resolution (WxH)
-            fps: Output frame rate
-            composition_config: Composition configuration with audio settings
-
-        Returns:
-            list[str]: FFmpeg command arguments
+        Raises:
+            CompositionPlanError: If the composition has no video assets
         """
+        if plan is None:
+            width, height = (int(value) for value in resolution.split("x"))
+            plan = self.planner.plan(composition_config, input_files, width, height, fps)
+
         cmd = [
-            "ffmpeg",
-            "-y",  # Overwrite output
+            self.ffmpeg_path,
+            "-y",  # Overwrite output file
             "-progress",
-            "pipe:1",  # Progress to stdout
+            "pipe:1",  # Progress output to stdout
             "-loglevel",
             "warning",  # Only show warnings/errors
         ]
+        cmd.extend(plan.input_args())
+        cmd.extend(plan.filter_args())
 
-        # Add all inputs (video files first, then audio files)
-        all_inputs = video_files + audio_files
-        for input_file in all_inputs:
-            cmd.extend(["-i", str(input_file)])
-
-        # Get audio settings
-        audio_config = composition_config.get("audio", {})
-        music_volume = audio_config.get("music_volume", 0.3)
-        original_audio_volume = audio_config.get("original_audio_volume", 0.7)
-
-        video_input_count = len(video_files)
-
-        # Build filter complex
-        filter_parts = []
-
-        # Check which video files have audio streams
-        files_with_audio = []
-        for i, video_file in enumerate(video_files):
-            has_audio = self.has_audio_stream(video_file)
-            files_with_audio.append(has_audio)
-            logger.debug(
-                f"Video input {i}: has_audio={has_audio}",
-                extra={"input_index": i, "video_file": str(video_file), "has_audio": has_audio},
-            )
-
-        any_has_audio = any(files_with_audio)
-
-        # Process video clips (concatenate if multiple)
-        if video_input_count > 1:
-            # Scale each video and handle audio
-            for i in range(video_input_count):
-                filter_parts.append(f"[{i}:v]scale={resolution},setsar=1,fps={fps}[v{i}]")
-
-                # Handle audio for each video
-                if files_with_audio[i]:
-                    filter_parts.append(f"[{i}:a]acopy[a{i}]")
-                elif any_has_audio:
-                    # Generate silence for videos without audio
-                    filter_parts.append(
-                        f"anullsrc=channel_layout=stereo:sample_rate=48000:duration=10[a{i}]"
-                    )
-
-            # Concatenate videos with their audio
-            if any_has_audio:
-                concat_inputs = "".join([f"[v{i}][a{i}]" for i in range(video_input_count)])
-                filter_parts.append(
-                    f"{concat_inputs}concat=n={video_input_count}:v=1:a=1[video_out][video_audio]"
-                )
-            else:
-                # No audio in any video - video-only concat, then generate silence
-                concat_inputs = "".join([f"[v{i}]" for i in range(video_input_count)])
-                filter_parts.append(
-                    f"{concat_inputs}concat=n={video_input_count}:v=1:a=0[video_out]"
-                )
-                # Generate silence for mixing with background audio
-                filter_parts.append(
-                    "anullsrc=channel_layout=stereo:sample_rate=48000:duration=10[video_audio]"
-                )
-        else:
-            # Single video - just scale
-            filter_parts.append(f"[0:v]scale={resolution},setsar=1,fps={fps}[video_out]")
-
-            # Handle audio for single video
-            if files_with_audio[0]:
-                filter_parts.append("[0:a]acopy[video_audio]")
-            else:
-                # Generate silence for video without audio
-                filter_parts.append(
-                    "anullsrc=channel_layout=stereo:sample_rate=48000:duration=10[video_audio]"
-                )
-
-        # Mix background audio with video audio
-        # Adjust volumes and mix
-        if audio_files:
-            bg_audio_index = video_input_count  # First audio file after videos
-            filter_parts.append(
-                f"[video_audio]volume={original_audio_volume}[video_audio_adjusted]"
-            )
-            filter_parts.append(f"[{bg_audio_index}:a]volume={music_volume}[bg_audio_adjusted]")
-            filter_parts.append(
-                "[video_audio_adjusted][bg_audio_adjusted]amix=inputs=2:duration=first[audio_out]"
+        # Output settings
+        cmd.extend(self._video_encoder_args(resolution, fps, encoder_settings))
+        if plan.copy_audio:
+            cmd.extend(["-c:a", "copy"])
+        elif plan.has_audio:
+            cmd.extend(
+                [
+                    "-c:a",
+                    "aac",  # AAC audio codec
+                    "-b:a",
+                    "192k",  # Audio bitrate
+                ]
             )
-        else:
-            filter_parts.append(f"[video_audio]volume={original_audio_volume}[audio_out]")
-
-        filter_complex = ";".join(filter_parts)
 
+        cmd.extend(self._mux_args(output_file, mux_args))
         cmd.extend(
             [
-                "-filter_complex",
-                filter_complex,
-                "-map",
-                "[video_out]",
-                "-map",
-                "[audio_out]",
-            ]
-        )
-
-        # Output settings
-        cmd.extend(
-            [
-                "-c:v",
-                "libx264",
-                "-preset",
-                "medium",
-                "-crf",
-                "23",
-                "-c:a",
-                "aac",
-                "-b:a",
-                "192k",
-                "-movflags",
-                "+faststart",
                 "-threads",
                 str(self.threads),
                 str(output_file),
@@ -549,12 +267,14 @@ class FFmpegCommandBuilder:
         )
 
         logger.info(
-            "Built video+audio mixing command",
+            "Built FFmpeg command",
             extra={
-                "video_count": len(video_files),
-                "audio_count": len(audio_files),
-                "music_volume": music_volume,
-                "original_volume": original_audio_volume,
+                "input_count": len(plan.ir.segments) + len(plan.ir.music),
+                "filter_chains": len(plan.graph.nodes),
+                "copy_audio": plan.copy_audio,
+                "output": str(output_file),
+                "resolution": resolution,
+                "fps": fps,
             },
         )
 
@@ -567,96 +287,13 @@ class FFmpegCommandBuilder:
             video_path: Path to video file
 
         Returns:
-            bool: True if video has audio stream, False otherwise
+            bool: True if video has audio stream, False otherwise (including probe failures)
         """
         try:
-            cmd = [
-                settings.ffprobe_path,
-                "-v",
-                "error",
-                "-select_streams",
-                "a:0",
-                "-show_entries",
-                "stream=codec_type",
-                "-of",
-                "default=noprint_wrappers=1:nokey=1",
-                str(video_path),
-            ]
-
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                check=False,  # Don't raise on non-zero exit
-            )
-
-            # If there's output and it contains "audio", the file has audio
-            return "audio" in result.stdout.strip().lower()
-
-        except Exception as e:
-            logger.warning(f"Failed to check audio stream: {e}")
-            return False  # Assume no audio on error
-
-    def _build_overlay_filter(
-        self, overlay: dict[str, Any], input_label: str, output_label: str
-    ) -> str:
-        """Build drawtext filter for text overlay.
-
-        Args:
-            overlay: Overlay configuration with text, position, timing, font settings
-            input_label: Input video stream label
-            output_label: Output video stream label
-
-        Returns:
-            str: FFmpeg drawtext filter string
-        """
-        text = overlay.get("text", "")
-        position = overlay.get("position", "bottom_center")
-        start_time = overlay.get("start_time", 0)
-        end_time = overlay.get("end_time")
-        font_size = overlay.get("font_size", 24)
-        font_color = overlay.get("font_color", "#FFFFFF")
-
-        # Convert hex color to FFmpeg format (remove #)
-        if font_color.startswith("#"):
-            font_color = font_color[1:]
-
-        # Map position to x,y coordinates
-        position_map = {
-            "top_left": "x=10:y=10",
-            "top_center": "x=(w-text_w)/2:y=10",
-            "top_right": "x=w-text_w-10:y=10",
-            "center_left": "x=10:y=(h-text_h)/2",
-            "center": "x=(w-text_w)/2:y=(h-text_h)/2",
-            "center_right": "x=w-text_w-10:y=(h-text_h)/2",
-            "bottom_left": "x=10:y=h-text_h-10",
-            "bottom_center": "x=(w-text_w)/2:y=h-text_h-10",
-            "bottom_right": "x=w-text_w-10:y=h-text_h-10",
-        }
-        xy_coords = position_map.get(position, position_map["bottom_center"])
-
-        # Escape text for FFmpeg (escape special characters)
-        text_escaped = text.replace(":", "\\:").replace("'", "\\'")
-
-        # Build enable expression for timing
-        if end_time is not None:
-            enable_expr = f"enable='between(t,{start_time},{end_time})'"
-        else:
-            enable_expr = f"enable='gte(t,{start_time})'"
-
-        # Build drawtext filter
-        drawtext = (
-            f"[{input_label}]drawtext="
-            f"text='{text_escaped}':"
-            f"{xy_coords}:"
-            f"fontsize={font_size}:"
-            f"fontcolor=0x{font_color}:"
-            f"box=1:boxcolor=0x000000@0.5:boxborderw=5:"
-            f"{enable_expr}"
-            f"[{output_label}]"
-        )
-
-        return drawtext
+            return self.planner.input_manager.probe_file(video_path).has_audio
+        except (FileNotFoundError, ValueError) as e:
+            logger.warning(f"Error checking audio stream in {video_path}: {e}")
+            return False
 
 
 class FFmpegProgressParser:
@@ -764,6 +401,8 @@ class FFmpegPipeline:
 
         self.process: subprocess.Popen | None = None
         self.command_builder = FFmpegCommandBuilder()
+        # Resource time series of the last render's FFmpeg process
+        self.resource_sampler: ProcessSampler | None = None
 
         logger.info(
             "Initialized FFmpegPipeline",
@@ -779,6 +418,8 @@ class FFmpegPipeline:
         fps: int = 30,
         progress_callback: Callable[[FFmpegProgress], None] | None = None,
         timeout: int | None = None,
+        encoder_profile: EncoderProfile | str = EncoderProfile.FINAL,
+        deadline_seconds: float | None = None,
     ) -> Path:
         """Execute FFmpeg composition pipeline with timeout support.
 
@@ -790,6 +431,9 @@ class FFmpegPipeline:
             fps: Output frame rate
             progress_callback: Optional callback for progress updates
             timeout: Optional timeout in seconds (default: settings.rq_default_timeout)
+            encoder_profile: Output profile (draft, preview, final, archive)
+            deadline_seconds: Optional render deadline; a faster preset is
+                chosen if the measured encode speed says the profile's would miss it
 
         Returns:
             Path: Path to output file
@@ -804,15 +448,47 @@ class FFmpegPipeline:
         timeout = timeout or settings.rq_default_timeout
         start_time = time.time()
 
+        width, height = (int(value) for value in resolution.split("x"))
+        current_progress = FFmpegProgress()
+        self.resource_sampler = None
+
         try:
-            # Build FFmpeg command
-            cmd = self.command_builder.build_complex_composition(
-                composition_config=composition_config,
-                input_files=input_files,
-                output_file=output_file,
-                resolution=resolution,
-                fps=fps,
-            )
+            with span("ffmpeg.plan", {"ffmpeg.input_count": len(input_files)}):
+                plan = self.command_builder.planner.plan(
+                    composition_config, input_files, width, height, fps
+                )
+                selection = self.select_encoder(
+                    encoder_profile,
+                    width,
+                    height,
+                    fps,
+                    deadline_seconds,
+                    duration_seconds=plan.duration_seconds,
+                )
+
+                # Build FFmpeg command, skipping the re-encode when inputs already match
+                if plan.stream_copy.eligible:
+                    concat_builder = ConcatDemuxerBuilder(temp_dir=self.temp_dir)
+                    concat_file = concat_builder.generate_concat_file(
+                        plan.stream_copy.segments, safe_mode=True
+                    )
+                    cmd = self.command_builder.build_stream_copy_composition(
+                        concat_file=concat_file,
+                        output_file=output_file,
+                        has_audio=plan.stream_copy.has_audio,
+                        mux_args=selection.mux_args,
+                    )
+                else:
+                    cmd = self.command_builder.build_complex_composition(
+                        composition_config=composition_config,
+                        input_files=input_files,
+                        output_file=output_file,
+                        resolution=resolution,
+                        fps=fps,
+                        encoder_settings=selection.settings,
+                        mux_args=selection.mux_args,
+                        plan=plan,
+                    )
 
             logger.info(
                 "Starting FFmpeg execution",
@@ -824,82 +500,110 @@ class FFmpegPipeline:
                 },
             )
 
-            # Execute FFmpeg process
-            self.process = subprocess.Popen(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                universal_newlines=True,
-                bufsize=1,
-            )
-
-            # Monitor progress
-            parser = FFmpegProgressParser()
-            current_progress = FFmpegProgress()
-
-            # Read stdout for progress with timeout checking
-            if self.process.stdout:
-                for line in self.process.stdout:
-                    # Check timeout
-                    elapsed = time.time() - start_time
-                    if elapsed > timeout:
-                        logger.error(
-                            f"FFmpeg execution exceeded timeout of {timeout}s",
-                            extra={"timeout": timeout, "elapsed": elapsed},
-                        )
-
-                        # Kill the process
-                        self.process.kill()
-                        self.process.wait(timeout=5)
-
-                        raise JobTimeoutError(
-                            f"FFmpeg execution exceeded timeout of {timeout} seconds"
-                        )
-
-                    line = line.strip()
-                    if not line:
-                        continue
-
-                    # Parse progress
-                    current_progress = parser.parse_line(line, current_progress)
-
-                    # Call progress callback
-                    if progress_callback:
-                        progress_callback(current_progress)
-
-            # Wait for completion with timeout
-            elapsed = time.time() - start_time
-            try:
-                return_code = self.process.wait(timeout=max(10, timeout - elapsed))
-            except subprocess.TimeoutExpired as timeout_err:
-                logger.error("FFmpeg process timeout during wait")
-                self.process.kill()
-                self.process.wait(timeout=5)
-                raise JobTimeoutError(
-                    f"FFmpeg execution exceeded timeout of {timeout} seconds"
-                ) from timeout_err
-
-            if return_code != 0:
-                # Read stderr for error messages
-                stderr = self.process.stderr.read() if self.process.stderr else ""
-                error_msg = f"FFmpeg failed with code {return_code}: {stderr}"
-
-                logger.error(
-                    "FFmpeg execution failed",
-                    extra={
-                        "return_code": return_code,
-                        "stderr": stderr[:500],  # Truncate long errors
-                    },
+            with span(
+                "ffmpeg.encode",
+                {
+                    "ffmpeg.preset": selection.settings.preset.value,
+                    "ffmpeg.stream_copy": plan.stream_copy.eligible,
+                },
+            ) as encode_span:
+                # Execute FFmpeg process
+                encode_start = time.time()
+                self.process = subprocess.Popen(
+                    cmd,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    universal_newlines=True,
+                    bufsize=1,
                 )
+                self.resource_sampler = self._start_sampler(self.process.pid)
+
+                # Monitor progress
+                parser = FFmpegProgressParser(duration_seconds=plan.duration_seconds or 0.0)
+
+                # Read stdout for progress with timeout checking
+                if self.process.stdout:
+                    for line in self.process.stdout:
+                        # Check timeout
+                        elapsed = time.time() - start_time
+                        if elapsed > timeout:
+                            logger.error(
+                                f"FFmpeg execution exceeded timeout of {timeout}s",
+                                extra={"timeout": timeout, "elapsed": elapsed},
+                            )
+
+                            # Kill the process
+                            self.process.kill()
+                            self.process.wait(timeout=5)
+
+                            raise JobTimeoutError(
+                                f"FFmpeg execution exceeded timeout of {timeout} seconds"
+                            )
+
+                        line = line.strip()
+                        if not line:
+                            continue
+
+                        # Parse progress
+                        current_progress = parser.parse_line(line, current_progress)
+                        if self.resource_sampler:
+                            self.resource_sampler.update_progress(
+                                current_progress.fps, current_progress.speed
+                            )
+
+                        # Call progress callback
+                        if progress_callback:
+                            progress_callback(current_progress)
+
+                # Wait for completion with timeout
+                elapsed = time.time() - start_time
+                try:
+                    return_code = self.process.wait(timeout=max(10, timeout - elapsed))
+                except subprocess.TimeoutExpired as timeout_err:
+                    logger.error("FFmpeg process timeout during wait")
+                    self.process.kill()
+                    self.process.wait(timeout=5)
+                    raise JobTimeoutError(
+                        f"FFmpeg execution exceeded timeout of {timeout} seconds"
+                    ) from timeout_err
+
+                encode_span.set_attribute("ffmpeg.frames", current_progress.frame)
+                if self.resource_sampler:
+                    self.resource_sampler.stop()
+                    for key, value in self.resource_sampler.summary().items():
+                        encode_span.set_attribute(f"ffmpeg.{key}", value)
+
+                if return_code != 0:
+                    # Read stderr for error messages
+                    stderr = self.process.stderr.read() if self.process.stderr else ""
+                    error_msg = f"FFmpeg failed with code {return_code}: {stderr}"
+
+                    logger.error(
+                        "FFmpeg execution failed",
+                        extra={
+                            "return_code": return_code,
+                            "stderr": stderr[:500],  # Truncate long errors
+                        },
+                    )
 
-                raise RuntimeError(error_msg)
+                    raise RuntimeError(error_msg)
 
-            if not output_file.exists():
-                raise RuntimeError(f"FFmpeg completed but output file not found: {output_file}")
+                if not output_file.exists():
+                    raise RuntimeError(f"FFmpeg completed but output file not found: {output_file}")
 
             output_size = output_file.stat().st_size
             execution_time = time.time() - start_time
 
+            # Feed the measured speed back into preset selection
+            if not plan.stream_copy.eligible:
+                self.command_builder.encoder_engine.speed_tracker.record(
+                    selection.settings.preset,
+                    current_progress.frame,
+                    width,
+                    height,
+                    time.time() - encode_start,
+                )
+
             logger.info(
                 "FFmpeg execution completed successfully",
                 extra={
@@ -907,6 +611,7 @@ class FFmpegPipeline:
                     "size_bytes": output_size,
                     "size_mb": round(output_size / (1024 * 1024), 2),
                     "execution_time": round(execution_time, 2),
+                    "stream_copy": plan.stream_copy.eligible,
                 },
             )
 
@@ -920,6 +625,9 @@ class FFmpegPipeline:
             raise
 
         finally:
+            if self.resource_sampler:
+                self.resource_sampler.stop()
+
             # Cleanup process
             if self.process and self.process.poll() is None:
                 try:
@@ -932,6 +640,75 @@ class FFmpegPipeline:
                     except Exception as kill_err:
                         logger.debug(f"Error killing process: {kill_err}")
 
+    def _start_sampler(self, pid: int) -> ProcessSampler | None:
+        """Start sampling the FFmpeg process's resource usage, if enabled.
+
+        Args:
+            pid: FFmpeg process ID
+
+        Returns:
+            ProcessSampler | None: Running sampler, or None if sampling is off
+        """
+        if settings.ffmpeg_sample_interval <= 0:
+            return None
+
+        sampler = ProcessSampler(
+            pid,
+            interval=settings.ffmpeg_sample_interval,
+            max_points=settings.ffmpeg_sample_max_points,
+        )
+        sampler.start()
+        return sampler
+
+    def select_encoder(
+        self,
+        encoder_profile: EncoderProfile | str,
+        width: int,
+        height: int,
+        fps: int,
+        deadline_seconds: float | None = None,
+        duration_seconds: float | None = None,
+    ) -> EncoderSelection:
+        """Choose encoder settings for a composition render.
+
+        Args:
+            encoder_profile: Output profile (draft, preview, final, archive)
+            width: Output width in pixels
+            height: Output height in pixels
+            fps: Output frame rate
+            deadline_seconds: Optional render deadline in seconds
+            duration_seconds: Planned output duration, if known
+
+        Returns:
+            EncoderSelection: Chosen profile settings
+        """
+        selection = self.command_builder.encoder_engine.select(
+            encoder_profile,
+            width,
+            height,
+            fps=fps,
+            duration_seconds=duration_seconds or None,
+            deadline_seconds=deadline_seconds,
+        )
+
+        logger.info(
+            "Selected encoder profile",
+            extra={
+                "profile": selection.profile.value,
+                "preset": selection.settings.preset.value,
+                "crf": selection.settings.crf,
+                "mux_args": " ".join(selection.mux_args),
+                "deadline_adjusted": selection.deadline_adjusted,
+                "estimated_seconds": (
+                    round(selection.estimated_seconds, 1)
+                    if selection.estimated_seconds is not None
+                    else None
+                ),
+            },
+        )
+
+        return selection
+
     def cleanup_temp_files(self, preserve_output: bool = True) -> None:
         """Clean up temporary files created during processing.
 
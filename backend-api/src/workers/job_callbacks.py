@@ -1,11 +1,14 @@
 """RQ job callbacks for updating composition status in database."""
 
 import logging
+from datetime import UTC, datetime
 from typing import Any
 from uuid import UUID
 
 from db.models.composition import Composition, CompositionStatus
 from rq.job import Job
+from services.callback_outbox import enqueue_callback
+from services.tracing import traced
 from sqlalchemy import create_engine, select
 from sqlalchemy.orm import Session
 
@@ -31,19 +34,25 @@ def _get_sync_session() -> Session:
     return Session(engine)
 
 
+@traced("db.update_composition_status")
 def _update_composition_status_sync(
     composition_id: UUID,
     status: CompositionStatus,
     output_url: str | None = None,
     error_message: str | None = None,
+    callback_url: str | None = None,
 ) -> None:
     """Update composition status in database (synchronous).
 
+    If a callback URL is given, the callback is queued in the outbox in the
+    same transaction as the status change; the API process delivers it.
+
     Args:
         composition_id: ID of composition to update
         status: New composition status
         output_url: Output URL if completed successfully
         error_message: Error message if failed
+        callback_url: URL to notify of the new status
     """
     session = _get_sync_session()
 
@@ -70,6 +79,24 @@ def _update_composition_status_sync(
         if error_message:
             composition.error_message = error_message
 
+        # Queue the client callback with the status change
+        if callback_url:
+            payload: dict[str, Any] = {
+                "event": (
+                    "composition.completed"
+                    if status == CompositionStatus.COMPLETED
+                    else "composition.failed"
+                ),
+                "composition_id": str(composition_id),
+                "status": status.value,
+                "timestamp": datetime.now(UTC).isoformat(),
+            }
+            if output_url:
+                payload["output_url"] = output_url
+            if error_message:
+                payload["error"] = error_message
+            enqueue_callback(session, callback_url, payload, request_id=str(composition_id))
+
         # Commit changes
         session.commit()
 
@@ -98,6 +125,13 @@ def _update_composition_status_sync(
         session.close()
 
 
+def _get_callback_url(job: Job) -> str | None:
+    """Get the client callback URL from job kwargs, if one was requested."""
+    if hasattr(job, "kwargs") and job.kwargs:
+        return job.kwargs.get("callback_url")
+    return None
+
+
 def on_job_success(job: Job, connection: Any, result: Any, *args: Any, **kwargs: Any) -> None:
     """Callback when job completes successfully.
 
@@ -138,6 +172,7 @@ def on_job_success(job: Job, connection: Any, result: Any, *args: Any, **kwargs:
                         composition_id=composition_id,
                         status=CompositionStatus.FAILED,
                         error_message=str(error_msg)[:1000],
+                        callback_url=_get_callback_url(job),
                     )
 
                     logger.info(
@@ -162,6 +197,7 @@ def on_job_success(job: Job, connection: Any, result: Any, *args: Any, **kwargs:
                     composition_id=composition_id,
                     status=CompositionStatus.COMPLETED,
                     output_url=output_url,
+                    callback_url=_get_callback_url(job),
                 )
 
                 logger.info(
@@ -234,6 +270,7 @@ def on_job_failure(job: Job, connection: Any, type: Any, value: Any, traceback:
                 composition_id=composition_id,
                 status=CompositionStatus.FAILED,
                 error_message=error_msg[:1000],  # Limit error message length
+                callback_url=_get_callback_url(job),
             )
 
             logger.info(
@@ -12,6 +12,9 @@ from uuid import UUID
 
 from app.config import settings
 from pydantic import BaseModel, Field, field_validator
+from services.ffmpeg.encoder_profiles import EncoderProfile
+from services.tracing import continue_trace, span
+from workers.job_queue import current_job_meta
 
 logger = logging.getLogger(__name__)
 
@@ -107,7 +110,16 @@ class CompositionJobParams(BaseModel):
     output_format: str = Field(default="mp4", description="Output video format")
     output_resolution: str = Field(default="1920x1080", description="Output resolution (WxH)")
     output_fps: int = Field(default=30, ge=1, le=120, description="Output frame rate")
+    encoder_profile: str = Field(
+        default="final", description="Encoder profile (draft/preview/final/archive)"
+    )
+    deadline_seconds: int | None = Field(
+        default=None, ge=1, description="Optional render deadline in seconds"
+    )
     priority: str = Field(default="default", description="Job priority (high/default/low)")
+    callback_url: str | None = Field(
+        default=None, description="URL notified when the composition finishes"
+    )
 
     @field_validator("output_format")
     @classmethod
@@ -155,6 +167,25 @@ class CompositionJobParams(BaseModel):
                 f"Invalid resolution format: {v}. Expected WxH (e.g., 1920x1080)"
             ) from e
 
+    @field_validator("encoder_profile")
+    @classmethod
+    def validate_encoder_profile(cls, v: str) -> str:
+        """Validate encoder profile name.
+
+        Args:
+            v: Profile name to validate
+
+        Returns:
+            str: Validated profile name
+
+        Raises:
+            ValueError: If profile not supported
+        """
+        supported = [profile.value for profile in EncoderProfile]
+        if v not in supported:
+            raise ValueError(f"Unsupported encoder profile: {v}. Must be one of {supported}")
+        return v
+
     @field_validator("priority")
     @classmethod
     def validate_priority(cls, v: str) -> str:
@@ -188,6 +219,7 @@ class CompositionJobHandler:
         self.context = JobContext(job_id=job_id)
         self.logger = logger.getChild(f"job.{job_id[:8]}")
         self.progress_tracker: Any = None  # Will be initialized in execute
+        self.resource_sampler: Any = None  # FFmpeg resource series, set by the render
 
         self.logger.info(
             "Initialized CompositionJobHandler",
@@ -324,14 +356,18 @@ class CompositionJobHandler:
         async with get_db_session() as session:
             # Update composition status to PROCESSING
             try:
-                result = await session.execute(
-                    select(Composition).where(Composition.id == validated_params.composition_id)
-                )
+                with span("db.query", {"db.table": "compositions"}):
+                    result = await session.execute(
+                        select(Composition).where(
+                            Composition.id == validated_params.composition_id
+                        )
+                    )
                 composition = result.scalar_one_or_none()
 
                 if composition:
                     composition.status = CompositionStatus.PROCESSING
-                    await session.commit()
+                    with span("db.commit"):
+                        await session.commit()
 
                     self.logger.info(
                         f"Updated composition {validated_params.composition_id} to PROCESSING",
@@ -389,6 +425,14 @@ class CompositionJobHandler:
                         },
                     )
 
+                # Batch the FFmpeg resource series; flushed when the metrics context exits
+                if self.resource_sampler and self.resource_sampler.started_at:
+                    metrics_collector.add_resource_samples(
+                        composition_id=validated_params.composition_id,
+                        samples=self.resource_sampler.samples,
+                        started_at=self.resource_sampler.started_at,
+                    )
+
                 # Mark as completed
                 self._update_context(
                     status=JobStatus.COMPLETED,
@@ -421,7 +465,8 @@ class CompositionJobHandler:
             )
 
             # Execute job with metrics collection (run async code in sync context)
-            result = asyncio.run(self._collect_metrics_async(params))
+            with span("job.composition", {"job.id": self.job_id}):
+                result = asyncio.run(self._collect_metrics_async(params))
 
             execution_time = time.time() - start_time
 
@@ -527,13 +572,14 @@ class CompositionJobHandler:
             if not assets:
                 raise ValueError("No assets provided in composition config")
 
-            downloaded_files = s3_manager.download_assets(
-                assets=assets,
-                temp_dir=job_temp_dir,
-                progress_callback=lambda asset_id, downloaded, total: self.logger.debug(
-                    f"Asset {asset_id} download progress: {downloaded}/{total} bytes"
-                ),
-            )
+            with span("job.download", {"job.asset_count": len(assets)}):
+                downloaded_files = s3_manager.download_assets(
+                    assets=assets,
+                    temp_dir=job_temp_dir,
+                    progress_callback=lambda asset_id, downloaded, total: self.logger.debug(
+                        f"Asset {asset_id} download progress: {downloaded}/{total} bytes"
+                    ),
+                )
 
             self.logger.info(
                 f"Downloaded {len(downloaded_files)} assets",
@@ -585,15 +631,18 @@ class CompositionJobHandler:
                 )
 
             # Execute FFmpeg composition with timeout
-            output_file = pipeline.execute_composition(
-                input_files=downloaded_files,
-                output_filename=output_filename,
-                composition_config=params.composition_config,
-                resolution=params.output_resolution,
-                fps=params.output_fps,
-                progress_callback=ffmpeg_progress_callback,
-                timeout=settings.rq_default_timeout,  # Use configured timeout
-            )
+            with span("job.render", {"job.encoder_profile": params.encoder_profile}):
+                output_file = pipeline.execute_composition(
+                    input_files=downloaded_files,
+                    output_filename=output_filename,
+                    composition_config=params.composition_config,
+                    resolution=params.output_resolution,
+                    fps=params.output_fps,
+                    progress_callback=ffmpeg_progress_callback,
+                    timeout=settings.rq_default_timeout,  # Use configured timeout
+                    encoder_profile=params.encoder_profile,
+                    deadline_seconds=params.deadline_seconds,
+                )
 
             self.logger.info(
                 "FFmpeg composition completed",
@@ -609,6 +658,11 @@ class CompositionJobHandler:
                     "bitrate_kbps": last_ffmpeg_progress.bitrate_kbps,
                 }
 
+            # Keep the FFmpeg resource series for the metrics flush
+            self.resource_sampler = pipeline.resource_sampler
+            if self.resource_sampler:
+                self.context.metadata["ffmpeg_resources"] = self.resource_sampler.summary()
+
             self._update_context(
                 operation="Video processing complete",
                 progress=80.0,
@@ -623,28 +677,29 @@ class CompositionJobHandler:
             # Generate S3 key for output
             s3_output_key = f"compositions/{params.composition_id}/{output_filename}"
 
-            # Upload with progress tracking
-            s3_url = s3_manager.upload_file(
-                local_path=output_file,
-                s3_key=s3_output_key,
-                progress_callback=lambda uploaded, total: self.logger.debug(
-                    f"Upload progress: {uploaded}/{total} bytes"
-                ),
-                extra_args={
-                    "ContentType": f"video/{params.output_format}",
-                    "ContentDisposition": "inline",
-                    "Metadata": {
-                        "composition_id": str(params.composition_id),
-                        "job_id": self.job_id,
+            with span("job.upload"):
+                # Upload with progress tracking
+                s3_url = s3_manager.upload_file(
+                    local_path=output_file,
+                    s3_key=s3_output_key,
+                    progress_callback=lambda uploaded, total: self.logger.debug(
+                        f"Upload progress: {uploaded}/{total} bytes"
+                    ),
+                    extra_args={
+                        "ContentType": f"video/{params.output_format}",
+                        "ContentDisposition": "inline",
+                        "Metadata": {
+                            "composition_id": str(params.composition_id),
+                            "job_id": self.job_id,
+                        },
                     },
-                },
-            )
+                )
 
-            # Generate presigned URL for temporary access (24 hours)
-            presigned_url = s3_manager.generate_presigned_url(
-                s3_key=s3_output_key,
-                expiration=86400,  # 24 hours
-            )
+                # Generate presigned URL for temporary access (24 hours)
+                presigned_url = s3_manager.generate_presigned_url(
+                    s3_key=s3_output_key,
+                    expiration=86400,  # 24 hours
+                )
 
             self.logger.info(
                 "Output uploaded to S3",
@@ -669,12 +724,13 @@ class CompositionJobHandler:
                 progress=98.0,
             )
 
-            pipeline.cleanup_temp_files(preserve_output=False)
+            with span("job.cleanup"):
+                pipeline.cleanup_temp_files(preserve_output=False)
 
-            # Remove job temp directory
-            import shutil
+                # Remove job temp directory
+                import shutil
 
-            shutil.rmtree(job_temp_dir, ignore_errors=True)
+                shutil.rmtree(job_temp_dir, ignore_errors=True)
 
             self.logger.info("Cleanup completed")
 
@@ -741,7 +797,9 @@ def process_composition_job(job_id: str, **params: Any) -> dict[str, Any]:
     handler = CompositionJobHandler(job_id=job_id)
 
     try:
-        result = handler.execute(params)
+        # Continue the trace of the request that enqueued the job
+        with continue_trace(current_job_meta()):
+            result = handler.execute(params)
         return result
 
     finally:
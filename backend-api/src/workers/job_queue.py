@@ -1,9 +1,13 @@
 """Job queue management using Redis Queue (RQ) for background tasks."""
 
+import functools
 import logging
 import uuid
+from collections.abc import Callable
+from typing import Any
 
-from rq import Queue
+from rq import Queue, get_current_job
+from services.tracing import continue_trace, inject_context
 from workers.redis_pool import get_redis_connection
 
 logger = logging.getLogger(__name__)
@@ -30,6 +34,26 @@ def get_queue(name: str = DEFAULT_QUEUE) -> Queue:
     return Queue(name, connection=redis_conn)
 
 
+def current_job_meta() -> dict[str, Any]:
+    """Get the meta of the RQ job being run, empty outside a worker."""
+    job = get_current_job()
+    return job.meta if job else {}
+
+
+def continues_enqueuer_trace(func: Callable[..., Any]) -> Callable[..., Any]:
+    """Decorator running an RQ job function in the trace of the code that enqueued it.
+
+    The enqueue helpers below store the caller's trace context in the job meta.
+    """
+
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        with continue_trace(current_job_meta()):
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
 def enqueue_video_import(
     url: str,
     name: str,
@@ -66,6 +90,7 @@ def enqueue_video_import(
         job_timeout=VIDEO_IMPORT_TIMEOUT,
         result_ttl=86400,  # Keep result for 24 hours
         failure_ttl=86400,  # Keep failed job info for 24 hours
+        meta=inject_context(),
     )
 
     logger.info(
@@ -116,6 +141,7 @@ def enqueue_image_import(
         job_timeout=DEFAULT_JOB_TIMEOUT,
         result_ttl=86400,
         failure_ttl=86400,
+        meta=inject_context(),
     )
 
     logger.info(
@@ -166,6 +192,7 @@ def enqueue_ken_burns_video_generation(
         height=height,
         job_timeout=VIDEO_IMPORT_TIMEOUT,
         result_ttl=86400,
+        meta=inject_context(),
     )
 
     logger.info(
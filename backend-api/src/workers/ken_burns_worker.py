@@ -1,13 +1,23 @@
 """Worker for creating videos from images with Ken Burns effects."""
 
 import logging
+import math
 import os
 import subprocess
+import tempfile
 import uuid
+from collections.abc import Iterator
+from dataclasses import dataclass
+from enum import Enum
 from pathlib import Path
 from typing import List, Optional
 import random
 
+import numpy as np
+from app.config import settings
+from services.ffmpeg.encoder import resolve_backend
+from services.ffmpeg.encoder_profiles import EncoderProfile, EncoderProfileEngine
+from workers.job_queue import continues_enqueuer_trace
 from workers.s3_manager import s3_manager
 from workers.temp_file_manager import TempFileManager
 from workers.video_processor import extract_video_metadata, generate_thumbnail
@@ -16,6 +26,453 @@ import requests
 
 logger = logging.getLogger(__name__)
 
+KEN_BURNS_FPS = 25
+
+# Zoom range (keep it subtle)
+KEN_BURNS_ZOOM_RANGE = (1.0, 1.25)
+
+# Largest supersampled canvas zoompan works on (8K UHD)
+MAX_CANVAS_PIXELS = 7680 * 4320
+
+# Fixed-point bits for the NumPy engine's interpolation weights; 7 bits keep
+# (b - a) * w inside int16
+WEIGHT_BITS = 7
+
+
+class KenBurnsEngine(str, Enum):
+    """How the pan/zoom frames are produced."""
+
+    # FFmpeg zoompan over a supersampled canvas, all in one filter graph
+    ZOOMPAN = "zoompan"
+    # Frames resampled in NumPy and piped raw to a single encoder
+    NUMPY = "numpy"
+
+
+@dataclass
+class KenBurnsMotion:
+    """
+    Linear zoom and pan path for one image.
+
+    Centers are normalized to the image (0.0-1.0). The crop at zoom Z covers
+    1/Z of the image, so a center must lie within [0.5/Z, 1.0 - 0.5/Z].
+    """
+
+    zoom_start: float
+    zoom_end: float
+    center_start: tuple[float, float]
+    center_end: tuple[float, float]
+
+    @classmethod
+    def random(cls) -> "KenBurnsMotion":
+        """Zoom in or out at random between two valid random centers."""
+        z_min, z_max = KEN_BURNS_ZOOM_RANGE
+        if random.random() < 0.5:
+            zoom_start, zoom_end = z_min, z_max
+        else:
+            zoom_start, zoom_end = z_max, z_min
+
+        def valid_center(zoom: float) -> tuple[float, float]:
+            margin = 0.5 / zoom
+            return random.uniform(margin, 1.0 - margin), random.uniform(margin, 1.0 - margin)
+
+        return cls(zoom_start, zoom_end, valid_center(zoom_start), valid_center(zoom_end))
+
+    def trajectory(
+        self, num_frames: int, canvas_width: int, canvas_height: int
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Crop rectangle of every frame, in canvas pixels.
+
+        Matches the zoompan expressions: the crop is 1/zoom of the canvas and
+        is centered on the interpolated center.
+
+        Args:
+            num_frames: Frames in the segment
+            canvas_width: Canvas width in pixels
+            canvas_height: Canvas height in pixels
+
+        Returns:
+            (x, y, width, height) arrays with one entry per frame
+        """
+        t = np.arange(num_frames) / num_frames
+        zoom = self.zoom_start + (self.zoom_end - self.zoom_start) * t
+        cx = self.center_start[0] + (self.center_end[0] - self.center_start[0]) * t
+        cy = self.center_start[1] + (self.center_end[1] - self.center_start[1]) * t
+
+        crop_w = canvas_width / zoom
+        crop_h = canvas_height / zoom
+        return cx * canvas_width - crop_w / 2, cy * canvas_height - crop_h / 2, crop_w, crop_h
+
+
+def supersample_factor(width: int, height: int, max_zoom: float = KEN_BURNS_ZOOM_RANGE[1]) -> int:
+    """
+    Choose how far to upscale the canvas before zoompan.
+
+    zoompan crops at whole canvas pixels, so one pixel of pan moves the output
+    by zoom/factor pixels and too small a factor makes slow pans judder. The
+    factor keeps that step at or below half an output pixel, but never grows
+    the canvas past MAX_CANVAS_PIXELS: a fixed 4x upscale of a 4K frame is
+    133 MP per frame, and the cost of zoompan scales with canvas area.
+
+    Args:
+        width: Output width in pixels
+        height: Output height in pixels
+        max_zoom: Largest zoom in the motion
+
+    Returns:
+        Integer upscale factor (at least 1)
+    """
+    wanted = math.ceil(2 * max_zoom)
+    budget = math.isqrt(MAX_CANVAS_PIXELS // (width * height))
+    return max(1, min(wanted, budget))
+
+
+def build_ken_burns_filter(
+    motions: List[KenBurnsMotion],
+    width: int,
+    height: int,
+    num_frames: int,
+) -> str:
+    """
+    Build one filter graph that renders every image's zoompan and concatenates them.
+
+    Each input is a single decoded image: it is scaled once straight onto the
+    supersampled canvas, and zoompan emits `num_frames` frames from it.
+
+    Args:
+        motions: Motion for each input, in order
+        width: Output width in pixels
+        height: Output height in pixels
+        num_frames: Frames per image
+
+    Returns:
+        filter_complex string whose output label is [v]
+    """
+    factor = supersample_factor(width, height)
+    canvas_w, canvas_h = width * factor, height * factor
+
+    chains = []
+    for i, motion in enumerate(motions):
+        # Interpolate linearly; `on` is the output frame number
+        z_expr = f"{motion.zoom_start}+({motion.zoom_end - motion.zoom_start})*on/{num_frames}"
+        (cx_start, cy_start), (cx_end, cy_end) = motion.center_start, motion.center_end
+        cx_expr = f"{cx_start}+({cx_end - cx_start})*on/{num_frames}"
+        cy_expr = f"{cy_start}+({cy_end - cy_start})*on/{num_frames}"
+
+        # Top-left corner of the crop
+        x_expr = f"({cx_expr})*iw-(iw/zoom/2)"
+        y_expr = f"({cy_expr})*ih-(ih/zoom/2)"
+
+        chains.append(
+            f"[{i}:v]scale={canvas_w}:{canvas_h}:force_original_aspect_ratio=decrease,"
+            f"pad={canvas_w}:{canvas_h}:(ow-iw)/2:(oh-ih)/2,setsar=1,"
+            f"zoompan=z='{z_expr}':x='{x_expr}':y='{y_expr}':d={num_frames}"
+            f":s={width}x{height}:fps={KEN_BURNS_FPS},setsar=1[s{i}]"
+        )
+
+    labels = "".join(f"[s{i}]" for i in range(len(motions)))
+    chains.append(f"{labels}concat=n={len(motions)}:v=1:a=0[v]")
+    return ";".join(chains)
+
+
+def build_ken_burns_command(
+    ffmpeg_path: str,
+    image_paths: List[Path],
+    motions: List[KenBurnsMotion],
+    width: int,
+    height: int,
+    segment_duration: float,
+    encoder_args: List[str],
+    output_path: Path,
+    audio_path: Optional[Path] = None,
+) -> List[str]:
+    """
+    Build the FFmpeg command that renders a whole slideshow in one process.
+
+    Args:
+        ffmpeg_path: FFmpeg binary
+        image_paths: Images in order
+        motions: Motion for each image
+        width: Output width in pixels (even)
+        height: Output height in pixels (even)
+        segment_duration: Seconds per image
+        encoder_args: Video encoder arguments
+        output_path: Output video path
+        audio_path: Optional soundtrack, cut to the video length
+
+    Returns:
+        FFmpeg command
+    """
+    num_frames = int(segment_duration * KEN_BURNS_FPS)
+
+    cmd = [ffmpeg_path, "-y"]
+    for image_path in image_paths:
+        cmd.extend(["-i", str(image_path)])
+    if audio_path:
+        cmd.extend(["-i", str(audio_path)])
+
+    cmd.extend(
+        [
+            "-filter_complex",
+            build_ken_burns_filter(motions, width, height, num_frames),
+            "-map",
+            "[v]",
+        ]
+    )
+    if audio_path:
+        cmd.extend(["-map", f"{len(image_paths)}:a", "-c:a", "aac", "-shortest"])
+
+    cmd.extend([*encoder_args, str(output_path)])
+    return cmd
+
+
+def _linear_taps(
+    start: np.ndarray, span: np.ndarray, size: int, limit: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Source index and fixed-point weight of every output sample, for every frame.
+
+    Args:
+        start: Crop start per frame (source pixels)
+        span: Crop length per frame (source pixels)
+        size: Output samples per frame
+        limit: Source length
+
+    Returns:
+        (index, weight) arrays of shape (frames, size); the sample is
+        source[index] + (source[index + 1] - source[index]) * weight / 2**WEIGHT_BITS
+    """
+    centers = (np.arange(size) + 0.5) / size
+    pos = start[:, None] + centers[None, :] * span[:, None] - 0.5
+    np.clip(pos, 0, limit - 1.000001, out=pos)
+    index = pos.astype(np.intp)
+    weight = np.rint((pos - index) * (1 << WEIGHT_BITS)).astype(np.int16)
+    return index, weight
+
+
+def _lerp(a: np.ndarray, b: np.ndarray, weight: np.ndarray) -> np.ndarray:
+    """Interpolate two uint8 arrays with fixed-point weights, in int16."""
+    a = a.astype(np.int16)
+    b = b.astype(np.int16)
+    b -= a
+    b *= weight
+    b += 1 << (WEIGHT_BITS - 1)
+    b >>= WEIGHT_BITS
+    b += a
+    return b
+
+
+def _resample_plane(
+    plane_t: np.ndarray,
+    out: np.ndarray,
+    x_index: np.ndarray,
+    x_weight: np.ndarray,
+    y_index: np.ndarray,
+    y_weight: np.ndarray,
+) -> None:
+    """
+    Bilinear resample of one crop of a transposed plane into `out`.
+
+    Both passes gather whole rows, which NumPy does far faster than gathering
+    columns: the horizontal pass reads rows of the transposed plane, and the
+    intermediate is transposed back once for the vertical pass.
+    """
+    y_lo, y_hi = y_index[0], y_index[-1] + 2
+    band = plane_t[:, y_lo:y_hi]
+    columns = _lerp(band.take(x_index, axis=0), band.take(x_index + 1, axis=0), x_weight[:, None])
+    rows = np.ascontiguousarray(columns.astype(np.uint8).T)
+
+    y = y_index - y_lo
+    np.copyto(
+        out,
+        _lerp(rows.take(y, axis=0), rows.take(y + 1, axis=0), y_weight[:, None]),
+        casting="unsafe",
+    )
+
+
+def decode_canvas(
+    ffmpeg_path: str, image_path: Path, canvas_width: int, canvas_height: int
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Decode an image once, fitted and padded onto the canvas, as transposed YUV 4:2:0 planes.
+
+    FFmpeg does the fit and the transpose while decoding, so the planes come
+    out ready for row gathers.
+
+    Args:
+        ffmpeg_path: FFmpeg binary
+        image_path: Image to decode
+        canvas_width: Canvas width in pixels (even)
+        canvas_height: Canvas height in pixels (even)
+
+    Returns:
+        (Y, U, V) planes of shape (width, height), halved for U and V
+    """
+    result = subprocess.run(
+        [
+            ffmpeg_path,
+            "-v",
+            "error",
+            "-i",
+            str(image_path),
+            "-vf",
+            f"scale={canvas_width}:{canvas_height}:force_original_aspect_ratio=decrease,"
+            f"pad={canvas_width}:{canvas_height}:(ow-iw)/2:(oh-ih)/2,setsar=1,"
+            "format=yuv420p,transpose=cclock_flip",
+            "-frames:v",
+            "1",
+            "-f",
+            "rawvideo",
+            "-pix_fmt",
+            "yuv420p",
+            "-",
+        ],
+        check=True,
+        capture_output=True,
+    )
+    buffer = np.frombuffer(result.stdout, dtype=np.uint8)
+    luma = canvas_width * canvas_height
+    chroma = luma // 4
+    return (
+        buffer[:luma].reshape(canvas_width, canvas_height),
+        buffer[luma : luma + chroma].reshape(canvas_width // 2, canvas_height // 2),
+        buffer[luma + chroma : luma + 2 * chroma].reshape(canvas_width // 2, canvas_height // 2),
+    )
+
+
+def render_ken_burns_frames(
+    planes: tuple[np.ndarray, np.ndarray, np.ndarray],
+    motion: KenBurnsMotion,
+    width: int,
+    height: int,
+    num_frames: int,
+) -> Iterator[np.ndarray]:
+    """
+    Synthesize the frames of one segment as raw yuv420p.
+
+    The crop rectangles and the resampling taps for the whole trajectory are
+    computed up front in one vectorized pass; each frame is then two gathers
+    and two interpolations per plane.
+
+    Args:
+        planes: Transposed canvas planes from decode_canvas
+        motion: Pan/zoom path
+        width: Output width in pixels (even)
+        height: Output height in pixels (even)
+        num_frames: Frames to render
+
+    Yields:
+        The same flat uint8 buffer for every frame, overwritten in place;
+        consume it before advancing
+    """
+    canvas_width, canvas_height = planes[0].shape
+    x, y, crop_w, crop_h = motion.trajectory(num_frames, canvas_width, canvas_height)
+
+    luma_taps = (
+        *_linear_taps(x, crop_w, width, canvas_width),
+        *_linear_taps(y, crop_h, height, canvas_height),
+    )
+    chroma_taps = (
+        *_linear_taps(x / 2, crop_w / 2, width // 2, canvas_width // 2),
+        *_linear_taps(y / 2, crop_h / 2, height // 2, canvas_height // 2),
+    )
+
+    frame = np.empty(width * height * 3 // 2, dtype=np.uint8)
+    luma = width * height
+    chroma = luma // 4
+    outputs = (
+        frame[:luma].reshape(height, width),
+        frame[luma : luma + chroma].reshape(height // 2, width // 2),
+        frame[luma + chroma :].reshape(height // 2, width // 2),
+    )
+
+    for i in range(num_frames):
+        for plane, out, taps in zip(
+            planes, outputs, (luma_taps, chroma_taps, chroma_taps), strict=True
+        ):
+            x_index, x_weight, y_index, y_weight = taps
+            _resample_plane(plane, out, x_index[i], x_weight[i], y_index[i], y_weight[i])
+        yield frame
+
+
+def render_ken_burns_numpy(
+    ffmpeg_path: str,
+    image_paths: List[Path],
+    motions: List[KenBurnsMotion],
+    width: int,
+    height: int,
+    segment_duration: float,
+    encoder_args: List[str],
+    output_path: Path,
+    audio_path: Optional[Path] = None,
+) -> None:
+    """
+    Render a slideshow with frames synthesized in NumPy.
+
+    Each image is decoded once onto a canvas max-zoom times the output size,
+    so the tightest crop still has full detail. Frames are written to a single
+    encoder process over stdin straight from the frame buffer, without copies.
+
+    Args:
+        ffmpeg_path: FFmpeg binary
+        image_paths: Images in order
+        motions: Motion for each image
+        width: Output width in pixels (even)
+        height: Output height in pixels (even)
+        segment_duration: Seconds per image
+        encoder_args: Video encoder arguments
+        output_path: Output video path
+        audio_path: Optional soundtrack, cut to the video length
+
+    Raises:
+        subprocess.CalledProcessError: If decoding or encoding fails
+    """
+    num_frames = int(segment_duration * KEN_BURNS_FPS)
+    max_zoom = KEN_BURNS_ZOOM_RANGE[1]
+    canvas_width = math.ceil(width * max_zoom / 2) * 2
+    canvas_height = math.ceil(height * max_zoom / 2) * 2
+
+    cmd = [
+        ffmpeg_path,
+        "-y",
+        "-v",
+        "error",
+        "-f",
+        "rawvideo",
+        "-pix_fmt",
+        "yuv420p",
+        "-s",
+        f"{width}x{height}",
+        "-r",
+        str(KEN_BURNS_FPS),
+        "-i",
+        "-",
+    ]
+    if audio_path:
+        cmd.extend(["-i", str(audio_path), "-map", "0:v", "-map", "1:a", "-c:a", "aac", "-shortest"])
+    cmd.extend([*encoder_args, str(output_path)])
+
+    # stderr goes to a file: a full pipe would stall the encoder while we block on stdin
+    with tempfile.TemporaryFile() as stderr:
+        encoder = subprocess.Popen(cmd, stdin=subprocess.PIPE, stderr=stderr)
+        try:
+            for image_path, motion in zip(image_paths, motions, strict=True):
+                planes = decode_canvas(ffmpeg_path, image_path, canvas_width, canvas_height)
+                for frame in render_ken_burns_frames(planes, motion, width, height, num_frames):
+                    encoder.stdin.write(frame.data)
+            encoder.stdin.close()
+        except BrokenPipeError:
+            pass
+        except BaseException:
+            encoder.kill()
+            encoder.wait()
+            raise
+
+        if encoder.wait() != 0:
+            stderr.seek(0)
+            raise subprocess.CalledProcessError(encoder.returncode, cmd, stderr=stderr.read())
+
+
 def generate_ken_burns_video(
     image_urls: List[str],
     duration: float,
@@ -23,6 +480,7 @@ def generate_ken_burns_video(
     width: Optional[int] = None,
     height: Optional[int] = None,
     audio_url: Optional[str] = None,
+    engine: Optional[KenBurnsEngine] = None,
 ) -> Path:
     """
     Generate a video from images with Ken Burns effect.
@@ -34,6 +492,7 @@ def generate_ken_burns_video(
         width: Optional target video width.
         height: Optional target video height.
         audio_url: Optional audio URL to add to the video.
+        engine: Frame synthesis engine (default: settings.ken_burns_engine).
 
     Returns:
         Path: Path to the generated video file.
@@ -105,126 +564,48 @@ def generate_ken_burns_video(
     
     logger.info(f"Target dimensions: {target_width}x{target_height}")
 
-    # 3. Process each image into a video segment
+    # 3. Render all segments and encode once
     segment_duration = duration / len(sorted_image_paths)
-    segment_paths = []
-    
-    for i, img_path in enumerate(sorted_image_paths):
-        segment_path = temp_dir / f"segment_{i}.mp4"
-        
-        # Determine random start and end zoom/pan parameters
-        # We want smooth transitions.
-        # Zoom range: 1.0 to 1.25 (keep it subtle)
-        z_min, z_max = 1.0, 1.25
-        
-        # Randomly decide if zooming in or out
-        if random.random() < 0.5:
-            z_start, z_end = z_min, z_max
-        else:
-            z_start, z_end = z_max, z_min
-            
-        # Determine start and end center points (normalized 0.0 to 1.0)
-        # We need to ensure the crop stays within the image bounds.
-        # The crop size at zoom Z is (1/Z) of the image size.
-        # The center (cx, cy) must be within [0.5/Z, 1.0 - 0.5/Z].
-        
-        def get_valid_center(zoom):
-            margin = 0.5 / zoom
-            min_c = margin
-            max_c = 1.0 - margin
-            # If min_c > max_c (shouldn't happen for Z >= 1), clamp to 0.5
-            if min_c > max_c: return 0.5
-            return random.uniform(min_c, max_c)
-
-        cx_start = get_valid_center(z_start)
-        cy_start = get_valid_center(z_start)
-        
-        cx_end = get_valid_center(z_end)
-        cy_end = get_valid_center(z_end)
-        
-        # Standardize to target dimensions
-        # Scale, Pad, Zoompan, Format
-        # We use 25 fps
-        num_frames = int(segment_duration * 25)
-        
-        # FFmpeg zoompan filter expressions
-        # on is current frame (0 to num_frames-1)
-        # We interpolate linearly.
-        
-        # Calculate per-frame increments (in the expression itself using 'on')
-        # z = z_start + (z_end - z_start) * on / num_frames
-        # cx = cx_start + (cx_end - cx_start) * on / num_frames
-        # cy = cy_start + (cy_end - cy_start) * on / num_frames
-        
-        # x (top-left) = (cx * iw) - (iw / zoom / 2)
-        # y (top-left) = (cy * ih) - (ih / zoom / 2)
-        
-        # We construct the expression strings. 
-        # Note: We use 'duration' variable in zoompan which is num_frames (or close to it).
-        # But safer to hardcode num_frames in the expression divisor to be sure.
-        
-        z_expr = f"{z_start}+({z_end - z_start})*on/{num_frames}"
-        cx_expr = f"{cx_start}+({cx_end - cx_start})*on/{num_frames}"
-        cy_expr = f"{cy_start}+({cy_end - cy_start})*on/{num_frames}"
-        
-        x_expr = f"({cx_expr})*iw-(iw/zoom/2)"
-        y_expr = f"({cy_expr})*ih-(ih/zoom/2)"
-        
-        cmd = [
-            "ffmpeg", "-y",
-            "-loop", "1",
-            "-i", str(img_path),
-            "-vf",
-            f"scale={target_width}:{target_height}:force_original_aspect_ratio=decrease,"
-            f"pad={target_width}:{target_height}:(ow-iw)/2:(oh-ih)/2,"
-            f"scale=4*iw:4*ih,"
-            f"zoompan=z='{z_expr}':x='{x_expr}':y='{y_expr}':d={num_frames}:s={target_width}x{target_height}:fps=25,"
-            f"framerate=25",
-            "-c:v", "libx264",
-            "-t", str(segment_duration),
-            "-pix_fmt", "yuv420p",
-            str(segment_path)
-        ]
-        
-        logger.info(f"Generating segment {i}")
-        subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
-        segment_paths.append(segment_path)
-
-    # 4. Concatenate segments
-    concat_list_path = temp_dir / "concat_list.txt"
-    with open(concat_list_path, "w") as f:
-        for path in segment_paths:
-            f.write(f"file '{path.name}'\n")
-    
-    concat_cmd = [
-        "ffmpeg", "-y",
-        "-f", "concat",
-        "-safe", "0",
-        "-i", str(concat_list_path)
-    ]
+    encoder_engine = EncoderProfileEngine(
+        backend=resolve_backend(settings.video_encoder_backend, settings.ffmpeg_path)
+    )
+    selection = encoder_engine.select(
+        EncoderProfile.FINAL,
+        target_width,
+        target_height,
+        fps=KEN_BURNS_FPS,
+        duration_seconds=duration,
+    )
+    render_args = {
+        "ffmpeg_path": settings.ffmpeg_path,
+        "image_paths": sorted_image_paths,
+        "motions": [KenBurnsMotion.random() for _ in sorted_image_paths],
+        "width": target_width,
+        "height": target_height,
+        "segment_duration": segment_duration,
+        "encoder_args": [
+            *encoder_engine.build_encoder_args(selection.settings),
+            *selection.mux_args,
+        ],
+        "output_path": output_video_path,
+        "audio_path": audio_path,
+    }
+    engine = KenBurnsEngine(engine or settings.ken_burns_engine)
 
-    if audio_path:
-        concat_cmd.extend([
-            "-i", str(audio_path),
-            "-map", "0:v",
-            "-map", "1:a",
-            "-c:v", "copy",
-            "-c:a", "aac",
-            "-shortest"
-        ])
+    logger.info(
+        f"Rendering {len(sorted_image_paths)} Ken Burns segments "
+        f"(engine={engine.value}, audio={bool(audio_path)})"
+    )
+    if engine == KenBurnsEngine.NUMPY:
+        render_ken_burns_numpy(**render_args)
     else:
-        concat_cmd.extend([
-            "-c", "copy"
-        ])
-
-    concat_cmd.append(str(output_video_path))
-    
-    logger.info(f"Concatenating segments (audio={bool(audio_path)})")
-    subprocess.run(concat_cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, cwd=str(temp_dir))
+        cmd = build_ken_burns_command(**render_args)
+        subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
 
     return output_video_path
 
 
+@continues_enqueuer_trace
 def create_video_from_images_job(
     image_urls: List[str],
     duration: float,
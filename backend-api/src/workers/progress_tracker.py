@@ -7,6 +7,7 @@ from dataclasses import asdict, dataclass
 from datetime import UTC, datetime
 from typing import Any
 
+from services.tracing import traced
 from workers.redis_pool import get_redis_connection
 
 logger = logging.getLogger(__name__)
@@ -85,6 +86,7 @@ class ProgressTracker:
             },
         )
 
+    @traced("redis.publish_progress")
     def publish_progress(
         self,
         progress_percent: float,
@@ -176,6 +178,7 @@ class ProgressTracker:
             )
             return False
 
+    @traced("redis.update_status")
     def update_status(
         self,
         status: str,
@@ -17,8 +17,11 @@ import logging
 import os
 import sys
 
+from app.config import settings
 from rq import Worker
 from rq.queue import Queue
+from services.ffmpeg.encoder import detect_encoder_backends
+from services.tracing import configure_tracing
 from workers.redis_pool import get_redis_connection
 
 # Configure logging
@@ -48,6 +51,12 @@ def main():
         },
     )
 
+    # Set up before forking, so every job continues its enqueuer's trace
+    configure_tracing(settings.tracing_backend)
+
+    # Probe encoders once; forked job processes inherit the cached result
+    detect_encoder_backends(settings.ffmpeg_path)
+
     try:
         # Get Redis connection for worker (binary mode for RQ pickle serialization)
         redis_conn = get_redis_connection(for_worker=True)
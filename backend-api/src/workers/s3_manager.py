@@ -1,5 +1,6 @@
 """S3 asset download and upload management with retry logic."""
 
+import contextvars
 import logging
 import os
 from collections.abc import Callable
@@ -11,6 +12,7 @@ import boto3
 from app.config import settings
 from botocore.config import Config
 from botocore.exceptions import BotoCoreError, ClientError
+from services.tracing import current_span, traced
 from tenacity import (
     retry,
     retry_if_exception_type,
@@ -57,6 +59,7 @@ class S3Manager:
             },
         )
 
+    @traced("s3.download")
     @retry(
         retry=retry_if_exception_type((ClientError, BotoCoreError, ConnectionError)),
         wait=wait_exponential(multiplier=1, min=2, max=30),
@@ -84,6 +87,7 @@ class S3Manager:
             FileNotFoundError: If S3 object doesn't exist
         """
         local_path = Path(local_path)
+        current_span().set_attribute("s3.key", s3_key)
 
         try:
             # Ensure parent directory exists
@@ -93,6 +97,7 @@ class S3Manager:
             try:
                 response = self.s3_client.head_object(Bucket=self.bucket_name, Key=s3_key)
                 total_size = response.get("ContentLength", 0)
+                current_span().set_attribute("s3.bytes", total_size)
             except ClientError as e:
                 if e.response["Error"]["Code"] == "404":
                     raise FileNotFoundError(
@@ -143,6 +148,7 @@ class S3Manager:
             )
             raise
 
+    @traced("s3.upload")
     @retry(
         retry=retry_if_exception_type((ClientError, BotoCoreError, ConnectionError)),
         wait=wait_exponential(multiplier=1, min=2, max=30),
@@ -178,6 +184,8 @@ class S3Manager:
 
         try:
             file_size = local_path.stat().st_size
+            current_span().set_attribute("s3.key", s3_key)
+            current_span().set_attribute("s3.bytes", file_size)
 
             logger.info(
                 f"Starting upload: {local_path} -> s3://{self.bucket_name}/{s3_key}",
@@ -361,9 +369,12 @@ class S3Manager:
         # Download assets in parallel using ThreadPoolExecutor
         downloaded_files = {}
         with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            # Submit all download tasks
+            # Submit all download tasks, each in a copy of this context so
+            # their spans stay in the caller's trace
             future_to_asset = {
-                executor.submit(download_single_asset, asset, i): asset
+                executor.submit(
+                    contextvars.copy_context().run, download_single_asset, asset, i
+                ): asset
                 for i, asset in enumerate(assets)
             }
 
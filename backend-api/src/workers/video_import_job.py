@@ -10,12 +10,14 @@ from pathlib import Path
 import httpx
 from db.models.media import MediaAsset, MediaAssetStatus, MediaAssetType
 from db.session import SessionLocal
+from workers.job_queue import continues_enqueuer_trace
 from workers.s3_manager import s3_manager
 from workers.video_processor import VideoProcessingError, process_video_file
 
 logger = logging.getLogger(__name__)
 
 
+@continues_enqueuer_trace
 def import_video_from_url_job(
     url: str,
     name: str,
@@ -295,6 +297,7 @@ def import_video_from_url_job(
             db.close()
 
 
+@continues_enqueuer_trace
 def import_image_from_url_job(
     url: str,
     name: str,
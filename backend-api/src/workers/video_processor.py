@@ -7,6 +7,12 @@ import tempfile
 from pathlib import Path
 from typing import Any
 
+from services.thumbnail_generator import (
+    ThumbnailFormat,
+    ThumbnailOutput,
+    build_thumbnail_command,
+)
+
 logger = logging.getLogger(__name__)
 
 
@@ -150,22 +156,17 @@ def generate_thumbnail(
         # Ensure output directory exists
         output_path.parent.mkdir(parents=True, exist_ok=True)
 
-        # Use FFmpeg to extract thumbnail frame
-        # -ss: seek to timestamp
-        # -i: input file
-        # -vf: video filter (scale width, maintain aspect ratio)
-        # -vframes 1: extract only 1 frame
-        # -q:v 2: high quality JPEG (scale 2-31, lower is better)
-        cmd = [
+        # Same single-seek extraction as the thumbnail service; height=None
+        # scales to the requested width keeping the aspect ratio
+        thumbnail_format = (
+            ThumbnailFormat.PNG if output_path.suffix.lower() == ".png" else ThumbnailFormat.JPEG
+        )
+        cmd = build_thumbnail_command(
             "ffmpeg",
-            "-y",  # Overwrite output file
-            "-ss", str(timestamp),
-            "-i", str(video_path),
-            "-vf", f"scale={width}:-1",  # -1 maintains aspect ratio
-            "-vframes", "1",
-            "-q:v", "2",
-            str(output_path),
-        ]
+            video_path,
+            timestamp,
+            [ThumbnailOutput(output_path, width, None, thumbnail_format)],
+        )
 
         logger.debug(f"Running FFmpeg: {' '.join(cmd)}")
 
@@ -9,6 +9,8 @@ from typing import Any
 from app.config import settings
 from rq import Queue, Worker
 from rq.job import Job
+from services.ffmpeg.encoder import detect_encoder_backends
+from services.tracing import configure_tracing, inject_context
 
 from workers.redis_pool import get_redis_connection, redis_connection_manager
 
@@ -390,6 +392,11 @@ def start_worker(
 
     logger.info("Starting RQ worker with graceful shutdown support")
 
+    configure_tracing(settings.tracing_backend)
+
+    # Probe encoders once; forked job processes inherit the cached result
+    detect_encoder_backends(settings.ffmpeg_path)
+
     try:
         # Get Redis connection
         redis_conn = get_redis_connection()
@@ -514,6 +521,8 @@ def enqueue_job(
         retry=retry_count if retry_count > 0 else None,  # RQ doesn't like retry=0
         on_success=on_success,
         on_failure=on_failure,
+        # The worker continues the caller's trace from this
+        meta=inject_context(),
     )
 
     logger.info(
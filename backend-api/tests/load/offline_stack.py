@@ -0,0 +1,226 @@
+"""
+Local stand-ins for running the pipeline benchmarks offline.
+
+Provides synthetic clips rendered with FFmpeg's testsrc2/sine sources, an
+in-process stack (moto S3, fakeredis, a no-op database session) patched in
+where the workers look them up, and StageTimer, which records per-stage wall
+time by wrapping the functions that implement each stage.
+"""
+
+from __future__ import annotations
+
+import itertools
+import subprocess
+import time
+from collections import defaultdict
+from collections.abc import Iterator
+from contextlib import ExitStack, asynccontextmanager, contextmanager
+from dataclasses import dataclass
+from functools import wraps
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import patch
+
+import boto3
+import fakeredis
+from moto import mock_aws
+
+BUCKET = "benchmark-bucket"
+
+
+def make_test_clip(
+    path: Path,
+    duration: float = 5.0,
+    size: str = "1280x720",
+    fps: int = 30,
+    audio: bool = True,
+) -> Path:
+    """Render a synthetic H.264/AAC clip with a test pattern and a sine tone."""
+    cmd = [
+        "ffmpeg",
+        "-y",
+        "-loglevel",
+        "error",
+        "-f",
+        "lavfi",
+        "-i",
+        f"testsrc2=size={size}:rate={fps}:duration={duration}",
+    ]
+    if audio:
+        cmd.extend(
+            ["-f", "lavfi", "-i", f"sine=frequency=440:sample_rate=48000:duration={duration}"]
+        )
+    cmd.extend(["-c:v", "libx264", "-preset", "ultrafast", "-pix_fmt", "yuv420p", "-g", str(fps)])
+    cmd.extend(["-c:a", "aac"] if audio else ["-an"])
+    cmd.append(str(path))
+
+    subprocess.run(cmd, check=True)
+    return path
+
+
+class StageTimer:
+    """
+    Accumulates wall time per pipeline stage.
+
+    Functions are wrapped with `instrument(stage, owner, name)`; time spent in
+    a stage nested inside another (probing inside a render, say) is counted
+    for the inner stage only, so the stage totals add up to the wall time.
+    """
+
+    def __init__(self) -> None:
+        self.seconds: dict[str, float] = defaultdict(float)
+        self.calls: dict[str, int] = defaultdict(int)
+        self._stack: list[list[float]] = []
+        self._patches = ExitStack()
+
+    def instrument(self, stage: str, owner: Any, name: str) -> None:
+        """Time every call of owner.name as `stage` until the timer is closed."""
+        original = getattr(owner, name)
+
+        @wraps(original)
+        def timed(*args: Any, **kwargs: Any) -> Any:
+            with self.stage(stage):
+                return original(*args, **kwargs)
+
+        self._patches.enter_context(patch.object(owner, name, timed))
+
+    @contextmanager
+    def stage(self, stage: str) -> Iterator[None]:
+        """Time a block as `stage`, excluding nested stages."""
+        frame = [time.perf_counter(), 0.0]  # start, time spent in nested stages
+        self._stack.append(frame)
+        try:
+            yield
+        finally:
+            self._stack.pop()
+            elapsed = time.perf_counter() - frame[0]
+            self.seconds[stage] += elapsed - frame[1]
+            self.calls[stage] += 1
+            if self._stack:
+                self._stack[-1][1] += elapsed
+
+    def report(self, rounds: int = 1) -> dict[str, Any]:
+        """Mean stage timings per round in milliseconds, for benchmark extra_info."""
+        return {
+            "stage_ms": {
+                stage: round(seconds * 1000 / rounds, 2) for stage, seconds in self.seconds.items()
+            },
+            "stage_calls": {stage: calls / rounds for stage, calls in self.calls.items()},
+        }
+
+    def close(self) -> None:
+        """Remove all instrumentation."""
+        self._patches.close()
+
+
+class NullResult:
+    """Query result with no rows."""
+
+    def scalar_one_or_none(self) -> None:
+        return None
+
+    def scalars(self) -> NullResult:
+        return self
+
+    def all(self) -> list[Any]:
+        return []
+
+
+class NullSession:
+    """Database session that accepts writes and returns no rows."""
+
+    def __init__(self) -> None:
+        self.added: list[Any] = []
+
+    def add(self, instance: Any) -> None:
+        self.added.append(instance)
+
+    def add_all(self, instances: list[Any]) -> None:
+        self.added.extend(instances)
+
+    async def execute(self, *args: Any, **kwargs: Any) -> NullResult:
+        return NullResult()
+
+    async def flush(self) -> None:
+        pass
+
+    async def commit(self) -> None:
+        pass
+
+    async def rollback(self) -> None:
+        pass
+
+
+@dataclass
+class OfflineStack:
+    """
+    Handles to the stand-in services.
+
+    Attributes:
+        s3_manager: S3Manager bound to the moto bucket
+        redis: fakeredis client the progress tracker publishes to
+        session: No-op database session handed to the job handler
+    """
+
+    s3_manager: Any
+    redis: fakeredis.FakeRedis
+    session: NullSession
+
+    def upload_asset(self, path: Path, key: str) -> str:
+        """Put a local file in the bucket and return its key."""
+        self.s3_manager.s3_client.upload_file(str(path), BUCKET, key)
+        return key
+
+
+@contextmanager
+def offline_stack() -> Iterator[OfflineStack]:
+    """Patch S3, Redis and the database with local stand-ins."""
+    from workers.s3_manager import S3Manager
+
+    with ExitStack() as stack:
+        stack.enter_context(mock_aws())
+        stack.enter_context(patch("app.config.settings.s3_bucket_name", BUCKET))
+        stack.enter_context(patch("app.config.settings.s3_endpoint_url", None))
+        boto3.client("s3", region_name="us-east-1").create_bucket(Bucket=BUCKET)
+
+        manager = S3Manager()
+        manager.bucket_name = BUCKET
+        stack.enter_context(patch("workers.s3_manager.s3_manager", manager))
+
+        redis = fakeredis.FakeRedis(decode_responses=True)
+        stack.enter_context(
+            patch("workers.progress_tracker.get_redis_connection", return_value=redis)
+        )
+
+        session = NullSession()
+
+        @asynccontextmanager
+        async def get_db_session() -> Any:
+            yield session
+
+        stack.enter_context(patch("db.session.get_db_session", get_db_session))
+
+        yield OfflineStack(s3_manager=manager, redis=redis, session=session)
+
+
+def make_replicate_client(latency: float = 0.0) -> SimpleNamespace:
+    """Create a Replicate client stand-in whose predictions succeed at once.
+
+    Args:
+        latency: Seconds each create and get call sleeps, to model API latency
+    """
+    counter = itertools.count(1)
+
+    def create(**kwargs: Any) -> SimpleNamespace:
+        time.sleep(latency)
+        return SimpleNamespace(id=f"pred_{next(counter)}", status="starting", output=None)
+
+    def get(prediction_id: str) -> SimpleNamespace:
+        time.sleep(latency)
+        return SimpleNamespace(id=prediction_id, status="succeeded", output=["out.mp4"])
+
+    def cancel(prediction_id: str) -> None:
+        pass
+
+    return SimpleNamespace(predictions=SimpleNamespace(create=create, get=get, cancel=cancel))
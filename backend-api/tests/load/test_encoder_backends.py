@@ -0,0 +1,96 @@
+"""
+Benchmark of the CPU encoder backends on a sample clip.
+
+Renders a 1080p sample clip once, then re-encodes it with every backend the
+local FFmpeg build offers at a fast and a medium preset, recording encode fps,
+fps per core and output size so backends can be compared on the same content.
+Backends missing from the build are skipped.
+
+Run with:
+    pytest tests/load/test_encoder_backends.py --benchmark-columns=min,median,mean
+"""
+
+from __future__ import annotations
+
+import os
+import shutil
+import subprocess
+import time
+from pathlib import Path
+
+import pytest
+from services.ffmpeg.encoder import (
+    EncoderBackend,
+    H264EncoderBuilder,
+    H264EncoderSettings,
+    H264Preset,
+    detect_encoder_backends,
+)
+
+pytestmark = pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg not installed")
+
+DURATION_SECONDS = 5
+FPS = 30
+SIZE = "1920x1080"
+
+
+@pytest.fixture(scope="module")
+def sample_clip(tmp_path_factory) -> Path:
+    """Render the sample clip losslessly so decode cost is the same for every backend."""
+    path = tmp_path_factory.mktemp("encoder-backends") / "sample.mkv"
+    subprocess.run(
+        [
+            "ffmpeg",
+            "-y",
+            "-loglevel",
+            "error",
+            "-f",
+            "lavfi",
+            "-i",
+            f"testsrc2=size={SIZE}:rate={FPS}:duration={DURATION_SECONDS}",
+            "-c:v",
+            "libx264",
+            "-preset",
+            "ultrafast",
+            "-qp",
+            "0",
+            str(path),
+        ],
+        check=True,
+    )
+    return path
+
+
+def encode(sample: Path, output: Path, args: list[str]) -> float:
+    """Encode the sample clip and return the wall time in seconds."""
+    start = time.perf_counter()
+    subprocess.run(
+        ["ffmpeg", "-y", "-loglevel", "error", "-i", str(sample), *args, "-an", str(output)],
+        check=True,
+    )
+    return time.perf_counter() - start
+
+
+@pytest.mark.benchmark(group="encoder-backend")
+@pytest.mark.parametrize("preset", [H264Preset.VERYFAST, H264Preset.MEDIUM])
+@pytest.mark.parametrize("backend", list(EncoderBackend))
+def test_benchmark_encoder_backend(benchmark, tmp_path, sample_clip, backend, preset):
+    if backend not in detect_encoder_backends("ffmpeg"):
+        pytest.skip(f"{backend.value} not in this FFmpeg build")
+
+    output = tmp_path / "out.mkv"
+    args = H264EncoderBuilder().build_encoder_args(
+        H264EncoderSettings(crf=23, preset=preset, keyframe_interval=FPS * 2, backend=backend)
+    )
+
+    seconds = benchmark.pedantic(encode, args=(sample_clip, output, args), rounds=3, iterations=1)
+
+    encode_fps = DURATION_SECONDS * FPS / seconds
+    benchmark.extra_info.update(
+        {
+            "encode_fps": round(encode_fps, 1),
+            "fps_per_core": round(encode_fps / (os.cpu_count() or 1), 2),
+            "output_bytes": output.stat().st_size,
+        }
+    )
+    assert output.stat().st_size > 0
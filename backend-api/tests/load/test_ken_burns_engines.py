@@ -0,0 +1,92 @@
+"""
+Benchmark of the Ken Burns engines: FFmpeg zoompan vs NumPy frame synthesis.
+
+Renders the same two-image slideshow with fixed motions through both engines
+at 1080p and 4K and records the rendered fps. Both engines feed the same
+lossless ultrafast encode, so the difference is frame production cost.
+
+Run with:
+    pytest tests/load/test_ken_burns_engines.py --benchmark-columns=min,median,mean
+"""
+
+from __future__ import annotations
+
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+from workers.ken_burns_worker import (
+    KEN_BURNS_FPS,
+    KenBurnsEngine,
+    KenBurnsMotion,
+    build_ken_burns_command,
+    render_ken_burns_numpy,
+)
+
+pytestmark = pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg not installed")
+
+SEGMENT_SECONDS = 2.0
+MOTIONS = [
+    KenBurnsMotion(1.0, 1.25, (0.5, 0.5), (0.42, 0.57)),
+    KenBurnsMotion(1.25, 1.0, (0.6, 0.45), (0.5, 0.5)),
+]
+ENCODER_ARGS = ["-c:v", "libx264", "-preset", "ultrafast", "-qp", "0", "-pix_fmt", "yuv420p"]
+
+
+@pytest.fixture(scope="module")
+def images(tmp_path_factory) -> list[Path]:
+    """Two 12 MP photos' worth of synthetic detail."""
+    directory = tmp_path_factory.mktemp("ken-burns")
+    paths = []
+    for i in range(len(MOTIONS)):
+        path = directory / f"image_{i}.jpg"
+        subprocess.run(
+            [
+                "ffmpeg",
+                "-y",
+                "-loglevel",
+                "error",
+                "-f",
+                "lavfi",
+                "-i",
+                f"testsrc2=size=4000x3000:rate=1,hue=h={i * 90}",
+                "-frames:v",
+                "1",
+                str(path),
+            ],
+            check=True,
+        )
+        paths.append(path)
+    return paths
+
+
+def render(engine: KenBurnsEngine, images: list[Path], size: tuple[int, int], output: Path) -> None:
+    """Render the slideshow with one engine."""
+    kwargs = {
+        "ffmpeg_path": "ffmpeg",
+        "image_paths": images,
+        "motions": MOTIONS,
+        "width": size[0],
+        "height": size[1],
+        "segment_duration": SEGMENT_SECONDS,
+        "encoder_args": ENCODER_ARGS,
+        "output_path": output,
+    }
+    if engine == KenBurnsEngine.NUMPY:
+        render_ken_burns_numpy(**kwargs)
+    else:
+        subprocess.run(build_ken_burns_command(**kwargs), check=True, capture_output=True)
+
+
+@pytest.mark.benchmark(group="ken-burns-engine")
+@pytest.mark.parametrize("size", [(1920, 1080), (3840, 2160)], ids=["1080p", "4k"])
+@pytest.mark.parametrize("engine", list(KenBurnsEngine))
+def test_benchmark_ken_burns_engine(benchmark, tmp_path, images, engine, size):
+    output = tmp_path / "out.mkv"
+
+    benchmark.pedantic(render, args=(engine, images, size, output), rounds=2, iterations=1)
+
+    frames = len(MOTIONS) * int(SEGMENT_SECONDS * KEN_BURNS_FPS)
+    benchmark.extra_info["render_fps"] = round(frames / benchmark.stats.stats.median, 1)
+    assert output.stat().st_size > 0
@@ -0,0 +1,81 @@
+"""
+Per-request overhead of the HTTP middleware stack.
+
+Each benchmark issues a batch of requests in-process (no network) against the
+application built by create_app, once with the full middleware stack and once
+with the custom middleware removed. The difference between the two groups is
+the per-request cost of the stack.
+
+Usage:
+    pytest tests/load/test_middleware_overhead.py --benchmark-only --benchmark-group-by=param:path
+"""
+
+from __future__ import annotations
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import fakeredis
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+REQUESTS_PER_ROUND = 50
+
+
+def _fake_db():
+    """Database session returning no media assets."""
+    result = MagicMock()
+    result.all.return_value = []
+    result.scalars.return_value.all.return_value = []
+    session = MagicMock()
+    session.execute = AsyncMock(return_value=result)
+    return session
+
+
+@pytest.fixture
+def app_factory():
+    """Build the application with in-memory Redis and database stand-ins."""
+    from app.main import create_app
+    from app.middleware.rate_limiting import SlidingWindowRateLimiter
+    from db.session import get_db
+
+    limiter = SlidingWindowRateLimiter(redis_client=fakeredis.FakeAsyncRedis(decode_responses=True))
+    patches = [
+        patch("app.middleware.rate_limiting.get_rate_limiter", return_value=limiter),
+        patch("app.middleware.internal_auth.get_rate_limiter", return_value=limiter),
+    ]
+    for p in patches:
+        p.start()
+
+    def build(with_middleware: bool):
+        app = create_app()
+        app.dependency_overrides[get_db] = _fake_db
+        if not with_middleware:
+            # Keep CORS (Starlette's own pure ASGI middleware), drop the custom stack
+            app.user_middleware = [m for m in app.user_middleware if m.cls.__name__ == "CORSMiddleware"]
+        return app
+
+    yield build
+
+    for p in patches:
+        p.stop()
+
+
+@pytest.mark.benchmark(group="middleware-overhead")
+@pytest.mark.parametrize("path", ["/api/v1/health", "/api/v1/media/"])
+@pytest.mark.parametrize("stack", ["bare", "full"])
+def test_benchmark_middleware_overhead(benchmark, app_factory, stack, path):
+    app = app_factory(with_middleware=stack == "full")
+    loop = asyncio.new_event_loop()
+    client = AsyncClient(transport=ASGITransport(app=app), base_url="http://testserver")
+
+    async def run_round():
+        for _ in range(REQUESTS_PER_ROUND):
+            response = await client.get(path)
+            assert response.status_code == 200
+
+    try:
+        benchmark(lambda: loop.run_until_complete(run_round()))
+    finally:
+        loop.run_until_complete(client.aclose())
+        loop.close()
@@ -0,0 +1,82 @@
+"""
+Benchmark of MP4 mux modes: +faststart vs fragmented vs reserved moov.
+
+Encodes a synthetic clip at 1080p and 4K with each mode and records wall time,
+bytes read and written by FFmpeg (from /proc/self/io, which includes reaped
+children), and the output size. +faststart re-reads and re-writes the whole
+output after encoding; the other two modes should write roughly the file size
+once.
+
+Run with:
+    pytest tests/load/test_mp4_output_modes.py --benchmark-columns=min,median,mean
+"""
+
+from __future__ import annotations
+
+import shutil
+import subprocess
+from pathlib import Path
+
+import psutil
+import pytest
+from services.ffmpeg.encoder_profiles import Mp4MuxMode, build_mux_args
+
+pytestmark = pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg not installed")
+
+DURATION_SECONDS = 10
+FPS = 30
+
+
+def encode(output: Path, size: str, mux_args: list[str]) -> dict[str, int]:
+    """Encode a synthetic clip and return I/O counters for the FFmpeg run."""
+    before = psutil.Process().io_counters()
+    subprocess.run(
+        [
+            "ffmpeg",
+            "-y",
+            "-loglevel",
+            "error",
+            "-f",
+            "lavfi",
+            "-i",
+            f"testsrc2=size={size}:rate={FPS}:duration={DURATION_SECONDS}",
+            "-f",
+            "lavfi",
+            "-i",
+            f"sine=frequency=440:sample_rate=48000:duration={DURATION_SECONDS}",
+            "-c:v",
+            "libx264",
+            "-preset",
+            "ultrafast",
+            "-crf",
+            "23",
+            "-c:a",
+            "aac",
+            *mux_args,
+            str(output),
+        ],
+        check=True,
+    )
+    after = psutil.Process().io_counters()
+    return {
+        "read_bytes": after.read_chars - before.read_chars,
+        "write_bytes": after.write_chars - before.write_chars,
+        "output_bytes": output.stat().st_size,
+    }
+
+
+@pytest.mark.benchmark(group="mp4-mux-mode")
+@pytest.mark.parametrize("size", ["1920x1080", "3840x2160"])
+@pytest.mark.parametrize("mode", list(Mp4MuxMode))
+def test_benchmark_mux_mode(benchmark, tmp_path, size, mode):
+    output = tmp_path / "out.mp4"
+    mux_args = build_mux_args(mode, duration_seconds=DURATION_SECONDS, fps=FPS)
+
+    io = benchmark.pedantic(encode, args=(output, size, mux_args), rounds=3, iterations=1)
+
+    benchmark.extra_info.update(io)
+    if mode == Mp4MuxMode.FASTSTART:
+        # The rewrite pass writes the file a second time
+        assert io["write_bytes"] >= 2 * io["output_bytes"] * 0.9
+    else:
+        assert io["write_bytes"] < 1.5 * io["output_bytes"]
@@ -0,0 +1,230 @@
+"""
+Offline end-to-end benchmarks of the processing pipeline.
+
+Everything runs in-process against local stand-ins (see offline_stack.py):
+synthetic clips from FFmpeg's testsrc2/sine sources, moto for S3, fakeredis
+for Redis, a no-op database session, a stub Replicate client, and the AI
+services' built-in mock mode in place of OpenAI. No deployed stack or network
+access is needed, so results are comparable from run to run.
+
+Each benchmark records per-stage wall times (download, probe, filter_build,
+encode, upload, publish) in extra_info; save them as JSON for regression
+tracking with:
+    pytest tests/load/test_offline_pipeline.py --benchmark-json=pipeline.json
+"""
+
+from __future__ import annotations
+
+import asyncio
+import shutil
+import uuid
+from datetime import UTC, datetime
+from pathlib import Path
+
+import fakeredis
+import pytest
+from fastapi.testclient import TestClient
+
+from .offline_stack import StageTimer, make_replicate_client, make_test_clip, offline_stack
+
+pytestmark = pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg not installed")
+
+requires_ffprobe = pytest.mark.skipif(
+    shutil.which("ffprobe") is None, reason="ffprobe not installed"
+)
+
+CLIP_SECONDS = 3.0
+ROUNDS = 3
+
+
+@pytest.fixture(scope="module")
+def clips(tmp_path_factory) -> list[Path]:
+    """Render three short 720p clips with audio."""
+    directory = tmp_path_factory.mktemp("offline-pipeline")
+    return [make_test_clip(directory / f"clip_{i}.mp4", duration=CLIP_SECONDS) for i in range(3)]
+
+
+def instrument_composition(timer: StageTimer) -> None:
+    """Wrap the functions that implement each stage of a composition job."""
+    from services.ffmpeg.composition_planner import CompositionPlanner
+    from workers.ffmpeg_pipeline import FFmpegCommandBuilder, FFmpegPipeline
+    from workers.progress_tracker import ProgressTracker
+    from workers.s3_manager import S3Manager
+
+    timer.instrument("download", S3Manager, "download_assets")
+    timer.instrument("probe", CompositionPlanner, "_probe")
+    timer.instrument("filter_build", CompositionPlanner, "lower")
+    timer.instrument("filter_build", FFmpegCommandBuilder, "build_complex_composition")
+    # Render minus the nested probe and filter stages is the FFmpeg run itself
+    timer.instrument("encode", FFmpegPipeline, "execute_composition")
+    timer.instrument("upload", S3Manager, "upload_file")
+    timer.instrument("upload", S3Manager, "generate_presigned_url")
+    timer.instrument("publish", ProgressTracker, "publish_progress")
+    timer.instrument("publish", ProgressTracker, "update_status")
+
+
+@pytest.mark.benchmark(group="offline-composition")
+@pytest.mark.parametrize("profile", ["draft", "final"])
+def test_benchmark_composition_job(benchmark, tmp_path, clips, profile):
+    from app.config import settings
+    from workers.job_handlers import CompositionJobHandler
+
+    if shutil.which(settings.ffmpeg_path) is None:
+        pytest.skip(f"FFMPEG_PATH {settings.ffmpeg_path} not found")
+
+    with offline_stack() as stack:
+        assets = [
+            {
+                "id": f"clip_{i}",
+                "type": "video",
+                "s3_key": stack.upload_asset(clip, f"assets/{clip.name}"),
+            }
+            for i, clip in enumerate(clips)
+        ]
+        params = {
+            "composition_id": str(uuid.uuid4()),
+            "composition_config": {"assets": assets, "overlays": []},
+            "output_resolution": "1280x720",
+            "output_fps": 30,
+            "encoder_profile": profile,
+        }
+        timer = StageTimer()
+        instrument_composition(timer)
+
+        def run() -> dict:
+            handler = CompositionJobHandler(job_id=f"bench-{uuid.uuid4().hex[:8]}")
+            with pytest.MonkeyPatch.context() as mp:
+                mp.setattr("app.config.settings.temp_dir", str(tmp_path))
+                return handler.execute(params)
+
+        try:
+            result = benchmark.pedantic(run, rounds=ROUNDS, iterations=1)
+        finally:
+            timer.close()
+
+        assert result["success"], result.get("error")
+        assert stack.s3_manager.object_exists(result["result"]["output_s3_key"])
+        benchmark.extra_info.update(timer.report(rounds=ROUNDS))
+
+
+@requires_ffprobe
+@pytest.mark.benchmark(group="offline-normalize")
+def test_benchmark_normalize(benchmark, tmp_path, clips):
+    from services.ffmpeg.input_manager import InputFileManager
+    from services.ffmpeg.normalizer import NormalizationSettings, VideoNormalizer
+
+    normalizer = VideoNormalizer(enable_cache=False)
+    settings = NormalizationSettings(target_width=854, target_height=480, target_fps=24.0)
+    timer = StageTimer()
+    timer.instrument("probe", InputFileManager, "probe_file")
+    timer.instrument("encode", VideoNormalizer, "normalize_video")
+
+    try:
+        result = benchmark.pedantic(
+            normalizer.normalize_video,
+            args=(clips[0], tmp_path / "normalized.mp4", settings),
+            rounds=ROUNDS,
+            iterations=1,
+        )
+    finally:
+        timer.close()
+
+    assert Path(result.output_path).exists()
+    benchmark.extra_info.update(timer.report(rounds=ROUNDS))
+
+
+@requires_ffprobe
+@pytest.mark.benchmark(group="offline-thumbnails")
+def test_benchmark_thumbnails(benchmark, tmp_path, clips):
+    from services.ffmpeg.input_manager import InputFileManager
+    from services.thumbnail_generator import ThumbnailGenerator, ThumbnailSize
+
+    generator = ThumbnailGenerator(output_dir=tmp_path)
+    timer = StageTimer()
+    timer.instrument("probe", InputFileManager, "probe_file")
+    timer.instrument("encode", ThumbnailGenerator, "_run_ffmpeg")
+
+    def run() -> dict:
+        return generator.generate_multiple_thumbnails(
+            clips[0], [ThumbnailSize.SMALL, ThumbnailSize.MEDIUM, ThumbnailSize.LARGE]
+        )
+
+    try:
+        thumbnails = benchmark.pedantic(run, rounds=ROUNDS, iterations=1)
+    finally:
+        timer.close()
+
+    assert len(thumbnails) == 3
+    benchmark.extra_info.update(timer.report(rounds=ROUNDS))
+
+
+@pytest.fixture
+def api_client(monkeypatch):
+    """API client with the jobs routes reading a fakeredis holding 200 jobs."""
+    from app.main import create_app
+
+    redis = fakeredis.FakeRedis()
+    for i in range(200):
+        job = {
+            "request_id": f"req_{i // 10}",
+            "clip_id": f"clip{i}",
+            "clip_url": "https://example.com/video.mp4",
+            "callback_url": "https://example.com/callback",
+            "operations": ["normalize"],
+            "processing_options": {"target_resolution": "720p"},
+            "metadata": {},
+            "priority": 5,
+            "queued_at": datetime.now(UTC).isoformat(),
+            "status": "queued",
+        }
+        redis.set(f"clip_job:job_{i}", str(job))
+
+    monkeypatch.setattr("app.api.v1.jobs.get_redis_connection", lambda: redis)
+    return TestClient(create_app())
+
+
+@pytest.mark.benchmark(group="offline-api")
+@pytest.mark.parametrize(
+    "path", ["/api/v1/jobs?limit=50", "/api/v1/jobs/job_42", "/api/v1/health"], ids=str
+)
+def test_benchmark_api_route(benchmark, api_client, path):
+    response = benchmark(api_client.get, path)
+
+    assert response.status_code == 200
+
+
+@pytest.mark.benchmark(group="offline-ai")
+def test_benchmark_prompt_analysis(benchmark):
+    from ai.models.prompt_analysis import AnalysisRequest
+    from ai.services.prompt_analysis_service import PromptAnalysisService
+
+    service = PromptAnalysisService(openai_api_key="offline", use_mock=True)
+    request = AnalysisRequest(prompt="A 30 second product launch video for a coffee brand")
+
+    response = benchmark(lambda: asyncio.run(service.analyze_prompt(request)))
+
+    assert response.status == "success"
+
+
+@pytest.mark.benchmark(group="offline-ai")
+@pytest.mark.parametrize("latency", [0.0, 0.02], ids=["instant", "20ms"])
+def test_benchmark_replicate_fanout(benchmark, latency):
+    from ai.core.replicate_fanout import ReplicateFanout
+    from ai.models.replicate_client import FanoutConfig
+
+    config = FanoutConfig(
+        max_concurrency_per_model=4,
+        requests_per_second=1000.0,
+        burst=100,
+        poll_initial_interval=0.001,
+    )
+
+    async def fan_out() -> list:
+        fanout = ReplicateFanout(config=config, client=make_replicate_client(latency))
+        return await asyncio.gather(
+            *(fanout.run("owner/model", input={"prompt": f"scene {i}"}) for i in range(12))
+        )
+
+    predictions = benchmark.pedantic(lambda: asyncio.run(fan_out()), rounds=ROUNDS, iterations=1)
+
+    assert all(p.status == "succeeded" for p in predictions)
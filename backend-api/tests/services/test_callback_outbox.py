@@ -0,0 +1,340 @@
+"""
+Unit tests for outbox-based callback delivery.
+
+Tests queueing, the per-host circuit breaker, draining with signed concurrent
+deliveries, and retry scheduling.
+"""
+
+import asyncio
+import json
+import uuid
+from datetime import UTC, datetime, timedelta
+from unittest.mock import MagicMock
+
+import httpx
+import pytest
+from services.callback_notifier import sign_payload
+from services.callback_outbox import (
+    CallbackDeliveryService,
+    CallbackOutbox,
+    CallbackOutboxStatus,
+    HostCircuitBreaker,
+    enqueue_callback,
+)
+from sqlalchemy.dialects import postgresql
+
+
+class FakeResult:
+    """Result of a fake session query."""
+
+    def __init__(self, entries):
+        self.entries = entries
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return list(self.entries)
+
+
+class FakeOutbox:
+    """In-memory outbox standing in for the database session factory."""
+
+    def __init__(self, entries):
+        self.entries = entries
+        self.statements = []
+        self.commits = 0
+
+    def __call__(self):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        if "FOR UPDATE" not in str(statement.compile(dialect=postgresql.dialect())):
+            # Outcome lookup by ID
+            return FakeResult(self.entries)
+
+        now = datetime.now(UTC)
+        return FakeResult(
+            entry
+            for entry in self.entries
+            if entry.status == CallbackOutboxStatus.PENDING and entry.next_attempt_at <= now
+        )
+
+    async def commit(self):
+        self.commits += 1
+
+
+def make_entry(url="https://partner.example.com/hook", attempts=0) -> CallbackOutbox:
+    """Create a due outbox entry."""
+    return CallbackOutbox(
+        id=uuid.uuid4(),
+        callback_url=url,
+        payload={"event": "composition.completed", "composition_id": "abc"},
+        request_id="req-1",
+        status=CallbackOutboxStatus.PENDING,
+        attempts=attempts,
+        next_attempt_at=datetime.now(UTC) - timedelta(seconds=1),
+    )
+
+
+def make_service(outbox, handler, **kwargs) -> CallbackDeliveryService:
+    """Create a delivery service over a fake outbox and mock transport."""
+    service = CallbackDeliveryService(
+        session_factory=outbox,
+        webhook_secret=kwargs.pop("webhook_secret", "test-secret"),
+        max_attempts=kwargs.pop("max_attempts", 3),
+        concurrency=8,
+        **kwargs,
+    )
+    service.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return service
+
+
+def test_enqueue_callback_adds_pending_entry():
+    """Test queueing adds a pending entry to the caller's session without committing."""
+    session = MagicMock()
+
+    entry = enqueue_callback(session, "https://example.com/hook", {"a": 1}, request_id="r")
+
+    session.add.assert_called_once_with(entry)
+    session.commit.assert_not_called()
+    assert entry.status == CallbackOutboxStatus.PENDING
+    assert entry.attempts == 0
+
+
+class TestHostCircuitBreaker:
+    """Test cases for HostCircuitBreaker."""
+
+    def test_opens_after_threshold_and_half_opens_after_timeout(self):
+        """Test the circuit opens, then lets a single trial request through."""
+        now = [0.0]
+        breaker = HostCircuitBreaker(failure_threshold=2, reset_timeout=30.0, clock=lambda: now[0])
+
+        breaker.record_failure()
+        assert breaker.allow_request()
+        breaker.record_failure()
+        assert not breaker.allow_request()
+        assert breaker.retry_after == 30.0
+
+        now[0] = 31.0
+        assert breaker.allow_request()
+        assert not breaker.allow_request()
+
+        breaker.record_success()
+        assert breaker.allow_request()
+
+    def test_in_flight_trial_defers_by_probe_interval(self):
+        """Test entries deferred behind a half-open trial wait a full interval."""
+        now = [0.0]
+        breaker = HostCircuitBreaker(failure_threshold=1, reset_timeout=30.0, clock=lambda: now[0])
+        breaker.record_failure()
+
+        now[0] = 45.0
+        assert breaker.allow_request()
+        assert not breaker.allow_request()
+        assert breaker.retry_after == 30.0
+
+    def test_failed_trial_reopens(self):
+        """Test a failed half-open trial opens the circuit again."""
+        now = [0.0]
+        breaker = HostCircuitBreaker(failure_threshold=1, reset_timeout=10.0, clock=lambda: now[0])
+        breaker.record_failure()
+
+        now[0] = 11.0
+        assert breaker.allow_request()
+        breaker.record_failure()
+
+        assert not breaker.allow_request()
+        assert breaker.retry_after == 10.0
+
+
+class TestCallbackDeliveryService:
+    """Test cases for CallbackDeliveryService."""
+
+    @pytest.mark.asyncio
+    async def test_drain_delivers_signed_callbacks(self):
+        """Test due entries are posted with signature and IDs and marked delivered."""
+        entries = [make_entry(), make_entry(url="https://other.example.com/hook")]
+        outbox = FakeOutbox(entries)
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(200)
+
+        service = make_service(outbox, handler)
+
+        assert await service.drain_once() == 2
+
+        assert {entry.status for entry in entries} == {CallbackOutboxStatus.DELIVERED}
+        assert all(entry.attempts == 1 and entry.delivered_at for entry in entries)
+        body = json.loads(requests[0].content)
+        assert requests[0].headers["X-Webhook-Signature"] == sign_payload(body, "test-secret")
+        assert requests[0].headers["X-Request-ID"] == "req-1"
+        assert {r.headers["X-Callback-ID"] for r in requests} == {str(e.id) for e in entries}
+        await service.client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_claim_skips_locked_rows_and_leases_entries(self):
+        """Test the claim query skips locked rows and pushes the entry past a lease."""
+        entry = make_entry()
+        outbox = FakeOutbox([entry])
+        service = make_service(outbox, lambda request: httpx.Response(200), lease_seconds=60)
+
+        claimed = await service._claim_due()
+
+        sql = str(outbox.statements[0].compile(dialect=postgresql.dialect()))
+        assert "FOR UPDATE SKIP LOCKED" in sql
+        assert [c.id for c in claimed] == [entry.id]
+        assert entry.next_attempt_at > datetime.now(UTC) + timedelta(seconds=50)
+        await service.client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_failure_schedules_retry_with_backoff(self):
+        """Test a failed delivery stays pending with a later next attempt."""
+        entry = make_entry()
+        service = make_service(
+            FakeOutbox([entry]), lambda request: httpx.Response(503, text="busy")
+        )
+
+        await service.drain_once()
+
+        assert entry.status == CallbackOutboxStatus.PENDING
+        assert entry.attempts == 1
+        assert entry.last_status_code == 503
+        assert "503" in entry.last_error
+        assert entry.next_attempt_at > datetime.now(UTC) + timedelta(seconds=3)
+        await service.client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_marked_failed_after_max_attempts(self):
+        """Test an entry is given up on after its last attempt."""
+        entry = make_entry(attempts=2)
+
+        def handler(request):
+            raise httpx.ConnectError("refused")
+
+        service = make_service(FakeOutbox([entry]), handler, max_attempts=3)
+
+        await service.drain_once()
+
+        assert entry.status == CallbackOutboxStatus.FAILED
+        assert entry.attempts == 3
+        assert "refused" in entry.last_error
+        await service.client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_open_circuit_defers_without_attempt(self):
+        """Test entries for a host with an open circuit are deferred, not attempted."""
+        entries = [make_entry() for _ in range(3)]
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(500)
+
+        service = make_service(FakeOutbox(entries), handler, failure_threshold=1)
+        service.breakers["partner.example.com"] = HostCircuitBreaker(failure_threshold=1)
+        service.breakers["partner.example.com"].record_failure()
+
+        await service.drain_once()
+
+        assert requests == []
+        assert all(entry.attempts == 0 for entry in entries)
+        assert all(entry.status == CallbackOutboxStatus.PENDING for entry in entries)
+        assert all("Circuit open" in entry.last_error for entry in entries)
+        await service.client.aclose()
+
+    def test_retry_delay_is_capped(self):
+        """Test exponential backoff never exceeds the maximum delay."""
+        service = CallbackDeliveryService(
+            session_factory=FakeOutbox([]), base_retry_delay=5.0, max_retry_delay=60.0
+        )
+
+        assert 3.75 <= service._calculate_retry_delay(0) <= 6.25
+        assert service._calculate_retry_delay(10) == 60.0
+
+    def test_lease_covers_slowest_batch(self):
+        """Test a claimed batch always finishes before its lease runs out."""
+        service = CallbackDeliveryService(
+            session_factory=FakeOutbox([]),
+            batch_size=100,
+            per_host_concurrency=4,
+            timeout=10.0,
+            lease_seconds=120.0,
+        )
+
+        # 100 entries for one host, 4 at a time, each timing out after 10s
+        assert service.lease_seconds >= 250.0
+
+    @pytest.mark.asyncio
+    async def test_outcomes_recorded_as_each_delivery_finishes(self):
+        """Test a slow host does not hold back recording other hosts' entries."""
+        slow, fast = make_entry(url="https://slow.example.com/hook"), make_entry()
+        release = asyncio.Event()
+
+        async def handler(request):
+            if request.url.host == "slow.example.com":
+                await release.wait()
+            return httpx.Response(200)
+
+        service = make_service(FakeOutbox([slow, fast]), handler)
+        drain = asyncio.create_task(service.drain_once())
+
+        for _ in range(100):
+            if fast.status == CallbackOutboxStatus.DELIVERED:
+                break
+            await asyncio.sleep(0.01)
+
+        assert fast.status == CallbackOutboxStatus.DELIVERED
+        assert slow.status == CallbackOutboxStatus.PENDING
+        release.set()
+        assert await drain == 2
+        assert slow.status == CallbackOutboxStatus.DELIVERED
+        await service.client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_global_concurrency_limit(self):
+        """Test deliveries across hosts never exceed the global limit."""
+        entries = [make_entry(url=f"https://host{i}.example.com/hook") for i in range(6)]
+        in_flight, peak = [0], [0]
+
+        async def handler(request):
+            in_flight[0] += 1
+            peak[0] = max(peak[0], in_flight[0])
+            await asyncio.sleep(0.01)
+            in_flight[0] -= 1
+            return httpx.Response(200)
+
+        service = make_service(FakeOutbox(entries), handler)
+        service._slots = asyncio.Semaphore(2)
+
+        await service.drain_once()
+
+        assert peak[0] == 2
+        assert {entry.status for entry in entries} == {CallbackOutboxStatus.DELIVERED}
+        await service.client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_pool_timeout_is_not_an_attempt(self):
+        """Test waiting for a pooled connection costs neither an attempt nor breaker health."""
+        entry = make_entry()
+
+        def handler(request):
+            raise httpx.PoolTimeout("pool exhausted")
+
+        service = make_service(FakeOutbox([entry]), handler, failure_threshold=1)
+
+        await service.drain_once()
+
+        assert entry.attempts == 0
+        assert entry.status == CallbackOutboxStatus.PENDING
+        assert service.breakers["partner.example.com"].allow_request()
+        await service.client.aclose()
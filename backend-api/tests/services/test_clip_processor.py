@@ -16,6 +16,7 @@ from services.clip_processor import (
     ProcessingStatus,
     UnsupportedFormatError,
 )
+from services.ffmpeg.encoder import EncoderBackend
 from services.ffmpeg.normalizer import NormalizationResult, NormalizationSettings
 
 
@@ -92,6 +93,16 @@ class TestClipProcessingOptions:
         assert settings.preserve_aspect_ratio is False
         assert settings.scale_mode == "force"
 
+    def test_to_normalization_settings_uses_configured_backend(self):
+        """Test clips are normalized with the configured encoder backend."""
+        with patch(
+            "services.clip_processor.resolve_backend", return_value=EncoderBackend.LIBX265
+        ) as resolve:
+            settings = ClipProcessingOptions().to_normalization_settings()
+
+        assert settings.encoder_backend == EncoderBackend.LIBX265
+        resolve.assert_called_once()
+
 
 class TestClipProcessor:
     """Test cases for ClipProcessor."""
@@ -209,6 +220,22 @@ class TestClipProcessor:
         assert settings.target_height == 1080
         assert settings.target_fps == 60.0
 
+    @patch("services.clip_processor.VideoNormalizer")
+    def test_process_clip_keys_thumbnails_by_checksum(self, mock_normalizer_class, processor):
+        """Test the asset checksum reaches the thumbnail frame selection."""
+        processor.normalizer = MagicMock()
+        processor.normalizer.normalize_video.return_value = NormalizationResult(
+            output_path=Path("/tmp/output.mp4"),
+            was_cached=False,
+        )
+        processor.thumbnail_generator = MagicMock()
+        processor.thumbnail_generator.generate_multiple_thumbnails.return_value = {}
+
+        processor.process_clip(input_path=Path("/tmp/input.mp4"), checksum="abc123")
+
+        call_args = processor.thumbnail_generator.generate_multiple_thumbnails.call_args
+        assert call_args.kwargs["checksum"] == "abc123"
+
     def test_process_clip_unsupported_format(self, processor):
         """Test processing fails for unsupported format."""
         input_path = Path("/tmp/input.flv")
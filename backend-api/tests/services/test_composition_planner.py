@@ -0,0 +1,458 @@
+"""
+Unit tests for the composition planner.
+
+Tests lowering of composition configs to the filter graph IR, each
+optimization pass on its own, copy vs. encode decisions, and the emitted
+FFmpeg arguments.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+from services.ffmpeg.composition_planner import (
+    CompositionPlanError,
+    CompositionPlanner,
+    FilterGraph,
+    FilterNode,
+    FilterOp,
+    SegmentNode,
+    StreamFormat,
+    drop_noop_filters,
+    fuse_linear_chains,
+    merge_adjacent_trims,
+    parse_filter_node,
+)
+from services.ffmpeg.encoder import EncoderBackend
+from services.ffmpeg.input_manager import InputFileManager, MediaFileInfo, StreamInfo
+from services.ffmpeg.text_overlay import TextOverlayBuilder, TextPosition, TextStyle
+
+
+def make_info(
+    name: str,
+    *,
+    width: int = 1920,
+    height: int = 1080,
+    fps: float = 30.0,
+    audio_codec: str | None = "aac",
+    duration: float = 10.0,
+) -> MediaFileInfo:
+    """Create probe data for a clip."""
+    streams = [
+        StreamInfo(
+            index=0,
+            codec_type="video",
+            codec_name="h264",
+            width=width,
+            height=height,
+            fps=fps,
+            pix_fmt="yuv420p",
+            profile="High",
+            sample_aspect_ratio="1:1",
+        )
+    ]
+    if audio_codec:
+        streams.append(
+            StreamInfo(
+                index=1, codec_type="audio", codec_name=audio_codec, sample_rate=48000, channels=2
+            )
+        )
+    return MediaFileInfo(
+        path=Path(f"/tmp/{name}"),
+        format_name="mov,mp4,m4a,3gp,3g2,mj2",
+        duration=duration,
+        streams=streams,
+    )
+
+
+def make_planner(infos: dict[str, MediaFileInfo], **kwargs) -> CompositionPlanner:
+    """Create a planner whose probes return the given data."""
+    manager = MagicMock(spec=InputFileManager)
+    manager.probe_file.side_effect = lambda path: infos[Path(path).name]
+    manager.probe_keyframes.return_value = [0.0, 2.0, 4.0, 6.0, 8.0]
+    return CompositionPlanner(input_manager=manager, **kwargs)
+
+
+def make_config(*assets: dict, overlays: list[dict] | None = None) -> dict:
+    """Create a composition config."""
+    return {"assets": list(assets), "overlays": overlays or [], "audio": {}}
+
+
+def clip(name: str, **kwargs) -> dict:
+    """Create a video asset whose ID is its file name."""
+    return {"id": name, "type": "video", **kwargs}
+
+
+def files(*names: str) -> dict[str, Path]:
+    """Map asset IDs to paths."""
+    return {name: Path(f"/tmp/{name}") for name in names}
+
+
+OVERLAY = {"text": "Hello", "position": "top_left", "start_time": 0, "end_time": 2}
+
+
+class TestLowering:
+    """Tests for lowering the IR to a filter graph."""
+
+    def test_two_clips_concat(self):
+        """Test each clip is normalized and concatenated with its audio."""
+        planner = make_planner({"a.mp4": make_info("a.mp4"), "b.mp4": make_info("b.mp4")})
+        ir = planner.compile(
+            make_config(clip("a.mp4"), clip("b.mp4")), files("a.mp4", "b.mp4"), 1280, 720, 30
+        )
+
+        graph = planner.lower(ir)
+
+        assert graph.render() == (
+            "[0:v]scale=1280:720,setsar=1,fps=30[v0];"
+            "[1:v]scale=1280:720,setsar=1,fps=30[v1];"
+            "[v0][0:a][v1][1:a]concat=n=2:v=1:a=1[outv][outa]"
+        )
+        assert (graph.video_out, graph.audio_out) == ("outv", "outa")
+
+    def test_silence_for_clip_without_audio(self):
+        """Test a silent clip gets silence of its own length for concat."""
+        planner = make_planner(
+            {
+                "a.mp4": make_info("a.mp4"),
+                "b.mp4": make_info("b.mp4", audio_codec=None, duration=4.5),
+            }
+        )
+        ir = planner.compile(
+            make_config(clip("a.mp4"), clip("b.mp4")), files("a.mp4", "b.mp4"), 1280, 720, 30
+        )
+
+        graph = planner.lower(ir)
+
+        assert "anullsrc=channel_layout=stereo:sample_rate=48000:duration=4.5[a1]" in graph.render()
+
+    def test_music_is_mixed(self):
+        """Test audio assets are mixed under the clips' audio at their volume."""
+        planner = make_planner({"a.mp4": make_info("a.mp4")})
+        config = make_config(clip("a.mp4"), {"id": "music", "type": "audio", "volume": 0.2})
+        ir = planner.compile(
+            config, {**files("a.mp4"), "music": Path("/tmp/m.mp3")}, 1920, 1080, 30
+        )
+
+        graph = planner.lower(ir)
+
+        rendered = graph.render()
+        assert "[0:a]volume=0.7[clip_mix]" in rendered
+        assert "[1:a]volume=0.2[music0]" in rendered
+        assert "[clip_mix][music0]amix=inputs=2:duration=first[mixa]" in rendered
+        assert graph.audio_out == "mixa"
+
+    def test_overlays_use_text_overlay_builder(self):
+        """Test overlays are TextOverlayBuilder drawtext chains fed by the concat output."""
+        planner = make_planner({"a.mp4": make_info("a.mp4"), "b.mp4": make_info("b.mp4")})
+        overlay = {**OVERLAY, "text": "It's 10:30", "font_color": "#FF0000"}
+        ir = planner.compile(
+            make_config(clip("a.mp4"), clip("b.mp4"), overlays=[overlay]),
+            files("a.mp4", "b.mp4"),
+            1280,
+            720,
+            30,
+        )
+
+        node = planner.lower(ir).nodes[-1]
+
+        expected = TextOverlayBuilder().create_text_overlay(
+            input_index=0,
+            text="It's 10:30",
+            position=TextPosition.TOP_LEFT,
+            start_time=0,
+            end_time=2,
+            style=TextStyle(
+                font_size=24, font_color="0xFF0000", border_width=0, background_color="0x000000@0.5"
+            ),
+            output_label="ov0",
+        )
+        assert node.inputs == ["outv"]
+        assert node.outputs == ["ov0"]
+        assert node.render() == expected.replace("[0:v]", "[outv]", 1)
+
+    def test_no_video_assets(self):
+        """Test compositions without video clips are rejected."""
+        planner = make_planner({})
+
+        with pytest.raises(CompositionPlanError):
+            planner.plan(
+                make_config({"id": "music", "type": "audio"}),
+                {"music": Path("/tmp/m.mp3")},
+                1920,
+                1080,
+                30,
+            )
+
+
+class TestMergeAdjacentTrims:
+    """Tests for merge_adjacent_trims."""
+
+    def test_continuation_is_merged(self):
+        """Test a cut that resumes where the previous one ended is merged."""
+        segments = [
+            SegmentNode(Path("/tmp/a.mp4"), trim_start=1.0, trim_end=5.0),
+            SegmentNode(Path("/tmp/a.mp4"), trim_start=5.0, trim_end=8.0),
+        ]
+
+        merged = merge_adjacent_trims(segments)
+
+        assert len(merged) == 1
+        assert (merged[0].trim_start, merged[0].trim_end) == (1.0, 8.0)
+
+    @pytest.mark.parametrize(
+        "second",
+        [
+            SegmentNode(Path("/tmp/a.mp4"), trim_start=6.0, trim_end=8.0),
+            SegmentNode(Path("/tmp/b.mp4"), trim_start=5.0, trim_end=8.0),
+        ],
+    )
+    def test_gaps_and_other_files_are_kept(self, second):
+        """Test cuts with a gap or from another file stay separate."""
+        first = SegmentNode(Path("/tmp/a.mp4"), trim_start=1.0, trim_end=5.0)
+
+        assert len(merge_adjacent_trims([first, second])) == 2
+
+
+class TestDropNoopFilters:
+    """Tests for drop_noop_filters."""
+
+    @staticmethod
+    def chain() -> FilterGraph:
+        return FilterGraph(
+            nodes=[
+                FilterNode(
+                    ["0:v"],
+                    [
+                        FilterOp("scale", "1920:1080"),
+                        FilterOp("setsar", "1"),
+                        FilterOp("fps", "30"),
+                    ],
+                    ["v0"],
+                )
+            ],
+            video_out="v0",
+        )
+
+    def test_matching_input_is_bypassed(self):
+        """Test a chain that changes nothing is removed and the input mapped directly."""
+        graph = self.chain()
+
+        removed = drop_noop_filters(graph, {"0:v": StreamFormat(1920, 1080, 30.0, True)})
+
+        assert removed == 3
+        assert graph.nodes == []
+        assert graph.video_out == "0:v"
+
+    def test_only_matching_filters_are_dropped(self):
+        """Test a 720p input keeps its scale but drops fps and setsar."""
+        graph = self.chain()
+
+        drop_noop_filters(graph, {"0:v": StreamFormat(1280, 720, 30.0, True)})
+
+        assert graph.render() == "[0:v]scale=1920:1080[v0]"
+
+    def test_unknown_format_keeps_filters(self):
+        """Test inputs without probe data are left alone."""
+        graph = self.chain()
+
+        assert drop_noop_filters(graph, {}) == 0
+        assert len(graph.nodes[0].ops) == 3
+
+    def test_tracing_stops_at_unknown_filter(self):
+        """Test filters after one the pass does not model are kept."""
+        graph = FilterGraph(
+            nodes=[
+                FilterNode(["0:v"], [FilterOp("crop", "100:100"), FilterOp("fps", "30")], ["v0"])
+            ],
+            video_out="v0",
+        )
+
+        drop_noop_filters(graph, {"0:v": StreamFormat(1920, 1080, 30.0, True)})
+
+        assert [op.name for op in graph.nodes[0].ops] == ["crop", "fps"]
+
+
+class TestFuseLinearChains:
+    """Tests for fuse_linear_chains."""
+
+    def test_overlays_fold_into_one_chain(self):
+        """Test consecutive drawtext chains become a single chain."""
+        graph = FilterGraph(
+            nodes=[
+                FilterNode(["outv"], [FilterOp("drawtext", "text='a'")], ["ov0"]),
+                FilterNode(["ov0"], [FilterOp("drawtext", "text='b'")], ["ov1"]),
+            ],
+            video_out="ov1",
+        )
+
+        assert fuse_linear_chains(graph) == 1
+        assert graph.render() == "[outv]drawtext=text='a',drawtext=text='b'[ov1]"
+
+    def test_multi_input_consumer_is_not_fused(self):
+        """Test chains feeding concat stay separate."""
+        graph = FilterGraph(
+            nodes=[
+                FilterNode(["0:v"], [FilterOp("scale", "1280:720")], ["v0"]),
+                FilterNode(["1:v"], [FilterOp("scale", "1280:720")], ["v1"]),
+                FilterNode(["v0", "v1"], [FilterOp("concat", "n=2:v=1:a=0")], ["outv"]),
+            ],
+            video_out="outv",
+        )
+
+        assert fuse_linear_chains(graph) == 0
+        assert len(graph.nodes) == 3
+
+
+class TestFilterGraph:
+    """Tests for FilterGraph validation."""
+
+    def test_undefined_label_rejected(self):
+        """Test chains reading a label nobody produces are rejected."""
+        graph = FilterGraph(
+            nodes=[FilterNode(["missing"], [FilterOp("fps", "30")], ["v0"])], video_out="v0"
+        )
+
+        with pytest.raises(CompositionPlanError):
+            graph.validate()
+
+    def test_label_consumed_twice_rejected(self):
+        """Test filter outputs can only be read once."""
+        graph = FilterGraph(
+            nodes=[
+                FilterNode(["0:v"], [FilterOp("fps", "30")], ["v0"]),
+                FilterNode(["v0"], [FilterOp("null")], ["x"]),
+                FilterNode(["v0"], [FilterOp("null")], ["y"]),
+            ],
+            video_out="x",
+        )
+
+        with pytest.raises(CompositionPlanError):
+            graph.validate()
+
+
+class TestParseFilterNode:
+    """Tests for parse_filter_node."""
+
+    def test_quoted_commas_stay_in_one_filter(self):
+        """Test commas inside quoted arguments do not split the chain."""
+        node = parse_filter_node("[0:v]drawtext=text='a, b':enable='between(t,0,2)',fps=30[ov0]")
+
+        assert node.inputs == ["0:v"]
+        assert [op.name for op in node.ops] == ["drawtext", "fps"]
+        assert node.ops[0].args == "text='a, b':enable='between(t,0,2)'"
+        assert node.outputs == ["ov0"]
+
+    def test_round_trips_builder_output(self):
+        """Test escaped quotes in builder output survive parsing and rendering."""
+        expression = TextOverlayBuilder().create_text_overlay(0, "it's, ok", output_label="t")
+
+        assert parse_filter_node(expression).render() == expression
+
+    def test_labels_without_filters_rejected(self):
+        """Test an expression with no filter is not a chain."""
+        with pytest.raises(CompositionPlanError):
+            parse_filter_node("[0:v][out]")
+
+
+class TestPlan:
+    """Tests for full planning."""
+
+    def test_matching_clip_with_overlays(self):
+        """Test a matching clip with overlays is one drawtext chain with copied audio."""
+        planner = make_planner({"a.mp4": make_info("a.mp4")})
+        config = make_config(clip("a.mp4"), overlays=[OVERLAY, {**OVERLAY, "text": "Bye"}])
+
+        plan = planner.plan(config, files("a.mp4"), 1920, 1080, 30)
+
+        assert not plan.stream_copy.eligible
+        assert len(plan.graph.nodes) == 1
+        assert plan.graph.nodes[0].inputs == ["0:v"]
+        assert [op.name for op in plan.graph.nodes[0].ops] == ["drawtext", "drawtext"]
+        assert plan.copy_audio
+        assert plan.filter_args()[-2:] == ["-map", "0:a:0"]
+
+    def test_non_aac_audio_is_reencoded(self):
+        """Test audio is only copied when it is already AAC."""
+        planner = make_planner({"a.mp4": make_info("a.mp4", audio_codec="mp3")})
+        config = make_config(clip("a.mp4"), overlays=[OVERLAY])
+
+        plan = planner.plan(config, files("a.mp4"), 1920, 1080, 30)
+
+        assert plan.has_audio
+        assert not plan.copy_audio
+
+    def test_matching_clips_are_stream_copied(self):
+        """Test compositions StreamCopyPlanner accepts are marked for copy."""
+        planner = make_planner({"a.mp4": make_info("a.mp4"), "b.mp4": make_info("b.mp4")})
+
+        plan = planner.plan(
+            make_config(clip("a.mp4"), clip("b.mp4")), files("a.mp4", "b.mp4"), 1920, 1080, 30
+        )
+
+        assert plan.stream_copy.eligible
+        assert planner.input_manager.probe_file.call_count == 2
+
+    def test_clips_in_another_codec_than_backend_are_reencoded(self):
+        """Test H.264 clips are not copied into an output rendered with libx265."""
+        planner = make_planner(
+            {"a.mp4": make_info("a.mp4"), "b.mp4": make_info("b.mp4")},
+            backend=EncoderBackend.LIBX265,
+        )
+
+        plan = planner.plan(
+            make_config(clip("a.mp4"), clip("b.mp4")), files("a.mp4", "b.mp4"), 1920, 1080, 30
+        )
+
+        assert not plan.stream_copy.eligible
+        assert "codec h264 != hevc" in plan.stream_copy.reason
+
+    def test_music_prevents_stream_copy(self):
+        """Test background audio forces a re-encode."""
+        planner = make_planner({"a.mp4": make_info("a.mp4")})
+        config = make_config(clip("a.mp4"), {"id": "music", "type": "audio"})
+
+        plan = planner.plan(config, {**files("a.mp4"), "music": Path("/tmp/m.mp3")}, 1920, 1080, 30)
+
+        assert not plan.stream_copy.eligible
+        assert "audio" in plan.stream_copy.reason
+
+    def test_trims_become_input_seeks(self):
+        """Test trims are applied with -ss/-t and merged when contiguous."""
+        planner = make_planner({"a.mp4": make_info("a.mp4")})
+        config = make_config(
+            clip("a.mp4", trim_start=1.5, trim_end=4.0),
+            {"id": "a2", "type": "video", "trim_start": 4.0, "trim_end": 7.0},
+        )
+
+        plan = planner.plan(
+            config, {"a.mp4": Path("/tmp/a.mp4"), "a2": Path("/tmp/a.mp4")}, 1280, 720, 30
+        )
+
+        assert plan.optimizations["merge_adjacent_trims"] == 1
+        assert plan.input_args() == ["-ss", "1.5", "-t", "5.5", "-i", "/tmp/a.mp4"]
+        assert plan.duration_seconds == pytest.approx(5.5)
+        assert "trim" not in plan.graph.render()
+
+
+class TestWorkerCommand:
+    """Tests for the worker's use of the plan."""
+
+    def test_copied_audio_skips_aac_encoder(self):
+        """Test the worker copies audio when the plan allows it."""
+        from workers.ffmpeg_pipeline import FFmpegCommandBuilder
+
+        builder = FFmpegCommandBuilder()
+        builder.planner = make_planner({"a.mp4": make_info("a.mp4")})
+
+        cmd = builder.build_complex_composition(
+            composition_config=make_config(clip("a.mp4"), overlays=[OVERLAY]),
+            input_files=files("a.mp4"),
+            output_file=Path("/tmp/out.mp4"),
+        )
+
+        assert cmd[cmd.index("-c:a") + 1] == "copy"
+        assert "aac" not in cmd
+        assert cmd[cmd.index("-filter_complex") + 1].startswith("[0:v]drawtext=")
@@ -2,21 +2,40 @@
 Tests for H.264 Encoder module.
 
 Tests H.264 encoding configuration, FFmpeg argument generation,
-preset/profile/tune options, and optimization settings.
+preset/profile/tune options, optimization settings, and the alternative
+encoder backends.
 """
 
 from __future__ import annotations
 
+import subprocess
+from unittest.mock import patch
+
 import pytest
 from services.ffmpeg.encoder import (
+    BACKEND_PRESETS,
     AudioEncoderSettings,
+    EncoderBackend,
     H264EncoderBuilder,
     H264EncoderSettings,
     H264Preset,
     H264Profile,
     H264Tune,
+    detect_encoder_backends,
+    parse_encoder_list,
+    resolve_backend,
 )
 
+ENCODERS_OUTPUT = """Encoders:
+ V..... = Video
+ A..... = Audio
+ ------
+ V....D libx264              libx264 H.264 / AVC / MPEG-4 AVC / MPEG-4 part 10 (codec h264)
+ V....D libx265              libx265 H.265 / HEVC (codec hevc)
+ V....D libvpx-vp9           libvpx VP9 (codec vp9)
+ A....D aac                  AAC (Advanced Audio Coding)
+"""
+
 
 class TestH264EncoderSettings:
     """Tests for H264EncoderSettings configuration."""
@@ -612,3 +631,107 @@ class TestIntegrationScenarios:
         assert "libx264" in all_args
         assert "-c:a" in all_args
         assert "aac" in all_args
+
+
+class TestEncoderBackends:
+    """Tests for the non-x264 encoder backends and capability detection."""
+
+    @pytest.fixture
+    def builder(self) -> H264EncoderBuilder:
+        """Create encoder builder instance."""
+        return H264EncoderBuilder()
+
+    @pytest.fixture(autouse=True)
+    def clear_detection_cache(self):
+        """Drop cached encoder detection between tests."""
+        detect_encoder_backends.cache_clear()
+        yield
+        detect_encoder_backends.cache_clear()
+
+    def test_x264_args_unchanged(self, builder):
+        """Test the default backend still produces plain x264 arguments."""
+        args = builder.build_encoder_args(H264EncoderSettings(crf=23, keyframe_interval=60))
+
+        assert args == [
+            "-c:v", "libx264", "-crf", "23", "-preset", "medium",
+            "-profile:v", "high", "-pix_fmt", "yuv420p", "-g", "60",
+        ]  # fmt: skip
+
+    def test_x265_args(self, builder):
+        """Test x265 shifts CRF, maps the profile and tags for Apple players."""
+        settings = H264EncoderSettings(
+            crf=23, tune=H264Tune.FILM, b_frames=2, backend=EncoderBackend.LIBX265
+        )
+        args = builder.build_encoder_args(settings)
+
+        assert args[:2] == ["-c:v", "libx265"]
+        assert args[args.index("-crf") + 1] == "28"
+        assert args[args.index("-profile:v") + 1] == "main"
+        assert args[-2:] == ["-tag:v", "hvc1"]
+        assert "-tune" not in args
+        assert "-bf" not in args
+
+    def test_svtav1_numeric_presets(self, builder):
+        """Test SVT-AV1 gets a numeric preset and a CRF on its 0-63 scale."""
+        settings = H264EncoderSettings(
+            crf=30, preset=H264Preset.VERYFAST, backend=EncoderBackend.LIBSVTAV1
+        )
+        args = builder.build_encoder_args(settings)
+
+        assert args[args.index("-preset") + 1] == "10"
+        assert args[args.index("-crf") + 1] == "45"
+        assert "-profile:v" not in args
+
+    def test_vp9_constant_quality(self, builder):
+        """Test VP9 CRF mode zeroes the bitrate and sets speed via -cpu-used."""
+        settings = H264EncoderSettings(crf=51, backend=EncoderBackend.LIBVPX_VP9)
+        args = builder.build_encoder_args(settings)
+
+        assert args[args.index("-crf") + 1] == "63"
+        assert args[args.index("-b:v") + 1] == "0"
+        assert "-cpu-used" in args
+        assert "-preset" not in args
+
+    @pytest.mark.parametrize("backend", list(EncoderBackend))
+    def test_every_backend_covers_every_preset(self, backend):
+        """Test each backend has speed arguments for every preset."""
+        assert set(BACKEND_PRESETS[backend].speed_args) == set(H264Preset)
+
+    def test_parse_encoder_list(self):
+        """Test encoder names are read from `ffmpeg -encoders` output."""
+        names = parse_encoder_list(ENCODERS_OUTPUT)
+
+        assert {"libx264", "libx265", "libvpx-vp9", "aac"} <= names
+        assert "Video" not in names
+
+    def test_detect_runs_ffmpeg_once(self):
+        """Test detection is cached per FFmpeg binary."""
+        result = subprocess.CompletedProcess([], 0, stdout=ENCODERS_OUTPUT, stderr="")
+        with patch("services.ffmpeg.encoder.subprocess.run", return_value=result) as mock_run:
+            first = detect_encoder_backends("ffmpeg")
+            second = detect_encoder_backends("ffmpeg")
+
+        assert first is second
+        assert first == {
+            EncoderBackend.LIBX264,
+            EncoderBackend.LIBX265,
+            EncoderBackend.LIBVPX_VP9,
+        }
+        mock_run.assert_called_once()
+
+    def test_detect_without_ffmpeg(self):
+        """Test a missing binary reports no backends."""
+        with patch("services.ffmpeg.encoder.subprocess.run", side_effect=FileNotFoundError):
+            assert detect_encoder_backends("/missing/ffmpeg") == frozenset()
+
+    def test_resolve_falls_back_to_x264(self):
+        """Test an unavailable backend falls back to libx264."""
+        result = subprocess.CompletedProcess([], 0, stdout=ENCODERS_OUTPUT, stderr="")
+        with patch("services.ffmpeg.encoder.subprocess.run", return_value=result):
+            assert resolve_backend("libx265") == EncoderBackend.LIBX265
+            assert resolve_backend("libsvtav1") == EncoderBackend.LIBX264
+
+    def test_resolve_rejects_unknown_backend(self):
+        """Test an unknown backend name is a configuration error."""
+        with pytest.raises(ValueError):
+            resolve_backend("h264_nvenc")
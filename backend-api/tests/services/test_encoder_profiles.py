@@ -0,0 +1,268 @@
+"""
+Tests for encoder profiles.
+
+Tests profile/resolution tables, deadline-driven preset selection, encode
+speed tracking, and the worker command builder's use of profile settings.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from services.ffmpeg.encoder import H264Preset
+from services.ffmpeg.encoder_profiles import (
+    EncodeSpeedTracker,
+    EncoderProfile,
+    EncoderProfileEngine,
+    Mp4MuxMode,
+    build_mux_args,
+    estimate_moov_size,
+    resolution_tier,
+)
+
+
+@pytest.fixture
+def engine() -> EncoderProfileEngine:
+    """Engine with a fresh tracker at 100 medium-equivalent megapixel-frames/s."""
+    return EncoderProfileEngine(speed_tracker=EncodeSpeedTracker(default_throughput=100.0))
+
+
+class TestProfileTables:
+    """Tests for profile and resolution settings."""
+
+    @pytest.mark.parametrize(
+        ("height", "tier"),
+        [(360, "sd"), (480, "sd"), (720, "hd"), (1080, "fhd"), (2160, "uhd")],
+    )
+    def test_resolution_tier(self, height, tier):
+        """Test heights map to the expected tier."""
+        assert resolution_tier(height) == tier
+
+    def test_draft_is_cheap(self, engine):
+        """Test draft renders never use a slow preset."""
+        settings = engine.settings_for(EncoderProfile.DRAFT, 1920, 1080)
+
+        assert settings.preset == H264Preset.ULTRAFAST
+        assert settings.crf > 28
+
+    def test_final_matches_web_settings(self, engine):
+        """Test final 1080p30 keeps the web-optimized level and GOP."""
+        settings = engine.settings_for(EncoderProfile.FINAL, 1920, 1080, fps=30)
+
+        assert settings.preset == H264Preset.MEDIUM
+        assert settings.crf == 23
+        assert settings.level == "4.0"
+        assert settings.keyframe_interval == 60
+        assert settings.b_frames == 2
+
+    def test_final_drops_level_above_1080p30(self, engine):
+        """Test level 4.0 is not forced on 4K or 60fps output."""
+        assert engine.settings_for(EncoderProfile.FINAL, 3840, 2160).level is None
+        assert engine.settings_for(EncoderProfile.FINAL, 1920, 1080, fps=60).level is None
+
+    def test_keyframe_interval_follows_fps(self, engine):
+        """Test GOP is two seconds at the output frame rate."""
+        assert engine.settings_for(EncoderProfile.PREVIEW, 1280, 720, fps=24).keyframe_interval == 48
+
+    def test_archive_uses_archive_settings(self, engine):
+        """Test archive keeps the extra reference frames."""
+        settings = engine.settings_for(EncoderProfile.ARCHIVE, 1920, 1080)
+
+        assert settings.preset == H264Preset.SLOWER
+        assert settings.crf == 18
+        assert settings.ref_frames == 5
+
+    def test_build_encoder_args(self, engine):
+        """Test args come from H264EncoderBuilder."""
+        settings = engine.settings_for(EncoderProfile.PREVIEW, 1280, 720)
+        args = engine.build_encoder_args(settings)
+
+        assert args[:2] == ["-c:v", "libx264"]
+        assert args[args.index("-preset") + 1] == "veryfast"
+        assert args[args.index("-crf") + 1] == "26"
+
+
+class TestDeadlineSelection:
+    """Tests for deadline-driven preset selection."""
+
+    def test_no_deadline_keeps_table_preset(self, engine):
+        """Test the table preset is used without a deadline."""
+        selection = engine.select(EncoderProfile.FINAL, 1920, 1080, duration_seconds=60)
+
+        assert selection.settings.preset == H264Preset.MEDIUM
+        assert selection.estimated_seconds is None
+        assert not selection.deadline_adjusted
+
+    def test_generous_deadline_keeps_table_preset(self, engine):
+        """Test a deadline that fits never upgrades to a slower preset."""
+        selection = engine.select(
+            EncoderProfile.PREVIEW, 1920, 1080, duration_seconds=10, deadline_seconds=3600
+        )
+
+        assert selection.settings.preset == H264Preset.VERYFAST
+        assert not selection.deadline_adjusted
+
+    def test_tight_deadline_steps_to_faster_preset(self, engine):
+        """Test a tight deadline picks the slowest preset that still fits."""
+        # 60s at 1080p30 = 1800 frames * 2.07 MP = ~3732 MP-frames;
+        # medium needs ~37s, fast ~27s, faster ~21s at 100 MP-frames/s
+        selection = engine.select(
+            EncoderProfile.FINAL, 1920, 1080, fps=30, duration_seconds=60, deadline_seconds=30
+        )
+
+        assert selection.settings.preset == H264Preset.FASTER
+        assert selection.deadline_adjusted
+        assert selection.estimated_seconds <= 30 * engine.deadline_headroom
+
+    def test_impossible_deadline_falls_back_to_ultrafast(self, engine):
+        """Test the fastest preset is used when nothing fits."""
+        selection = engine.select(
+            EncoderProfile.ARCHIVE, 3840, 2160, duration_seconds=180, deadline_seconds=1
+        )
+
+        assert selection.settings.preset == H264Preset.ULTRAFAST
+
+    def test_profile_accepts_string(self, engine):
+        """Test profile values from job params are accepted."""
+        assert engine.select("draft", 1280, 720).profile == EncoderProfile.DRAFT
+
+    def test_unknown_profile_rejected(self, engine):
+        """Test unknown profile names raise."""
+        with pytest.raises(ValueError):
+            engine.select("cinema", 1280, 720)
+
+
+class TestMuxModes:
+    """Tests for MP4 mux mode selection."""
+
+    def test_fragmented_args(self):
+        """Test fragmented output never needs a rewrite."""
+        assert build_mux_args(Mp4MuxMode.FRAGMENTED) == [
+            "-movflags",
+            "frag_keyframe+empty_moov+default_base_moof",
+        ]
+
+    def test_reserved_moov_args(self):
+        """Test reserved moov sizes the reservation from the duration."""
+        args = build_mux_args(Mp4MuxMode.RESERVED_MOOV, duration_seconds=60, fps=30)
+
+        assert args == ["-moov_size", str(estimate_moov_size(60, 30))]
+
+    def test_reserved_moov_without_duration_falls_back(self):
+        """Test an unknown duration falls back to faststart."""
+        assert build_mux_args(Mp4MuxMode.RESERVED_MOOV) == ["-movflags", "+faststart"]
+
+    def test_moov_estimate_covers_sample_tables(self):
+        """Test the reservation exceeds the worst-case table size with margin."""
+        # 3 minutes at 60fps with 48kHz AAC
+        worst_case_tables = 180 * 60 * 24 + 180 * 48000 / 1024 * 12
+        assert estimate_moov_size(180, 60) > 2 * worst_case_tables
+
+    @pytest.mark.parametrize(
+        ("profile", "flag"),
+        [
+            (EncoderProfile.DRAFT, "frag_keyframe+empty_moov+default_base_moof"),
+            (EncoderProfile.PREVIEW, "frag_keyframe+empty_moov+default_base_moof"),
+            (EncoderProfile.FINAL, "-moov_size"),
+            (EncoderProfile.ARCHIVE, "+faststart"),
+        ],
+    )
+    def test_mode_per_profile(self, engine, profile, flag):
+        """Test each profile picks its mux mode."""
+        selection = engine.select(profile, 1920, 1080, duration_seconds=30)
+
+        assert flag in selection.mux_args
+
+
+class TestEncodeSpeedTracker:
+    """Tests for EncodeSpeedTracker."""
+
+    def test_default_before_measurements(self):
+        """Test the default throughput is used until something is recorded."""
+        tracker = EncodeSpeedTracker(default_throughput=50.0)
+
+        assert tracker.throughput == 50.0
+        assert tracker.samples == 0
+
+    def test_record_normalizes_to_medium(self):
+        """Test a veryfast measurement predicts the slower medium preset."""
+        tracker = EncodeSpeedTracker()
+        # 300 frames at 1000x1000 in 1s with veryfast (3x medium)
+        tracker.record(H264Preset.VERYFAST, 300, 1000, 1000, 1.0)
+
+        assert tracker.throughput == pytest.approx(100.0)
+        assert tracker.estimate_seconds(H264Preset.MEDIUM, 300, 1000, 1000) == pytest.approx(3.0)
+
+    def test_record_smooths(self):
+        """Test later measurements are blended in."""
+        tracker = EncodeSpeedTracker(smoothing=0.5)
+        tracker.record(H264Preset.MEDIUM, 100, 1000, 1000, 1.0)
+        tracker.record(H264Preset.MEDIUM, 200, 1000, 1000, 1.0)
+
+        assert tracker.throughput == pytest.approx(150.0)
+        assert tracker.samples == 2
+
+    def test_ignores_empty_measurements(self):
+        """Test zero frames or zero time are not recorded."""
+        tracker = EncodeSpeedTracker()
+        tracker.record(H264Preset.MEDIUM, 0, 1920, 1080, 5.0)
+        tracker.record(H264Preset.MEDIUM, 100, 1920, 1080, 0.0)
+
+        assert tracker.samples == 0
+
+
+class TestWorkerCommandBuilder:
+    """Tests for profile settings in the worker's FFmpeg command builder."""
+
+    def test_defaults_to_final_profile(self):
+        """Test commands without explicit settings use the final profile."""
+        from workers.ffmpeg_pipeline import FFmpegCommandBuilder
+
+        builder = FFmpegCommandBuilder()
+        cmd = builder.build_simple_composition(
+            input_files=[Path("/tmp/a.mp4")], output_file=Path("/tmp/out.mp4"), resolution="1280x720"
+        )
+
+        assert cmd[cmd.index("-preset") + 1] == "medium"
+        assert cmd[cmd.index("-crf") + 1] == "23"
+        assert cmd.count("-c:v") == 1
+
+    def test_uses_profile_settings(self, engine):
+        """Test explicit profile settings replace the defaults."""
+        from workers.ffmpeg_pipeline import FFmpegCommandBuilder
+
+        builder = FFmpegCommandBuilder()
+        draft = engine.settings_for(EncoderProfile.DRAFT, 1280, 720)
+        with patch.object(
+            builder.planner.input_manager, "probe_file", side_effect=FileNotFoundError("a.mp4")
+        ) as probe_file:
+            cmd = builder.build_simple_composition(
+                input_files=[Path("/tmp/a.mp4")],
+                output_file=Path("/tmp/out.mp4"),
+                resolution="1280x720",
+                encoder_settings=draft,
+            )
+
+        probe_file.assert_called_with(Path("/tmp/a.mp4"))
+        assert cmd[cmd.index("-preset") + 1] == "ultrafast"
+        assert cmd[cmd.index("-crf") + 1] == "30"
+        assert "-c:a" not in cmd
+
+    def test_mux_args_only_for_mp4_family(self):
+        """Test muxer flags are added for MP4 but not AVI outputs."""
+        from workers.ffmpeg_pipeline import FFmpegCommandBuilder
+
+        builder = FFmpegCommandBuilder()
+        fragmented = build_mux_args(Mp4MuxMode.FRAGMENTED)
+        mp4_cmd = builder.build_simple_composition(
+            input_files=[Path("/tmp/a.mp4")], output_file=Path("/tmp/out.mp4"), mux_args=fragmented
+        )
+        avi_cmd = builder.build_simple_composition(
+            input_files=[Path("/tmp/a.mp4")], output_file=Path("/tmp/out.avi"), mux_args=fragmented
+        )
+
+        assert "frag_keyframe+empty_moov+default_base_moof" in mp4_cmd
+        assert "+faststart" not in mp4_cmd
+        assert "-movflags" not in avi_cmd
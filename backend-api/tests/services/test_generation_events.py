@@ -0,0 +1,215 @@
+"""
+Unit tests for generation event streams behind the SSE endpoint.
+
+Tests stream appends, the per-process stream hub and Last-Event-ID resume.
+"""
+
+import asyncio
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import app  # noqa: F401 - the API package must be loaded before fastapi_app services
+import fakeredis
+import pytest
+from fastapi_app.services import generation_events
+from fastapi_app.services.generation_events import (
+    GenerationStreamHub,
+    append_generation_event,
+    generation_stream_key,
+)
+
+
+@pytest.fixture
+def server():
+    """Redis server shared by the sync producer and async hub clients."""
+    return fakeredis.FakeServer()
+
+
+@pytest.fixture
+def redis_conn(server):
+    """Sync Redis connection used to append events."""
+    return fakeredis.FakeRedis(server=server, decode_responses=True)
+
+
+@pytest.fixture
+def hub(server):
+    """Stream hub over the shared in-memory Redis."""
+    return GenerationStreamHub(
+        redis_client=fakeredis.FakeAsyncRedis(server=server, decode_responses=True),
+        block_ms=50,
+    )
+
+
+def parse_frame(frame: str) -> dict:
+    """Split an SSE frame into its fields."""
+    fields = dict(line.split(": ", 1) for line in frame.strip().split("\n"))
+    fields["data"] = json.loads(fields["data"])
+    return fields
+
+
+async def next_frame(frames) -> dict:
+    return parse_frame(await asyncio.wait_for(frames.__anext__(), timeout=2.0))
+
+
+class TestAppendGenerationEvent:
+    """Test cases for append_generation_event."""
+
+    @pytest.mark.asyncio
+    async def test_appends_event_with_ttl(self, hub, redis_conn):
+        """Events land in the generation's stream, which expires."""
+        entry_id = await append_generation_event("gen_1", "progress", {"percentage": 40.0}, hub=hub)
+
+        entries = redis_conn.xrange(generation_stream_key("gen_1"))
+        assert entries == [(entry_id, {"event": "progress", "data": '{"percentage": 40.0}'})]
+        assert redis_conn.ttl(generation_stream_key("gen_1")) > 0
+
+    @pytest.mark.asyncio
+    async def test_redis_failure_is_logged_not_raised(self):
+        """A Redis outage never breaks the broadcast that appends the event."""
+        redis_client = MagicMock()
+        redis_client.pipeline.side_effect = ConnectionError("redis down")
+        hub = GenerationStreamHub(redis_client=redis_client)
+
+        assert await append_generation_event("gen_1", "progress", {}, hub=hub) is None
+
+    @pytest.mark.asyncio
+    async def test_broadcast_appends_socketio_event(self, hub, redis_conn):
+        """Generation broadcasts also feed the SSE stream, through the hub's client."""
+        from fastapi_app.services import websocket_broadcast
+
+        ws_manager = MagicMock(emit_completed=AsyncMock())
+        with (
+            patch.object(websocket_broadcast, "get_websocket_manager", return_value=ws_manager),
+            patch.object(websocket_broadcast, "get_redis_connection", return_value=redis_conn),
+            patch.object(generation_events, "get_generation_stream_hub", return_value=hub),
+        ):
+            await websocket_broadcast.broadcast_completed("gen_1", "https://v.mp4", "", 30.0)
+
+        [(_, fields)] = redis_conn.xrange(generation_stream_key("gen_1"))
+        assert fields["event"] == "completed"
+        assert json.loads(fields["data"])["video_url"] == "https://v.mp4"
+
+    @pytest.mark.asyncio
+    async def test_replicate_job_update_reaches_sse_without_bridge(
+        self, hub, redis_conn, monkeypatch
+    ):
+        """Per-clip Replicate updates reach SSE clients with the Socket.io bridge off."""
+        from app.api.v1 import replicate as replicate_api
+        from app.config import settings
+
+        monkeypatch.setattr(settings, "redis_bridge_enabled", False)
+        redis_conn.set(
+            "ai_job:pred_1",
+            json.dumps({"generation_id": "gen_1", "clip_index": 2, "total_clips": 4}),
+        )
+        frames = hub.events("gen_1")
+        first = asyncio.ensure_future(next_frame(frames))
+        await asyncio.sleep(0.05)
+
+        with (
+            patch.object(replicate_api, "get_redis_connection", return_value=redis_conn),
+            patch.object(generation_events, "get_generation_stream_hub", return_value=hub),
+        ):
+            await replicate_api.publish_job_update("pred_1", "processing", progress=40)
+            await replicate_api.publish_job_update("pred_1", "failed", error="Model error")
+
+        progress, error = await first, await next_frame(frames)
+        assert progress["event"] == "progress"
+        assert (progress["data"]["clip_number"], progress["data"]["percentage"]) == (2, 40.0)
+        assert (error["event"], error["data"]["message"]) == ("error", "Model error")
+        await frames.aclose()
+
+    @pytest.mark.asyncio
+    async def test_job_outside_a_generation_is_not_appended(self, hub, redis_conn):
+        """Updates of jobs without a generation have no stream to go to."""
+        redis_conn.set("ai_job:pred_1", json.dumps({"status": "processing"}))
+
+        update = {"jobId": "pred_1", "status": "running", "progress": 10}
+        assert await generation_events.append_job_update("pred_1", update, hub=hub) == []
+        assert redis_conn.keys("generation:*") == []
+
+
+class TestGenerationStreamHub:
+    """Test cases for GenerationStreamHub."""
+
+    @pytest.mark.asyncio
+    async def test_live_events_reach_watchers_of_that_generation(self, hub, redis_conn):
+        """Clients receive new events for their generation only."""
+        await hub.append("gen_1", "progress", {"percentage": 10})
+        frames = hub.events("gen_1")
+        first = asyncio.ensure_future(next_frame(frames))
+        await asyncio.sleep(0.05)
+
+        await hub.append("gen_2", "progress", {"percentage": 99})
+        entry_id = await hub.append("gen_1", "progress", {"percentage": 20})
+
+        frame = await first
+        assert frame == {"id": entry_id, "event": "progress", "data": {"percentage": 20}}
+        assert hub.watched_generations() == ["gen_1"]
+        await frames.aclose()
+
+    @pytest.mark.asyncio
+    async def test_resume_replays_missed_events_once(self, hub, redis_conn):
+        """Reconnecting with Last-Event-ID replays the gap, then continues live."""
+        seen = await hub.append("gen_1", "progress", {"n": 1})
+        await hub.append("gen_1", "progress", {"n": 2})
+        await hub.append("gen_1", "clip_completed", {"n": 3})
+
+        frames = hub.events("gen_1", last_event_id=seen)
+        assert (await next_frame(frames))["data"] == {"n": 2}
+        assert (await next_frame(frames))["data"] == {"n": 3}
+
+        await hub.append("gen_1", "completed", {"n": 4})
+        frame = await next_frame(frames)
+        assert (frame["event"], frame["data"]) == ("completed", {"n": 4})
+        await frames.aclose()
+
+    @pytest.mark.asyncio
+    async def test_stream_is_read_only_while_watched(self, hub, redis_conn):
+        """The reader stops once the last local client leaves."""
+        frames = hub.events("gen_1")
+        pending = asyncio.ensure_future(frames.__anext__())
+        await asyncio.sleep(0.05)
+        assert hub._reader is not None and not hub._reader.done()
+
+        pending.cancel()
+        await asyncio.gather(pending, return_exceptions=True)
+        await frames.aclose()
+        await asyncio.sleep(0.2)
+
+        assert hub.watched_generations() == []
+        assert hub._reader.done()
+
+    @pytest.mark.asyncio
+    async def test_slow_client_is_told_to_resume(self, hub, monkeypatch):
+        """A client whose queue overflows gets None and is dropped from delivery."""
+        monkeypatch.setattr(generation_events, "SUBSCRIBER_QUEUE_SIZE", 2)
+        queue = await hub.subscribe("gen_1")
+
+        hub._deliver(queue, [("1-0", {}), ("2-0", {}), ("3-0", {})])
+
+        assert queue.get_nowait() is None
+        assert queue.empty()
+        hub.unsubscribe("gen_1", queue)
+
+    @pytest.mark.asyncio
+    async def test_concurrent_first_subscribers_share_one_cursor(self, hub, redis_conn):
+        """Clients subscribing together look the tail up once and all get new events."""
+        await hub.append("gen_1", "progress", {"n": 1})
+        xrevrange = hub.redis.xrevrange
+
+        async def slow_xrevrange(*args, **kwargs):
+            tail = await xrevrange(*args, **kwargs)
+            await asyncio.sleep(0.05)
+            return tail
+
+        with patch.object(hub.redis, "xrevrange", side_effect=slow_xrevrange) as lookups:
+            queues = await asyncio.gather(hub.subscribe("gen_1"), hub.subscribe("gen_1"))
+
+        entry_id = await hub.append("gen_1", "progress", {"n": 2})
+        entries = [await asyncio.wait_for(queue.get(), timeout=2.0) for queue in queues]
+
+        assert lookups.call_count == 1
+        assert [entry[0] for entry in entries] == [entry_id, entry_id]
+        for queue in queues:
+            hub.unsubscribe("gen_1", queue)
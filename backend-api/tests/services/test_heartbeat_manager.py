@@ -0,0 +1,158 @@
+"""
+Unit tests for the WebSocket heartbeat timer wheel.
+
+Tests slot assignment, queued pings, missed heartbeats and deadline expiry.
+"""
+
+import asyncio
+import json
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import pytest
+from app.api.schemas.websocket import ConnectionState
+from services.websocket import connection_manager as connection_manager_module
+from services.websocket.connection_manager import ConnectionManager
+from services.websocket.heartbeat_manager import HeartbeatManager
+
+
+def make_websocket(send_text=None) -> MagicMock:
+    """WebSocket double recording sent frames."""
+    return MagicMock(send_text=send_text or AsyncMock(), send_json=AsyncMock(), close=AsyncMock())
+
+
+@pytest.fixture
+def manager():
+    """The connection manager singleton, emptied for each test."""
+    manager = ConnectionManager()
+    manager._connections.clear()
+    manager._connection_listeners.clear()
+    yield manager
+    manager._connections.clear()
+    manager._connection_listeners.clear()
+
+
+async def connect(manager, composition_id=None, websocket=None):
+    return await manager.add_connection(
+        websocket or make_websocket(),
+        composition_id or uuid4(),
+        state=ConnectionState.SUBSCRIBED,
+    )
+
+
+class TestTimerWheel:
+    """Test cases for HeartbeatManager scheduling."""
+
+    @pytest.mark.asyncio
+    async def test_connections_are_spread_over_slots(self, manager):
+        """Connections opened together land in different slots."""
+        heartbeat = HeartbeatManager(manager, ping_interval=30, wheel_slots=10)
+        await heartbeat.start()
+        try:
+            for _ in range(25):
+                await connect(manager)
+
+            assert sorted(len(slot) for slot in heartbeat._wheel) == [2] * 5 + [3] * 5
+            assert (await heartbeat.get_stats())["scheduled_connections"] == 25
+        finally:
+            await heartbeat.stop()
+
+    @pytest.mark.asyncio
+    async def test_slot_pings_share_one_frame_per_composition(self, manager):
+        """A tick serializes the ping once per composition and queues it."""
+        heartbeat = HeartbeatManager(manager, wheel_slots=1)
+        composition_id = uuid4()
+        conns = [await connect(manager, composition_id) for _ in range(3)]
+        other = await connect(manager)
+        for conn in [*conns, other]:
+            heartbeat.schedule(conn)
+
+        assert heartbeat._process_slot(heartbeat._wheel[0]) == []
+        await asyncio.sleep(0)
+
+        frames = [conn.websocket.send_text.await_args.args[0] for conn in conns]
+        assert frames[0] is frames[1] is frames[2]
+        assert json.loads(frames[0])["composition_id"] == str(composition_id)
+        assert json.loads(frames[0])["type"] == "heartbeat"
+        assert json.loads(other.websocket.send_text.await_args.args[0])["sequence"] == 1
+
+    @pytest.mark.asyncio
+    async def test_removed_connections_leave_the_wheel(self, manager):
+        """Connections removed from the manager are dropped when their slot is due."""
+        heartbeat = HeartbeatManager(manager, wheel_slots=1)
+        conn = await connect(manager)
+        heartbeat.schedule(conn)
+
+        await manager.remove_connection(conn.websocket, conn.composition_id)
+        heartbeat._process_slot(heartbeat._wheel[0])
+
+        assert heartbeat._wheel[0] == set()
+        conn.websocket.send_text.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_loop_pings_on_schedule(self, manager):
+        """The running wheel pings every connection once per interval."""
+        heartbeat = HeartbeatManager(manager, ping_interval=0.1, wheel_slots=5)
+        await heartbeat.start()
+        try:
+            conn = await connect(manager)
+            await asyncio.sleep(0.25)
+        finally:
+            await heartbeat.stop()
+
+        assert conn.websocket.send_text.await_count in (2, 3)
+
+
+class TestStaleConnections:
+    """Test cases for heartbeat deadlines."""
+
+    @pytest.mark.asyncio
+    async def test_blocked_connection_misses_heartbeats_then_closes(self, manager, monkeypatch):
+        """Pings to a connection that stopped reading never block the tick."""
+        monkeypatch.setattr(connection_manager_module, "OUTBOUND_QUEUE_SIZE", 1)
+
+        async def never_sends(frame):
+            await asyncio.Event().wait()
+
+        heartbeat = HeartbeatManager(manager, wheel_slots=1, max_missed_heartbeats=2)
+        conn = await connect(manager, websocket=make_websocket(send_text=never_sends))
+        heartbeat.schedule(conn)
+
+        # One ping is being sent, one fills the queue, two more are missed
+        for _ in range(4):
+            assert heartbeat._process_slot(heartbeat._wheel[0]) == []
+            await asyncio.sleep(0)
+        assert conn.missed_heartbeats == 2
+
+        stale = heartbeat._process_slot(heartbeat._wheel[0])
+        assert stale == [conn]
+        await heartbeat._close_stale_connections(stale)
+        conn.websocket.close.assert_awaited_once()
+        assert await manager.get_connection_count(conn.composition_id) == 0
+
+    @pytest.mark.asyncio
+    async def test_silent_connection_expires(self, manager):
+        """A connection that stops answering pings is closed at its deadline."""
+        heartbeat = HeartbeatManager(manager, ping_interval=30, wheel_slots=1)
+        conn = await connect(manager)
+        heartbeat.schedule(conn)
+
+        conn.last_heartbeat = datetime.utcnow() - timedelta(seconds=119)
+        assert heartbeat._process_slot(heartbeat._wheel[0]) == []
+
+        conn.last_heartbeat = datetime.utcnow() - timedelta(seconds=121)
+        assert heartbeat._process_slot(heartbeat._wheel[0]) == [conn]
+        assert heartbeat._wheel[0] == set()
+
+    @pytest.mark.asyncio
+    async def test_failed_send_removes_connection(self, manager):
+        """The writer task drops a connection whose socket fails."""
+        broken = AsyncMock(side_effect=RuntimeError("socket closed"))
+        conn = await connect(manager, websocket=make_websocket(send_text=broken))
+
+        assert manager.enqueue_frame(conn, "{}")
+        await asyncio.sleep(0.01)
+
+        assert await manager.get_connection_count(conn.composition_id) == 0
+        assert not manager.enqueue_frame(conn, "{}")
@@ -479,6 +479,8 @@ class TestInputFileManager:
             "r_frame_rate": "30/1",
             "duration": "120.5",
             "bit_rate": "5000000",
+            "level": 40,
+            "extradata_hash": "SHA256:ab12",
         }
 
         stream = manager._parse_stream_info(stream_data)
@@ -492,6 +494,8 @@ class TestInputFileManager:
         assert stream.fps == 30.0
         assert stream.duration == 120.5
         assert stream.bit_rate == 5000000
+        assert stream.level == 40
+        assert stream.extradata_hash == "SHA256:ab12"
 
     def test_parse_stream_info_audio(self, manager):
         """Test parsing audio stream info."""
@@ -559,6 +563,13 @@ class TestInputFileManager:
         assert stream.codec_name is None
         assert stream.width is None
 
+    def test_parse_stream_info_unknown_level(self, manager):
+        """Test ffprobe's -99 placeholder level is treated as unknown."""
+        stream = manager._parse_stream_info({"index": 0, "codec_type": "video", "level": -99})
+
+        assert stream is not None
+        assert stream.level is None
+
     @patch.object(InputFileManager, "probe_file")
     def test_validate_file_success(self, mock_probe, manager):
         """Test successful file validation."""
@@ -0,0 +1,88 @@
+"""
+Unit tests for the AI job status notifier.
+
+Tests shared subscriptions, latest-update delivery and unsubscribing once the
+last waiter leaves.
+"""
+
+import asyncio
+import json
+
+import app  # noqa: F401 - the API package must be loaded before services
+import fakeredis
+import pytest
+from services.job_status_notifier import JobStatusNotifier, job_status_channel
+
+JOB_ID = "pred-123"
+
+
+@pytest.fixture
+def server():
+    """Redis server shared by the notifier and the publishing client."""
+    return fakeredis.FakeServer()
+
+
+@pytest.fixture
+def publisher(server):
+    return fakeredis.FakeRedis(server=server, decode_responses=True)
+
+
+def make_notifier(server) -> JobStatusNotifier:
+    return JobStatusNotifier(fakeredis.FakeAsyncRedis(server=server, decode_responses=True))
+
+
+def publish(publisher, status: str) -> None:
+    publisher.publish(job_status_channel(JOB_ID), json.dumps({"status": status}))
+
+
+class TestJobStatusNotifier:
+    """Test cases for JobStatusNotifier."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_watchers_share_one_subscription(self, server, publisher):
+        """Waiters on the same job are all woken by one published update."""
+        notifier = make_notifier(server)
+        try:
+            queues = await asyncio.gather(*(notifier.watch(JOB_ID) for _ in range(3)))
+            assert publisher.pubsub_numsub(job_status_channel(JOB_ID)) == [
+                (job_status_channel(JOB_ID), 1)
+            ]
+
+            publish(publisher, "succeeded")
+            updates = [await asyncio.wait_for(queue.get(), timeout=2) for queue in queues]
+
+            assert [update["status"] for update in updates] == ["succeeded"] * 3
+        finally:
+            await notifier.close()
+
+    @pytest.mark.asyncio
+    async def test_unread_updates_are_replaced(self, server, publisher):
+        """A waiter that falls behind receives only the latest status."""
+        notifier = make_notifier(server)
+        try:
+            queue = await notifier.watch(JOB_ID)
+
+            publish(publisher, "starting")
+            publish(publisher, "processing")
+            await asyncio.sleep(0.2)
+
+            assert queue.qsize() == 1
+            assert (await queue.get())["status"] == "processing"
+        finally:
+            await notifier.close()
+
+    @pytest.mark.asyncio
+    async def test_last_waiter_unsubscribes(self, server, publisher):
+        """The job's channel is released once nobody waits on it."""
+        notifier = make_notifier(server)
+        try:
+            first = await notifier.watch(JOB_ID)
+            second = await notifier.watch(JOB_ID)
+
+            await notifier.unwatch(JOB_ID, first)
+            assert publisher.pubsub_numsub(job_status_channel(JOB_ID))[0][1] == 1
+
+            await notifier.unwatch(JOB_ID, second)
+            assert publisher.pubsub_numsub(job_status_channel(JOB_ID))[0][1] == 0
+        finally:
+            await notifier.close()
@@ -9,6 +9,7 @@ from pathlib import Path
 from unittest.mock import Mock, patch
 
 import pytest
+from services.ffmpeg.encoder import EncoderBackend
 from services.ffmpeg.input_manager import MediaFileInfo, StreamInfo
 from services.ffmpeg.normalizer import (
     NormalizationResult,
@@ -273,6 +274,27 @@ class TestVideoNormalizer:
         assert "-an" in cmd
         assert "-c:a" not in cmd
 
+    def test_build_normalization_command_encoder_backend(self, mock_video_info, temp_dir):
+        """Test the encoder backend drives the codec and the cache key."""
+        normalizer = VideoNormalizer(cache_dir=temp_dir)
+        settings = NormalizationSettings(encoder_backend=EncoderBackend.LIBX265)
+
+        cmd = normalizer._build_normalization_command(
+            input_path=Path("/tmp/input.mp4"),
+            output_path=Path("/tmp/output.mp4"),
+            settings=settings,
+            media_info=mock_video_info,
+        )
+
+        assert cmd[cmd.index("-c:v") + 1] == "libx265"
+        assert cmd[cmd.index("-preset") + 1] == "fast"
+
+        input_path = temp_dir / "input.mp4"
+        input_path.write_bytes(b"video")
+        assert normalizer._get_cached_path(input_path, settings) != normalizer._get_cached_path(
+            input_path, NormalizationSettings()
+        )
+
     @patch("services.ffmpeg.normalizer.subprocess.run")
     @patch.object(VideoNormalizer, "_get_cached_path")
     def test_normalize_video_uses_cache(self, mock_get_cached, mock_run, temp_dir, mock_video_info):
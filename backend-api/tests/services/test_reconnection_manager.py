@@ -0,0 +1,199 @@
+"""
+Unit tests for the WebSocket reconnection replay log.
+
+Tests Redis-assigned sequence numbers, replica deduplication by message ID,
+trimming and replay of missed messages on reconnect.
+"""
+
+import asyncio
+import json
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import fakeredis
+import pytest
+from app.api.schemas.websocket import ProcessingStage, WSProgressMessage
+from services.websocket.reconnection_manager import ReconnectionManager
+from services.websocket import redis_subscriber as redis_subscriber_module
+from services.websocket.redis_subscriber import RedisSubscriber, publish_composition_message
+
+COMPOSITION_ID = uuid4()
+
+
+@pytest.fixture
+def server():
+    """Redis server shared by every replica's clients."""
+    return fakeredis.FakeServer()
+
+
+def make_manager(server, **kwargs) -> ReconnectionManager:
+    """Reconnection manager as created by one API replica."""
+    return ReconnectionManager(
+        fakeredis.FakeRedis(server=server, decode_responses=True),
+        async_redis_client=fakeredis.FakeAsyncRedis(server=server, decode_responses=True),
+        **kwargs,
+    )
+
+
+@pytest.fixture
+def manager(server):
+    return make_manager(server)
+
+
+def progress(percentage: float) -> WSProgressMessage:
+    return WSProgressMessage(
+        composition_id=COMPOSITION_ID, stage=ProcessingStage.RENDERING, percentage=percentage
+    )
+
+
+class TestAppendMessage:
+    """Test cases for ReconnectionManager.append_message."""
+
+    @pytest.mark.asyncio
+    async def test_redis_assigns_increasing_sequences(self, server, manager):
+        """Messages are numbered 1, 2, 3... by the stream, with a TTL."""
+        sequences = [await manager.append_message(COMPOSITION_ID, progress(p)) for p in (10, 20)]
+
+        assert sequences == [1, 2]
+        redis_conn = fakeredis.FakeRedis(server=server, decode_responses=True)
+        assert redis_conn.ttl(f"composition:{COMPOSITION_ID}:replay") > 0
+
+    @pytest.mark.asyncio
+    async def test_replicas_store_a_published_message_once(self, server):
+        """Replicas receiving the same pub/sub message agree on its sequence."""
+        replicas = [make_manager(server) for _ in range(3)]
+
+        sequences = [
+            await replica.append_message(COMPOSITION_ID, progress(50), message_id="m-1")
+            for replica in replicas
+        ]
+
+        assert sequences == [1, 1, 1]
+        assert (await replicas[0].get_stats(COMPOSITION_ID))["stored_message_count"] == 1
+
+    @pytest.mark.asyncio
+    async def test_identical_publishes_are_stored_separately(self, manager):
+        """Separate publishes of the same data are distinct messages."""
+        sequences = [
+            await manager.append_message(COMPOSITION_ID, progress(50), message_id=message_id)
+            for message_id in ("m-1", "m-2")
+        ]
+        sequences.append(await manager.append_message(COMPOSITION_ID, progress(50)))
+
+        assert sequences == [1, 2, 3]
+
+    @pytest.mark.asyncio
+    async def test_stream_is_trimmed(self, server):
+        """The replay log keeps roughly max_stored_messages entries."""
+        manager = make_manager(server, max_stored_messages=10)
+
+        for percentage in range(500):
+            await manager.append_message(COMPOSITION_ID, progress(percentage / 5))
+
+        stats = await manager.get_stats(COMPOSITION_ID)
+        assert stats["latest_sequence"] == 500
+        assert stats["stored_message_count"] < 500
+
+    @pytest.mark.asyncio
+    async def test_redis_failure_is_logged_not_raised(self):
+        """A Redis outage never prevents the broadcast."""
+        async_redis = MagicMock()
+        async_redis.register_script.return_value = AsyncMock(side_effect=ConnectionError("down"))
+        manager = ReconnectionManager(MagicMock(), async_redis_client=async_redis)
+
+        assert await manager.append_message(COMPOSITION_ID, progress(10)) is None
+
+
+class TestGetMissedMessages:
+    """Test cases for ReconnectionManager.get_missed_messages."""
+
+    @pytest.mark.asyncio
+    async def test_replays_messages_after_last_sequence(self, manager):
+        """Only messages after the client's last sequence are returned, in order."""
+        for percentage in (10, 20, 30):
+            await manager.append_message(COMPOSITION_ID, progress(percentage))
+
+        missed = await manager.get_missed_messages(COMPOSITION_ID, last_sequence=1)
+
+        assert [entry["sequence"] for entry in missed] == [2, 3]
+        assert [entry["message"]["percentage"] for entry in missed] == [20, 30]
+        assert missed[0]["message"]["message_sequence"] == 2
+        assert await manager.get_missed_messages(COMPOSITION_ID, last_sequence=3) == []
+
+    @pytest.mark.asyncio
+    async def test_replays_everything_after_stream_reset(self, manager):
+        """A client ahead of an expired and restarted stream gets all of it."""
+        for percentage in (10, 20, 30):
+            await manager.append_message(COMPOSITION_ID, progress(percentage))
+        await manager.clear_messages(COMPOSITION_ID)
+        await manager.append_message(COMPOSITION_ID, progress(5))
+
+        missed = await manager.get_missed_messages(COMPOSITION_ID, last_sequence=3)
+
+        assert [entry["message"]["percentage"] for entry in missed] == [5]
+
+
+def published(redis_conn, percentage: float) -> dict:
+    """Pub/sub message as received for one published progress update."""
+    pubsub = redis_conn.pubsub()
+    pubsub.subscribe(f"composition:{COMPOSITION_ID}:progress")
+    pubsub.get_message(timeout=1)
+    publish_composition_message(
+        redis_conn,
+        COMPOSITION_ID,
+        {"type": "progress", "stage": "rendering", "percentage": percentage},
+    )
+    message = pubsub.get_message(ignore_subscribe_messages=True, timeout=1)
+    pubsub.close()
+    return message
+
+
+class TestRedisSubscriberSequencing:
+    """Test cases for sequence numbers on routed messages."""
+
+    @pytest.mark.asyncio
+    async def test_broadcast_carries_stored_sequence(self, server, manager):
+        """Routed messages carry their replay sequence; replicas store each once."""
+        redis_conn = fakeredis.FakeRedis(server=server, decode_responses=True)
+        connection_manager = MagicMock(broadcast_to_composition=AsyncMock(return_value=1))
+        subscribers = [
+            RedisSubscriber(connection_manager, reconnection_manager=manager),
+            RedisSubscriber(connection_manager, reconnection_manager=make_manager(server)),
+        ]
+
+        for message in [published(redis_conn, 10), published(redis_conn, 10)]:
+            for subscriber in subscribers:
+                await subscriber._handle_message(message)
+
+        sent = [
+            call.args[1] for call in connection_manager.broadcast_to_composition.await_args_list
+        ]
+        assert [message.message_sequence for message in sent] == [1, 1, 2, 2]
+        assert await manager.get_latest_sequence(COMPOSITION_ID) == 2
+
+    @pytest.mark.asyncio
+    async def test_slow_append_does_not_hold_the_broadcast(self, manager, monkeypatch):
+        """A broadcast goes out without a sequence once the append takes too long."""
+        monkeypatch.setattr(redis_subscriber_module, "SEQUENCE_WAIT_SECONDS", 0.01)
+        stored = asyncio.Event()
+
+        async def slow_append(composition_id, message, message_id=None):
+            await asyncio.sleep(0.1)
+            stored.set()
+            return 1
+
+        manager.append_message = slow_append
+        connection_manager = MagicMock(broadcast_to_composition=AsyncMock(return_value=1))
+        subscriber = RedisSubscriber(connection_manager, reconnection_manager=manager)
+
+        await subscriber._handle_message(
+            {
+                "channel": f"composition:{COMPOSITION_ID}:progress",
+                "data": json.dumps({"type": "progress", "stage": "rendering", "percentage": 10}),
+            }
+        )
+
+        sent = connection_manager.broadcast_to_composition.await_args.args[1]
+        assert sent.message_sequence is None
+        assert not stored.is_set()
+        await asyncio.wait_for(stored.wait(), timeout=1)
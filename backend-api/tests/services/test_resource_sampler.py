@@ -0,0 +1,94 @@
+"""
+Unit tests for FFmpeg process resource sampling.
+
+Tests sample merging, bounded downsampling of long series, and sampling a
+real child process.
+"""
+
+import subprocess
+import sys
+import time
+
+from services.resource_sampler import ProcessSampler, ResourceSample, merge_samples
+
+
+def make_sample(elapsed, cpu=100.0, rss=1000, read=0, write=0, fps=30.0, speed=1.0):
+    """Create a sample with defaults for the fields a test does not care about."""
+    return ResourceSample(
+        elapsed=elapsed,
+        cpu_percent=cpu,
+        rss_bytes=rss,
+        read_bytes=read,
+        write_bytes=write,
+        fps=fps,
+        speed=speed,
+    )
+
+
+def test_merge_samples_averages_rates_and_keeps_peaks():
+    """Test merging averages CPU and speed, keeps peak memory and latest counters."""
+    merged = merge_samples(
+        [
+            make_sample(1.0, cpu=100.0, rss=500, read=10, write=20, fps=20.0, speed=1.0),
+            make_sample(2.0, cpu=300.0, rss=900, read=30, write=50, fps=40.0, speed=2.0),
+        ]
+    )
+
+    assert merged.elapsed == 2.0
+    assert merged.cpu_percent == 200.0
+    assert merged.rss_bytes == 900
+    assert (merged.read_bytes, merged.write_bytes) == (30, 50)
+    assert (merged.fps, merged.speed) == (30.0, 1.5)
+
+
+def test_long_series_is_downsampled_to_bound():
+    """Test the series stays under its point limit and still spans the whole render."""
+    sampler = ProcessSampler(pid=0, max_points=8)
+
+    for i in range(1, 101):
+        sampler._add(make_sample(float(i), rss=i))
+    samples = sampler.stop()
+
+    assert len(samples) < 8
+    assert samples[-1].elapsed == 100.0
+    assert max(s.rss_bytes for s in samples) == 100
+    assert [s.elapsed for s in samples] == sorted(s.elapsed for s in samples)
+
+
+def test_summary_of_empty_series():
+    """Test a render too short to sample summarizes to zero samples."""
+    assert ProcessSampler(pid=0).summary() == {"samples": 0}
+
+
+def test_samples_child_process():
+    """Test a running child process is sampled until it exits."""
+    process = subprocess.Popen(
+        [sys.executable, "-c", "import time\nend = time.time() + 0.6\nwhile time.time() < end: pass"]
+    )
+    sampler = ProcessSampler(process.pid, interval=0.05)
+    sampler.start()
+    sampler.update_progress(fps=48.0, speed=1.6)
+
+    process.wait()
+    time.sleep(0.1)
+    samples = sampler.stop()
+
+    assert samples
+    assert sampler.started_at is not None
+    assert all(s.rss_bytes > 0 for s in samples)
+    summary = sampler.summary()
+    assert summary["samples"] == len(samples)
+    assert summary["cpu_percent_max"] > 0
+    assert summary["fps_avg"] == 48.0
+
+
+def test_exited_process_is_not_sampled():
+    """Test starting on a process that already exited is a no-op."""
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+
+    sampler = ProcessSampler(process.pid, interval=0.01)
+    sampler.start()
+
+    assert sampler.stop() == []
+    assert sampler.started_at is None
@@ -0,0 +1,234 @@
+"""
+Unit tests for stream-copy planning.
+
+Tests eligibility checks against probe data, keyframe snapping of trims,
+and the worker's stream-copy command.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+from services.ffmpeg.encoder import BACKEND_PRESETS, EncoderBackend
+from services.ffmpeg.input_manager import InputFileManager, MediaFileInfo, StreamInfo
+from services.ffmpeg.stream_copy import StreamCopyClip, StreamCopyPlanner
+
+
+def make_info(
+    name: str,
+    *,
+    codec: str = "h264",
+    width: int = 1920,
+    height: int = 1080,
+    fps: float = 30.0,
+    pix_fmt: str = "yuv420p",
+    profile: str = "High",
+    level: int = 40,
+    extradata_hash: str = "SHA256:aa",
+    audio: bool = True,
+    sample_rate: int = 48000,
+    duration: float = 10.0,
+    format_name: str = "mov,mp4,m4a,3gp,3g2,mj2",
+) -> MediaFileInfo:
+    """Create probe data for a clip."""
+    streams = [
+        StreamInfo(
+            index=0,
+            codec_type="video",
+            codec_name=codec,
+            width=width,
+            height=height,
+            fps=fps,
+            pix_fmt=pix_fmt,
+            profile=profile,
+            level=level,
+            extradata_hash=extradata_hash,
+            sample_aspect_ratio="1:1",
+        )
+    ]
+    if audio:
+        streams.append(
+            StreamInfo(index=1, codec_type="audio", codec_name="aac", sample_rate=sample_rate, channels=2)
+        )
+    return MediaFileInfo(
+        path=Path(f"/tmp/{name}"),
+        format_name=format_name,
+        duration=duration,
+        streams=streams,
+    )
+
+
+def make_planner(infos: dict[str, MediaFileInfo], keyframes: list[float] | None = None) -> StreamCopyPlanner:
+    """Create a planner whose probes return the given data."""
+    manager = MagicMock(spec=InputFileManager)
+    manager.probe_file.side_effect = lambda path: infos[Path(path).name]
+    manager.probe_keyframes.return_value = keyframes if keyframes is not None else [0.0, 2.0, 4.0, 6.0, 8.0]
+    return StreamCopyPlanner(input_manager=manager)
+
+
+def clips(*names: str) -> list[StreamCopyClip]:
+    """Untrimmed clips for the given file names."""
+    return [StreamCopyClip(path=Path(f"/tmp/{name}")) for name in names]
+
+
+class TestEligibility:
+    """Tests for the stream-compatibility checks."""
+
+    def test_matching_clips_are_copied(self):
+        """Test identical H.264/AAC clips at the output format are eligible."""
+        planner = make_planner({"a.mp4": make_info("a.mp4"), "b.mp4": make_info("b.mp4")})
+
+        plan = planner.plan(clips("a.mp4", "b.mp4"), 1920, 1080, 30)
+
+        assert plan.eligible
+        assert plan.has_audio
+        assert [segment.file_path for segment in plan.segments] == [
+            Path("/tmp/a.mp4"),
+            Path("/tmp/b.mp4"),
+        ]
+        planner.input_manager.probe_keyframes.assert_not_called()
+
+    def test_overlays_force_reencode(self):
+        """Test overlays are never stream-copied."""
+        planner = make_planner({"a.mp4": make_info("a.mp4")})
+
+        plan = planner.plan(clips("a.mp4"), 1920, 1080, 30, has_overlays=True)
+
+        assert not plan.eligible
+        planner.input_manager.probe_file.assert_not_called()
+
+    @pytest.mark.parametrize(
+        ("override", "reason"),
+        [
+            ({"width": 1280, "height": 720}, "resolution"),
+            ({"fps": 25.0}, "frame rate"),
+            ({"codec": "hevc"}, "codec"),
+            ({"pix_fmt": "yuv444p"}, "pixel format"),
+            ({"profile": "Main"}, "profile"),
+            ({"level": 41}, "level"),
+            ({"extradata_hash": "SHA256:bb"}, "parameter sets"),
+            ({"audio": False}, "audio present"),
+            ({"sample_rate": 44100}, "audio format"),
+            ({"format_name": "avi"}, "container"),
+        ],
+    )
+    def test_mismatch_rejected(self, override, reason):
+        """Test any mismatch with the output or the first clip forces a re-encode."""
+        planner = make_planner(
+            {"a.mp4": make_info("a.mp4"), "b.mp4": make_info("b.mp4", **override)}
+        )
+
+        plan = planner.plan(clips("a.mp4", "b.mp4"), 1920, 1080, 30)
+
+        assert not plan.eligible
+        assert reason in plan.reason
+
+    def test_hevc_clips_reencoded_for_h264_backend(self):
+        """Test clips that share a codec other than the backend's are re-encoded."""
+        planner = make_planner(
+            {"a.mp4": make_info("a.mp4", codec="hevc"), "b.mp4": make_info("b.mp4", codec="hevc")}
+        )
+        planner.video_codec = BACKEND_PRESETS[EncoderBackend.LIBX264].codec_name
+
+        plan = planner.plan(clips("a.mp4", "b.mp4"), 1920, 1080, 30)
+
+        assert not plan.eligible
+        assert "codec hevc != h264" in plan.reason
+
+    def test_clips_normalized_by_backend_are_copied(self):
+        """Test clips already in the configured backend's codec are copied."""
+        planner = make_planner(
+            {"a.mp4": make_info("a.mp4", codec="hevc"), "b.mp4": make_info("b.mp4", codec="hevc")}
+        )
+        planner.video_codec = BACKEND_PRESETS[EncoderBackend.LIBX265].codec_name
+
+        assert planner.plan(clips("a.mp4", "b.mp4"), 1920, 1080, 30).eligible
+
+    def test_ntsc_rate_within_tolerance(self):
+        """Test 29.97 clips do not match a 30fps output."""
+        planner = make_planner({"a.mp4": make_info("a.mp4", fps=30000 / 1001)})
+
+        assert not planner.plan(clips("a.mp4"), 1920, 1080, 30).eligible
+
+    def test_silent_clips_are_copied(self):
+        """Test clips without audio are eligible when none have audio."""
+        planner = make_planner(
+            {"a.mp4": make_info("a.mp4", audio=False), "b.mp4": make_info("b.mp4", audio=False)}
+        )
+
+        plan = planner.plan(clips("a.mp4", "b.mp4"), 1920, 1080, 30)
+
+        assert plan.eligible
+        assert not plan.has_audio
+
+    def test_probe_failure_rejected(self):
+        """Test probe errors fall back to re-encoding."""
+        manager = MagicMock(spec=InputFileManager)
+        manager.probe_file.side_effect = ValueError("ffprobe failed")
+        planner = StreamCopyPlanner(input_manager=manager)
+
+        plan = planner.plan(clips("a.mp4"), 1920, 1080, 30)
+
+        assert not plan.eligible
+        assert "probe failed" in plan.reason
+
+
+class TestTrims:
+    """Tests for keyframe-aligned trims."""
+
+    def test_keyframe_trims_become_in_and_out_points(self):
+        """Test trims on keyframes are copied with concat in/out points."""
+        planner = make_planner({"a.mp4": make_info("a.mp4")})
+        clip = StreamCopyClip(path=Path("/tmp/a.mp4"), trim_start=2.01, trim_end=6.0)
+
+        plan = planner.plan([clip], 1920, 1080, 30)
+
+        assert plan.eligible
+        assert plan.segments[0].inpoint == 2.0
+        assert plan.segments[0].outpoint == 6.0
+
+    def test_sub_gop_trim_rejected(self):
+        """Test a trim inside a GOP falls back to re-encoding."""
+        planner = make_planner({"a.mp4": make_info("a.mp4")})
+        clip = StreamCopyClip(path=Path("/tmp/a.mp4"), trim_start=3.0)
+
+        plan = planner.plan([clip], 1920, 1080, 30)
+
+        assert not plan.eligible
+        assert "keyframe" in plan.reason
+
+    def test_trim_end_at_file_end_needs_no_keyframe(self):
+        """Test trimming to the file's own end is not a real trim."""
+        planner = make_planner({"a.mp4": make_info("a.mp4", duration=10.0)})
+        clip = StreamCopyClip(path=Path("/tmp/a.mp4"), trim_start=0.0, trim_end=10.0)
+
+        plan = planner.plan([clip], 1920, 1080, 30)
+
+        assert plan.eligible
+        assert plan.segments[0].outpoint is None
+        planner.input_manager.probe_keyframes.assert_not_called()
+
+
+class TestStreamCopyCommand:
+    """Tests for the worker's stream-copy command."""
+
+    def test_command_copies_streams(self):
+        """Test the command uses the concat demuxer and -c copy."""
+        from workers.ffmpeg_pipeline import FFmpegCommandBuilder
+
+        cmd = FFmpegCommandBuilder().build_stream_copy_composition(
+            concat_file=Path("/tmp/list.txt"),
+            output_file=Path("/tmp/out.mp4"),
+            has_audio=True,
+            mux_args=["-movflags", "frag_keyframe+empty_moov+default_base_moof"],
+        )
+
+        assert cmd[cmd.index("-f") + 1] == "concat"
+        assert cmd[cmd.index("-i") + 1] == "/tmp/list.txt"
+        assert cmd[cmd.index("-c") + 1] == "copy"
+        assert "0:a:0" in cmd
+        assert "libx264" not in cmd
+        assert "-filter_complex" not in cmd
+        assert cmd[-1] == "/tmp/out.mp4"
@@ -14,7 +14,9 @@ from services.thumbnail_generator import (
     ThumbnailFormat,
     ThumbnailGenerator,
     ThumbnailGeneratorError,
+    ThumbnailOutput,
     ThumbnailSize,
+    build_thumbnail_command,
 )
 
 
@@ -259,10 +261,11 @@ class TestThumbnailGenerator:
 
         # Mock subprocess
         def run_side_effect(*args, **kwargs):
-            # Create output file based on command
+            # Create every output file named in the command
             cmd = args[0]
-            output_path = Path(cmd[-1])
-            output_path.touch()
+            for arg in cmd:
+                if arg.endswith(".webp"):
+                    Path(arg).touch()
             return MagicMock(returncode=0)
 
         mock_run.side_effect = run_side_effect
@@ -273,6 +276,13 @@ class TestThumbnailGenerator:
             timestamp=1.0,
         )
 
+        # One probe and one FFmpeg process for all sizes
+        mock_manager.probe_file.assert_called_once()
+        mock_run.assert_called_once()
+        cmd = mock_run.call_args[0][0]
+        assert cmd.count("-i") == 1
+        assert "split=3" in cmd[cmd.index("-filter_complex") + 1]
+
         assert len(results) == 3
         assert "small" in results
         assert "medium" in results
@@ -402,3 +412,192 @@ class TestThumbnailGenerator:
 
         assert result.metadata.format == "png"
         assert result.path.suffix == ".png"
+
+    @patch("services.thumbnail_generator.InputFileManager")
+    @patch("subprocess.run")
+    def test_generate_multiple_thumbnails_fallback(
+        self, mock_run, mock_input_manager_class, generator, tmp_path
+    ):
+        """Test the whole batch is retried as JPEG when WebP fails."""
+        video_file = tmp_path / "test.mp4"
+        video_file.touch()
+
+        mock_manager = MagicMock()
+        mock_manager.probe_file.return_value.duration = 10.0
+        generator.input_manager = mock_manager
+
+        def run_side_effect(*args, **kwargs):
+            cmd = args[0]
+            if "libwebp" in cmd:
+                raise subprocess.CalledProcessError(1, "ffmpeg", stderr="WebP not supported")
+            for arg in cmd:
+                if arg.endswith(".jpeg"):
+                    Path(arg).touch()
+            return MagicMock(returncode=0)
+
+        mock_run.side_effect = run_side_effect
+
+        results = generator.generate_multiple_thumbnails(video_path=video_file, timestamp=1.0)
+
+        assert mock_run.call_count == 2
+        assert len(results) == 3
+        for result in results.values():
+            assert result.was_fallback is True
+            assert result.metadata.format == "jpeg"
+            assert result.path.suffix == ".jpeg"
+
+    @patch("services.thumbnail_generator.InputFileManager")
+    @patch("subprocess.run")
+    def test_generate_multiple_thumbnails_failure_returns_empty(
+        self, mock_run, mock_input_manager_class, generator, tmp_path
+    ):
+        """Test a failed batch is logged and yields no thumbnails."""
+        video_file = tmp_path / "test.mp4"
+        video_file.touch()
+
+        mock_manager = MagicMock()
+        mock_manager.probe_file.return_value.duration = 10.0
+        generator.input_manager = mock_manager
+
+        mock_run.side_effect = subprocess.CalledProcessError(1, "ffmpeg", stderr="corrupt input")
+
+        results = generator.generate_multiple_thumbnails(
+            video_path=video_file, format=ThumbnailFormat.JPEG
+        )
+
+        assert results == {}
+        mock_run.assert_called_once()
+
+    @patch("services.thumbnail_generator.InputFileManager")
+    @patch("subprocess.run")
+    def test_generate_storyboard(self, mock_run, mock_input_manager_class, generator, tmp_path):
+        """Test storyboard tiles come from one FFmpeg process with a seek per tile."""
+        video_file = tmp_path / "test.mp4"
+        video_file.touch()
+
+        mock_manager = MagicMock()
+        mock_manager.probe_file.return_value.duration = 60.0
+        generator.input_manager = mock_manager
+
+        def run_side_effect(*args, **kwargs):
+            Path(args[0][-1]).touch()
+            return MagicMock(returncode=0)
+
+        mock_run.side_effect = run_side_effect
+
+        result = generator.generate_storyboard(video_path=video_file, count=12, columns=5)
+
+        mock_run.assert_called_once()
+        cmd = mock_run.call_args[0][0]
+        assert cmd.count("-i") == 12
+        graph = cmd[cmd.index("-filter_complex") + 1]
+        assert "concat=n=12" in graph
+        assert "tile=5x3" in graph
+
+        assert result.path.exists()
+        assert result.timestamps[0] == 2.5
+        assert result.timestamps[-1] == 57.5
+        assert (result.columns, result.rows) == (5, 3)
+        assert result.tile_rect(0) == (0, 0, 160, 90)
+        assert result.tile_rect(7) == (320, 90, 160, 90)
+
+    def test_generate_storyboard_invalid_count(self, generator, tmp_path):
+        """Test out-of-range tile counts are rejected."""
+        video_file = tmp_path / "test.mp4"
+        video_file.touch()
+
+        with pytest.raises(ValueError, match="count"):
+            generator.generate_storyboard(video_path=video_file, count=0)
+
+    @patch("services.thumbnail_generator.InputFileManager")
+    def test_generate_storyboard_needs_duration(
+        self, mock_input_manager_class, generator, tmp_path
+    ):
+        """Test a storyboard cannot be laid out without a known duration."""
+        video_file = tmp_path / "test.mp4"
+        video_file.touch()
+
+        mock_manager = MagicMock()
+        mock_manager.probe_file.side_effect = ValueError("ffprobe failed")
+        generator.input_manager = mock_manager
+
+        with pytest.raises(ThumbnailGeneratorError, match="duration"):
+            generator.generate_storyboard(video_path=video_file)
+
+    @patch("services.thumbnail_generator.InputFileManager")
+    @patch("subprocess.run")
+    def test_frame_scorer_picks_timestamp(
+        self, mock_run, mock_input_manager_class, generator, tmp_path
+    ):
+        """Test a configured frame scorer replaces the requested timestamp."""
+        video_file = tmp_path / "test.mp4"
+        video_file.touch()
+
+        mock_manager = MagicMock()
+        mock_manager.probe_file.return_value.duration = 10.0
+        generator.input_manager = mock_manager
+        generator.frame_scorer = MagicMock()
+        generator.frame_scorer.best_timestamp.return_value = 6.5
+
+        def run_side_effect(*args, **kwargs):
+            for arg in args[0]:
+                if arg.endswith(".webp"):
+                    Path(arg).touch()
+            return MagicMock(returncode=0)
+
+        mock_run.side_effect = run_side_effect
+
+        results = generator.generate_multiple_thumbnails(
+            video_path=video_file, timestamp=1.0, checksum="abc123"
+        )
+
+        generator.frame_scorer.best_timestamp.assert_called_once_with(
+            video_file, 10.0, checksum="abc123"
+        )
+        cmd = mock_run.call_args[0][0]
+        assert cmd[cmd.index("-ss") + 1] == "6.5"
+        assert results["small"].metadata.timestamp == 6.5
+
+
+class TestBuildThumbnailCommand:
+    """Test cases for build_thumbnail_command."""
+
+    def test_single_output_uses_simple_filter(self):
+        """Test one output is a plain -vf extraction."""
+        cmd = build_thumbnail_command(
+            "ffmpeg",
+            "/tmp/in.mp4",
+            2.0,
+            [ThumbnailOutput(Path("/tmp/out.jpeg"), 320, 180, ThumbnailFormat.JPEG)],
+        )
+
+        assert cmd[cmd.index("-ss") + 1] == "2.0"
+        assert "-filter_complex" not in cmd
+        assert cmd[cmd.index("-vf") + 1].startswith("scale=320:180")
+        assert cmd[-1] == "/tmp/out.jpeg"
+
+    def test_width_only_keeps_aspect_ratio(self):
+        """Test a missing height scales to the width without padding."""
+        output = ThumbnailOutput(Path("/tmp/out.jpg"), 320, None, ThumbnailFormat.JPEG)
+
+        assert output.scale_filter == "scale=320:-1"
+
+    def test_multiple_outputs_split_one_decode(self):
+        """Test several outputs share one seek and one decoded frame."""
+        cmd = build_thumbnail_command(
+            "ffmpeg",
+            "/tmp/in.mp4",
+            1.0,
+            [
+                ThumbnailOutput(Path("/tmp/a.webp"), 320, 180, ThumbnailFormat.WEBP),
+                ThumbnailOutput(Path("/tmp/b.jpeg"), 640, 360, ThumbnailFormat.JPEG),
+            ],
+        )
+
+        assert cmd.count("-ss") == 1
+        assert cmd.count("-i") == 1
+        assert cmd[cmd.index("-filter_complex") + 1].startswith("[0:v]split=2[s0][s1]")
+        assert cmd.count("-map") == 2
+        assert cmd.count("-frames:v") == 2
+        assert cmd.index("libwebp") < cmd.index("/tmp/a.webp") < cmd.index("-q:v")
+        assert cmd[-1] == "/tmp/b.jpeg"
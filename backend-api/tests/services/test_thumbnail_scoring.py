@@ -0,0 +1,186 @@
+"""
+Unit tests for content-aware thumbnail frame selection.
+
+Tests frame scoring, the sampling pass, and the per-checksum cache.
+"""
+
+import os
+import subprocess
+import time
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+from services.thumbnail_scoring import (
+    SAMPLE_HEIGHT,
+    SAMPLE_WIDTH,
+    ThumbnailFrameScorer,
+    score_frames,
+)
+
+
+def make_frame(kind: str) -> np.ndarray:
+    """Create a grayscale sample frame."""
+    rng = np.random.default_rng(0)
+    if kind == "black":
+        return np.full((SAMPLE_HEIGHT, SAMPLE_WIDTH), 16, dtype=np.uint8)
+    if kind == "flat":
+        return np.full((SAMPLE_HEIGHT, SAMPLE_WIDTH), 120, dtype=np.uint8)
+    if kind == "white":
+        return np.full((SAMPLE_HEIGHT, SAMPLE_WIDTH), 250, dtype=np.uint8)
+
+    detail = rng.integers(40, 216, size=(SAMPLE_HEIGHT, SAMPLE_WIDTH)).astype(np.float32)
+    if kind == "blurry":
+        # Box-blur the same content so only sharpness differs
+        for axis in (0, 1):
+            detail = (detail + np.roll(detail, 1, axis) + np.roll(detail, -1, axis)) / 3
+            detail = (detail + np.roll(detail, 1, axis) + np.roll(detail, -1, axis)) / 3
+    return detail.astype(np.uint8)
+
+
+def ffmpeg_output(kinds: list[str], timestamps: list[float]) -> MagicMock:
+    """Create the result of an FFmpeg sampling pass."""
+    stdout = b"".join(make_frame(kind).tobytes() for kind in kinds)
+    stderr = "".join(
+        f"[Parsed_showinfo_3 @ 0x1] n:{i} pts:{int(t * 1000)} pts_time:{t} duration:1\n"
+        for i, t in enumerate(timestamps)
+    )
+    return MagicMock(returncode=0, stdout=stdout, stderr=stderr.encode())
+
+
+class TestScoreFrames:
+    """Test cases for score_frames."""
+
+    def test_unusable_frames_score_zero(self):
+        """Test black, blown-out and flat frames are rejected."""
+        frames = np.stack([make_frame(kind) for kind in ("black", "white", "flat", "sharp")])
+
+        scores = score_frames(frames, [1.0, 2.0, 3.0, 4.0])
+
+        assert [score.score for score in scores[:3]] == [0.0, 0.0, 0.0]
+        assert scores[3].score > 0
+
+    def test_sharp_frame_beats_blurry_frame(self):
+        """Test sharpness ranks frames of the same content."""
+        frames = np.stack([make_frame("blurry"), make_frame("sharp")])
+
+        blurry, sharp = score_frames(frames, [1.0, 2.0])
+
+        assert sharp.sharpness > blurry.sharpness
+        assert sharp.score > blurry.score
+
+    def test_empty_sample(self):
+        """Test an empty sample yields no scores."""
+        frames = np.empty((0, SAMPLE_HEIGHT, SAMPLE_WIDTH), dtype=np.uint8)
+
+        assert score_frames(frames, []) == []
+
+
+class TestThumbnailFrameScorer:
+    """Test cases for ThumbnailFrameScorer."""
+
+    @pytest.fixture
+    def video_file(self, tmp_path):
+        """Create a placeholder video file."""
+        video_file = tmp_path / "test.mp4"
+        video_file.write_bytes(b"video")
+        return video_file
+
+    @patch("subprocess.run")
+    def test_best_timestamp_picks_best_keyframe(self, mock_run, video_file, tmp_path):
+        """Test the best usable keyframe is chosen in one keyframe-only pass."""
+        mock_run.return_value = ffmpeg_output(
+            ["black", "blurry", "sharp", "blurry", "sharp", "white"],
+            [0.0, 2.0, 4.0, 6.0, 8.0, 10.0],
+        )
+        scorer = ThumbnailFrameScorer(cache_dir=tmp_path / "scores")
+
+        timestamp = scorer.best_timestamp(video_file, video_duration=12.0)
+
+        assert timestamp == 4.0
+        mock_run.assert_called_once()
+        cmd = mock_run.call_args[0][0]
+        assert cmd[cmd.index("-skip_frame") + 1] == "nokey"
+
+    @patch("subprocess.run")
+    def test_result_cached_per_checksum(self, mock_run, video_file, tmp_path):
+        """Test re-thumbnailing an asset with the same checksum skips scoring."""
+        mock_run.return_value = ffmpeg_output(
+            ["sharp", "blurry", "blurry", "blurry"], [2.0, 4.0, 6.0, 8.0]
+        )
+        scorer = ThumbnailFrameScorer(cache_dir=tmp_path / "scores")
+
+        first = scorer.best_timestamp(video_file, video_duration=10.0, checksum="abc123")
+        second = scorer.best_timestamp(video_file, video_duration=10.0, checksum="abc123")
+        ThumbnailFrameScorer(cache_dir=tmp_path / "scores").best_timestamp(
+            Path("/elsewhere/copy.mp4"), video_duration=10.0, checksum="abc123"
+        )
+
+        assert first == second == 2.0
+        mock_run.assert_called_once()
+
+    @patch("subprocess.run")
+    def test_cache_keeps_most_recently_used(self, mock_run, video_file, tmp_path):
+        """Test the cache is pruned to max_cache_entries, oldest use first."""
+        mock_run.return_value = ffmpeg_output(
+            ["sharp", "blurry", "blurry", "blurry"], [2.0, 4.0, 6.0, 8.0]
+        )
+        scorer = ThumbnailFrameScorer(cache_dir=tmp_path / "scores", max_cache_entries=2)
+
+        for checksum in ("a", "b"):
+            scorer.best_timestamp(video_file, video_duration=10.0, checksum=checksum)
+        old = time.time() - 60
+        for checksum in ("a", "b"):
+            os.utime(scorer._get_cache_path(video_file, checksum), (old, old))
+        scorer.best_timestamp(video_file, video_duration=10.0, checksum="a")
+        scorer.best_timestamp(video_file, video_duration=10.0, checksum="c")
+
+        assert mock_run.call_count == 3
+        assert not scorer._get_cache_path(video_file, "b").exists()
+        assert scorer._get_cache_path(video_file, "a").exists()
+        assert len(list((tmp_path / "scores").iterdir())) == 2
+
+    @patch("subprocess.run")
+    def test_few_keyframes_falls_back_to_even_sampling(self, mock_run, video_file):
+        """Test a single-GOP video is sampled evenly instead of by keyframe."""
+        mock_run.side_effect = [
+            ffmpeg_output(["black"], [0.0]),
+            ffmpeg_output(["blurry", "sharp", "blurry"], [1.0, 2.0, 3.0]),
+        ]
+        scorer = ThumbnailFrameScorer()
+
+        timestamp = scorer.best_timestamp(video_file, video_duration=4.0)
+
+        assert timestamp == 2.0
+        assert mock_run.call_count == 2
+        cmd = mock_run.call_args[0][0]
+        assert "-skip_frame" not in cmd
+        assert cmd[cmd.index("-vf") + 1].startswith("fps=40/4.000")
+
+    @patch("subprocess.run")
+    def test_no_usable_frame(self, mock_run, video_file):
+        """Test a video of only black frames yields no timestamp."""
+        mock_run.return_value = ffmpeg_output(["black", "black"], [1.0, 2.0])
+        scorer = ThumbnailFrameScorer()
+
+        assert scorer.best_timestamp(video_file, video_duration=3.0) is None
+
+    @patch("subprocess.run")
+    def test_failure_not_cached(self, mock_run, video_file, tmp_path):
+        """Test scoring failures return None and are retried next time."""
+        mock_run.side_effect = subprocess.CalledProcessError(1, "ffmpeg")
+        scorer = ThumbnailFrameScorer(cache_dir=tmp_path / "scores")
+
+        assert scorer.best_timestamp(video_file, video_duration=10.0) is None
+        assert not list((tmp_path / "scores").iterdir())
+
+    @patch("subprocess.run")
+    def test_mismatched_output_rejected(self, mock_run, video_file):
+        """Test frames without matching timestamps are treated as a failure."""
+        result = ffmpeg_output(["sharp", "sharp"], [2.0, 4.0])
+        result.stderr = b""
+        mock_run.return_value = result
+        scorer = ThumbnailFrameScorer()
+
+        assert scorer.best_timestamp(video_file, video_duration=10.0) is None
@@ -0,0 +1,185 @@
+"""
+Unit tests for the tracing layer.
+
+Tests span nesting and error recording with the in-memory exporter, the no-op
+default, traceparent propagation and the request tracing middleware.
+"""
+
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from services.tracing import (
+    NOOP_SPAN,
+    InMemorySpanExporter,
+    configure_tracing,
+    continue_trace,
+    current_span,
+    inject_context,
+    parse_traceparent,
+    span,
+    traced,
+)
+
+from app.middleware.request_id import RequestIDMiddleware
+from app.middleware.tracing import TracingMiddleware
+
+REMOTE_TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+REMOTE_SPAN_ID = "00f067aa0ba902b7"
+REMOTE_TRACEPARENT = f"00-{REMOTE_TRACE_ID}-{REMOTE_SPAN_ID}-01"
+
+
+@pytest.fixture
+def exporter():
+    """Record spans in memory, restoring the no-op tracer afterwards."""
+    exporter = InMemorySpanExporter()
+    configure_tracing(exporter=exporter)
+    yield exporter
+    configure_tracing()
+
+
+def test_spans_nest_within_a_trace(exporter):
+    """Test child spans share the trace ID and point at their parent."""
+    with span("job.composition", {"job.id": "job-1"}) as parent:
+        with span("job.download"):
+            pass
+        with span("job.render") as render:
+            render.set_attribute("ffmpeg.frames", 90)
+
+    assert exporter.names() == ["job.download", "job.render", "job.composition"]
+    download = exporter.get("job.download")
+    assert download.trace_id == parent.trace_id
+    assert download.parent_id == parent.span_id
+    assert parent.parent_id is None
+    assert parent.attributes == {"job.id": "job-1"}
+    assert exporter.get("job.render").attributes == {"ffmpeg.frames": 90}
+    assert all(s.duration_ms is not None and s.duration_ms >= 0 for s in exporter.spans)
+
+
+def test_span_records_exception(exporter):
+    """Test a failing block marks the span as an error and re-raises."""
+    with pytest.raises(RuntimeError, match="encode failed"), span("ffmpeg.encode"):
+        raise RuntimeError("encode failed")
+
+    failed = exporter.get("ffmpeg.encode")
+    assert failed.status == "error"
+    assert failed.error == "RuntimeError: encode failed"
+    assert failed.end_time is not None
+
+
+def test_traced_wraps_sync_and_async_functions(exporter):
+    """Test the decorator opens a span per call and exposes it as the current span."""
+
+    @traced("s3.download")
+    def download(key):
+        current_span().set_attribute("s3.key", key)
+        return key
+
+    @traced("redis.publish_progress")
+    async def publish():
+        return "sent"
+
+    assert download("a.mp4") == "a.mp4"
+    assert asyncio.run(publish()) == "sent"
+
+    assert exporter.names() == ["s3.download", "redis.publish_progress"]
+    assert exporter.get("s3.download").attributes == {"s3.key": "a.mp4"}
+
+
+def test_noop_tracer_is_default():
+    """Test spans are free no-ops and nothing is propagated by default."""
+    configure_tracing()
+
+    with span("job.download") as current:
+        current.set_attribute("ignored", True)
+
+    assert current is NOOP_SPAN
+    assert current_span() is NOOP_SPAN
+    assert inject_context() == {}
+
+
+def test_inject_and_continue_round_trip(exporter):
+    """Test a trace crosses a process boundary through the carrier."""
+    with span("http.request") as request_span:
+        carrier = inject_context()
+
+    assert carrier == {"traceparent": request_span.traceparent}
+
+    with continue_trace(carrier), span("job.composition") as job_span:
+        pass
+
+    assert job_span.trace_id == request_span.trace_id
+    assert job_span.parent_id == request_span.span_id
+
+
+def test_continue_trace_ignores_missing_context(exporter):
+    """Test jobs enqueued without trace context start their own trace."""
+    with continue_trace({}), span("job.composition") as job_span:
+        pass
+
+    assert job_span.parent_id is None
+    assert len(job_span.trace_id) == 32
+
+
+def test_job_functions_continue_enqueuer_trace(exporter, monkeypatch):
+    """Test decorated RQ job functions join the trace stored in their job meta."""
+    from workers import job_queue
+
+    with span("http.request") as request_span:
+        meta = inject_context()
+    monkeypatch.setattr(job_queue, "get_current_job", lambda: type("Job", (), {"meta": meta}))
+
+    @job_queue.continues_enqueuer_trace
+    def import_job():
+        with span("job.import") as job_span:
+            return job_span
+
+    job_span = import_job()
+
+    assert job_span.trace_id == request_span.trace_id
+    assert job_span.parent_id == request_span.span_id
+
+
+@pytest.mark.parametrize(
+    "value,expected",
+    [
+        (REMOTE_TRACEPARENT, (REMOTE_TRACE_ID, REMOTE_SPAN_ID)),
+        (REMOTE_TRACEPARENT.upper(), (REMOTE_TRACE_ID, REMOTE_SPAN_ID)),
+        ("", None),
+        (None, None),
+        ("00-abc-def-01", None),
+        (f"00-{'0' * 32}-{REMOTE_SPAN_ID}-01", None),
+        (f"00-{REMOTE_TRACE_ID}-{'0' * 16}-01", None),
+    ],
+)
+def test_parse_traceparent(value, expected):
+    """Test traceparent parsing accepts valid values and rejects malformed ones."""
+    assert parse_traceparent(value) == expected
+
+
+def test_middleware_continues_incoming_trace(exporter):
+    """Test the middleware opens a request span under the caller's traceparent."""
+    app = FastAPI()
+    app.add_middleware(TracingMiddleware)
+    app.add_middleware(RequestIDMiddleware)
+
+    @app.get("/enqueue")
+    async def enqueue() -> dict:
+        return inject_context()
+
+    response = TestClient(app).get(
+        "/enqueue", headers={"traceparent": REMOTE_TRACEPARENT, "X-Request-ID": "req-9"}
+    )
+
+    request_span = exporter.get("http.request")
+    assert request_span.trace_id == REMOTE_TRACE_ID
+    assert request_span.parent_id == REMOTE_SPAN_ID
+    assert request_span.attributes == {
+        "http.method": "GET",
+        "http.target": "/enqueue",
+        "http.status_code": 200,
+        "http.request_id": "req-9",
+    }
+    # Work enqueued by the handler carries the request span's context
+    assert response.json() == {"traceparent": request_span.traceparent}
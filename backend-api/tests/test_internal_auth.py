@@ -7,10 +7,12 @@ Tests API key authentication, JWT token validation, rate limiting, and security.
 import time
 from unittest.mock import MagicMock, patch
 
+import fakeredis
 import jwt
 import pytest
 from app.config import Settings
 from app.middleware.internal_auth import InternalAuthMiddleware
+from app.middleware.rate_limiting import SlidingWindowRateLimiter
 from fastapi import FastAPI, Request
 from fastapi.testclient import TestClient
 
@@ -56,7 +58,8 @@ def app_with_auth(mock_settings, mock_redis):
         "app.middleware.internal_auth.get_settings", return_value=mock_settings
     )
     redis_patcher = patch(
-        "app.middleware.internal_auth.get_redis_connection", return_value=mock_redis
+        "app.middleware.internal_auth.get_rate_limiter",
+        return_value=SlidingWindowRateLimiter(redis_client=mock_redis),
     )
 
     settings_patcher.start()
@@ -78,12 +81,8 @@ def client(app_with_auth):
 
 @pytest.fixture
 def mock_redis():
-    """Mock Redis connection."""
-    redis_mock = MagicMock()
-    redis_mock.pipeline.return_value = redis_mock
-    redis_mock.execute.return_value = [None, 0, None, None]
-    redis_mock.zrange.return_value = []
-    return redis_mock
+    """In-memory async Redis with Lua scripting for the rate limiter."""
+    return fakeredis.FakeAsyncRedis(decode_responses=True)
 
 
 class TestInternalAuthMiddleware:
@@ -117,13 +116,12 @@ class TestInternalAuthMiddleware:
 
     def test_valid_api_key_authentication(self, client, mock_redis):
         """Test successful API key authentication."""
-        with patch("app.middleware.internal_auth.get_redis_connection", return_value=mock_redis):
-            response = client.get(
-                "/internal/v1/test",
-                headers={"X-API-Key": "test-key-1"},
-            )
-            assert response.status_code == 200
-            assert response.json() == {"message": "Internal API endpoint"}
+        response = client.get(
+            "/internal/v1/test",
+            headers={"X-API-Key": "test-key-1"},
+        )
+        assert response.status_code == 200
+        assert response.json() == {"message": "Internal API endpoint"}
 
     def test_invalid_api_key_rejected(self, client):
         """Test that invalid API keys are rejected."""
@@ -196,32 +194,40 @@ class TestInternalAuthMiddleware:
 
     def test_rate_limit_headers_included(self, client, mock_redis):
         """Test that rate limit headers are included in response."""
-        mock_redis.execute.return_value = [None, 3, None, None]
-
-        with patch("app.middleware.internal_auth.get_redis_connection", return_value=mock_redis):
-            response = client.get(
-                "/internal/v1/test",
-                headers={"X-API-Key": "test-key-1"},
-            )
+        response = client.get(
+            "/internal/v1/test",
+            headers={"X-API-Key": "test-key-1"},
+        )
 
-            assert response.status_code == 200
-            assert "X-RateLimit-Limit" in response.headers
-            assert "X-RateLimit-Remaining" in response.headers
+        assert response.status_code == 200
+        assert response.headers["X-RateLimit-Limit"] == "10"
+        assert response.headers["X-RateLimit-Remaining"] == "9"
 
     def test_rate_limit_per_api_key_enforced(self, client, mock_redis):
         """Test that rate limiting is enforced per API key."""
-        # Simulate rate limit exceeded
-        mock_redis.execute.return_value = [None, 10, None, None]
-        mock_redis.zrange.return_value = [(b"timestamp", int(time.time()) - 30)]
-
-        with patch("app.middleware.internal_auth.get_redis_connection", return_value=mock_redis):
+        # Use up the 10 requests allowed per window
+        for _ in range(10):
             response = client.get(
                 "/internal/v1/test",
                 headers={"X-API-Key": "test-key-1"},
             )
+            assert response.status_code == 200
+
+        response = client.get(
+            "/internal/v1/test",
+            headers={"X-API-Key": "test-key-1"},
+        )
 
-            assert response.status_code == 429
-            assert "rate limit exceeded" in response.json()["message"].lower()
+        assert response.status_code == 429
+        assert "rate limit exceeded" in response.json()["message"].lower()
+        assert int(response.headers["Retry-After"]) >= 1
+
+        # Other API keys have their own window
+        response = client.get(
+            "/internal/v1/test",
+            headers={"X-API-Key": "test-key-2"},
+        )
+        assert response.status_code == 200
 
     def test_missing_authentication_rejected(self, client):
         """Test that requests without authentication are rejected."""
@@ -239,28 +245,25 @@ class TestInternalAuthMiddleware:
 
     def test_multiple_api_keys_work(self, client, mock_redis):
         """Test that multiple configured API keys all work."""
-        with patch("app.middleware.internal_auth.get_redis_connection", return_value=mock_redis):
-            for api_key in ["test-key-1", "test-key-2"]:
-                response = client.get(
-                    "/internal/v1/test",
-                    headers={"X-API-Key": api_key},
-                )
-                assert response.status_code == 200
-
-    def test_redis_failure_allows_request(self, client):
-        """Test that Redis failures fail open (allow request)."""
-        # Mock Redis to raise exception
-        failing_redis = MagicMock()
-        failing_redis.pipeline.side_effect = Exception("Redis connection failed")
-
-        with patch("app.middleware.internal_auth.get_redis_connection", return_value=failing_redis):
+        for api_key in ["test-key-1", "test-key-2"]:
             response = client.get(
                 "/internal/v1/test",
-                headers={"X-API-Key": "test-key-1"},
+                headers={"X-API-Key": api_key},
             )
-            # Should allow request even if Redis fails
             assert response.status_code == 200
 
+    def test_redis_failure_allows_request(self, client, mock_redis):
+        """Test that Redis failures fail open (allow request)."""
+        # Make every script call raise
+        mock_redis.evalsha = MagicMock(side_effect=Exception("Redis connection failed"))
+
+        response = client.get(
+            "/internal/v1/test",
+            headers={"X-API-Key": "test-key-1"},
+        )
+        # Should allow request even if Redis fails
+        assert response.status_code == 200
+
 
 class TestInternalAuthConfiguration:
     """Test cases for authentication configuration."""
@@ -6,9 +6,11 @@ Tests process-clips endpoint with various request scenarios.
 
 from unittest.mock import MagicMock, patch
 
+import fakeredis
 import pytest
 from app.config import Settings
 from app.main import create_app
+from app.middleware.rate_limiting import SlidingWindowRateLimiter
 from fastapi.testclient import TestClient
 
 
@@ -37,16 +39,15 @@ def client(mock_settings, mock_redis):
 
     Uses context managers to keep patches active during test execution.
     """
-    # Mock rate limiting to allow requests
-    mock_redis.pipeline.return_value = mock_redis
-    mock_redis.execute.return_value = [None, 0, None, None]
-    mock_redis.zrange.return_value = []
+    # Rate limiting runs against an in-memory Redis
+    limiter = SlidingWindowRateLimiter(redis_client=fakeredis.FakeAsyncRedis(decode_responses=True))
 
     # Create patches
     patches = [
         patch("app.middleware.internal_auth.get_settings", return_value=mock_settings),
         patch("app.api.internal.clips.get_redis_connection", return_value=mock_redis),
-        patch("app.middleware.internal_auth.get_redis_connection", return_value=mock_redis),
+        patch("app.middleware.internal_auth.get_rate_limiter", return_value=limiter),
+        patch("app.middleware.rate_limiting.get_rate_limiter", return_value=limiter),
     ]
 
     # Start all patches
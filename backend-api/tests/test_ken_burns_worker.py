@@ -0,0 +1,115 @@
+"""Unit tests for Ken Burns slideshow rendering."""
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+from workers.ken_burns_worker import (
+    KenBurnsMotion,
+    build_ken_burns_command,
+    build_ken_burns_filter,
+    render_ken_burns_frames,
+    supersample_factor,
+)
+
+MOTION = KenBurnsMotion(1.0, 1.25, (0.5, 0.5), (0.45, 0.55))
+
+
+@pytest.mark.parametrize(
+    ("width", "height", "factor"),
+    [(1280, 720, 3), (1920, 1080, 3), (3840, 2160, 2), (7680, 4320, 1)],
+)
+def test_supersample_factor_shrinks_with_output_size(width: int, height: int, factor: int) -> None:
+    """Test the canvas upscale stays within the pixel budget."""
+    assert supersample_factor(width, height) == factor
+
+
+def test_random_motion_keeps_crop_inside_image() -> None:
+    """Test random centers leave room for the crop at their zoom."""
+    for _ in range(50):
+        motion = KenBurnsMotion.random()
+        for zoom, center in (
+            (motion.zoom_start, motion.center_start),
+            (motion.zoom_end, motion.center_end),
+        ):
+            margin = 0.5 / zoom
+            assert all(margin <= c <= 1.0 - margin for c in center)
+
+
+def test_filter_renders_all_images_in_one_graph() -> None:
+    """Test each image gets one zoompan chain and the chains are concatenated."""
+    graph = build_ken_burns_filter([MOTION, MOTION, MOTION], 1920, 1080, num_frames=75)
+
+    assert graph.count("zoompan=") == 3
+    assert "scale=5760:3240" in graph
+    assert "scale=4*iw" not in graph
+    assert graph.endswith("[s0][s1][s2]concat=n=3:v=1:a=0[v]")
+
+
+def test_command_encodes_once_with_audio() -> None:
+    """Test the command takes every image, maps the soundtrack and encodes once."""
+    cmd = build_ken_burns_command(
+        ffmpeg_path="/opt/ffmpeg",
+        image_paths=[Path("/tmp/a.jpg"), Path("/tmp/b.jpg")],
+        motions=[MOTION, MOTION],
+        width=1280,
+        height=720,
+        segment_duration=3.0,
+        encoder_args=["-c:v", "libx264"],
+        output_path=Path("/tmp/out.mp4"),
+        audio_path=Path("/tmp/audio.mp3"),
+    )
+
+    assert cmd[0] == "/opt/ffmpeg"
+    assert cmd.count("-i") == 3
+    assert "-loop" not in cmd
+    assert cmd[cmd.index("-filter_complex") + 1].count(":d=75:") == 2
+    assert cmd.count("-c:v") == 1
+    assert cmd[cmd.index("2:a") - 1] == "-map"
+    assert "-shortest" in cmd
+    assert cmd[-1] == "/tmp/out.mp4"
+
+
+def planes_for(canvas: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Transposed Y plane plus flat chroma for a luma canvas."""
+    height, width = canvas.shape
+    chroma = np.full((width // 2, height // 2), 128, dtype=np.uint8)
+    return np.ascontiguousarray(canvas.T), chroma, chroma
+
+
+def test_trajectory_matches_zoompan_crop() -> None:
+    """Test the vectorized crop path starts and moves like the zoompan expressions."""
+    x, y, crop_w, crop_h = MOTION.trajectory(50, 2400, 1350)
+
+    assert crop_w[0] == 2400 and crop_h[0] == 1350
+    assert x[0] == 0 and y[0] == 0
+    assert crop_w[25] == pytest.approx(2400 / 1.125)
+    assert x[25] == pytest.approx(0.475 * 2400 - crop_w[25] / 2)
+    assert np.all(np.diff(crop_w) < 0)
+
+
+def test_numpy_frames_copy_an_unscaled_crop_exactly() -> None:
+    """Test a crop at output size on whole pixels is reproduced without filtering."""
+    rng = np.random.default_rng(0)
+    canvas = rng.integers(0, 256, size=(100, 160), dtype=np.uint8)
+    # Zoom 1.25 on a 160x100 canvas is a 128x80 crop; this center puts it at (12, 6)
+    motion = KenBurnsMotion(1.25, 1.25, (76 / 160, 46 / 100), (76 / 160, 46 / 100))
+
+    frame = next(render_ken_burns_frames(planes_for(canvas), motion, 128, 80, num_frames=4))
+
+    np.testing.assert_array_equal(frame[: 128 * 80].reshape(80, 128), canvas[6:86, 12:140])
+
+
+def test_numpy_frames_interpolate_between_pixels() -> None:
+    """Test a half-pixel offset averages neighbouring pixels."""
+    canvas = np.tile(np.array([0, 200], dtype=np.uint8), (100, 80))
+    motion = KenBurnsMotion(1.25, 1.25, (76.5 / 160, 0.5), (76.5 / 160, 0.5))
+
+    frames = [
+        frame.copy()
+        for frame in render_ken_burns_frames(planes_for(canvas), motion, 128, 80, num_frames=3)
+    ]
+
+    assert len(frames) == 3
+    assert len(frames[0]) == 128 * 80 * 3 // 2
+    assert np.all(np.abs(frames[0][: 128 * 80].astype(int) - 100) <= 1)
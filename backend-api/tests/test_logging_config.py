@@ -1,14 +1,20 @@
 """Unit tests for structured JSON logging configuration."""
 
+import gzip
 import json
 import logging
+import queue
+import threading
 from io import StringIO
 
 import pytest
 
 try:
     from app.logging_config import (
+        CompressingRotatingFileHandler,
         CustomJsonFormatter,
+        LogRateLimitFilter,
+        NonBlockingQueueHandler,
         clear_context,
         get_logger,
         set_composition_id,
@@ -16,10 +22,15 @@ try:
         set_request_id,
         set_user_id,
         setup_logging,
+        start_queue_listener,
+        stop_logging,
     )
 except ImportError:
     from src.app.logging_config import (
+        CompressingRotatingFileHandler,
         CustomJsonFormatter,
+        LogRateLimitFilter,
+        NonBlockingQueueHandler,
         clear_context,
         get_logger,
         set_composition_id,
@@ -27,6 +38,8 @@ except ImportError:
         set_request_id,
         set_user_id,
         setup_logging,
+        start_queue_listener,
+        stop_logging,
     )
 
 
@@ -268,3 +281,114 @@ def test_context_variable_isolation() -> None:
 
     # Clean up
     clear_context()
+
+
+def test_queued_logging_formats_on_listener_with_caller_context(
+    json_log_handler: tuple[logging.Handler, StringIO]
+) -> None:
+    """Test queued records keep the caller's context and are written by the listener."""
+    handler, stream = json_log_handler
+    queue_handler = start_queue_listener([handler], queue_size=100, rate_limit=None)
+
+    logger = logging.getLogger("test_queued")
+    logger.handlers = [queue_handler]
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+
+    set_request_id("req-queued")
+    try:
+        logger.info("Rendered %s frames", 90, extra={"stage": "encode"})
+        try:
+            raise ValueError("bad input")
+        except ValueError:
+            logger.exception("Render failed")
+    finally:
+        clear_context()
+        stop_logging()
+
+    first, second = (json.loads(line) for line in stream.getvalue().strip().split("\n"))
+    assert first["message"] == "Rendered 90 frames"
+    assert first["request_id"] == "req-queued"
+    assert first["stage"] == "encode"
+    assert first["thread_id"] == threading.get_ident()
+    assert second["exception"]["type"] == "ValueError"
+
+
+def test_full_queue_drops_and_reports() -> None:
+    """Test records are dropped rather than blocking and the drop count is reported."""
+    log_queue: queue.Queue = queue.Queue(maxsize=1)
+    handler = NonBlockingQueueHandler(log_queue, block_timeout=0.01)
+
+    logger = logging.getLogger("test_dropping")
+    logger.handlers = [handler]
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+
+    logger.info("kept")
+    logger.info("dropped")
+    logger.warning("dropped after waiting")
+    assert handler.dropped == 2
+
+    assert log_queue.get_nowait().getMessage() == "kept"
+    logger.info("after drain")
+
+    report = log_queue.get_nowait()
+    assert report.levelno == logging.WARNING
+    assert report.dropped_records == 2
+    assert handler.dropped == 1  # "after drain" found the queue full again
+
+
+def test_rate_limit_filter_limits_prefixed_lines_per_logger() -> None:
+    """Test chatty prefixes are limited per logger and suppressed counts are reported."""
+    now = [0.0]
+    rate_limit = LogRateLimitFilter(rate=1.0, burst=2, clock=lambda: now[0])
+
+    def record(name: str, msg: str, level: int = logging.WARNING) -> logging.LogRecord:
+        return logging.LogRecord(name, level, __file__, 1, msg, None, None)
+
+    results = [rate_limit.filter(record("ai", f"[CHATGPT_INPUT] line {i}")) for i in range(5)]
+    assert results == [True, True, False, False, False]
+
+    # Other loggers, other prefixes, unprefixed lines and errors are unaffected
+    assert rate_limit.filter(record("webhooks", "[CHATGPT_INPUT] line"))
+    assert rate_limit.filter(record("ai", "[WEBHOOK] line"))
+    assert rate_limit.filter(record("ai", "Plain line"))
+    assert rate_limit.filter(record("ai", "[CHATGPT_INPUT] failed", logging.ERROR))
+
+    now[0] = 1.0
+    allowed = record("ai", "[CHATGPT_OUTPUT] line")
+    assert rate_limit.filter(allowed)
+    assert allowed.suppressed == 3
+
+
+def test_rotated_file_is_compressed_in_background(tmp_path) -> None:
+    """Test size-based rollover gzips the rotated file off the logging thread."""
+    log_file = tmp_path / "access.log"
+    handler = CompressingRotatingFileHandler(log_file, maxBytes=200, backupCount=2)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+
+    logger = logging.getLogger("test_rotation")
+    logger.handlers = [handler]
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+
+    for i in range(10):
+        logger.info("line %d %s", i, "x" * 50)
+    for thread in threading.enumerate():
+        if thread.name == "log-compress":
+            thread.join()
+    handler.close()
+
+    rotated = tmp_path / "access.log.1.gz"
+    assert rotated.exists()
+    assert "line" in gzip.decompress(rotated.read_bytes()).decode()
+
+
+def test_setup_logging_uses_queue_handler() -> None:
+    """Test setup_logging routes the root logger through a background queue."""
+    setup_logging(environment="development", log_level="INFO", enable_file_logging=False)
+
+    try:
+        assert [type(h) for h in logging.getLogger().handlers] == [NonBlockingQueueHandler]
+    finally:
+        stop_logging()
@@ -9,6 +9,7 @@ import pytest
 from sqlalchemy.ext.asyncio import AsyncSession
 from src.db.models import JobMetric, MetricType
 from src.services.metrics import JobMetricsContext, MetricsCollector
+from src.services.resource_sampler import ResourceSample
 
 
 @pytest.fixture
@@ -128,6 +129,40 @@ class TestMetricsCollector:
         assert count == 0
         assert not mock_session.add_all.called
 
+    def test_add_resource_samples(
+        self,
+        metrics_collector: MetricsCollector,
+        sample_composition_id: uuid.UUID,
+    ) -> None:
+        """Test an FFmpeg resource series is batched as timestamped metrics."""
+        started_at = datetime.now(UTC)
+        samples = [
+            ResourceSample(
+                elapsed=1.0,
+                cpu_percent=180.0,
+                rss_bytes=200 * 1024 * 1024,
+                read_bytes=4096,
+                write_bytes=8192,
+                fps=60.0,
+                speed=2.0,
+            ),
+            ResourceSample(elapsed=2.0, cpu_percent=190.0, rss_bytes=210 * 1024 * 1024),
+        ]
+
+        count = metrics_collector.add_resource_samples(
+            composition_id=sample_composition_id, samples=samples, started_at=started_at
+        )
+
+        assert count == 12
+        assert len(metrics_collector._batch) == 12
+        first = {m.metric_type: m for m in metrics_collector._batch[:6]}
+        assert first[MetricType.ENCODER_CPU].metric_value == Decimal("180.0")
+        assert first[MetricType.ENCODER_MEMORY].metric_value == Decimal("200.0")
+        assert first[MetricType.ENCODER_MEMORY].metric_unit == "MB"
+        assert first[MetricType.ENCODER_WRITE_BYTES].metric_value == 8192
+        assert first[MetricType.ENCODE_SPEED].metric_unit == "x"
+        assert metrics_collector._batch[-1].recorded_at == started_at + timedelta(seconds=2)
+
     @pytest.mark.asyncio
     async def test_record_job_duration(
         self,
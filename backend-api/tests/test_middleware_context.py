@@ -0,0 +1,127 @@
+"""Tests for the pure ASGI middleware stack and its shared request context."""
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from app.middleware.context import REQUEST_CONTEXT_KEY, RequestContext, bind_request_context
+from app.middleware.error_handler import ErrorHandlerMiddleware
+from app.middleware.logging import LoggingMiddleware
+from app.middleware.metrics import MetricsMiddleware
+from app.middleware.request_id import RequestIDMiddleware
+
+
+@pytest.fixture
+def app() -> FastAPI:
+    """Create an app with the request ID, logging and metrics layers."""
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+    app.add_middleware(LoggingMiddleware)
+    app.add_middleware(RequestIDMiddleware)
+
+    @app.get("/context")
+    async def context_endpoint(request: Request) -> dict:
+        context = getattr(request.state, REQUEST_CONTEXT_KEY)
+        return {
+            "is_context": isinstance(context, RequestContext),
+            "request_id": request.state.request_id,
+            "context_request_id": context.request_id,
+        }
+
+    @app.get("/missing")
+    async def missing_endpoint() -> dict:
+        return {}
+
+    return app
+
+
+def find_middleware(app: FastAPI, name: str):
+    """Walk the built middleware chain and return the first layer with the given class name."""
+    layer = app.middleware_stack
+    while layer is not None:
+        if type(layer).__name__ == name:
+            return layer
+        layer = getattr(layer, "app", None)
+    return None
+
+
+def test_request_id_shared_with_handlers(app: FastAPI) -> None:
+    """The request ID header, request.state and the context agree."""
+    client = TestClient(app)
+
+    response = client.get("/context", headers={"X-Request-ID": "req-123"})
+
+    assert response.status_code == 200
+    assert response.headers["X-Request-ID"] == "req-123"
+    assert response.json() == {
+        "is_context": True,
+        "request_id": "req-123",
+        "context_request_id": "req-123",
+    }
+
+
+def test_request_id_generated_when_missing(app: FastAPI) -> None:
+    """A request ID is generated and echoed when the client sends none."""
+    client = TestClient(app)
+
+    response = client.get("/context")
+
+    assert response.headers["X-Request-ID"] == response.json()["request_id"]
+
+
+def test_metrics_use_status_from_context(app: FastAPI) -> None:
+    """Metrics record the status code the inner app actually sent."""
+    client = TestClient(app)
+
+    client.get("/context")
+    client.get("/nope")
+
+    metrics = find_middleware(app, "MetricsMiddleware").get_metrics()
+    assert metrics["total_requests"] == 2
+    assert metrics["requests_by_status"] == {200: 1, 404: 1}
+    assert metrics["response_times"]["GET /context"]["count"] == 1
+
+
+def test_error_handler_returns_json_500() -> None:
+    """Unhandled exceptions become a JSON 500 with the request ID."""
+    app = FastAPI()
+    app.add_middleware(ErrorHandlerMiddleware)
+    app.add_middleware(RequestIDMiddleware)
+
+    @app.get("/boom")
+    async def boom() -> dict:
+        raise ValueError("boom")
+
+    client = TestClient(app)
+    response = client.get("/boom", headers={"X-Request-ID": "req-boom"})
+
+    assert response.status_code == 500
+    assert response.headers["X-Request-ID"] == "req-boom"
+    assert response.json()["error"]["request_id"] == "req-boom"
+
+
+@pytest.mark.asyncio
+async def test_outermost_response_header_wins() -> None:
+    """When two layers queue the same header, the first (outer) one wins."""
+    sent = []
+
+    async def send(message: dict) -> None:
+        sent.append(message)
+
+    scope = {"type": "http", "method": "GET", "path": "/"}
+    context, wrapped_send = bind_request_context(scope, send)
+    inner_context, inner_send = bind_request_context(scope, wrapped_send)
+    assert inner_context is context
+    assert inner_send is wrapped_send
+
+    context.add_response_header("X-RateLimit-Limit", "100")
+    context.add_response_header("X-RateLimit-Limit", "10")
+    await wrapped_send(
+        {"type": "http.response.start", "status": 201, "headers": [(b"content-length", b"7")]}
+    )
+
+    headers = dict(sent[0]["headers"])
+    assert headers[b"x-ratelimit-limit"] == b"100"
+    assert context.status_code == 201
+    assert context.response_content_length == 7
+    assert context.response_started
@@ -0,0 +1,88 @@
+"""Unit tests for the shared sliding-window rate limiter."""
+
+from unittest.mock import MagicMock
+
+import fakeredis
+import pytest
+from app.middleware.rate_limiting import SlidingWindowRateLimiter
+
+
+@pytest.fixture
+def redis_client():
+    """In-memory async Redis with Lua scripting."""
+    return fakeredis.FakeAsyncRedis(decode_responses=True)
+
+
+@pytest.mark.asyncio
+async def test_burst_in_same_second_counts_every_request(redis_client):
+    """Requests within the same second must not collapse into one entry."""
+    limiter = SlidingWindowRateLimiter(redis_client=redis_client)
+
+    results = [await limiter.hit("rate_limit:ip:1:POST:/x", 10, 60) for _ in range(12)]
+
+    assert [r.allowed for r in results] == [True] * 10 + [False] * 2
+    assert [r.count for r in results[:10]] == list(range(1, 11))
+    assert await redis_client.zcard("rate_limit:ip:1:POST:/x") == 10
+
+
+@pytest.mark.asyncio
+async def test_rejection_reports_retry_after(redis_client):
+    limiter = SlidingWindowRateLimiter(redis_client=redis_client)
+    for _ in range(3):
+        await limiter.hit("key", 3, 60)
+
+    result = await limiter.hit("key", 3, 60)
+
+    assert result.allowed is False
+    assert result.count == 3
+    assert 1 <= result.retry_after <= 60
+
+
+@pytest.mark.asyncio
+async def test_under_limit_clients_are_served_from_local_lease(redis_client):
+    limiter = SlidingWindowRateLimiter(redis_client=redis_client, lease_size=5)
+    first = await limiter.hit("key", 1000, 60)
+
+    script_calls = MagicMock(wraps=redis_client.evalsha)
+    redis_client.evalsha = script_calls
+    results = [first] + [await limiter.hit("key", 1000, 60) for _ in range(4)]
+
+    assert all(r.allowed for r in results)
+    assert [r.count for r in results] == [1, 2, 3, 4, 5]
+    assert script_calls.call_count == 0
+    # Leased slots are reserved in Redis, so other processes see them
+    assert await redis_client.zcard("key") == 5
+
+
+@pytest.mark.asyncio
+async def test_expired_lease_releases_unused_slots(redis_client):
+    limiter = SlidingWindowRateLimiter(redis_client=redis_client, lease_size=5, lease_ttl=0.0)
+
+    await limiter.hit("key", 1000, 60)
+    assert await redis_client.zcard("key") == 5
+
+    await limiter.hit("key", 1000, 60)
+    # One used slot from the first lease plus five newly reserved
+    assert await redis_client.zcard("key") == 6
+
+
+@pytest.mark.asyncio
+async def test_no_lease_near_the_limit(redis_client):
+    limiter = SlidingWindowRateLimiter(redis_client=redis_client, lease_size=5)
+
+    for _ in range(12):
+        await limiter.hit("key", 20, 60)
+
+    # limit // 20 leaves no room for leasing, so every request hits Redis
+    assert await redis_client.zcard("key") == 12
+
+
+@pytest.mark.asyncio
+async def test_redis_failure_fails_open(redis_client):
+    redis_client.evalsha = MagicMock(side_effect=ConnectionError("down"))
+    limiter = SlidingWindowRateLimiter(redis_client=redis_client)
+
+    result = await limiter.hit("key", 1, 60)
+
+    assert result.allowed is True
+    assert result.count == 0
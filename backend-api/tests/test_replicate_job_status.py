@@ -0,0 +1,233 @@
+"""
+Unit tests for Replicate AI job status polling.
+
+Tests single-flight status refreshes, atomic write-through to the job cache,
+notification-driven long-polling and the server-sent event stream.
+"""
+
+import asyncio
+import json
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import fakeredis
+import pytest
+from app.api.v1 import replicate as replicate_api
+from app.main import create_app
+from fastapi.testclient import TestClient
+from services.job_status_notifier import JobStatusNotifier, job_status_channel
+
+JOB_ID = "pred_abc123"
+
+
+def cache_job(redis_conn, job_id: str = JOB_ID, **fields) -> None:
+    """Store job data the way the generation endpoints do."""
+    job_data = {"job_id": job_id, "status": "queued", "prompt": "a cat", "model": "m", **fields}
+    redis_conn.setex(f"ai_job:{job_id}", 86400, json.dumps(job_data))
+
+
+@pytest.fixture
+def redis_conn():
+    """In-memory Redis shared by the endpoints and the status notifier under test."""
+    server = fakeredis.FakeServer()
+    conn = fakeredis.FakeRedis(server=server, decode_responses=True)
+    notifier = JobStatusNotifier(fakeredis.FakeAsyncRedis(server=server, decode_responses=True))
+    with (
+        patch.object(replicate_api, "get_redis_connection", return_value=conn),
+        patch.object(replicate_api, "get_job_status_notifier", return_value=notifier),
+    ):
+        yield conn
+
+
+@pytest.fixture
+def predictions(monkeypatch):
+    """Replicate predictions API returning a processing prediction."""
+    import replicate
+
+    monkeypatch.setenv("REPLICATE_API_TOKEN", "test-token")
+    get = MagicMock(return_value=SimpleNamespace(status="processing", output=None, error=None))
+    monkeypatch.setattr(replicate.predictions, "get", get)
+    return get
+
+
+@pytest.fixture
+def client(redis_conn):
+    """Create test client with the job cache in fakeredis."""
+    app = create_app()
+    yield TestClient(app, raise_server_exceptions=False)
+
+
+class TestStatusRefresh:
+    """Test cases for resolve_job_status."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_polls_refresh_once(self, redis_conn, predictions):
+        """Concurrent polls of a running job make a single upstream call."""
+        cache_job(redis_conn)
+
+        results = await asyncio.gather(
+            *[replicate_api.resolve_job_status(redis_conn, JOB_ID) for _ in range(10)]
+        )
+
+        assert predictions.call_count == 1
+        assert {result["status"] for result in results} <= {"queued", "processing"}
+        assert replicate_api.read_job_data(redis_conn, JOB_ID)["status"] == "processing"
+        assert replicate_api.read_job_data(redis_conn, JOB_ID)["prompt"] == "a cat"
+
+    @pytest.mark.asyncio
+    async def test_refresh_waits_for_minimum_interval(self, redis_conn, predictions):
+        """A job is refreshed again only once its refresh claim expires."""
+        cache_job(redis_conn)
+
+        await replicate_api.resolve_job_status(redis_conn, JOB_ID)
+        await replicate_api.resolve_job_status(redis_conn, JOB_ID)
+        assert predictions.call_count == 1
+        assert 0 < redis_conn.pttl(f"ai_job:refresh:{JOB_ID}") <= 5000
+
+        redis_conn.delete(f"ai_job:refresh:{JOB_ID}")
+        await replicate_api.resolve_job_status(redis_conn, JOB_ID)
+        assert predictions.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_finished_job_is_served_from_cache(self, redis_conn, predictions):
+        """Terminal jobs with a result never query Replicate."""
+        cache_job(redis_conn, status="succeeded", result_url="https://cdn/x.mp4")
+
+        job_data = await replicate_api.resolve_job_status(redis_conn, JOB_ID)
+
+        assert job_data["status"] == "succeeded"
+        predictions.assert_not_called()
+
+    def test_terminal_status_is_not_overwritten(self, redis_conn):
+        """A stale refresh cannot undo a terminal webhook update."""
+        replicate_api.write_job_status(
+            redis_conn, JOB_ID, "succeeded", result_url="https://cdn/x.mp4"
+        )
+        job_data = replicate_api.write_job_status(redis_conn, JOB_ID, "processing")
+
+        assert job_data["status"] == "succeeded"
+        assert replicate_api.read_job_data(redis_conn, JOB_ID)["result_url"] == "https://cdn/x.mp4"
+
+    def test_write_racing_a_refresh_is_not_lost(self, redis_conn):
+        """A write landing between a refresh's read and write makes the refresh retry."""
+        cache_job(redis_conn, status="processing")
+        seen = []
+
+        def stale_refresh(job_data):
+            seen.append(job_data["status"])
+            if len(seen) == 1:
+                replicate_api.write_job_status(
+                    redis_conn, JOB_ID, "succeeded", result_url="https://cdn/x.mp4"
+                )
+            if job_data["status"] in replicate_api.TERMINAL_JOB_STATUSES:
+                return None
+            return {**job_data, "status": "processing"}
+
+        job_data = replicate_api.update_job_data(redis_conn, JOB_ID, stale_refresh)
+
+        assert seen == ["processing", "succeeded"]
+        assert job_data["status"] == "succeeded"
+        assert replicate_api.read_job_data(redis_conn, JOB_ID)["status"] == "succeeded"
+
+    def test_write_publishes_stored_data(self, redis_conn):
+        """Every cache write is announced on the job's status channel."""
+        pubsub = redis_conn.pubsub()
+        pubsub.subscribe(job_status_channel(JOB_ID))
+        pubsub.get_message(timeout=1)
+
+        replicate_api.write_job_status(redis_conn, JOB_ID, "failed", error="boom")
+
+        message = pubsub.get_message(ignore_subscribe_messages=True, timeout=1)
+        assert json.loads(message["data"])["error"] == "boom"
+
+
+class TestJobStatusEndpoint:
+    """Test cases for GET /api/v1/replicate/jobs/{job_id}."""
+
+    def test_webhook_update_makes_poll_a_cache_read(self, client, redis_conn, predictions):
+        """Polls after the webhook return its result without calling Replicate."""
+        cache_job(redis_conn)
+
+        response = client.post(
+            "/api/v1/replicate/webhook",
+            json={"id": JOB_ID, "status": "succeeded", "output": "https://cdn/x.mp4"},
+        )
+        assert response.status_code == 200
+
+        response = client.get(f"/api/v1/replicate/jobs/{JOB_ID}", params={"auto_import": False})
+
+        assert response.status_code == 200
+        assert response.json()["status"] == "succeeded"
+        assert response.json()["result_url"] == "https://cdn/x.mp4"
+        assert replicate_api.read_job_data(redis_conn, JOB_ID)["prompt"] == "a cat"
+        predictions.assert_not_called()
+
+    def test_unknown_job_returns_404(self, client, monkeypatch):
+        """Jobs that are neither cached nor known to Replicate are not found."""
+        monkeypatch.delenv("REPLICATE_API_TOKEN", raising=False)
+
+        response = client.get("/api/v1/replicate/jobs/missing")
+
+        assert response.status_code == 404
+
+    @pytest.mark.asyncio
+    async def test_long_poll_returns_on_status_change(self, redis_conn, monkeypatch):
+        """Waiting is woken by the write's notification, without re-reading the cache."""
+        monkeypatch.delenv("REPLICATE_API_TOKEN", raising=False)
+        cache_job(redis_conn, status="processing")
+
+        async def finish():
+            await asyncio.sleep(0.05)
+            replicate_api.write_job_status(redis_conn, JOB_ID, "failed", error="boom")
+
+        task = asyncio.create_task(finish())
+        with patch.object(
+            replicate_api, "read_job_data", wraps=replicate_api.read_job_data
+        ) as reads:
+            job_data = await asyncio.wait_for(
+                replicate_api.wait_for_job_status(
+                    redis_conn, JOB_ID, since="processing", timeout=5.0
+                ),
+                timeout=0.9,
+            )
+        await task
+
+        assert job_data["status"] == "failed"
+        assert job_data["error"] == "boom"
+        assert reads.call_count == 1
+
+    def test_long_poll_times_out_with_current_status(self, client, redis_conn, monkeypatch):
+        """A wait that sees no change returns the unchanged status."""
+        monkeypatch.delenv("REPLICATE_API_TOKEN", raising=False)
+        cache_job(redis_conn, status="processing")
+
+        response = client.get(f"/api/v1/replicate/jobs/{JOB_ID}", params={"wait": 0.05})
+
+        assert response.status_code == 200
+        assert response.json()["status"] == "processing"
+
+
+class TestJobStatusStream:
+    """Test cases for GET /api/v1/replicate/jobs/{job_id}/events."""
+
+    def test_stream_ends_after_terminal_status(self, client, redis_conn, monkeypatch):
+        """The stream sends the terminal status and closes."""
+        monkeypatch.delenv("REPLICATE_API_TOKEN", raising=False)
+        cache_job(redis_conn, status="failed", error="boom")
+
+        response = client.get(f"/api/v1/replicate/jobs/{JOB_ID}/events")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = [chunk for chunk in response.text.split("\n\n") if chunk]
+        assert len(events) == 1
+        assert events[0].startswith("event: status\ndata: ")
+        assert json.loads(events[0].split("data: ", 1)[1])["error"] == "boom"
+
+    def test_stream_unknown_job_returns_404(self, client, monkeypatch):
+        """Streams for unknown jobs are rejected up front."""
+        monkeypatch.delenv("REPLICATE_API_TOKEN", raising=False)
+
+        response = client.get("/api/v1/replicate/jobs/missing/events")
+
+        assert response.status_code == 404